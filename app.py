@@ -7,6 +7,7 @@ from services.vision_service import VisionService
 from services.ocr_service_new import OcrService  # Phase 1: השתמש בגרסה החדשה
 from models.grid import CellType
 from database import PuzzleRepository
+from services.usage_ledger import UsageLedger, get_ledger, set_ledger, usage_context
 
 st.set_page_config(page_title="Crossword Architect", layout="wide")
 st.title("AI Crossword Architect 🧩")
@@ -32,6 +33,10 @@ if 'show_save_dialog' not in st.session_state:
 # Repository לגישה ל-Database
 puzzle_repo = PuzzleRepository()
 
+# רישום הקריאות למודלים (טוקנים, זמן ועלות) - אלא אם הוגדר ledger אחר
+if get_ledger() is None:
+    set_ledger(UsageLedger())
+
 # --- סרגל צד ---
 with st.sidebar:
     st.header("1. העלאת תמונה")
@@ -138,6 +143,8 @@ if st.session_state.show_save_dialog:
 
 if uploaded_file is not None:
     image = Image.open(uploaded_file)
+    # שם התשבץ לרישום הקריאות למודלים
+    usage_puzzle = st.session_state.loaded_puzzle_name or uploaded_file.name
     # המרה ל-RGB אם צריך (למקרה של RGBA או אחר)
     if image.mode != 'RGB':
         image = image.convert('RGB')
@@ -312,10 +319,11 @@ if uploaded_file is not None:
                 ocr_service = OcrService(use_cloud_services=use_cloud)
                 # המרה ל-BGR כי כל הקוד מצפה לפורמט OpenCV
                 image_bgr = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                updated_grid = ocr_service.recognize_clues(
-                    image_bgr,
-                    st.session_state.analyzed_grid
-                )
+                with usage_context(puzzle=usage_puzzle):
+                    updated_grid = ocr_service.recognize_clues(
+                        image_bgr,
+                        st.session_state.analyzed_grid
+                    )
                 st.session_state.analyzed_grid = updated_grid
 
                 # שמירת הלוגים מה-batch_processor
@@ -369,12 +377,13 @@ if uploaded_file is not None:
                             image_bgr = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
 
                             # בחינה חוזרת
-                            result = batch_processor.reexamine_cell(
-                                image_bgr,
-                                st.session_state.analyzed_grid,
-                                row_idx,
-                                col_idx
-                            )
+                            with usage_context(puzzle=usage_puzzle):
+                                result = batch_processor.reexamine_cell(
+                                    image_bgr,
+                                    st.session_state.analyzed_grid,
+                                    row_idx,
+                                    col_idx
+                                )
 
                             if result:
                                 st.success(f"✅ משבצת ({reexamine_row},{reexamine_col}) נבחנה מחדש בהצלחה!")
@@ -742,12 +751,12 @@ if uploaded_file is not None:
                 if 'puzzle_solver' not in st.session_state:
                     from services.puzzle_solver import PuzzleSolver
                     from services.solution_grid import SolutionGrid
-                    from services.clue_solver import ClueSolver
+                    from services.ensemble_clue_solver import create_clue_solver
                     from config.cloud_config import get_cloud_config
 
                     config = get_cloud_config()
                     solution = SolutionGrid(grid_obj.rows, grid_obj.cols)
-                    solver = ClueSolver(api_key=config.claude.api_key, model=config.claude.model)
+                    solver = create_clue_solver(config.claude)
                     puzzle_solver = PuzzleSolver(clue_db, solution, solver)
                     st.session_state.puzzle_solver = puzzle_solver
                     st.session_state.solution_grid = solution
@@ -757,7 +766,8 @@ if uploaded_file is not None:
                     cell_size=40,
                     letter_delay_ms=150,
                     show_stats=True,
-                    show_manual_edit=True
+                    show_manual_edit=True,
+                    puzzle_name=usage_puzzle
                 )
 
                 # Render interactive solver
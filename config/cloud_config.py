@@ -65,7 +65,10 @@ class GoogleVisionConfig:
 
     # Retry settings
     max_retries: int = 3
-    retry_delay: float = 1.0  # שניות
+    retry_delay: float = 1.0  # שניות (בסיס ל-exponential backoff)
+    # Deadlines / hedging (services.call_policy)
+    request_timeout: float = 60.0  # deadline לכל ניסיון בשניות
+    hedge_requests: bool = False  # בקשה כפולה אחרי p95 של זמני התגובה
 
 
 @dataclass
@@ -80,14 +83,27 @@ class ClaudeVisionConfig:
         )
     )
 
+    # כתובת API חלופית (למשל tests.mock_model_server); None = ברירת המחדל של ה-SDK
+    base_url: Optional[str] = field(default_factory=lambda: os.environ.get('ANTHROPIC_BASE_URL'))
+
     # Model settings
     model: str = "claude-sonnet-4-20250514"  # מודל מומלץ - מאזן בין דיוק לעלות
     max_tokens: int = 1024
+
+    # Ensemble לפתרון הגדרות (services.ensemble_clue_solver) - מהמודל המהיר לחזק.
+    # ריק = רק model. למשל: ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"]
+    ensemble_models: list = field(default_factory=list)
+    ensemble_weights: list = field(default_factory=list)  # ריק = 1, 2, 3...
+    ensemble_escalate_confidence: float = 0.75  # ביטחון מוביל שמתחתיו מסלימים
+    ensemble_escalate_certainty: float = 0.4  # clue_certainty שמתחתיו מסלימים
     temperature: float = 0.1  # נמוך לתוצאות עקביות
 
     # Retry settings
     max_retries: int = 3
     retry_delay: float = 1.0
+    # Deadlines / hedging (services.call_policy)
+    request_timeout: float = 60.0  # deadline לכל ניסיון בשניות
+    hedge_requests: bool = False  # בקשה כפולה אחרי p95 של זמני התגובה
 
 
 @dataclass
@@ -103,6 +119,9 @@ class GPTVisionConfig:
         )
     )
 
+    # כתובת API חלופית (למשל tests.mock_model_server); None = ברירת המחדל של ה-SDK
+    base_url: Optional[str] = field(default_factory=lambda: os.environ.get('OPENAI_BASE_URL'))
+
     # Model settings
     model: str = "gpt-5.2"  # GPT-5.2 - המודל המתקדם ביותר של OpenAI
     max_tokens: int = 1024
@@ -111,6 +130,9 @@ class GPTVisionConfig:
     # Retry settings
     max_retries: int = 3
     retry_delay: float = 1.0
+    # Deadlines / hedging (services.call_policy)
+    request_timeout: float = 60.0  # deadline לכל ניסיון בשניות
+    hedge_requests: bool = False  # בקשה כפולה אחרי p95 של זמני התגובה
 
 
 @dataclass
@@ -127,6 +149,9 @@ class GeminiVisionConfig:
         )
     )
 
+    # כתובת API חלופית (למשל tests.mock_model_server); None = ברירת המחדל של ה-SDK
+    base_url: Optional[str] = field(default_factory=lambda: os.environ.get('GEMINI_BASE_URL'))
+
     # Model settings
     model: str = "gemini-3-pro-preview"  # Gemini 3 Pro - המודל המתקדם ביותר של Google
     max_tokens: int = 16384  # הגדלנו עוד יותר כי thinking צורך הרבה טוקנים
@@ -136,6 +161,9 @@ class GeminiVisionConfig:
     # Retry settings
     max_retries: int = 3
     retry_delay: float = 1.0
+    # Deadlines / hedging (services.call_policy)
+    request_timeout: float = 120.0  # deadline לכל ניסיון בשניות
+    hedge_requests: bool = False  # בקשה כפולה אחרי p95 של זמני התגובה
 
 
 @dataclass
@@ -152,6 +180,14 @@ class CloudServicesConfig:
     fallback_on_low_confidence: bool = False  # לא להשתמש ב-Template Matching גם ב-confidence נמוך
     fallback_confidence_threshold: float = 0.0  # סף 0 = לא משנה
 
+    # Circuit breaker לכל ספק חצים (services.circuit_breaker)
+    # כשהמפסק של הספק פתוח - ניתוב מיידי לספק הזמין הבא לפי failover_order
+    enable_failover: bool = True
+    failover_order: list = field(default_factory=lambda: ["gemini", "gpt", "claude", "template"])
+    breaker_failure_threshold: int = 3  # כשלונות רצופים שפותחים את המפסק
+    breaker_slow_call_seconds: float = 90.0  # תשובה איטית מזה נחשבת כשלון
+    breaker_reset_seconds: float = 30.0  # זמן עד קריאת בדיקה (half-open)
+
     # Sub-configs
     google: GoogleVisionConfig = field(default_factory=GoogleVisionConfig)
     claude: ClaudeVisionConfig = field(default_factory=ClaudeVisionConfig)
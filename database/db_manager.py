@@ -88,11 +88,72 @@ class DatabaseManager:
             )
         ''')
 
+        # Solver checkpoints table (מצב פתרון שמור - services/solver_checkpoint.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS solver_checkpoints (
+                key TEXT PRIMARY KEY,
+                format_version INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                data BLOB NOT NULL
+            )
+        ''')
+
+        # Calibration samples table (מועמדים מפתרונות קודמים - services/confidence_calibration.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS calibration_samples (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                confidence REAL NOT NULL,
+                clue_certainty REAL NOT NULL,
+                pattern_fill REAL NOT NULL,
+                correct INTEGER NOT NULL,
+                source TEXT DEFAULT '',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Solved clues table (הגדרות שנפתרו לחיפוש דמיון - services/clue_retrieval.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS solved_clues (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                source TEXT DEFAULT '',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(text, answer)
+            )
+        ''')
+
+        # Model calls table (טוקנים, זמן ועלות לכל קריאה למודל - services/usage_ledger.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS model_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                stage TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                puzzle TEXT DEFAULT '',
+                cell TEXT DEFAULT '',
+                clues TEXT DEFAULT '',
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                thinking_tokens INTEGER DEFAULT 0,
+                units INTEGER DEFAULT 0,
+                latency REAL DEFAULT 0.0,
+                attempts INTEGER DEFAULT 0,
+                retries INTEGER DEFAULT 0,
+                hedges INTEGER DEFAULT 0,
+                success INTEGER DEFAULT 1,
+                error TEXT DEFAULT '',
+                cost_usd REAL DEFAULT 0.0
+            )
+        ''')
+
         # Create indexes
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_cells_puzzle ON cells(puzzle_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_cells_position ON cells(puzzle_id, row, col)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_clues_puzzle ON clues(puzzle_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_clues_cell ON clues(cell_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_model_calls_puzzle ON model_calls(puzzle)')
 
         conn.commit()
 
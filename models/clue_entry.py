@@ -3,8 +3,9 @@ ClueEntry Model
 מודל להגדרה בודדת בתשבץ
 """
 
+from collections.abc import Mapping, MutableMapping
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterator
 from enum import Enum
 
 
@@ -16,6 +17,123 @@ class WritingDirection(Enum):
     LEFT = "left"
 
 
+class KnownLetters(MutableMapping):
+    """
+    אותיות ידועות של הגדרה - מתנהג כמו {מיקום: אות}.
+
+    האותיות מוחזקות ב-buffer בגודל אורך התשובה. התבנית ("כ_ב_") ומסכת הביטים
+    של המיקומים הידועים נשמרות ב-cache ומתעדכנות רק כשאות משתנה, כך שקריאת
+    התבנית בלולאת ה-propagation לא מקצה זיכרון.
+    """
+
+    __slots__ = ('_buffer', '_count', '_mask', '_pattern', '_pattern_length')
+
+    def __init__(self, letters: Optional[Mapping] = None, size: int = 0):
+        """
+        Args:
+            letters: אותיות התחלתיות {מיקום: אות}
+            size: גודל ה-buffer (אורך התשובה) - גדל לבד אם צריך
+        """
+        self._buffer: List[Optional[str]] = [None] * size
+        self._count = 0
+        self._mask = 0
+        self._pattern: Optional[str] = None
+        self._pattern_length = -1
+
+        if letters:
+            for pos, letter in letters.items():
+                self[pos] = letter
+
+    def __getitem__(self, pos: int) -> str:
+        if 0 <= pos < len(self._buffer):
+            letter = self._buffer[pos]
+            if letter is not None:
+                return letter
+        raise KeyError(pos)
+
+    def __setitem__(self, pos: int, letter: str) -> None:
+        if pos < 0:
+            raise KeyError(pos)
+
+        buffer = self._buffer
+        if pos >= len(buffer):
+            buffer.extend([None] * (pos + 1 - len(buffer)))
+
+        current = buffer[pos]
+        if current == letter:
+            return
+
+        if current is None:
+            self._count += 1
+            self._mask |= 1 << pos
+        buffer[pos] = letter
+        self._pattern = None
+
+    def __delitem__(self, pos: int) -> None:
+        self[pos]  # KeyError אם אין אות
+
+        self._buffer[pos] = None
+        self._count -= 1
+        self._mask &= ~(1 << pos)
+        self._pattern = None
+
+    def __contains__(self, pos) -> bool:
+        return isinstance(pos, int) and 0 <= pos < len(self._buffer) and self._buffer[pos] is not None
+
+    def __iter__(self) -> Iterator[int]:
+        for pos, letter in enumerate(self._buffer):
+            if letter is not None:
+                yield pos
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"KnownLetters({dict(self)!r})"
+
+    def __reduce__(self):
+        return (KnownLetters, (dict(self), len(self._buffer)))
+
+    def clear(self) -> None:
+        """מחיקת כל האותיות"""
+        if self._count:
+            self._buffer = [None] * len(self._buffer)
+            self._count = 0
+            self._mask = 0
+            self._pattern = None
+
+    def assign(self, letters: Mapping) -> None:
+        """החלפת כל האותיות - ה-cache נשמר אם התוכן לא השתנה"""
+        if letters is self:
+            return
+        if len(letters) == self._count and all(
+            pos in self and self._buffer[pos] == letter for pos, letter in letters.items()
+        ):
+            return
+
+        self.clear()
+        for pos, letter in letters.items():
+            self[pos] = letter
+
+    @property
+    def mask(self) -> int:
+        """מסכת ביטים של המיקומים הידועים (ביט i = אות ידועה במיקום i)"""
+        return self._mask
+
+    def pattern(self, length: int) -> str:
+        """
+        התבנית באורך נתון ("כ_ב_"). מחושבת מחדש רק אחרי שינוי באותיות.
+        """
+        if self._pattern is None or self._pattern_length != length:
+            buffer = self._buffer
+            self._pattern = "".join(
+                (buffer[i] if i < len(buffer) and buffer[i] is not None else "_")
+                for i in range(length)
+            )
+            self._pattern_length = length
+        return self._pattern
+
+
 @dataclass
 class ClueEntry:
     """
@@ -44,7 +162,10 @@ class ClueEntry:
     answer_cells: List[Tuple[int, int]] = field(default_factory=list)  # כל המשבצות
 
     # === פתרון ===
-    known_letters: Dict[int, str] = field(default_factory=dict)  # אותיות ידועות {0: 'כ', 2: 'ב'}
+    _known_letters: KnownLetters = field(
+        default_factory=KnownLetters, init=False, repr=False, compare=False
+    )
+    known_letters: Dict[int, str]  # אותיות ידועות {0: 'כ', 2: 'ב'} - property, ראו למטה
     candidates: List[Tuple[str, float]] = field(default_factory=list)  # [(תשובה, ביטחון), ...]
     chosen_answer: Optional[str] = None  # התשובה שנבחרה
 
@@ -53,6 +174,19 @@ class ClueEntry:
     is_solved: bool = False
     error: Optional[str] = None
 
+    @property
+    def known_letters(self) -> KnownLetters:
+        """אותיות ידועות {מיקום: אות}"""
+        return self._known_letters
+
+    @known_letters.setter
+    def known_letters(self, letters: Mapping) -> None:
+        # השמה (למשל clue.known_letters = {...}) מעדכנת את ה-buffer הקיים.
+        # בלי ערך ב-__init__ ה-dataclass מעביר את ה-property עצמו כברירת מחדל
+        if isinstance(letters, property):
+            letters = {}
+        self._known_letters.assign(letters)
+
     def __post_init__(self):
         """חישוב ביטחון כולל"""
         if self.ocr_confidence > 0 or self.arrow_confidence > 0:
@@ -66,11 +200,11 @@ class ClueEntry:
         if self.answer_length == 0:
             return ""
 
-        result = ["_"] * self.answer_length
-        for pos, letter in self.known_letters.items():
-            if 0 <= pos < self.answer_length:
-                result[pos] = letter
-        return "".join(result)
+        return self.known_letters.pattern(self.answer_length)
+
+    def get_known_mask(self) -> int:
+        """מסכת ביטים של המיקומים עם אות ידועה"""
+        return self.known_letters.mask
 
     def matches_answer(self, answer: str) -> bool:
         """
@@ -98,7 +232,7 @@ class ClueEntry:
             'writing_direction': self.writing_direction.value if self.writing_direction else None,
             'answer_length': self.answer_length,
             'answer_cells': self.answer_cells,
-            'known_letters': self.known_letters,
+            'known_letters': dict(self.known_letters),
             'constraint': self.get_constraint_string(),
             'candidates': self.candidates[:5],  # רק 5 ראשונים
             'chosen_answer': self.chosen_answer,
@@ -134,3 +268,4 @@ class ClueEntry:
             arrow_confidence=parsed_clue.get('arrow_confidence', 0.0),
             overall_confidence=parsed_clue.get('confidence', 0.0)
         )
+
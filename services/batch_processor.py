@@ -3,6 +3,7 @@ Batch Processor - Updated for Phase 2
 עיבוד מקבילי של משבצות גריד עם תמיכה ב-Cloud Services
 """
 
+import contextvars
 import time
 import numpy as np
 from typing import Callable, Optional
@@ -15,6 +16,7 @@ from services.recognition_orchestrator import RecognitionOrchestrator
 from services.confidence_scorer import ConfidenceScorer
 from services.split_cell_analyzer import SplitCellAnalyzer
 from services.arrow_offset_calculator import ArrowOffsetCalculator
+from services.usage_ledger import usage_context
 from config.cloud_config import get_cloud_config
 
 
@@ -98,11 +100,11 @@ class BatchProcessor:
         import streamlit as st
         st.info(f"מעבד {len(tasks)} משבצות הגדרה...")
 
-        # עיבוד מקבילי
+        # עיבוד מקבילי - כל task רץ בעותק של ה-context (התשבץ של ה-usage ledger)
         results = {}
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_task = {
-                executor.submit(self._process_single_cell, task): task
+                executor.submit(contextvars.copy_context().run, self._process_single_cell, task): task
                 for task in tasks
             }
 
@@ -172,7 +174,12 @@ class BatchProcessor:
         return tasks
 
     def _process_single_cell(self, task: dict) -> CellRecognitionResult:
-        """עיבוד משבצת בודדת"""
+        """עיבוד משבצת בודדת (הקריאות למודלים נרשמות עם המשבצת - services.usage_ledger)"""
+        with usage_context(cell=(task['row'], task['col'])):
+            return self._recognize_cell(task)
+
+    def _recognize_cell(self, task: dict) -> CellRecognitionResult:
+        """OCR וזיהוי חצים למשבצת בודדת"""
         start_time = time.time()
         cell_image = task['image']  # תמונה מדויקת לזיהוי טקסט
         arrow_image = task.get('arrow_image', cell_image)  # תמונה מורחבת לזיהוי חצים
@@ -280,11 +287,12 @@ class BatchProcessor:
                     for a in arrow_results
                 ]
 
-                split_result = self.split_analyzer.analyze_split_cell(
-                    result.arrow_image if result.arrow_image is not None else result.cell_image,
-                    ocr_text,
-                    arrows_info
-                )
+                with usage_context(cell=(row, col)):
+                    split_result = self.split_analyzer.analyze_split_cell(
+                        result.arrow_image if result.arrow_image is not None else result.cell_image,
+                        ocr_text,
+                        arrows_info
+                    )
 
                 if split_result.definitions and len(split_result.definitions) == 2:
                     # הצלחנו לפצל!
@@ -630,11 +638,12 @@ class BatchProcessor:
                 for a in arrow_results
             ]
 
-            split_result = self.split_analyzer.analyze_split_cell(
-                result.arrow_image if result.arrow_image is not None else result.cell_image,
-                ocr_text,
-                arrows_info
-            )
+            with usage_context(cell=(row, col)):
+                split_result = self.split_analyzer.analyze_split_cell(
+                    result.arrow_image if result.arrow_image is not None else result.cell_image,
+                    ocr_text,
+                    arrows_info
+                )
 
             if split_result.definitions and len(split_result.definitions) == 2:
                 for i, defn in enumerate(split_result.definitions):
@@ -0,0 +1,333 @@
+"""
+Call Policy - deadlines, backoff ו-hedging לקריאות למודלים
+
+קריאה איטית אחת ל-API תוקעת worker שלם של BatchProcessor. ResilientCaller עוטף
+קריאה בודדת (פונקציה שמקבלת את ה-timeout שנותר) ומוסיף:
+- deadline לכל ניסיון - גם כשה-SDK לא מכבד timeout, הקורא לא מחכה יותר
+- deadline כולל לקריאה (כל הניסיונות יחד)
+- retries עם exponential backoff ו-full jitter (במקום retry_delay * (attempt+1))
+- hedging: אם אין תשובה אחרי p95 של זמני התגובה האחרונים (או זמן קבוע),
+  נשלחת בקשה כפולה - והראשונה שחוזרת מנצחת
+
+הניסיונות רצים ב-thread pool משותף; ניסיון שננטש (timeout או hedge שהפסיד)
+ממשיך ברקע עד שה-SDK מסיים אותו, ולכן כדאי להעביר את ה-timeout גם ל-SDK.
+בקשות hedge עולות במכסה - כדאי להפעיל רק כשה-tail latency הוא הבעיה.
+
+עם UsageMeter (services.usage_ledger) כל קריאה נרשמת ב-ledger עם הטוקנים,
+הזמן ומספר הניסיונות, ה-retries וה-hedges שלה.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+MAX_CALL_THREADS = 64
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """thread pool משותף לכל הקריאות"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CALL_THREADS, thread_name_prefix="model-call")
+        return _executor
+
+
+class CallTimeout(TimeoutError):
+    """עבר ה-deadline של הקריאה"""
+
+
+def timeout_kwargs(timeout: Optional[float]) -> Dict[str, float]:
+    """{'timeout': ...} ל-SDK, או {} כשאין timeout (ברירת המחדל של ה-SDK)"""
+    return {'timeout': timeout} if timeout is not None else {}
+
+
+def timeout_ms(timeout: Optional[float]) -> Optional[int]:
+    """timeout במילישניות (HttpOptions של Gemini), לפחות 1 - או None כשאין timeout"""
+    return None if timeout is None else max(1, math.ceil(timeout * 1000))
+
+
+@dataclass
+class CallPolicy:
+    """מדיניות קריאה למודל"""
+    timeout: Optional[float] = 60.0        # deadline לכל ניסיון (שניות)
+    total_timeout: Optional[float] = None  # deadline לכל הניסיונות יחד
+    max_attempts: int = 3
+    backoff_base: float = 1.0              # ההשהיה לפני ה-retry הראשון (לפני jitter)
+    backoff_max: float = 20.0
+    hedge: bool = False
+    hedge_after: Optional[float] = None    # זמן קבוע ל-hedge; None = לפי percentile
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20            # עד שנאספו מספיק זמנים - בלי hedge אוטומטי
+    max_hedges: int = 1
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'CallPolicy':
+        """מתוך הגדרות של שירות (max_retries, retry_delay, request_timeout, hedge_requests)"""
+        return cls(
+            timeout=getattr(config, 'request_timeout', 60.0),
+            max_attempts=max(1, getattr(config, 'max_retries', 3)),
+            backoff_base=getattr(config, 'retry_delay', 1.0),
+            hedge=getattr(config, 'hedge_requests', False),
+        )
+
+    def backoff(self, attempt: int, rng: random.Random) -> float:
+        """השהיה לפני ניסיון attempt+1: full jitter על base * 2^attempt"""
+        return rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """זמני התגובה האחרונים של קריאות שהצליחו"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        """pickle - בלי הנעילה"""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """האחוזון p (0-1), או None אם אין דגימות"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+class ResilientCaller:
+    """
+    מריץ קריאות לפי CallPolicy ושומר סטטיסטיקות וזמני תגובה.
+
+    Example:
+        caller = ResilientCaller(CallPolicy(timeout=30, hedge=True), name="gemini")
+        text = caller.call(lambda timeout: client.generate(..., timeout=timeout))
+    """
+
+    def __init__(
+        self,
+        policy: Optional[CallPolicy] = None,
+        name: str = "",
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        on_error: Optional[Callable[[int, Exception], None]] = None
+    ):
+        """
+        Args:
+            policy: המדיניות (ברירת מחדל: CallPolicy())
+            name: שם לסטטיסטיקות
+            seed: seed ל-jitter (None = אקראי)
+            sleep: פונקציית ההשהיה בין ניסיונות (להחלפה בבדיקות)
+            on_error: נקרא עם (מספר הניסיון, החריגה) על כל ניסיון שנכשל
+        """
+        self.policy = policy or CallPolicy()
+        self.name = name
+        self.latencies = LatencyTracker()
+        self.on_error = on_error
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        # סטטיסטיקות
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.failures = 0
+
+    def __getstate__(self) -> Dict:
+        """pickle (ל-worker process) - בלי נעילה ובלי on_error"""
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['on_error'] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def hedge_delay(self) -> Optional[float]:
+        """אחרי כמה שניות לשלוח בקשה כפולה (None = לא שולחים)"""
+        if not self.policy.hedge:
+            return None
+        if self.policy.hedge_after is not None:
+            return self.policy.hedge_after
+        if len(self.latencies) < self.policy.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.policy.hedge_percentile)
+
+    def call(
+        self,
+        func: Callable[[Optional[float]], T],
+        deadline: Optional[float] = None,
+        meter: Optional[Any] = None
+    ) -> T:
+        """
+        מריץ func(timeout) עם retries ו-hedging.
+
+        Args:
+            func: הקריאה; מקבלת את ה-timeout שנותר לניסיון (להעברה ל-SDK)
+            deadline: זמן מוחלט (time.time()) שאחריו מוותרים - בנוסף ל-total_timeout
+            meter: UsageMeter שנסגר בסוף הקריאה (הצלחה או כישלון) עם הזמן והניסיונות
+
+        Returns:
+            התשובה של הניסיון הראשון שהצליח
+
+        Raises:
+            החריגה של הניסיון האחרון, או CallTimeout
+        """
+        self._count(calls=1)
+        policy = self.policy
+        start = time.time()
+        tally = {'attempts': 0, 'retries': 0, 'hedges': 0}   # של הקריאה הזו בלבד
+
+        if policy.total_timeout is not None:
+            total_deadline = time.time() + policy.total_timeout
+            deadline = total_deadline if deadline is None else min(deadline, total_deadline)
+
+        last_error: Optional[Exception] = None
+        for attempt in range(policy.max_attempts):
+            if attempt > 0:
+                delay = policy.backoff(attempt - 1, self._rng)
+                if deadline is not None:
+                    delay = min(delay, max(0.0, deadline - time.time()))
+                self._count(retries=1)
+                tally['retries'] += 1
+                self._sleep(delay)
+
+            attempt_deadline = None
+            if policy.timeout is not None:
+                attempt_deadline = time.time() + policy.timeout
+            if deadline is not None:
+                attempt_deadline = deadline if attempt_deadline is None else min(attempt_deadline, deadline)
+            if attempt_deadline is not None and attempt_deadline <= time.time():
+                last_error = last_error or CallTimeout(f"{self.name}: deadline exceeded")
+                break
+
+            try:
+                result = self._attempt(func, attempt_deadline, tally)
+            except Exception as e:
+                last_error = e
+                if isinstance(e, CallTimeout):
+                    self._count(timeouts=1)
+                if self.on_error:
+                    self.on_error(attempt, e)
+            else:
+                if meter is not None:
+                    meter.finish(time.time() - start, **tally)
+                return result
+
+        self._count(failures=1)
+        if meter is not None:
+            meter.finish(time.time() - start, error=last_error, **tally)
+        raise last_error
+
+    def _attempt(
+        self,
+        func: Callable[[Optional[float]], T],
+        deadline: Optional[float],
+        tally: Dict[str, int]
+    ) -> T:
+        """ניסיון אחד: בקשה ראשית ועד max_hedges בקשות כפולות (נספרים גם ב-tally של הקריאה)"""
+        self._count(attempts=1)
+        tally['attempts'] += 1
+        executor = _get_executor()
+        start = time.time()
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.time())
+
+        def submit(is_hedge: bool) -> None:
+            # 0.0 = ה-deadline כבר עבר - לא שולחים בקשה שתיכשל מיד (או תרוץ בלי timeout)
+            timeout = remaining()
+            if timeout == 0.0:
+                for other in pending:
+                    other.cancel()
+                raise CallTimeout(f"{self.name}: deadline exceeded")
+            pending[executor.submit(func, timeout)] = is_hedge
+
+        pending: Dict[Future, bool] = {}   # future → האם hedge
+        submit(False)
+        hedges = 0
+        hedge_delay = self.hedge_delay()
+        error: Optional[Exception] = None
+
+        while pending:
+            wait_for = remaining()
+            hedge_at = None
+            if hedge_delay is not None and hedges < self.policy.max_hedges:
+                hedge_at = max(0.0, start + hedge_delay * (hedges + 1) - time.time())
+                wait_for = hedge_at if wait_for is None else min(wait_for, hedge_at)
+
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                is_hedge = pending.pop(future)
+                if future.exception() is None:
+                    self.latencies.record(time.time() - start)
+                    if is_hedge:
+                        self._count(hedges_won=1)
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+
+            if deadline is not None and time.time() >= deadline:
+                for other in pending:
+                    other.cancel()
+                raise CallTimeout(f"{self.name}: no response within deadline")
+
+            if hedge_at is not None and time.time() >= start + hedge_delay * (hedges + 1) and pending:
+                submit(True)
+                hedges += 1
+                self._count(hedges_sent=1)
+                tally['hedges'] += 1
+
+        raise error
+
+    def get_statistics(self) -> Dict:
+        """סטטיסטיקות הקריאות"""
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'timeouts': self.timeouts,
+            'failures': self.failures,
+            'hedges_sent': self.hedges_sent,
+            'hedges_won': self.hedges_won,
+            'p50': self.latencies.percentile(0.5),
+            'p95': self.latencies.percentile(0.95),
+        }
@@ -7,22 +7,63 @@ Candidate Index - אינדקס מהיר למועמדים לפתרון תשבץ
 3. מעקב אחר מקור ורמת ביטחון
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Set, Tuple, Optional, Iterator
+from typing import List, Dict, Set, Tuple, Optional, Iterable, Iterator
 from collections import defaultdict
 import re
 
 
-@dataclass
 class CandidateWord:
-    """מועמד לתשובה בתשבץ"""
+    """
+    מועמד לתשובה בתשבץ.
+
+    מחלקה עם __slots__ (בלי __dict__ לכל מופע) - פתרון מחזיק אלפי מועמדים.
+    """
 
-    word: str                      # המילה עצמה ("במבה")
-    clue_id: str                   # מאיזה clue הגיעה
-    confidence: float              # ביטחון בתשובה הזו (0.0-1.0)
-    clue_certainty: float          # ודאות ההגדרה (0.0-1.0)
-    query_phase: int = 1           # באיזה שלב התקבלה (1, 2, 3...)
-    known_letters_snapshot: str = ""  # תבנית בזמן השאילתא ("____" או "_ב__")
+    __slots__ = (
+        'word',                    # המילה עצמה ("במבה")
+        'clue_id',                 # מאיזה clue הגיעה
+        'confidence',              # ביטחון בתשובה הזו (0.0-1.0)
+        'clue_certainty',          # ודאות ההגדרה (0.0-1.0)
+        'query_phase',             # באיזה שלב התקבלה (1, 2, 3...)
+        'known_letters_snapshot',  # תבנית בזמן השאילתא ("____" או "_ב__")
+    )
+
+    def __init__(
+        self,
+        word: str,
+        clue_id: str,
+        confidence: float,
+        clue_certainty: float,
+        query_phase: int = 1,
+        known_letters_snapshot: str = ""
+    ):
+        self.word = word
+        self.clue_id = clue_id
+        self.confidence = confidence
+        self.clue_certainty = clue_certainty
+        self.query_phase = query_phase
+        self.known_letters_snapshot = known_letters_snapshot
+
+    def __repr__(self) -> str:
+        return (
+            f"CandidateWord(word={self.word!r}, clue_id={self.clue_id!r}, "
+            f"confidence={self.confidence!r}, clue_certainty={self.clue_certainty!r}, "
+            f"query_phase={self.query_phase!r}, known_letters_snapshot={self.known_letters_snapshot!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # ניתן לשינוי - כמו dataclass
+
+    def copy(self) -> 'CandidateWord':
+        """עותק (לאינדקס נפרד)"""
+        return CandidateWord(
+            self.word, self.clue_id, self.confidence, self.clue_certainty,
+            self.query_phase, self.known_letters_snapshot
+        )
 
     @property
     def length(self) -> int:
@@ -63,18 +104,29 @@ class CandidateIndex:
     - חיפוש לפי אורך
     - סינון לפי תבנית אותיות
     - סינון מועמדים לא תואמים
+
+    אחסון לפי מפתח (clue_id, word) - הוספה, מיזוג והסרה ב-O(1) למועמד.
+    האינדקסים המשניים סופרים כמה הגדרות מחזיקות כל מילה, וכל הסרה עוברת
+    דרך _remove - כך שהם נשארים עקביים ולא גדלים לאורך פתרון ארוך.
+
+    עם calibrator (ConfidenceCalibrator מאומן) - הביטחון של כל מועמד חדש מכויל
+    כשהוא נכנס (add_candidate / merge_new_candidates), לפני המיצוע עם מועמד קיים.
+    מועמדים שכבר באינדקס לא מכוילים שוב.
     """
 
     def __init__(self):
-        # מיפוי ראשי: clue_id → רשימת מועמדים
-        self._by_clue: Dict[str, List[CandidateWord]] = defaultdict(list)
+        # כיול הביטחון (services.confidence_calibration) - None = ביטחון גולמי
+        self.calibrator = None
+
+        # מיפוי ראשי: clue_id → {word → מועמד} (לפי סדר ההוספה)
+        self._by_clue: Dict[str, Dict[str, CandidateWord]] = {}
 
-        # מיפוי לפי אורך: length → set of words
-        self._by_length: Dict[int, Set[str]] = defaultdict(set)
+        # מיפוי לפי אורך: length → {word → מספר הגדרות שמחזיקות אותה}
+        self._by_length: Dict[int, Dict[str, int]] = {}
 
-        # אינדקס לפי (אורך, מיקום, אות) → set of words
+        # אינדקס לפי (אורך, מיקום, אות) → {word → מספר הגדרות}
         # מאפשר שאילתות כמו "כל המילים באורך 5 עם 'ב' במיקום 1"
-        self._position_index: Dict[Tuple[int, int, str], Set[str]] = defaultdict(set)
+        self._position_index: Dict[Tuple[int, int, str], Dict[str, int]] = {}
 
         # מעקב אחר מילים שנכשלו (לא לנסות שוב)
         self._failed: Dict[str, Set[str]] = defaultdict(set)  # clue_id → {failed words}
@@ -86,9 +138,11 @@ class CandidateIndex:
     def add_candidate(self, candidate: CandidateWord) -> None:
         """הוספת מועמד לאינדקס"""
         # בדיקה אם כבר נכשל
-        if candidate.word in self._failed.get(candidate.clue_id, set()):
+        if candidate.word in self._failed.get(candidate.clue_id, ()):
             return
 
+        self._calibrate(candidate)
+
         # בדיקה אם כבר קיים - עדכון confidence אם צריך
         existing = self._find_existing(candidate.clue_id, candidate.word)
         if existing:
@@ -97,14 +151,7 @@ class CandidateIndex:
             existing.query_phase = max(existing.query_phase, candidate.query_phase)
             return
 
-        # הוספה לאינדקסים
-        self._by_clue[candidate.clue_id].append(candidate)
-        self._by_length[candidate.length].add(candidate.word)
-
-        # אינדקס לפי מיקום ואות
-        for i, letter in enumerate(candidate.word):
-            self._position_index[(candidate.length, i, letter)].add(candidate.word)
-
+        self._insert(candidate)
         self._total_added += 1
 
     def add_candidates(self, candidates: List[CandidateWord]) -> None:
@@ -114,10 +161,53 @@ class CandidateIndex:
 
     def _find_existing(self, clue_id: str, word: str) -> Optional[CandidateWord]:
         """מחפש מועמד קיים"""
-        for c in self._by_clue.get(clue_id, []):
-            if c.word == word:
-                return c
-        return None
+        candidates = self._by_clue.get(clue_id)
+        return candidates.get(word) if candidates else None
+
+    def _calibrate(self, candidate: CandidateWord) -> None:
+        """מחליף את הביטחון הגולמי של מועמד חדש בהסתברות המכוילת (אם יש calibrator מאומן)"""
+        if self.calibrator is not None and self.calibrator.is_fitted:
+            candidate.confidence = self.calibrator.calibrate_candidate(candidate)
+
+    def _insert(self, candidate: CandidateWord) -> None:
+        """הוספה לאחסון הראשי ולאינדקסים המשניים (בלי בדיקות)"""
+        self._by_clue.setdefault(candidate.clue_id, {})[candidate.word] = candidate
+
+        length = candidate.length
+        _increment(self._by_length, length, candidate.word)
+
+        # אינדקס לפי מיקום ואות
+        for i, letter in enumerate(candidate.word):
+            _increment(self._position_index, (length, i, letter), candidate.word)
+
+    def _remove(self, clue_id: str, word: str) -> bool:
+        """הסרה מהאחסון הראשי ומכל האינדקסים המשניים"""
+        candidates = self._by_clue.get(clue_id)
+        if not candidates or word not in candidates:
+            return False
+
+        del candidates[word]
+        if not candidates:
+            del self._by_clue[clue_id]
+
+        length = len(word)
+        _decrement(self._by_length, length, word)
+        for i, letter in enumerate(word):
+            _decrement(self._position_index, (length, i, letter), word)
+
+        return True
+
+    def _remove_where(self, clue_id: str, predicate) -> int:
+        """מסיר את מועמדי ההגדרה שמקיימים predicate. מחזיר כמה הוסרו"""
+        candidates = self._by_clue.get(clue_id)
+        if not candidates:
+            return 0
+
+        to_remove = [word for word, c in candidates.items() if predicate(c)]
+        for word in to_remove:
+            self._remove(clue_id, word)
+
+        return len(to_remove)
 
     def get_candidates_for_clue(
         self,
@@ -136,7 +226,7 @@ class CandidateIndex:
         Returns:
             רשימת מועמדים ממוינת לפי ביטחון (גבוה לנמוך)
         """
-        candidates = self._by_clue.get(clue_id, [])
+        candidates = list(self._by_clue.get(clue_id, {}).values())
 
         # סינון לפי תבנית
         if pattern:
@@ -144,8 +234,9 @@ class CandidateIndex:
 
         # סינון מילים שנכשלו
         if exclude_failed:
-            failed = self._failed.get(clue_id, set())
-            candidates = [c for c in candidates if c.word not in failed]
+            failed = self._failed.get(clue_id)
+            if failed:
+                candidates = [c for c in candidates if c.word not in failed]
 
         # מיון לפי ביטחון
         return sorted(candidates, key=lambda c: c.confidence, reverse=True)
@@ -179,6 +270,46 @@ class CandidateIndex:
         """מחזיר מספר מועמדים תקינים"""
         return len(self.get_candidates_for_clue(clue_id, pattern=pattern))
 
+    def has_valid_candidate(
+        self,
+        clue_id: str,
+        pattern: str,
+        letters: Optional[Dict[int, str]] = None
+    ) -> bool:
+        """
+        בודק אם נשאר להגדרה מועמד תקין - בלי למיין ובלי לשנות את האינדקס.
+
+        Args:
+            clue_id: מזהה ההגדרה
+            pattern: התבנית הנוכחית
+            letters: אותיות נוספות {מיקום: אות} שעוד אינן בתבנית
+                     (בדיקה מקדימה לפני שיבוץ מילה מצטלבת)
+
+        Returns:
+            True אם יש לפחות מועמד אחד שמתאים לתבנית ולאותיות
+        """
+        candidates = self._by_clue.get(clue_id)
+        if not candidates:
+            return False
+
+        words: Iterable[str] = candidates.keys()
+        if letters:
+            # צמצום דרך אינדקס המיקומים - רק מילים עם האות הראשונה במקומה
+            position, letter = next(iter(letters.items()))
+            with_letter = self._position_index.get((len(pattern), position, letter))
+            if not with_letter:
+                return False
+            if len(with_letter) < len(candidates):
+                words = [word for word in with_letter if word in candidates]
+
+        for word in words:
+            if letters and any(word[i] != letter for i, letter in letters.items()):
+                continue
+            if candidates[word].matches_pattern(pattern):
+                return True
+
+        return False
+
     def filter_by_letter(
         self,
         clue_id: str,
@@ -198,17 +329,10 @@ class CandidateIndex:
         Returns:
             מספר מועמדים שהוסרו
         """
-        candidates = self._by_clue.get(clue_id, [])
-        initial_count = len(candidates)
-
-        # סינון מועמדים לא מתאימים
-        valid = [
-            c for c in candidates
-            if c.length == word_length and c.get_letter_at(position) == letter
-        ]
-
-        self._by_clue[clue_id] = valid
-        filtered = initial_count - len(valid)
+        filtered = self._remove_where(
+            clue_id,
+            lambda c: c.length != word_length or c.get_letter_at(position) != letter
+        )
         self._total_filtered += filtered
 
         return filtered
@@ -224,13 +348,7 @@ class CandidateIndex:
         Returns:
             מספר מועמדים שהוסרו
         """
-        candidates = self._by_clue.get(clue_id, [])
-        initial_count = len(candidates)
-
-        valid = [c for c in candidates if c.matches_pattern(pattern)]
-
-        self._by_clue[clue_id] = valid
-        filtered = initial_count - len(valid)
+        filtered = self._remove_where(clue_id, lambda c: not c.matches_pattern(pattern))
         self._total_filtered += filtered
 
         return filtered
@@ -240,10 +358,7 @@ class CandidateIndex:
         self._failed[clue_id].add(word)
 
         # הסרה מרשימת המועמדים
-        self._by_clue[clue_id] = [
-            c for c in self._by_clue.get(clue_id, [])
-            if c.word != word
-        ]
+        self._remove(clue_id, word)
 
     def remove_candidate(self, clue_id: str, word: str) -> bool:
         """
@@ -252,21 +367,93 @@ class CandidateIndex:
         Returns:
             True אם הוסר, False אם לא נמצא
         """
-        candidates = self._by_clue.get(clue_id, [])
-        initial_count = len(candidates)
-
-        self._by_clue[clue_id] = [c for c in candidates if c.word != word]
-
-        return len(self._by_clue[clue_id]) < initial_count
+        return self._remove(clue_id, word)
 
     def clear_clue(self, clue_id: str) -> None:
         """מנקה את כל המועמדים להגדרה"""
-        self._by_clue[clue_id] = []
+        self._remove_where(clue_id, lambda c: True)
+
+    def subset(self, clue_ids: Set[str]) -> 'CandidateIndex':
+        """
+        מחזיר אינדקס חדש עם עותק של המועמדים (והמילים שנכשלו) להגדרות מסוימות בלבד.
+        משמש לפתרון רכיב בלתי תלוי בנפרד.
+        """
+        sub = CandidateIndex()
+        sub.calibrator = self.calibrator
+
+        for clue_id in clue_ids:
+            if clue_id in self._failed:
+                sub._failed[clue_id] = set(self._failed[clue_id])
+
+            for c in self._by_clue.get(clue_id, {}).values():
+                sub._insert(c.copy())
+                sub._total_added += 1
+
+        return sub
+
+    def iter_candidates(self) -> Iterator[CandidateWord]:
+        """עובר על כל המועמדים (לפי הגדרה, בסדר ההוספה)"""
+        for candidates in self._by_clue.values():
+            yield from candidates.values()
+
+    def get_failed_words(self) -> Dict[str, Set[str]]:
+        """מחזיר את המילים שנכשלו לכל הגדרה"""
+        return {clue_id: set(words) for clue_id, words in self._failed.items() if words}
+
+    def get_exclusions(self, clue_id: str, pattern: Optional[str] = None) -> List[str]:
+        """
+        מילים שאין טעם לקבל שוב ב-re-query: המילים שנכשלו, ואחריהן המועמדים
+        הקיימים לפי ביטחון. עם pattern - רק מילים שמתאימות לתבנית
+        (מילה שלא מתאימה ממילא לא תחזור).
+        """
+        words = sorted(self._failed.get(clue_id, ())) + [
+            c.word for c in self.get_candidates_for_clue(clue_id)
+        ]
+        if pattern:
+            regex = pattern_to_regex(pattern)
+            words = [word for word in words if regex.match(word)]
+        return list(dict.fromkeys(words))
+
+    def get_counters(self) -> Tuple[int, int]:
+        """מחזיר (total_added, total_filtered)"""
+        return self._total_added, self._total_filtered
+
+    @classmethod
+    def restore(
+        cls,
+        candidates: List[CandidateWord],
+        failed: Dict[str, Set[str]],
+        total_added: int = 0,
+        total_filtered: int = 0
+    ) -> 'CandidateIndex':
+        """
+        בונה אינדקס ממועמדים שמורים (checkpoint) במעבר אחד.
+        המועמדים כבר ייחודיים ולא נכשלו - בלי בדיקות כפילות.
+        """
+        index = cls()
+
+        for clue_id, words in failed.items():
+            index._failed[clue_id] = set(words)
+
+        for c in candidates:
+            index._insert(c)
+
+        index._total_added = total_added
+        index._total_filtered = total_filtered
+        return index
 
     def get_all_clue_ids(self) -> List[str]:
         """מחזיר את כל ה-clue_ids באינדקס"""
         return list(self._by_clue.keys())
 
+    def get_words_by_length(self, length: int) -> Set[str]:
+        """כל המילים באורך מסוים (מכל ההגדרות)"""
+        return set(self._by_length.get(length, ()))
+
+    def get_words_with_letter(self, length: int, position: int, letter: str) -> Set[str]:
+        """כל המילים באורך מסוים עם אות מסוימת במיקום מסוים"""
+        return set(self._position_index.get((length, position, letter), ()))
+
     def get_clues_with_single_candidate(self, patterns: Dict[str, str]) -> List[str]:
         """
         מחזיר clue_ids שיש להם מועמד תקין יחיד.
@@ -333,6 +520,7 @@ class CandidateIndex:
 
             if existing:
                 # עדכון - נותן משקל יתר לתוצאה החדשה (עם יותר אותיות ידועות)
+                self._calibrate(c)
                 existing.confidence = (existing.confidence + c.confidence * 2) / 3
                 existing.query_phase = current_phase
             else:
@@ -358,7 +546,7 @@ class CandidateIndex:
             'total_added': self._total_added,
             'total_filtered': self._total_filtered,
             'failed_words': failed_words,
-            'unique_words': len(self._by_length.get(max(self._by_length.keys(), default=0), set()))
+            'unique_words': sum(len(words) for words in self._by_length.values())
         }
 
     def clear(self) -> None:
@@ -371,6 +559,29 @@ class CandidateIndex:
         self._total_filtered = 0
 
 
+def _increment(index: Dict, key, word: str) -> None:
+    """מעלה את מונה ההגדרות של מילה באינדקס משני"""
+    words = index.get(key)
+    if words is None:
+        words = index[key] = {}
+    words[word] = words.get(word, 0) + 1
+
+
+def _decrement(index: Dict, key, word: str) -> None:
+    """מוריד את מונה ההגדרות של מילה - ומנקה מפתחות ריקים"""
+    words = index.get(key)
+    if not words or word not in words:
+        return
+
+    if words[word] > 1:
+        words[word] -= 1
+        return
+
+    del words[word]
+    if not words:
+        del index[key]
+
+
 def pattern_to_regex(pattern: str) -> re.Pattern:
     """ממיר תבנית תשבץ לregex"""
     regex_str = ""
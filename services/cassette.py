@@ -0,0 +1,414 @@
+"""
+Cassette - הקלטה והשמעה של קריאות API למודלים
+
+ClueSolver, גלאי החצים (Gemini / GPT / Claude), SplitCellAnalyzer ו-Google
+Vision פונים ישירות ל-API חי. ה-cassette עוטף את ה-client של כל אחד מהם:
+- כל קריאה מזוהה לפי fingerprint: namespace + שם המתודה + הארגומנטים
+  (bytes ותמונות נכנסים כ-hash, לא כתוכן)
+- במצב record התשובה וזמן התגובה נשמרים לקובץ מקומי לכל namespace
+- במצב replay התשובה חוזרת מהקובץ בלי רשת ובלי API key,
+  עם השהיה מדומה לפי פרופיל latency (ה-SDK נדרש רק בשירותים שבונים
+  איתו את אובייקטי הבקשה - Gemini, Google Vision client library)
+
+בקשה זהה שהוקלטה כמה פעמים (למשל requery) חוזרת לפי סדר ההקלטה.
+
+הפעלה מהקוד (use_cassette) או ממשתני סביבה - שעוברים גם ל-worker processes:
+    CROSSWORD_CASSETTE=path/to/dir
+    CROSSWORD_CASSETTE_MODE=record|replay|auto
+    CROSSWORD_CASSETTE_LATENCY=instant|recorded|fast|slow
+
+פורמט: pickle דחוס ב-gzip (תשובות ה-SDK נשמרות כמו שהן). כל הקלטה נוספת
+לסוף הקובץ כ-frame משלה (בלי לכתוב מחדש את כל ההקלטות); compact() כותב את
+הקובץ מחדש בלי הקלטות שהוחלפו.
+קבצי cassette הם קבצים מקומיים בלבד - לא לטעון cassette ממקור לא מוכר.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+MODE_RECORD = "record"   # תמיד קורא ל-API ומקליט מחדש
+MODE_REPLAY = "replay"   # רק מהקובץ; בקשה שלא הוקלטה - CassetteMiss
+MODE_AUTO = "auto"       # מהקובץ אם קיים, אחרת קורא ומקליט
+
+MODES = (MODE_RECORD, MODE_REPLAY, MODE_AUTO)
+
+ENV_PATH = "CROSSWORD_CASSETTE"
+ENV_MODE = "CROSSWORD_CASSETTE_MODE"
+ENV_LATENCY = "CROSSWORD_CASSETTE_LATENCY"
+
+CASSETTE_VERSION = 2
+
+
+class CassetteMiss(LookupError):
+    """בקשה שאין לה הקלטה (במצב replay)"""
+
+
+@dataclass
+class LatencyProfile:
+    """
+    השהיה מדומה בהשמעה.
+
+    kind:
+        none - בלי השהיה
+        recorded - זמן התגובה שהוקלט, כפול scale
+        fixed - seconds קבוע
+    jitter: סטייה יחסית אקראית (0.2 = ±20%), דטרמיניסטית לפי seed
+    """
+    name: str
+    kind: str = "none"
+    seconds: float = 0.0
+    scale: float = 1.0
+    jitter: float = 0.0
+
+    def delay(self, recorded: float, rng: random.Random) -> float:
+        """ההשהיה לקריאה אחת"""
+        if self.kind == "recorded":
+            base = recorded * self.scale
+        elif self.kind == "fixed":
+            base = self.seconds
+        else:
+            return 0.0
+
+        if self.jitter:
+            base *= 1.0 + rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+
+
+LATENCY_PROFILES: Dict[str, LatencyProfile] = {
+    "instant": LatencyProfile("instant"),
+    "recorded": LatencyProfile("recorded", kind="recorded"),
+    "fast": LatencyProfile("fast", kind="fixed", seconds=0.3, jitter=0.2),
+    "slow": LatencyProfile("slow", kind="fixed", seconds=3.0, jitter=0.5),
+}
+
+
+@dataclass
+class CassetteEntry:
+    """תשובה מוקלטת אחת"""
+    response: Any
+    elapsed: float = 0.0
+
+
+# אפשרויות תעבורה (ה-timeout שנותר משתנה בין קריאות) - לא חלק מזהות הבקשה
+_TRANSPORT_KEYS = frozenset(('timeout', 'http_options'))
+
+
+def _canonical(value: Any) -> Any:
+    """ערך יציב ל-JSON לצורך fingerprint"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return {'bytes': hashlib.sha256(bytes(value)).hexdigest()}
+    if isinstance(value, dict):
+        return {
+            str(key): _canonical(item)
+            for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))
+            if key not in _TRANSPORT_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if hasattr(value, 'tobytes') and hasattr(value, 'shape'):
+        # numpy array
+        return {'array': hashlib.sha256(value.tobytes()).hexdigest(), 'shape': list(value.shape)}
+    if hasattr(value, 'model_dump'):
+        # pydantic (anthropic / openai / google-genai)
+        return {type(value).__name__: _canonical(value.model_dump())}
+    if hasattr(type(value), 'serialize') and hasattr(type(value), 'pb'):
+        # proto-plus (google-cloud-vision)
+        return {type(value).__name__: _canonical(type(value).serialize(value))}
+    if hasattr(value, '__dict__'):
+        return {type(value).__name__: _canonical(vars(value))}
+    return repr(value)
+
+
+def fingerprint(namespace: str, method: str, args: Tuple, kwargs: Dict) -> str:
+    """מזהה יציב לבקשה"""
+    payload = json.dumps(
+        [namespace, method, _canonical(list(args)), _canonical(kwargs)],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CassetteProxy:
+    """
+    עוטף client של SDK: גישה לתכונות מחזירה proxy מקונן,
+    וקריאה עוברת דרך ה-cassette (client.messages.create(...) → "messages.create").
+    """
+
+    def __init__(self, cassette: 'Cassette', namespace: str, target: Any = None, path: str = ""):
+        self._cassette = cassette
+        self._namespace = namespace
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name: str) -> 'CassetteProxy':
+        if name.startswith('__'):
+            raise AttributeError(name)
+        target = getattr(self._target, name) if self._target is not None else None
+        path = f"{self._path}.{name}" if self._path else name
+        return CassetteProxy(self._cassette, self._namespace, target, path)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._cassette.invoke(self._namespace, self._path, self._target, args, kwargs)
+
+
+class Cassette:
+    """
+    מאגר הקלטות בתיקייה מקומית - קובץ לכל namespace.
+
+    Example:
+        cassette = Cassette("cassettes/run1", mode=MODE_REPLAY, latency="recorded")
+        with use_cassette(cassette):
+            solver = ClueSolver()          # בלי API key
+            solver.solve_clue(clue)        # מהקובץ
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = MODE_AUTO,
+        latency: Any = "instant",
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            path: תיקיית ההקלטות
+            mode: record / replay / auto
+            latency: שם פרופיל מ-LATENCY_PROFILES או LatencyProfile
+            seed: seed ל-jitter של ההשהיה
+            sleep: פונקציית ההשהיה (להחלפה בבדיקות)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.latency = LATENCY_PROFILES[latency] if isinstance(latency, str) else latency
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()                 # סדר ה-frames בקובץ
+
+        self._store: Dict[str, Dict[str, List[CassetteEntry]]] = {}
+        self._played: Dict[Tuple[str, str], int] = {}      # כמה פעמים הושמעה כל בקשה
+        self._rerecorded: set = set()                       # בקשות שהוקלטו מחדש בריצה הזו
+
+        # סטטיסטיקות
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.simulated_latency = 0.0
+
+    @property
+    def replaying(self) -> bool:
+        """True אם לא נדרש API חי (replay בלבד)"""
+        return self.mode == MODE_REPLAY
+
+    # === clients ===
+
+    def wrap(self, namespace: str, client: Any) -> CassetteProxy:
+        """עוטף client חי (record / auto)"""
+        return CassetteProxy(self, namespace, client)
+
+    def replay_client(self, namespace: str) -> CassetteProxy:
+        """client להשמעה בלבד - בלי API key"""
+        return CassetteProxy(self, namespace)
+
+    def has_recordings(self, namespace: str) -> bool:
+        """האם יש הקלטות ל-namespace"""
+        return bool(self._load(namespace))
+
+    # === record / replay ===
+
+    def invoke(self, namespace: str, method: str, target: Any, args: Tuple, kwargs: Dict) -> Any:
+        """קריאה אחת דרך ה-cassette"""
+        key = fingerprint(namespace, method, args, kwargs)
+
+        if self.mode != MODE_RECORD:
+            entry = self._next_recording(namespace, key)
+            if entry is not None:
+                delay = self.latency.delay(entry.elapsed, self._rng)
+                if delay > 0:
+                    self.simulated_latency += delay
+                    self._sleep(delay)
+                return entry.response
+
+            self.misses += 1
+            if self.mode == MODE_REPLAY or target is None:
+                raise CassetteMiss(f"No recording for {namespace}.{method} ({key[:12]})")
+
+        start = time.time()
+        response = target(*args, **kwargs)
+        self._record(namespace, key, CassetteEntry(response, time.time() - start))
+        return response
+
+    def _next_recording(self, namespace: str, key: str) -> Optional[CassetteEntry]:
+        with self._lock:
+            entries = self._load(namespace).get(key)
+            if not entries:
+                return None
+            played = self._played.get((namespace, key), 0)
+            self._played[(namespace, key)] = played + 1
+            self.hits += 1
+            # יותר קריאות מהקלטות - חוזרים על האחרונה
+            return entries[min(played, len(entries) - 1)]
+
+    def _record(self, namespace: str, key: str, entry: CassetteEntry) -> None:
+        with self._lock:
+            entries = self._load(namespace)
+            replace = self.mode == MODE_RECORD and (namespace, key) not in self._rerecorded
+            if replace:
+                # הקלטה מחדש מחליפה את מה שהיה בקובץ
+                entries[key] = []
+                self._rerecorded.add((namespace, key))
+            entries.setdefault(key, []).append(entry)
+            self.recorded += 1
+            # הכתיבה מחוץ ל-_lock (השמעות לא מחכות לה), אבל באותו סדר
+            self._write_lock.acquire()
+        try:
+            self._append(namespace, (key, entry, replace))
+        finally:
+            self._write_lock.release()
+
+    # === storage ===
+
+    def _file(self, namespace: str) -> str:
+        return os.path.join(self.path, f"{namespace}.cassette")
+
+    def _load(self, namespace: str) -> Dict[str, List[CassetteEntry]]:
+        if namespace not in self._store:
+            entries: Dict[str, List[CassetteEntry]] = {}
+            if os.path.exists(self._file(namespace)):
+                with gzip.open(self._file(namespace), 'rb') as f:
+                    while True:
+                        try:
+                            frame = pickle.load(f)
+                        except EOFError:
+                            # סוף הקובץ (או frame אחרון שנקטע בקריסה)
+                            break
+                        self._apply_frame(entries, frame)
+            self._store[namespace] = entries
+        return self._store[namespace]
+
+    @staticmethod
+    def _apply_frame(entries: Dict[str, List[CassetteEntry]], frame: Any) -> None:
+        """frame אחד מהקובץ: כותרת / snapshot (dict) או הקלטה (key, entry, replace)"""
+        if isinstance(frame, dict):
+            if frame.get('version') not in (1, CASSETTE_VERSION):
+                raise ValueError(f"Unsupported cassette version: {frame.get('version')}")
+            for key, items in frame.get('entries', {}).items():
+                entries[key] = list(items)
+            return
+
+        key, entry, replace = frame
+        if replace:
+            entries[key] = []
+        entries.setdefault(key, []).append(entry)
+
+    def _append(self, namespace: str, frame: Tuple) -> None:
+        """הוספת frame לסוף הקובץ - member של gzip בכתיבה אחת"""
+        os.makedirs(self.path, exist_ok=True)
+        data = pickle.dumps(frame)
+        with open(self._file(namespace), 'ab') as f:
+            if f.tell() == 0:
+                data = pickle.dumps({'version': CASSETTE_VERSION}) + data
+            f.write(gzip.compress(data))
+
+    def compact(self) -> None:
+        """
+        כותב מחדש את קבצי ה-namespaces שנטענו - בלי הקלטות שהוחלפו.
+        רק כשאין תהליך אחר שמקליט לאותה תיקייה (הקלטות שלו שאחרי הטעינה יאבדו).
+        """
+        with self._lock, self._write_lock:
+            for namespace, entries in self._store.items():
+                if not entries:
+                    continue
+                os.makedirs(self.path, exist_ok=True)
+                # כתיבה לקובץ זמני והחלפה - קובץ חלקי לא נשאר אחרי קריסה
+                temp = self._file(namespace) + ".tmp"
+                with gzip.open(temp, 'wb') as f:
+                    pickle.dump({'version': CASSETTE_VERSION, 'entries': entries}, f)
+                os.replace(temp, self._file(namespace))
+
+    def get_statistics(self) -> Dict:
+        """סטטיסטיקות ההקלטה / ההשמעה"""
+        return {
+            'mode': self.mode,
+            'latency_profile': self.latency.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'recorded': self.recorded,
+            'simulated_latency': self.simulated_latency,
+        }
+
+
+# === cassette פעיל ===
+
+_active: Optional[Cassette] = None
+_from_env: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """ה-cassette הפעיל (מהקוד, או ממשתני הסביבה)"""
+    global _from_env
+    if _active is not None:
+        return _active
+
+    path = os.environ.get(ENV_PATH)
+    if not path:
+        return None
+    if _from_env is None or _from_env.path != path:
+        _from_env = Cassette(
+            path,
+            mode=os.environ.get(ENV_MODE, MODE_AUTO),
+            latency=os.environ.get(ENV_LATENCY, "instant")
+        )
+    return _from_env
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    """הגדרת ה-cassette הפעיל (None = לפי משתני הסביבה)"""
+    global _active
+    _active = cassette
+
+
+@contextmanager
+def use_cassette(cassette: Cassette) -> Iterator[Cassette]:
+    """cassette פעיל בתוך בלוק"""
+    previous = _active
+    set_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        set_cassette(previous)
+
+
+def replay_client(namespace: str) -> Optional[CassetteProxy]:
+    """
+    client להשמעה בלבד, אם ה-cassette הפעיל במצב replay.
+    השירותים בודקים את זה לפני יצירת client חי, כך שאין צורך ב-API key.
+    """
+    cassette = get_cassette()
+    if cassette is not None and cassette.replaying:
+        return cassette.replay_client(namespace)
+    return None
+
+
+def wrap_client(namespace: str, client: Any) -> Any:
+    """עוטף client חי ב-cassette הפעיל (אם יש); אחרת מחזיר אותו כמו שהוא"""
+    cassette = get_cassette()
+    if cassette is None:
+        return client
+    return cassette.wrap(namespace, client)
@@ -0,0 +1,167 @@
+"""
+Circuit Breaker - מפסק לכל ספק מודל
+
+כשספק (למשל Gemini) במצב תקלה, כל משבצת מחכה בנפרד לכל ה-retries לפני
+שהיא נכשלת - דקות לכל תשבץ. המפסק משותף לכל הקריאות לאותו ספק:
+
+- CLOSED: קריאות עוברות. כשלונות רצופים (שגיאה, או תשובה איטית מ-slow_call_seconds)
+  נספרים; אחרי failure_threshold המפסק נפתח
+- OPEN: allow() מחזיר False מיד - המתאם מנתב לספק הבא בלי לחכות
+- HALF_OPEN: אחרי reset_seconds עוברת קריאת בדיקה אחת (probe);
+  הצלחה סוגרת את המפסק, כשלון פותח אותו מחדש
+
+המפסקים נשמרים ב-registry לפי שם ספק (get_breaker), כך שכל ה-workers חולקים אותם.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """מפסק לספק אחד"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        slow_call_seconds: Optional[float] = None,
+        reset_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            name: שם הספק
+            failure_threshold: כמה כשלונות רצופים פותחים את המפסק
+            slow_call_seconds: קריאה מוצלחת איטית מזה נחשבת כשלון (None = בלי)
+            reset_seconds: כמה זמן המפסק פתוח לפני probe
+            half_open_probes: כמה probes במקביל במצב HALF_OPEN
+            clock: שעון (להחלפה בבדיקות)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+        # סטטיסטיקות
+        self.times_opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def state(self) -> str:
+        """המצב הנוכחי (OPEN הופך ל-HALF_OPEN כשעבר reset_seconds)"""
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN
+
+    def _current_state(self) -> str:
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = STATE_HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        האם לשלוח קריאה עכשיו.
+        במצב HALF_OPEN - רק עד half_open_probes קריאות בדיקה במקביל.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: float = 0.0) -> None:
+        """קריאה שהצליחה (איטית מדי - נחשבת כשלון)"""
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            if self._state == STATE_HALF_OPEN:
+                self._state = STATE_CLOSED
+                self._probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        """קריאה שנכשלה"""
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == STATE_HALF_OPEN or (
+                state == STATE_CLOSED and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self.times_opened += 1
+
+    def reset(self) -> None:
+        """סגירה ידנית"""
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def get_statistics(self) -> Dict:
+        """סטטיסטיקות המפסק"""
+        return {
+            'name': self.name,
+            'state': self.state,
+            'times_opened': self.times_opened,
+            'rejected': self.rejected,
+            'successes': self.successes,
+            'failures': self.failures,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """
+    המפסק המשותף של ספק (נוצר בקריאה הראשונה עם options).
+
+    Args:
+        name: שם הספק ("gemini", "gpt", "claude")
+        **options: פרמטרים ל-CircuitBreaker (רק ביצירה)
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
+
+
+def reset_breakers() -> None:
+    """מחיקת כל המפסקים (לבדיקות ולתחילת ריצה חדשה)"""
+    with _breakers_lock:
+        _breakers.clear()
@@ -13,6 +13,9 @@ import cv2
 
 from config.cloud_config import ClaudeVisionConfig, get_cloud_config
 from models.recognition_result import ArrowResult, ArrowDetectionResult
+from services.call_policy import CallPolicy, ResilientCaller, timeout_kwargs
+from services.cassette import replay_client, wrap_client
+from services.usage_ledger import UsageMeter
 
 
 class ClaudeArrowDetector:
@@ -178,12 +181,20 @@ Your response must be ONLY a JSON object (no other text):
         self.config = config or get_cloud_config().claude
         self._client = None
         self._initialized = False
+        self._caller = ResilientCaller(CallPolicy.from_config(self.config), name="claude_arrow")
 
     def _initialize_client(self) -> None:
         """אתחול הלקוח של Anthropic"""
         if self._initialized:
             return
 
+        # השמעה מ-cassette - בלי SDK ובלי API key
+        replayed = replay_client("claude_arrow")
+        if replayed is not None:
+            self._client = replayed
+            self._initialized = True
+            return
+
         try:
             import anthropic
 
@@ -192,7 +203,9 @@ Your response must be ONLY a JSON object (no other text):
                     "Claude Vision requires ANTHROPIC_API_KEY environment variable"
                 )
 
-            self._client = anthropic.Anthropic(api_key=self.config.api_key)
+            self._client = wrap_client("claude_arrow", anthropic.Anthropic(
+                api_key=self.config.api_key, base_url=self.config.base_url
+            ))
             self._initialized = True
             print("[OK] Claude Vision client initialized")
 
@@ -262,38 +275,38 @@ Your response must be ONLY a JSON object (no other text):
 
     def _call_claude_api(self, image_base64: str) -> str:
         """קריאה ל-Claude Vision API"""
-        for attempt in range(self.config.max_retries):
-            try:
-                message = self._client.messages.create(
-                    model=self.config.model,
-                    max_tokens=self.config.max_tokens,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "image",
-                                    "source": {
-                                        "type": "base64",
-                                        "media_type": "image/png",
-                                        "data": image_base64
-                                    }
-                                },
-                                {
-                                    "type": "text",
-                                    "text": self.DETECTION_PROMPT
+        meter = UsageMeter("arrow_detection", "anthropic", self.config.model)
+
+        def request(timeout: Optional[float]) -> str:
+            message = self._client.messages.create(
+                model=self.config.model,
+                max_tokens=self.config.max_tokens,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image",
+                                "source": {
+                                    "type": "base64",
+                                    "media_type": "image/png",
+                                    "data": image_base64
                                 }
-                            ]
-                        }
-                    ]
-                )
+                            },
+                            {
+                                "type": "text",
+                                "text": self.DETECTION_PROMPT
+                            }
+                        ]
+                    }
+                ],
+                **timeout_kwargs(timeout)
+            )
+            meter.observe(message)
 
-                return message.content[0].text
+            return message.content[0].text
 
-            except Exception as e:
-                if attempt == self.config.max_retries - 1:
-                    raise e
-                time.sleep(self.config.retry_delay * (attempt + 1))
+        return self._caller.call(request, meter=meter)
 
     # מיפוי פאה לכיוון
     SIDE_TO_DIRECTION = {
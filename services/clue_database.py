@@ -3,7 +3,7 @@ Clue Database Service
 ניהול מאגר ההגדרות
 """
 
-from typing import List, Dict, Optional, Tuple, Set
+from typing import List, Dict, Optional, Tuple, Set, Callable
 from dataclasses import dataclass, field
 import json
 
@@ -27,6 +27,7 @@ class ClueDatabase:
         self.clues: List[ClueEntry] = []
         self._clue_map: Dict[str, ClueEntry] = {}  # מיפוי לפי ID
         self._cell_to_clues: Dict[Tuple[int, int], List[str]] = {}  # מיפוי משבצת להגדרות
+        self._crossing_graph: Optional[Dict[str, Dict[str, List[Tuple[int, int]]]]] = None  # cache
 
     def add_clue(self, clue: ClueEntry) -> None:
         """הוספת הגדרה למאגר"""
@@ -39,6 +40,8 @@ class ClueDatabase:
                 self._cell_to_clues[cell] = []
             self._cell_to_clues[cell].append(clue.id)
 
+        self._crossing_graph = None
+
     def get_clue(self, clue_id: str) -> Optional[ClueEntry]:
         """קבלת הגדרה לפי ID"""
         return self._clue_map.get(clue_id)
@@ -56,6 +59,7 @@ class ClueDatabase:
         self.clues = []
         self._clue_map = {}
         self._cell_to_clues = {}
+        self._crossing_graph = None
 
         for row in range(grid.rows):
             for col in range(grid.cols):
@@ -179,6 +183,87 @@ class ClueDatabase:
 
         return intersections
 
+    def get_crossing_graph(self) -> Dict[str, Dict[str, List[Tuple[int, int]]]]:
+        """
+        מחזיר את גרף ההצלבות בין כל ההגדרות (מחושב פעם אחת ונשמר).
+
+        Returns:
+            מיפוי: clue_id → {clue_id אחר: [(אינדקס אצלי, אינדקס אצלו), ...]}
+        """
+        if self._crossing_graph is not None:
+            return self._crossing_graph
+
+        graph: Dict[str, Dict[str, List[Tuple[int, int]]]] = {
+            clue.id: {} for clue in self.clues
+        }
+
+        for cell, clue_ids in self._cell_to_clues.items():
+            if len(clue_ids) < 2:
+                continue
+
+            for clue_id in clue_ids:
+                clue = self._clue_map[clue_id]
+                my_idx = clue.answer_cells.index(cell)
+
+                for other_id in clue_ids:
+                    if other_id == clue_id:
+                        continue
+                    other_idx = self._clue_map[other_id].answer_cells.index(cell)
+                    graph[clue_id].setdefault(other_id, []).append((my_idx, other_idx))
+
+        self._crossing_graph = graph
+        return graph
+
+    def get_components(
+        self,
+        clue_ids: Optional[Set[str]] = None,
+        is_open_cell: Optional[Callable[[int, int], bool]] = None
+    ) -> List[List[str]]:
+        """
+        מפרק הגדרות לרכיבים בלתי תלויים.
+
+        שתי הגדרות באותו רכיב אם הן חולקות (ישירות או דרך שרשרת) משבצת פתוחה.
+        משבצת שכבר יש בה אות ידועה לא מקשרת - האות קבועה לשתיהן.
+
+        Args:
+            clue_ids: ההגדרות לפירוק (ברירת מחדל: כולן)
+            is_open_cell: פונקציה (row, col) → האם המשבצת עדיין פתוחה
+                          (ברירת מחדל: כל המשבצות פתוחות)
+
+        Returns:
+            רשימת רכיבים (רשימות clue_id), מהגדול לקטן
+        """
+        if clue_ids is None:
+            clue_ids = {clue.id for clue in self.clues}
+
+        parent: Dict[str, str] = {clue_id: clue_id for clue_id in clue_ids}
+
+        def find(x: str) -> str:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for cell, cell_clues in self._cell_to_clues.items():
+            members = [cid for cid in cell_clues if cid in parent]
+            if len(members) < 2:
+                continue
+            if is_open_cell and not is_open_cell(cell[0], cell[1]):
+                continue
+
+            root = find(members[0])
+            for other in members[1:]:
+                other_root = find(other)
+                if other_root != root:
+                    parent[other_root] = root
+
+        components: Dict[str, List[str]] = {}
+        for clue in self.clues:
+            if clue.id in parent:
+                components.setdefault(find(clue.id), []).append(clue.id)
+
+        return sorted(components.values(), key=len, reverse=True)
+
     def update_known_letters(self, clue: ClueEntry, answer: str) -> None:
         """
         מעדכן אותיות ידועות בהגדרות אחרות אחרי שיבוץ תשובה.
@@ -260,3 +345,4 @@ class ClueDatabase:
         self.clues = []
         self._clue_map = {}
         self._cell_to_clues = {}
+        self._crossing_graph = None
@@ -0,0 +1,300 @@
+"""
+Clue Retrieval - חיפוש הגדרות דומות שכבר נפתרו
+
+הרבה הגדרות חוזרות בין תשבצים כמעט כמו שהן: פיסוק אחר, מילה נוספת, רעש
+OCR. מפתח מדויק (טקסט → תשובה) מפספס אותן, אז האינדקס משווה טקסטים לפי
+n-grams של תווים:
+- נרמול: בלי ניקוד ופיסוק (גרשיים, מקפים), אותיות סופיות → רגילות
+- וקטור TF-IDF (tf לוגריתמי) של n-grams של תווים, מנורמל לאורך 1
+- אינדקס הפוך בפורמט CSR (מערכי NumPy): לכל n-gram - המסמכים והמשקלים
+- שאילתא: צבירת דמיון cosine רק על המסמכים שחולקים n-gram עם השאילתא,
+  סינון לפי אורך התשובה ותבנית, ו-top-k
+
+ההוספה זולה (מערכים רציפים); המערכים הדחוסים נבנים מחדש בשאילתא הראשונה
+אחרי הוספה. ההגדרות שנפתרו נשמרות בטבלה solved_clues במסד הנתונים.
+
+שימוש:
+    index = ClueRetrievalIndex.from_store(SolvedClueStore())
+    for match in index.lookup_clue(clue, k=5):
+        print(match.answer, match.similarity, match.text)
+"""
+
+import math
+import re
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from database.db_manager import DatabaseManager
+from models.clue_entry import ClueEntry
+from services.candidate_index import pattern_to_regex
+
+
+NGRAM_SIZE = 3
+
+_FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+_QUOTES = re.compile("[\"'`\u05f3\u05f4\u2018\u2019\u201c\u201d]")   # צה"ל → צהל
+_NON_WORD = re.compile(r"[^\w\s]|_")                                  # מקף, פסיק → רווח
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_clue_text(text: str) -> str:
+    """טקסט הגדרה להשוואה: בלי ניקוד, גרשיים ופיסוק, אותיות סופיות כרגילות, רווח יחיד"""
+    text = "".join(char for char in unicodedata.normalize("NFD", text) if not unicodedata.combining(char))
+    text = _QUOTES.sub("", text.lower().translate(_FINAL_LETTERS))
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> Dict[str, int]:
+    """n-grams של תווים עם ספירה; כל מילה מרופדת ברווח (גבולות מילה נספרים)"""
+    padded = f" {normalize_clue_text(text)} "
+    counts: Dict[str, int] = {}
+    for i in range(len(padded) - n + 1):
+        gram = padded[i:i + n]
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+@dataclass
+class RetrievedClue:
+    """הגדרה דומה שנפתרה"""
+    text: str
+    answer: str
+    similarity: float
+
+
+class ClueRetrievalIndex:
+    """
+    אינדקס דמיון על טקסטים של הגדרות שנפתרו.
+
+    Example:
+        index = ClueRetrievalIndex()
+        index.add("חטיף בוטנים פופולרי", "במבה")
+        index.lookup("חטיף-בוטנים, פופולארי", length=4)   # [RetrievedClue(..., "במבה", 0.81)]
+    """
+
+    # כמה מועמדים (לפי דמיון) לבדוק מול התבנית לפני שמוותרים
+    MAX_SCANNED = 500
+
+    def __init__(self, n: int = NGRAM_SIZE):
+        self.n = n
+
+        # מסמכים
+        self._texts: List[str] = []
+        self._answers: List[str] = []
+        self._seen: Set[Tuple[str, str]] = set()   # (טקסט מנורמל, תשובה) - בלי כפילויות
+
+        # מילון n-grams
+        self._vocabulary: Dict[str, int] = {}
+
+        # postings גולמיים (לפי סדר ההוספה): מסמך, n-gram, ספירה
+        self._raw_docs = array('i')
+        self._raw_grams = array('i')
+        self._raw_counts = array('f')
+
+        # CSR דחוס - נבנה ב-_compile
+        self._dirty = False
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._lengths = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str, answer: str) -> bool:
+        """
+        הוספת הגדרה שנפתרה.
+
+        Returns:
+            False אם אותו טקסט (אחרי נרמול) עם אותה תשובה כבר באינדקס
+        """
+        answer = answer.replace(' ', '')
+        key = (normalize_clue_text(text), answer)
+        if not key[0] or not answer or key in self._seen:
+            return False
+        self._seen.add(key)
+
+        doc_id = len(self._texts)
+        self._texts.append(text)
+        self._answers.append(answer)
+        for gram, count in char_ngrams(text, self.n).items():
+            gram_id = self._vocabulary.setdefault(gram, len(self._vocabulary))
+            self._raw_docs.append(doc_id)
+            self._raw_grams.append(gram_id)
+            self._raw_counts.append(count)
+
+        self._dirty = True
+        return True
+
+    def add_many(self, entries: Iterable[Tuple[str, str]]) -> int:
+        """הוספת (טקסט, תשובה) רבים. מחזיר כמה נוספו"""
+        return sum(1 for text, answer in entries if self.add(text, answer))
+
+    def add_solved(self, clues: Iterable[ClueEntry]) -> int:
+        """הוספת ההגדרות שנפתרו (chosen_answer) מ-ClueDatabase / רשימה"""
+        return self.add_many(
+            (clue.text, clue.chosen_answer) for clue in clues
+            if clue.is_solved and clue.chosen_answer and clue.text
+        )
+
+    @classmethod
+    def from_store(cls, store: 'SolvedClueStore', n: int = NGRAM_SIZE) -> 'ClueRetrievalIndex':
+        index = cls(n)
+        index.add_many(store.load())
+        return index
+
+    def build(self) -> None:
+        """דחיסת האינדקס מראש (אחרת - בשאילתא הראשונה אחרי הוספה)"""
+        if self._dirty:
+            self._compile()
+
+    def _compile(self) -> None:
+        """בונה את ה-CSR: postings ממוינים לפי n-gram, משקלי TF-IDF מנורמלים לכל מסמך"""
+        docs = np.frombuffer(self._raw_docs, dtype=np.int32)
+        grams = np.frombuffer(self._raw_grams, dtype=np.int32)
+        counts = np.frombuffer(self._raw_counts, dtype=np.float32)
+        doc_count = len(self._texts)
+
+        df = np.bincount(grams, minlength=len(self._vocabulary))
+        self._idf = (np.log((1.0 + doc_count) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        weights = (1.0 + np.log(counts)) * self._idf[grams]
+        norms = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=doc_count))
+        weights = weights / norms[docs]
+
+        order = np.argsort(grams, kind='stable')
+        self._doc_ids = docs[order].copy()
+        self._weights = weights[order].astype(np.float32)
+        self._offsets = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self._lengths = np.fromiter((len(answer) for answer in self._answers), dtype=np.int32, count=doc_count)
+        self._dirty = False
+
+    def _query_vector(self, text: str) -> Tuple[List[int], List[float]]:
+        """(n-grams מהמילון, משקלים מנורמלים) של השאילתא; n-gram שלא במילון לא תורם"""
+        gram_ids, weights = [], []
+        norm_sq = 0.0
+        for gram, count in char_ngrams(text, self.n).items():
+            gram_id = self._vocabulary.get(gram)
+            # n-gram לא מוכר - נכנס רק לנורמה (עם idf מקסימלי)
+            idf = float(self._idf[gram_id]) if gram_id is not None else math.log(1.0 + len(self._texts)) + 1.0
+            weight = (1.0 + math.log(count)) * idf
+            norm_sq += weight * weight
+            if gram_id is not None:
+                gram_ids.append(gram_id)
+                weights.append(weight)
+
+        norm = math.sqrt(norm_sq) or 1.0
+        return gram_ids, [w / norm for w in weights]
+
+    def similarities(self, text: str) -> np.ndarray:
+        """דמיון cosine של text לכל ההגדרות באינדקס"""
+        self.build()
+
+        scores = np.zeros(len(self._texts), dtype=np.float32)
+        for gram_id, weight in zip(*self._query_vector(text)):
+            start, end = self._offsets[gram_id], self._offsets[gram_id + 1]
+            scores[self._doc_ids[start:end]] += weight * self._weights[start:end]
+        return scores
+
+    def lookup(
+        self,
+        text: str,
+        k: int = 5,
+        length: Optional[int] = None,
+        pattern: Optional[str] = None,
+        min_similarity: float = 0.3
+    ) -> List[RetrievedClue]:
+        """
+        ההגדרות הדומות ביותר ל-text.
+
+        Args:
+            text: טקסט ההגדרה
+            k: מספר התשובות (שונות) המקסימלי
+            length: אורך התשובה הנדרש (None = כל אורך)
+            pattern: תבנית אותיות ידועות ("_ב__"); קובעת גם את האורך
+            min_similarity: דמיון מינימלי (0.0-1.0)
+
+        Returns:
+            RetrievedClue לכל תשובה שונה, לפי דמיון (גבוה לנמוך)
+        """
+        if not self._texts or k <= 0:
+            return []
+
+        regex = None
+        if pattern:
+            length = len(pattern)
+            if pattern.strip('_'):
+                regex = pattern_to_regex(pattern)
+
+        scores = self.similarities(text)
+        if length is not None:
+            scores[self._lengths != length] = 0.0
+
+        candidates = np.flatnonzero(scores >= max(min_similarity, 1e-6))
+        if len(candidates) > self.MAX_SCANNED:
+            candidates = candidates[np.argpartition(-scores[candidates], self.MAX_SCANNED)[:self.MAX_SCANNED]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        results: List[RetrievedClue] = []
+        answers: Set[str] = set()
+        for doc_id in candidates:
+            answer = self._answers[doc_id]
+            if answer in answers or (regex and not regex.match(answer)):
+                continue
+            answers.add(answer)
+            results.append(RetrievedClue(self._texts[doc_id], answer, round(float(scores[doc_id]), 4)))
+            if len(results) >= k:
+                break
+        return results
+
+    def lookup_clue(self, clue: ClueEntry, k: int = 5, min_similarity: float = 0.3) -> List[RetrievedClue]:
+        """lookup לפי הגדרה: האורך והאותיות הידועות מה-ClueEntry"""
+        pattern = clue.get_constraint_string() if clue.answer_length > 0 else None
+        return self.lookup(clue.text, k=k, pattern=pattern, min_similarity=min_similarity)
+
+    def get_statistics(self) -> Dict:
+        """גודל האינדקס"""
+        return {
+            'clues': len(self._texts),
+            'ngrams': len(self._vocabulary),
+            'postings': len(self._raw_docs),
+        }
+
+
+class SolvedClueStore:
+    """הגדרות שנפתרו (טקסט → תשובה) בטבלה solved_clues"""
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        self.db = db_manager or DatabaseManager()
+
+    def add(self, entries: Iterable[Tuple[str, str]], source: str = "") -> int:
+        """הוספה (כפילויות של טקסט ותשובה מתעלמות). מחזיר כמה שורות נוספו"""
+        conn = self.db.get_connection()
+        before = conn.total_changes
+        conn.executemany('''
+            INSERT OR IGNORE INTO solved_clues (text, answer, source) VALUES (?, ?, ?)
+        ''', [(text, answer.replace(' ', ''), source) for text, answer in entries if text and answer])
+        conn.commit()
+        return conn.total_changes - before
+
+    def add_solved(self, clues: Iterable[ClueEntry], source: str = "") -> int:
+        """הוספת ההגדרות שנפתרו מ-ClueDatabase / רשימה"""
+        return self.add(
+            ((clue.text, clue.chosen_answer) for clue in clues if clue.is_solved and clue.chosen_answer),
+            source
+        )
+
+    def load(self) -> List[Tuple[str, str]]:
+        conn = self.db.get_connection()
+        rows = conn.execute('SELECT text, answer FROM solved_clues ORDER BY id').fetchall()
+        return [(row['text'], row['answer']) for row in rows]
+
+    def count(self) -> int:
+        conn = self.db.get_connection()
+        return conn.execute('SELECT COUNT(*) FROM solved_clues').fetchone()[0]
@@ -3,12 +3,19 @@ Clue Solver Service
 קבלת תשובות אפשריות להגדרות מ-LLM
 """
 
+import copy
 import json
 import time
-from typing import List, Tuple, Optional, Dict
+from typing import Collection, List, Tuple, Optional, Dict, MutableMapping, Mapping
 from dataclasses import dataclass
 
 from models.clue_entry import ClueEntry
+from services.call_policy import CallPolicy, ResilientCaller, timeout_kwargs
+from services.cassette import replay_client, wrap_client
+from services.usage_ledger import UsageMeter
+from services.compact_answers import (
+    FORMAT_COMPACT, OUTPUT_FORMATS, extract_json, looks_like_json, parse_compact
+)
 
 try:
     import anthropic
@@ -17,6 +24,10 @@ except ImportError:
     ANTHROPIC_AVAILABLE = False
 
 
+# שגיאה להגדרות שלא נשלחו כי עבר ה-deadline של solve_batch
+DEADLINE_EXCEEDED = "Deadline exceeded"
+
+
 @dataclass
 class SolverResult:
     """תוצאת פתרון הגדרה"""
@@ -39,7 +50,22 @@ class ClueSolver:
     - רשימה של 10 תשובות אפשריות עם ציוני ביטחון
     """
 
-    SOLVE_PROMPT = """You are a Hebrew crossword puzzle expert. Solve this clue.
+    # כמה מילים מוחרגות לכל היותר נשלחות בפרומפט לכל הגדרה (הסינון בפענוח - על כולן)
+    MAX_EXCLUDED_IN_PROMPT = 20
+
+    EXCLUSION_HINT = (
+        "Words listed after \"not:\" / \"Exclude:\" were already tried or are already known - "
+        "do NOT return them again. Give only NEW answers that fit the length and pattern."
+    )
+
+    _SOLVE_RULES = """Rules:
+1. Each answer must be EXACTLY {length} Hebrew letters
+2. Provide up to 10 candidates, sorted by confidence (highest first)
+3. For famous clues (brands, songs, etc.) - confidence should be high
+4. For ambiguous clues - confidence should be lower, provide variety
+"""
+
+    _SOLVE_INSTRUCTIONS = """You are a Hebrew crossword puzzle expert. Solve this clue.
 
 Clue: "{clue_text}"
 Answer length: {length} letters
@@ -63,7 +89,9 @@ IMPORTANT:
 - Consider wordplay, puns, and double meanings common in Hebrew crosswords
 {known_letters_hint}
 
-Respond with JSON only:
+"""
+
+    SOLVE_PROMPT = _SOLVE_INSTRUCTIONS + """Respond with JSON only:
 {{
   "clue_certainty": 0.85,
   "candidates": [
@@ -85,18 +113,30 @@ FIELD EXPLANATIONS:
   - 0.5-0.7 = Possible
   - <0.5 = Guess
 
-Rules:
-1. Each answer must be EXACTLY {length} Hebrew letters
-2. Provide up to 10 candidates, sorted by confidence (highest first)
-3. For famous clues (brands, songs, etc.) - confidence should be high
-4. For ambiguous clues - confidence should be lower, provide variety
-"""
+""" + _SOLVE_RULES
 
-    BATCH_SOLVE_PROMPT = """You are a Hebrew crossword puzzle expert. Solve these clues.
+    # פורמט שורות קומפקטי (services.compact_answers) - פחות טוקני פלט מ-JSON
+    COMPACT_SOLVE_PROMPT = _SOLVE_INSTRUCTIONS + """Respond with ONE line and nothing else - no JSON, no explanations:
+1|<clue_certainty>|<answer> <confidence>|<answer> <confidence>|...
 
-{clues_list}
+Example:
+1|85|תשובה 95|אחרת 80
 
-SPECIAL FORMATS - IMPORTANT:
+FIELD EXPLANATIONS (whole numbers 0-100):
+- clue_certainty: How "narrow" is this clue?
+  - 100 = Only one possible answer (famous brand, specific person, etc.)
+  - 50 = A few dozen options (city in Israel, animal, etc.)
+  - 10 = Many options (letter in English, number, etc.)
+
+- confidence: Your certainty that THIS SPECIFIC answer is correct
+  - 95+ = Very confident
+  - 70-90 = Likely correct
+  - 50-70 = Possible
+  - <50 = Guess
+
+""" + _SOLVE_RULES
+
+    _BATCH_FORMATS = """SPECIAL FORMATS - IMPORTANT:
 1. Multi-word answers with (X,Y) notation:
    - "(3,2)" means 3 letters + 2 letters = 5 total, written WITHOUT spaces
    - Example: "שלום עליכם (4,6)" → "שלוםעליכם" (10 letters)
@@ -111,7 +151,13 @@ IMPORTANT:
 - NO spaces, NO punctuation - just Hebrew letters
 - Consider wordplay, puns, and double meanings
 
-Respond with JSON only:
+"""
+
+    BATCH_SOLVE_PROMPT = """You are a Hebrew crossword puzzle expert. Solve these clues.
+
+{clues_list}
+
+""" + _BATCH_FORMATS + """Respond with JSON only:
 {{
   "solutions": [
     {{
@@ -135,27 +181,92 @@ FIELD EXPLANATIONS:
 - confidence: Your certainty about EACH SPECIFIC answer
 """
 
-    def __init__(self, api_key: str = None, model: str = "claude-sonnet-4-20250514"):
+    COMPACT_BATCH_SOLVE_PROMPT = """You are a Hebrew crossword puzzle expert. Solve these numbered clues.
+
+{clues_list}
+
+""" + _BATCH_FORMATS + """Respond with one line per clue and nothing else - no JSON, no explanations:
+<clue number>|<clue_certainty>|<answer> <confidence>|<answer> <confidence>|...
+
+Example:
+1|85|תשובה 95|אחרת 80
+2|30|מילה 60|מלה 40|שורה 20
+
+FIELD EXPLANATIONS (whole numbers 0-100):
+- clue_certainty: How "narrow" is this clue?
+  - 100 = Only one answer (famous brand, specific song, etc.)
+  - 50 = A few dozen options (city, animal, etc.)
+  - 10 = Many options (letter, number, etc.)
+
+- confidence: Your certainty about EACH SPECIFIC answer
+"""
+
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = "claude-sonnet-4-20250514",
+        cache: Optional[MutableMapping[str, SolverResult]] = None,
+        base_url: Optional[str] = None,
+        call_policy: Optional[CallPolicy] = None,
+        output_format: str = FORMAT_COMPACT
+    ):
         """
         Args:
             api_key: Claude API key
             model: מודל Claude לשימוש
+            cache: cache חיצוני לתשובות (למשל Manager().dict() משותף בין תהליכים)
+            base_url: כתובת API חלופית (למשל tests.mock_model_server);
+                      None = ANTHROPIC_BASE_URL או ברירת המחדל של ה-SDK
+            call_policy: deadline, retries ו-hedging לכל קריאה (services.call_policy)
+            output_format: פורמט התשובה שמבקשים מהמודל - "compact" (שורות, services.compact_answers)
+                           או "json". תשובת JSON מתפענחת בכל מקרה
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
         self.api_key = api_key
+        self.base_url = base_url
         self.model = model
-        self.client = None
-        self._cache: Dict[str, SolverResult] = {}  # cache לתשובות
-
-        if ANTHROPIC_AVAILABLE and api_key:
-            self.client = anthropic.Anthropic(api_key=api_key)
+        self.output_format = output_format
+        self._cache: MutableMapping[str, SolverResult] = cache if cache is not None else {}  # cache לתשובות
+        self._caller = ResilientCaller(call_policy or CallPolicy(), name="clue_solver")
+        self.client = self._create_client()
+
+    def __getstate__(self) -> Dict:
+        """pickle (לשליחה ל-worker process) - בלי ה-client, שאינו ניתן ל-pickle"""
+        state = self.__dict__.copy()
+        state['client'] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        """שחזור מ-pickle - יצירת client חדש בתהליך הנוכחי"""
+        self.__dict__.update(state)
+        self.client = self._create_client()
+
+    def _create_client(self):
+        """client של Anthropic, עטוף ב-cassette הפעיל (services.cassette) אם יש"""
+        replayed = replay_client("clue_solver")
+        if replayed is not None:
+            return replayed
+        if ANTHROPIC_AVAILABLE and self.api_key:
+            return wrap_client(
+                "clue_solver", anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url)
+            )
+        return None
 
-    def solve_clue(self, clue: ClueEntry, use_cache: bool = True) -> SolverResult:
+    def solve_clue(
+        self,
+        clue: ClueEntry,
+        use_cache: bool = True,
+        deadline: Optional[float] = None
+    ) -> SolverResult:
         """
         פותר הגדרה בודדת.
 
         Args:
             clue: ההגדרה לפתרון
             use_cache: האם להשתמש ב-cache
+            deadline: זמן (time.time()) שאחריו לא שולחים את הקריאה; עד אליו
+                      הקריאה (כל הניסיונות) מוגבלת
 
         Returns:
             SolverResult עם רשימת תשובות אפשריות
@@ -177,6 +288,9 @@ FIELD EXPLANATIONS:
         if use_cache and cache_key in self._cache:
             return self._cache[cache_key]
 
+        if deadline is not None and time.time() >= deadline:
+            return SolverResult(candidates=[], error=DEADLINE_EXCEEDED)
+
         start_time = time.time()
 
         try:
@@ -189,7 +303,8 @@ FIELD EXPLANATIONS:
                 constraints_info = f"Known letters pattern: {constraint_str}"
                 known_letters_hint = f"- The answer must match this pattern: {constraint_str} (where _ is unknown)"
 
-            prompt = self.SOLVE_PROMPT.format(
+            template = self.COMPACT_SOLVE_PROMPT if self.output_format == FORMAT_COMPACT else self.SOLVE_PROMPT
+            prompt = template.format(
                 clue_text=clue.text,
                 length=clue.answer_length,
                 constraints_info=constraints_info,
@@ -197,13 +312,15 @@ FIELD EXPLANATIONS:
             )
 
             # קריאה לקלוד
-            response = self.client.messages.create(
+            meter = UsageMeter("clue_solver", "anthropic", self.model, clues=[clue.id])
+            response = self._caller.call(lambda timeout: meter.observe(self.client.messages.create(
                 model=self.model,
                 max_tokens=1024,
                 messages=[
                     {"role": "user", "content": prompt}
-                ]
-            )
+                ],
+                **timeout_kwargs(timeout)
+            )), deadline=deadline, meter=meter)
 
             # פענוח התשובה
             result = self._parse_response(response.content[0].text, clue)
@@ -225,7 +342,10 @@ FIELD EXPLANATIONS:
     def solve_batch(
         self,
         clues: List[ClueEntry],
-        max_per_request: int = 10
+        max_per_request: int = 10,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
     ) -> Dict[str, SolverResult]:
         """
         פותר מספר הגדרות בבת אחת (יעיל יותר).
@@ -233,6 +353,11 @@ FIELD EXPLANATIONS:
         Args:
             clues: רשימת הגדרות
             max_per_request: מקסימום הגדרות בקריאה אחת
+            use_cache: האם להשתמש ב-cache
+            deadline: זמן (time.time()) שאחריו לא שולחים עוד קריאות.
+                      הזמן שנותר משמש גם כ-timeout לכל קריאה
+            exclude: clue_id → מילים שכבר ידועות או נכשלו (re-query). נשלחות בפרומפט
+                     כדי שהמודל לא יחזיר אותן, ומה שחוזר בכל זאת מסונן
 
         Returns:
             מיפוי clue_id → SolverResult
@@ -247,45 +372,75 @@ FIELD EXPLANATIONS:
                 )
             return results
 
+        exclude = exclude or {}
+
+        # הגדרות שכבר יש להן תשובה ב-cache לא נשלחות שוב
+        pending = []
+        for clue in clues:
+            cache_key = self._get_cache_key(clue, exclude.get(clue.id))
+            if use_cache and cache_key in self._cache:
+                results[clue.id] = self._cache[cache_key]
+            else:
+                pending.append(clue)
+
         # חלוקה לקבוצות
-        for i in range(0, len(clues), max_per_request):
-            batch = clues[i:i + max_per_request]
-            batch_results = self._solve_batch_internal(batch)
+        for i in range(0, len(pending), max_per_request):
+            batch = pending[i:i + max_per_request]
+
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    for clue in batch:
+                        results[clue.id] = SolverResult(candidates=[], error=DEADLINE_EXCEEDED)
+                    continue
+
+            batch_results = self._solve_batch_internal(batch, timeout=timeout, exclude=exclude)
             results.update(batch_results)
 
+            if use_cache:
+                for clue in batch:
+                    result = batch_results.get(clue.id)
+                    if result and not result.error:
+                        self._cache[self._get_cache_key(clue, exclude.get(clue.id))] = result
+
         return results
 
-    def _solve_batch_internal(self, clues: List[ClueEntry]) -> Dict[str, SolverResult]:
-        """פותר קבוצה של הגדרות"""
+    def _solve_batch_internal(
+        self,
+        clues: List[ClueEntry],
+        timeout: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> Dict[str, SolverResult]:
+        """
+        פותר קבוצה של הגדרות.
+
+        Args:
+            clues: ההגדרות
+            timeout: deadline לכל הניסיונות בשניות (None = לפי call_policy בלבד)
+            exclude: clue_id → מילים שאסור להחזיר
+        """
         results = {}
         start_time = time.time()
 
         try:
-            # בניית רשימת ההגדרות
-            clues_list = []
-            for clue in clues:
-                constraint_str = clue.get_constraint_string()
-                clue_info = f"- ID: {clue.id}\n  Clue: \"{clue.text}\"\n  Length: {clue.answer_length}"
-                if constraint_str and '_' in constraint_str:
-                    clue_info += f"\n  Pattern: {constraint_str}"
-                clues_list.append(clue_info)
+            prompt = self._build_batch_prompt(clues, exclude)
 
-            prompt = self.BATCH_SOLVE_PROMPT.format(
-                clues_list="\n".join(clues_list)
-            )
-
-            # קריאה לקלוד
-            response = self.client.messages.create(
+            # קריאה לקלוד - ה-timeout של ה-batch הוא deadline לכל הניסיונות
+            deadline = time.time() + timeout if timeout is not None else None
+            meter = UsageMeter("clue_solver", "anthropic", self.model, clues=[clue.id for clue in clues])
+            response = self._caller.call(lambda attempt_timeout: meter.observe(self.client.messages.create(
                 model=self.model,
                 max_tokens=4096,
                 messages=[
                     {"role": "user", "content": prompt}
-                ]
-            )
+                ],
+                **timeout_kwargs(attempt_timeout)
+            )), deadline=deadline, meter=meter)
 
             # פענוח
             processing_time = time.time() - start_time
-            results = self._parse_batch_response(response.content[0].text, clues)
+            results = self._parse_batch_response(response.content[0].text, clues, exclude)
 
             # עדכון זמן עיבוד
             for result in results.values():
@@ -301,45 +456,98 @@ FIELD EXPLANATIONS:
 
         return results
 
-    def _parse_response(self, response_text: str, clue: ClueEntry) -> SolverResult:
-        """פענוח תשובה בודדת"""
-        try:
-            # חילוץ JSON
-            json_str = response_text
-            if '{' in json_str:
-                start = json_str.find('{')
-                end = json_str.rfind('}') + 1
-                json_str = json_str[start:end]
-
-            data = json.loads(json_str)
-
-            # קריאת clue_certainty
-            clue_certainty = data.get('clue_certainty', 0.5)
-
-            candidates = []
-            for cand in data.get('candidates', []):
-                answer = cand.get('answer', '')
+    def _build_batch_prompt(
+        self,
+        clues: List[ClueEntry],
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> str:
+        """
+        פרומפט ל-batch: לפי clue_id ב-JSON, לפי מספר קצר (1..n) בפורמט הקומפקטי.
+        לכל הגדרה עם מילים ב-exclude נוספת רשימת החרגה (עד MAX_EXCLUDED_IN_PROMPT).
+        """
+        compact = self.output_format == FORMAT_COMPACT
+        exclude = exclude or {}
+        clues_list = []
+        for number, clue in enumerate(clues, 1):
+            constraint_str = clue.get_constraint_string()
+            has_pattern = constraint_str and '_' in constraint_str
+            excluded = list(exclude.get(clue.id, ()))[:self.MAX_EXCLUDED_IN_PROMPT]
+            if compact:
+                clue_info = f"{number}. \"{clue.text}\" - {clue.answer_length} letters"
+                if has_pattern:
+                    clue_info += f", pattern {constraint_str}"
+                if excluded:
+                    clue_info += f", not: {' '.join(excluded)}"
+            else:
+                clue_info = f"- ID: {clue.id}\n  Clue: \"{clue.text}\"\n  Length: {clue.answer_length}"
+                if has_pattern:
+                    clue_info += f"\n  Pattern: {constraint_str}"
+                if excluded:
+                    clue_info += f"\n  Exclude: {', '.join(excluded)}"
+            clues_list.append(clue_info)
 
-                # הסרת רווחים אם יש (למקרה של תשובות מרובות מילים)
-                answer = answer.replace(' ', '')
+        if any(exclude.get(clue.id) for clue in clues):
+            clues_list.append("\n" + self.EXCLUSION_HINT)
 
-                # סינון תשובות לא תקינות
-                if len(answer) != clue.answer_length:
-                    continue
+        template = self.COMPACT_BATCH_SOLVE_PROMPT if compact else self.BATCH_SOLVE_PROMPT
+        return template.format(clues_list="\n".join(clues_list))
 
-                # בדיקת התאמה לאותיות ידועות
-                if not clue.matches_answer(answer):
-                    continue
+    def _filter_candidates(
+        self,
+        raw_candidates: List[Tuple[str, float]],
+        clue: ClueEntry,
+        excluded: Collection[str] = ()
+    ) -> List[Tuple[str, float]]:
+        """סינון מועמדים לפי אורך, אותיות ידועות והחרגות, ממוינים לפי ביטחון (עד 10)"""
+        candidates = []
+        for answer, confidence in raw_candidates:
+            # הסרת רווחים אם יש (למקרה של תשובות מרובות מילים)
+            answer = answer.replace(' ', '')
+
+            # מילה שכבר ידועה או נכשלה - לא מידע חדש
+            if answer in excluded:
+                continue
+
+            # סינון תשובות לא תקינות
+            if len(answer) != clue.answer_length:
+                continue
+
+            # בדיקת התאמה לאותיות ידועות
+            if not clue.matches_answer(answer):
+                continue
+
+            candidates.append((answer, confidence))
+
+        # מיון לפי ביטחון
+        candidates.sort(key=lambda x: x[1], reverse=True)
+        return candidates[:10]
+
+    @staticmethod
+    def _json_candidates(data: Dict) -> List[Tuple[str, float]]:
+        return [
+            (cand.get('answer', ''), cand.get('confidence', 0.5))
+            for cand in data.get('candidates', [])
+        ]
 
-                confidence = cand.get('confidence', 0.5)
-                candidates.append((answer, confidence))
+    def _parse_response(self, response_text: str, clue: ClueEntry) -> SolverResult:
+        """פענוח תשובה בודדת (קומפקטית או JSON)"""
+        if self.output_format == FORMAT_COMPACT and not looks_like_json(response_text):
+            answers = parse_compact(response_text)
+            if not answers:
+                return SolverResult(candidates=[], error="Compact parse error: no answer line")
+            # הגדרה אחת - לוקחים את השורה עם המספר הנמוך (אמור להיות 1)
+            answer = answers[min(answers)]
+            return SolverResult(
+                candidates=self._filter_candidates(answer.candidates, clue),
+                clue_certainty=answer.clue_certainty
+            )
 
-            # מיון לפי ביטחון
-            candidates.sort(key=lambda x: x[1], reverse=True)
+        try:
+            data = extract_json(response_text)
 
             return SolverResult(
-                candidates=candidates[:10],
-                clue_certainty=clue_certainty
+                candidates=self._filter_candidates(self._json_candidates(data), clue),
+                clue_certainty=data.get('clue_certainty', 0.5)
             )
 
         except json.JSONDecodeError as e:
@@ -351,20 +559,32 @@ FIELD EXPLANATIONS:
     def _parse_batch_response(
         self,
         response_text: str,
-        clues: List[ClueEntry]
+        clues: List[ClueEntry],
+        exclude: Optional[Mapping[str, Collection[str]]] = None
     ) -> Dict[str, SolverResult]:
-        """פענוח תשובה לקבוצה"""
+        """
+        פענוח תשובה לקבוצה.
+        בפורמט הקומפקטי השורות ממוספרות לפי סדר ההגדרות בפרומפט; שורות שלמות
+        מתשובה שנקטעה נשמרות, וההגדרות החסרות מקבלות שגיאה.
+        """
         results = {}
         clue_map = {c.id: c for c in clues}
+        exclude = exclude or {}
+
+        if self.output_format == FORMAT_COMPACT and not looks_like_json(response_text):
+            for index, answer in parse_compact(response_text).items():
+                if 1 <= index <= len(clues):
+                    clue = clues[index - 1]
+                    results[clue.id] = SolverResult(
+                        candidates=self._filter_candidates(
+                            answer.candidates, clue, set(exclude.get(clue.id, ()))
+                        ),
+                        clue_certainty=answer.clue_certainty
+                    )
+            return self._fill_missing(results, clues)
 
         try:
-            json_str = response_text
-            if '{' in json_str:
-                start = json_str.find('{')
-                end = json_str.rfind('}') + 1
-                json_str = json_str[start:end]
-
-            data = json.loads(json_str)
+            data = extract_json(response_text)
 
             for solution in data.get('solutions', []):
                 clue_id = solution.get('clue_id', '')
@@ -373,29 +593,11 @@ FIELD EXPLANATIONS:
                 if not clue:
                     continue
 
-                # קריאת clue_certainty
-                clue_certainty = solution.get('clue_certainty', 0.5)
-
-                candidates = []
-                for cand in solution.get('candidates', []):
-                    answer = cand.get('answer', '')
-
-                    # הסרת רווחים אם יש
-                    answer = answer.replace(' ', '')
-
-                    if len(answer) != clue.answer_length:
-                        continue
-
-                    if not clue.matches_answer(answer):
-                        continue
-
-                    confidence = cand.get('confidence', 0.5)
-                    candidates.append((answer, confidence))
-
-                candidates.sort(key=lambda x: x[1], reverse=True)
                 results[clue_id] = SolverResult(
-                    candidates=candidates[:10],
-                    clue_certainty=clue_certainty
+                    candidates=self._filter_candidates(
+                        self._json_candidates(solution), clue, set(exclude.get(clue_id, ()))
+                    ),
+                    clue_certainty=solution.get('clue_certainty', 0.5)
                 )
 
         except json.JSONDecodeError as e:
@@ -405,7 +607,11 @@ FIELD EXPLANATIONS:
                     error=f"JSON parse error: {e}"
                 )
 
-        # וידוא שכל ההגדרות קיבלו תוצאה
+        return self._fill_missing(results, clues)
+
+    @staticmethod
+    def _fill_missing(results: Dict[str, SolverResult], clues: List[ClueEntry]) -> Dict[str, SolverResult]:
+        """וידוא שכל ההגדרות קיבלו תוצאה"""
         for clue in clues:
             if clue.id not in results:
                 results[clue.id] = SolverResult(
@@ -415,14 +621,57 @@ FIELD EXPLANATIONS:
 
         return results
 
-    def _get_cache_key(self, clue: ClueEntry) -> str:
-        """יוצר מפתח cache להגדרה"""
-        return f"{clue.text}|{clue.answer_length}|{clue.get_constraint_string()}"
+    def _get_cache_key(self, clue: ClueEntry, excluded: Optional[Collection[str]] = None) -> str:
+        """יוצר מפתח cache להגדרה (תשובה עם החרגות נשמרת בנפרד)"""
+        key = f"{clue.text}|{clue.answer_length}|{clue.get_constraint_string()}"
+        if excluded:
+            key += "|-" + ",".join(sorted(excluded))
+        return key
+
+    @staticmethod
+    def without_excluded(result: SolverResult, excluded: Optional[Collection[str]]) -> SolverResult:
+        """
+        עותק של התוצאה בלי המילים המוחרגות - לתחליפים מקומיים של solve_batch
+        (fixtures, benchmark, replay) שצריכים לכבד exclude כמו ה-API
+        """
+        if not excluded:
+            return result
+        return SolverResult(
+            candidates=[(word, conf) for word, conf in result.candidates if word not in excluded],
+            clue_certainty=result.clue_certainty,
+            processing_time=result.processing_time,
+            error=result.error
+        )
+
+    def share_cache(self, cache: MutableMapping[str, SolverResult]) -> 'ClueSolver':
+        """
+        מחזיר עותק של ה-solver שקורא וכותב ל-cache משותף.
+        התשובות שכבר נשמרו מועתקות ל-cache המשותף.
+
+        Args:
+            cache: ה-cache המשותף (למשל Manager().dict())
+
+        Returns:
+            ClueSolver חדש עם אותן הגדרות
+        """
+        cache.update(self._cache)
+        shared = copy.copy(self)
+        shared.client = self.client  # copy עובר דרך __getstate__, שמוותר על ה-client
+        shared._cache = cache
+        return shared
+
+    def merge_cache(self, entries: Mapping[str, SolverResult]) -> None:
+        """מיזוג תשובות (למשל מ-cache משותף שנסגר) ל-cache המקומי"""
+        self._cache.update(entries)
 
     def clear_cache(self) -> None:
         """ניקוי ה-cache"""
         self._cache.clear()
 
+    def get_call_stats(self) -> Dict:
+        """סטטיסטיקות הקריאות ל-API (retries, timeouts, hedges, p50/p95)"""
+        return self._caller.get_statistics()
+
     def get_cache_stats(self) -> Dict:
         """סטטיסטיקות cache"""
         return {
@@ -0,0 +1,190 @@
+"""
+Compact Answers - פורמט שורות קומפקטי לתשובות ההגדרות
+
+ב-JSON המפתחות ("answer", "confidence") חוזרים על עצמם בכל מועמד, וטוקני
+הפלט הם רוב הזמן והעלות של קריאה. בפורמט הקומפקטי כל הגדרה היא שורה אחת,
+לפי מספר קצר במקום ה-clue_id, והביטחון הוא מספר שלם 0-100:
+
+    1|85|תשובה 95|אחרת 80
+    2|30|מילה 60|מלה 40
+
+השדות: מספר ההגדרה | clue_certainty | מועמד וביטחון | ...
+
+הפענוח סלחני ועובד גם על זרם (feed לפי חלקים): שורה שהושלמה מפוענחת מיד,
+שורות לא תקינות, code fences ותבליטים מדולגים, וביטחון מתקבל גם כשבר (0.95)
+או עם %. תשובה שנקטעה באמצע (max_tokens) עדיין מחזירה את כל השורות השלמות -
+ב-JSON קטוע לא מתקבל כלום.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+FORMAT_JSON = "json"
+FORMAT_COMPACT = "compact"
+
+OUTPUT_FORMATS = (FORMAT_JSON, FORMAT_COMPACT)
+
+DEFAULT_SCORE = 0.5
+
+_INDEX = re.compile(r"^[#]?(\d+)[.):]?$")
+_SCORE = re.compile(r"^(\d+(?:\.\d+)?)%?$")
+
+
+@dataclass
+class ParsedAnswer:
+    """שורה מפוענחת: תשובות להגדרה אחת"""
+    index: int
+    clue_certainty: float = DEFAULT_SCORE
+    candidates: List[Tuple[str, float]] = field(default_factory=list)
+
+
+def _parse_score(token: str) -> Optional[float]:
+    """'95' / '0.95' / '95%' → 0.95; None אם זה לא מספר"""
+    if token.isascii() and token.isdigit():
+        return min(1.0, int(token) / 100.0)
+    match = _SCORE.match(token.strip())
+    if not match:
+        return None
+    value = float(match.group(1))
+    if value > 1.0 or '%' in token:
+        value /= 100.0
+    return min(1.0, max(0.0, value))
+
+
+def _parse_candidate(field_text: str) -> Optional[Tuple[str, float]]:
+    """'תשובה 95' / 'תשובה:95' / 'תשובה' → (תשובה, ביטחון)"""
+    text = field_text.strip().strip('"\'')
+    if not text:
+        return None
+
+    answer, score = text, DEFAULT_SCORE
+    for separator in (" ", ":", "="):
+        head, sep, tail = text.rpartition(separator)
+        if sep and head.strip():
+            parsed = _parse_score(tail)
+            if parsed is not None:
+                answer, score = head, parsed
+                break
+
+    answer = answer.strip().strip('"\'').replace(' ', '')
+    if not answer or _parse_score(answer) is not None:
+        return None
+    return answer, score
+
+
+def parse_line(line: str) -> Optional[ParsedAnswer]:
+    """
+    פענוח שורה אחת; None לשורה שאינה תשובה (ריקה, fence, הסבר).
+    שדה ה-certainty אופציונלי - אם השדה השני אינו מספר הוא מועמד.
+    """
+    line = line.strip().lstrip("-*• \t")
+    if not line or line.startswith("```") or '|' not in line:
+        return None
+
+    fields = line.split('|')
+    index_match = _INDEX.match(fields[0].strip())
+    if not index_match:
+        return None
+
+    result = ParsedAnswer(index=int(index_match.group(1)))
+    rest = fields[1:]
+    if rest:
+        certainty = _parse_score(rest[0])
+        if certainty is not None:
+            result.clue_certainty = certainty
+            rest = rest[1:]
+
+    for field_text in rest:
+        candidate = _parse_candidate(field_text)
+        if candidate:
+            result.candidates.append(candidate)
+    return result
+
+
+class CompactAnswerParser:
+    """
+    פענוח מצטבר: feed() מקבל חלקים של טקסט (למשל מ-stream) ומחזיר את
+    השורות שהושלמו; close() מפענח את השארית.
+    שורה חוזרת לאותו מספר הגדרה מחליפה את הקודמת.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self.answers: Dict[int, ParsedAnswer] = {}
+        self.skipped_lines = 0
+
+    def _accept(self, line: str) -> Optional[ParsedAnswer]:
+        parsed = parse_line(line)
+        if parsed is None:
+            if line.strip():
+                self.skipped_lines += 1
+            return None
+        self.answers[parsed.index] = parsed
+        return parsed
+
+    def feed(self, chunk: str) -> List[ParsedAnswer]:
+        """מוסיף טקסט; מחזיר את השורות שהושלמו בו"""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        completed = []
+        for line in lines:
+            parsed = self._accept(line)
+            if parsed:
+                completed.append(parsed)
+        return completed
+
+    def close(self) -> List[ParsedAnswer]:
+        """מפענח את השורה האחרונה (בלי ירידת שורה בסוף)"""
+        line, self._buffer = self._buffer, ""
+        parsed = self._accept(line)
+        return [parsed] if parsed else []
+
+
+def parse_compact(text: str) -> Dict[int, ParsedAnswer]:
+    """פענוח תשובה שלמה: מספר הגדרה → ParsedAnswer"""
+    parser = CompactAnswerParser()
+    parser.feed(text)
+    parser.close()
+    return parser.answers
+
+
+def format_compact(index: int, clue_certainty: float, candidates: List[Tuple[str, float]]) -> str:
+    """שורה בפורמט הקומפקטי (למשל לשרת ה-mock ולבנצ'מרק)"""
+    fields = [str(index), str(round(clue_certainty * 100))]
+    fields.extend(f"{answer} {round(confidence * 100)}" for answer, confidence in candidates)
+    return "|".join(fields)
+
+
+def extract_json(text: str) -> Dict:
+    """
+    האובייקט הראשון שמתפענח כ-JSON בטקסט - גם כשיש לפניו או אחריו
+    הסבר עם סוגריים מסולסלים (שם find('{')/rfind('}') נכשל).
+
+    Raises:
+        json.JSONDecodeError: אם אין אובייקט תקין
+    """
+    decoder = json.JSONDecoder()
+    start = text.find('{')
+    error: Optional[json.JSONDecodeError] = None
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError as e:
+            error = error or e
+        start = text.find('{', start + 1)
+    if error:
+        raise error
+    return json.loads(text)
+
+
+def looks_like_json(text: str) -> bool:
+    """תשובה בפורמט JSON (למשל מ-cassette ישן) גם כשביקשנו קומפקטי"""
+    stripped = text.lstrip().lstrip('`').lstrip()
+    if stripped.startswith("json"):
+        stripped = stripped[4:].lstrip()
+    return stripped.startswith('{')
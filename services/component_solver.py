@@ -0,0 +1,149 @@
+"""
+Component Solver - פירוק לרכיבים בלתי תלויים ופתרון מקבילי
+
+תשבץ גדול מתפרק לעיתים קרובות לאזורים שאינם חולקים אף משבצת פתוחה
+(אחרי ששובצו המילים הוודאיות). backtrack באזור אחד לא אמור לבטל התקדמות
+באזור אחר, ולכן כל רכיב נפתר עם SolverState משלו, ב-worker process נפרד,
+והתוצאות ממוזגות ל-SolutionGrid המשותף.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from services.solver_strategy import SolverStrategy, SolvePhase, SolveProgress, SolveStatus
+from services.solver_snapshot import SolveSnapshot, SnapshotResult, solve_snapshot
+
+
+class ComponentSolver:
+    """
+    פותר תשבץ ברכיבים בלתי תלויים במקביל.
+
+    תהליך:
+    1. שאילתא ראשונית אחת לכל ההגדרות (בתהליך הראשי)
+    2. שיבוץ מילים ודאיות (מועמד יחיד / ביטחון גבוה)
+    3. פירוק ההגדרות שנותרו לרכיבים על גרף ההצלבות
+    4. פתרון כל רכיב ב-worker process עם SolverState משלו
+    5. מיזוג התוצאות ל-SolutionGrid וחישוב הרכיבים מחדש
+    """
+
+    MAX_ROUNDS = 5
+
+    def __init__(
+        self,
+        strategy: SolverStrategy,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+        max_rounds: int = MAX_ROUNDS
+    ):
+        """
+        Args:
+            strategy: הסולבר הראשי (מחזיק את ה-SolutionGrid המשותף)
+            max_workers: מקסימום תהליכים במקביל (None = מספר המעבדים)
+            use_processes: False = פתרון הרכיבים בזה אחר זה בתהליך הנוכחי
+            max_rounds: מקסימום סבבי פירוק-פתרון-מיזוג
+        """
+        self.strategy = strategy
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.max_rounds = max_rounds
+
+        self.round_stats: List[Dict] = []
+
+    def find_components(self) -> List[List[str]]:
+        """
+        מחשב רכיבים בלתי תלויים מההגדרות שעוד לא נפתרו.
+        משבצות שכבר יש בהן אות לא מקשרות בין הגדרות.
+        """
+        state = self.strategy.state
+        unsolved = {
+            clue_id for clue_id, clue_state in state.clue_states.items()
+            if not clue_state.is_solved and clue_state.clue.answer_length > 0
+        }
+        solution = self.strategy.solution
+
+        return self.strategy.clue_db.get_components(
+            unsolved,
+            is_open_cell=lambda row, col: not solution.get_letter(row, col)
+        )
+
+    def solve(self) -> SolveProgress:
+        """
+        פותר את התשבץ.
+
+        Returns:
+            SolveProgress של הסולבר הראשי
+        """
+        strategy = self.strategy
+        strategy.prepare()
+        self.round_stats = []
+
+        for round_num in range(1, self.max_rounds + 1):
+            confident = strategy.place_confident_words()
+
+            components = self.find_components()
+            if not components:
+                break
+
+            results = self._solve_components(components)
+
+            placed = 0
+            for result in results:
+                placed += strategy.apply_assignments(result.assignments)
+                strategy.state.backtracks += result.backtracks
+                strategy.state.query_count += result.query_count
+
+            self.round_stats.append({
+                'round': round_num,
+                'confident_placements': confident,
+                'components': len(components),
+                'largest_component': len(components[0]),
+                'placed': placed,
+                'errors': sum(1 for r in results if r.error)
+            })
+
+            if placed == 0:
+                break
+
+        if strategy.state.solve_phase != SolvePhase.COMPLETED:
+            strategy.state.solve_phase = SolvePhase.STUCK
+
+        return strategy.get_progress()
+
+    def _solve_components(self, components: List[List[str]]) -> List[SnapshotResult]:
+        """פותר כל רכיב על תמונת מצב עצמאית"""
+        snapshots = [
+            SolveSnapshot.capture(self.strategy, set(component))
+            for component in components
+        ]
+        clue_solver = self.strategy.solver
+
+        if not self.use_processes or len(snapshots) == 1 or self.max_workers == 1:
+            return [self._run(snapshot, clue_solver) for snapshot in snapshots]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(solve_snapshot, snapshot, clue_solver)
+                for snapshot in snapshots
+            ]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(SnapshotResult(status=SolveStatus.FAILED, error=str(e)))
+
+        return results
+
+    @staticmethod
+    def _run(snapshot: SolveSnapshot, clue_solver) -> SnapshotResult:
+        """פתרון רכיב בתהליך הנוכחי"""
+        try:
+            return solve_snapshot(snapshot, clue_solver)
+        except Exception as e:
+            return SnapshotResult(status=SolveStatus.FAILED, error=str(e))
+
+    def get_statistics(self) -> Dict:
+        """סטטיסטיקות - של הסולבר הראשי + סבבי הרכיבים"""
+        stats = self.strategy.get_statistics()
+        stats['component_rounds'] = self.round_stats
+        return stats
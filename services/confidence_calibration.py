@@ -0,0 +1,362 @@
+"""
+Confidence Calibration - כיול הביטחון של ה-LLM מהיסטוריית פתרונות
+
+הביטחון שהמודל מדווח לא מכויל: 0.9 לא אומר שהתשובה נכונה ב-90% מהמקרים,
+וגם clue_certainty ומספר האותיות הידועות בזמן השאילתא משפיעים על הסיכוי.
+SolverStrategy משבץ לפי HIGH_CONFIDENCE_THRESHOLD ולפי combined_score, כך
+שביטחון מנופח גורם לשיבוצים שגויים ול-backtracks.
+
+המודול לומד מיפוי מדגימות (confidence, clue_certainty, pattern_fill, correct)
+שנאספות מ-traces של פתרונות (services.solver_trace) ונשמרות מקומית בטבלה
+calibration_samples במסד הנתונים:
+- isotonic: מיפוי מונוטוני (PAV) של confidence להסתברות
+- platt: רגרסיה לוגיסטית על logit(confidence), logit(clue_certainty), pattern_fill
+
+CandidateIndex עם calibrator מחליף את הביטחון הגולמי של כל מועמד חדש
+בהסתברות המכוילת שהמילה נכונה, כך שהסף HIGH_CONFIDENCE_THRESHOLD, המיון
+ו-combined_score עובדים על ערכים מכוילים. הביטחון הגולמי נשאר ב-trace.
+
+התוויות (נכון / לא נכון) דורשות את התשובות הנכונות - מפתרון רשמי או מתיקון
+ידני. בלי תשובות, רק trace של פתרון שהסתיים (COMPLETED) נחשב לאמת; פתרון
+תקוע או שגוי לא נכנס - אחרת הטעויות של הסולבר נלמדות כנכונות.
+
+שימוש:
+    store = CalibrationStore()
+    store.add(samples_from_trace(trace, answers))   # answers: clue_id → התשובה הנכונה
+    calibrator = ConfidenceCalibrator("isotonic").fit(store.load())
+    strategy.calibrator = calibrator
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from database.db_manager import DatabaseManager
+
+
+METHOD_ISOTONIC = "isotonic"
+METHOD_PLATT = "platt"
+
+# הסתברות מכוילת לא יורדת ל-0 או עולה ל-1 - מילה לא נפסלת ולא "ודאית" רק בגלל הכיול
+_EPSILON = 1e-3
+
+
+@dataclass
+class CalibrationSample:
+    """מועמד אחד שהמודל הציע, ואם התברר כנכון"""
+    confidence: float
+    clue_certainty: float
+    pattern_fill: float     # חלק האותיות הידועות בזמן השאילתא (0.0-1.0)
+    correct: bool
+
+
+def pattern_fill(pattern: str) -> float:
+    """חלק האותיות הידועות בתבנית ("_ב__" → 0.25)"""
+    if not pattern:
+        return 0.0
+    return sum(1 for char in pattern if char != '_') / len(pattern)
+
+
+def _clip(p: float) -> float:
+    return min(1.0 - _EPSILON, max(_EPSILON, p))
+
+
+def _logit(p: float) -> float:
+    p = _clip(p)
+    return math.log(p / (1.0 - p))
+
+
+class IsotonicCalibrator:
+    """
+    רגרסיה איזוטונית (pool adjacent violators) על confidence בלבד - מיפוי חד-ממדי
+    בלי הנחה על הצורה; clue_certainty ו-pattern_fill נכנסים רק ב-Platt.
+    בין נקודות הכיול - אינטרפולציה ליניארית; מחוץ לטווח - הערך הקיצוני.
+    """
+
+    method = METHOD_ISOTONIC
+
+    def __init__(self, thresholds: Optional[List[float]] = None, values: Optional[List[float]] = None):
+        self.thresholds = thresholds or []
+        self.values = values or []
+
+    def fit(self, samples: List[CalibrationSample]) -> 'IsotonicCalibrator':
+        order = sorted(samples, key=lambda s: s.confidence)
+
+        # בלוקים: [סכום x, סכום y, משקל]
+        blocks: List[List[float]] = []
+        for s in order:
+            blocks.append([s.confidence, float(s.correct), 1.0])
+            # מיזוג כל עוד הבלוק האחרון נמוך מקודמו
+            while len(blocks) > 1 and blocks[-2][1] / blocks[-2][2] >= blocks[-1][1] / blocks[-1][2]:
+                x, y, w = blocks.pop()
+                blocks[-1][0] += x
+                blocks[-1][1] += y
+                blocks[-1][2] += w
+
+        self.thresholds = [round(x / w, 6) for x, _, w in blocks]
+        self.values = [round(_clip(y / w), 6) for _, y, w in blocks]
+        return self
+
+    def predict(self, confidence: float, clue_certainty: float, fill: float = 0.0) -> float:
+        return float(np.interp(confidence, self.thresholds, self.values))
+
+    def to_dict(self) -> Dict:
+        return {'thresholds': self.thresholds, 'values': self.values}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IsotonicCalibrator':
+        return cls(list(data['thresholds']), list(data['values']))
+
+
+class PlattCalibrator:
+    """
+    Platt scaling: sigmoid(w · [1, logit(confidence), logit(clue_certainty), pattern_fill]).
+    מתאים ב-Newton/IRLS עם רגולריזציה L2 קטנה (יציב גם כשהדגימות מופרדות).
+    """
+
+    method = METHOD_PLATT
+    L2 = 1e-2
+    MAX_ITERATIONS = 50
+
+    def __init__(self, coef: Optional[List[float]] = None):
+        # ברירת מחדל: ה-logit של confidence כמו שהוא (מיפוי זהות)
+        self.coef = coef or [0.0, 1.0, 0.0, 0.0]
+
+    @staticmethod
+    def _features(confidence: float, clue_certainty: float, fill: float) -> List[float]:
+        return [1.0, _logit(confidence), _logit(clue_certainty), fill]
+
+    def fit(self, samples: List[CalibrationSample]) -> 'PlattCalibrator':
+        x = np.array([self._features(s.confidence, s.clue_certainty, s.pattern_fill) for s in samples])
+        y = np.array([float(s.correct) for s in samples])
+        penalty = self.L2 * np.eye(x.shape[1])
+        penalty[0, 0] = 0.0  # בלי רגולריזציה על ה-bias
+
+        w = np.zeros(x.shape[1])
+        for _ in range(self.MAX_ITERATIONS):
+            p = 1.0 / (1.0 + np.exp(-x @ w))
+            gradient = x.T @ (p - y) + penalty @ w
+            hessian = (x * (p * (1.0 - p))[:, None]).T @ x + penalty
+            step = np.linalg.lstsq(hessian, gradient, rcond=None)[0]
+            w -= step
+            if np.max(np.abs(step)) < 1e-6:
+                break
+
+        self.coef = [round(float(v), 6) for v in w]
+        return self
+
+    def predict(self, confidence: float, clue_certainty: float, fill: float = 0.0) -> float:
+        z = sum(c * f for c, f in zip(self.coef, self._features(confidence, clue_certainty, fill)))
+        return _clip(1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, z)))))
+
+    def to_dict(self) -> Dict:
+        return {'coef': self.coef}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlattCalibrator':
+        return cls(list(data['coef']))
+
+
+_METHODS = {
+    METHOD_ISOTONIC: IsotonicCalibrator,
+    METHOD_PLATT: PlattCalibrator,
+}
+
+
+class ConfidenceCalibrator:
+    """
+    מיפוי (confidence, clue_certainty, pattern_fill) → הסתברות שהמילה נכונה.
+
+    לפני fit (או עם פחות מ-min_samples דגימות) הכיול לא פעיל: is_fitted=False,
+    ו-CandidateIndex / SolverStrategy ממשיכים עם הביטחון הגולמי.
+    """
+
+    MIN_SAMPLES = 50
+
+    def __init__(self, method: str = METHOD_ISOTONIC, min_samples: int = MIN_SAMPLES):
+        if method not in _METHODS:
+            raise ValueError(f"Unknown calibration method: {method!r} (expected one of {sorted(_METHODS)})")
+        self.method = method
+        self.min_samples = min_samples
+        self.model = None
+        self.sample_count = 0
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.model is not None
+
+    def fit(self, samples: Iterable[CalibrationSample]) -> 'ConfidenceCalibrator':
+        """התאמה לדגימות; מעט מדי דגימות - הכיול נשאר כבוי"""
+        samples = list(samples)
+        self.sample_count = len(samples)
+        if len(samples) < self.min_samples or len({s.correct for s in samples}) < 2:
+            self.model = None
+            return self
+        self.model = _METHODS[self.method]().fit(samples)
+        return self
+
+    def calibrate(self, confidence: float, clue_certainty: float, fill: float = 0.0) -> float:
+        """ההסתברות המכוילת (0.0-1.0)"""
+        if self.model is None:
+            raise ValueError("Calibrator is not fitted")
+        return round(self.model.predict(confidence, clue_certainty, fill), 4)
+
+    def calibrate_candidate(self, candidate) -> float:
+        """הסתברות מכוילת ל-CandidateWord (ה-fill מהתבנית בזמן השאילתא)"""
+        return self.calibrate(
+            candidate.confidence, candidate.clue_certainty, pattern_fill(candidate.known_letters_snapshot)
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'method': self.method,
+            'min_samples': self.min_samples,
+            'sample_count': self.sample_count,
+            'model': self.model.to_dict() if self.model else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ConfidenceCalibrator':
+        calibrator = cls(data['method'], data.get('min_samples', cls.MIN_SAMPLES))
+        calibrator.sample_count = data.get('sample_count', 0)
+        if data.get('model') is not None:
+            calibrator.model = _METHODS[calibrator.method].from_dict(data['model'])
+        return calibrator
+
+    def save(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path) -> 'ConfidenceCalibrator':
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class CalibrationStore:
+    """דגימות כיול בטבלה calibration_samples (מצטברות מכל הפתרונות)"""
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        self.db = db_manager or DatabaseManager()
+
+    def add(self, samples: Iterable[CalibrationSample], source: str = "") -> int:
+        rows = [
+            (s.confidence, s.clue_certainty, s.pattern_fill, int(s.correct), source)
+            for s in samples
+        ]
+        conn = self.db.get_connection()
+        conn.executemany('''
+            INSERT INTO calibration_samples (confidence, clue_certainty, pattern_fill, correct, source)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+        return len(rows)
+
+    def load(self, limit: Optional[int] = None) -> List[CalibrationSample]:
+        """הדגימות (עם limit - האחרונות בלבד)"""
+        query = 'SELECT confidence, clue_certainty, pattern_fill, correct FROM calibration_samples ORDER BY id DESC'
+        params: tuple = ()
+        if limit is not None:
+            query += ' LIMIT ?'
+            params = (limit,)
+        conn = self.db.get_connection()
+        rows = conn.execute(query, params).fetchall()
+        return [
+            CalibrationSample(row['confidence'], row['clue_certainty'], row['pattern_fill'], bool(row['correct']))
+            for row in reversed(rows)
+        ]
+
+    def count(self) -> int:
+        conn = self.db.get_connection()
+        return conn.execute('SELECT COUNT(*) FROM calibration_samples').fetchone()[0]
+
+    def clear(self) -> None:
+        conn = self.db.get_connection()
+        conn.execute('DELETE FROM calibration_samples')
+        conn.commit()
+
+
+def final_answers(trace) -> Dict[str, str]:
+    """המילים שנשארו משובצות בסוף ה-trace (שיבוץ אחרון שלא בוטל ב-backtrack)"""
+    placed: Dict[str, str] = {}
+    for event in trace.events:
+        if event[0] == "place":
+            placed[event[2]] = event[3]
+        elif event[0] == "backtrack" and placed.get(event[2]) == event[3]:
+            del placed[event[2]]
+    return placed
+
+
+def trace_completed(trace) -> bool:
+    """האם ה-trace הסתיים בפתרון מלא (לכל ההגדרות בפריסה נשאר שיבוץ)"""
+    placed = final_answers(trace)
+    return bool(trace.clues) and all(clue['id'] in placed for clue in trace.clues)
+
+
+def samples_from_trace(trace, answers: Optional[Mapping[str, str]] = None) -> List[CalibrationSample]:
+    """
+    דגימות מכל המועמדים שהמודל החזיר ב-trace.
+
+    Args:
+        trace: SolverTrace
+        answers: clue_id → התשובה הנכונה. None = final_answers(trace), אבל רק
+                 אם ה-trace הסתיים בפתרון מלא; אחרת אין אמת ואין דגימות
+    """
+    if answers is None:
+        if not trace_completed(trace):
+            return []
+        answers = final_answers(trace)
+    samples = []
+    for data in trace.results:
+        if data['e']:
+            continue
+        clue_id, _, pattern = data['k'].rpartition('|')
+        answer = answers.get(clue_id)
+        if answer is None:
+            continue
+        fill = pattern_fill(pattern)
+        for word, confidence in data['c']:
+            samples.append(CalibrationSample(confidence, data['u'], fill, word == answer))
+    return samples
+
+
+def reliability_curve(
+    samples: List[CalibrationSample],
+    calibrator: Optional[ConfidenceCalibrator] = None,
+    bins: int = 10
+) -> List[Dict]:
+    """
+    עקומת אמינות: לכל סל של ביטחון חזוי - הביטחון הממוצע מול שיעור הנכונים.
+    בלי calibrator - הביטחון הגולמי (confidence).
+    """
+    counts = [[0, 0.0, 0] for _ in range(bins)]  # [n, סכום חזוי, נכונים]
+    for s in samples:
+        predicted = (
+            calibrator.calibrate(s.confidence, s.clue_certainty, s.pattern_fill)
+            if calibrator and calibrator.is_fitted else s.confidence
+        )
+        bucket = counts[min(bins - 1, int(predicted * bins))]
+        bucket[0] += 1
+        bucket[1] += predicted
+        bucket[2] += int(s.correct)
+
+    return [
+        {
+            'bin': round(i / bins, 3),
+            'count': n,
+            'predicted': round(total / n, 4),
+            'observed': round(correct / n, 4),
+        }
+        for i, (n, total, correct) in enumerate(counts) if n
+    ]
+
+
+def expected_calibration_error(curve: List[Dict]) -> float:
+    """ECE: ממוצע |חזוי - נצפה| משוקלל במספר הדגימות בכל סל"""
+    total = sum(point['count'] for point in curve)
+    if not total:
+        return 0.0
+    return round(sum(point['count'] * abs(point['predicted'] - point['observed']) for point in curve) / total, 4)
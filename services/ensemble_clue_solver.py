@@ -0,0 +1,262 @@
+"""
+Ensemble Clue Solver - כמה מודלים בדרגות, עם הסלמה רק כשצריך
+
+מודל גדול אחד לכל ההגדרות איטי ויקר, ומודלים שונים חזקים בסגנונות הגדרות
+שונים. ה-ensemble שואל קודם את המודל המהיר (הדרגה הראשונה) על כל ההגדרות,
+ומסלים לדרגה הבאה רק הגדרות שהתשובה עליהן חלשה:
+- שגיאה או אין מועמדים
+- ביטחון המועמד המוביל מתחת ל-escalate_below_confidence
+- clue_certainty מתחת ל-escalate_below_certainty
+
+הרשימות של כל הדרגות שנשאלו ממוזגות: הביטחון של מילה הוא ממוצע משוקלל
+(weight של הדרגה, אחרי calibrate) על הדרגות שהציעו אותה. דרגה שלא הציעה
+את המילה לא מורידה אותה - אחרת תשובה בטוחה של הדרגה החזקה, על הגדרה שהדרגה
+המהירה פספסה, הייתה יורדת מתחת לספים שבשבילם הסלמנו. הגדרה שהמיזוג שלה
+כבר בטוח מספיק לא מוסלמת הלאה (early termination).
+
+כל דרגה היא ClueSolver רגיל (עם ה-cache, ה-call_policy וה-cassette שלו), כך
+שאפשר לשלב גם solver של ספק אחר עם אותו ממשק.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Dict, List, Mapping, Optional, Tuple
+
+from models.clue_entry import ClueEntry
+from services.call_policy import CallPolicy
+from services.clue_solver import ClueSolver, SolverResult
+
+
+@dataclass
+class EnsembleTier:
+    """דרגה אחת ב-ensemble"""
+    solver: ClueSolver
+    weight: float = 1.0
+    name: str = ""
+    # מיפוי הביטחון שהמודל מדווח להסתברות (למשל מ-calibration); None = כמו שהוא
+    calibrate: Optional[Callable[[float], float]] = None
+
+    def __post_init__(self):
+        if not self.name:
+            self.name = getattr(self.solver, 'model', "") or type(self.solver).__name__
+
+    def calibrated(self, confidence: float) -> float:
+        return self.calibrate(confidence) if self.calibrate else confidence
+
+
+@dataclass
+class _ClueVotes:
+    """התשובות של הדרגות שנשאלו על הגדרה אחת"""
+    results: List[Tuple[EnsembleTier, SolverResult]] = field(default_factory=list)
+
+
+class EnsembleClueSolver(ClueSolver):
+    """
+    ClueSolver שמנתב בין כמה מודלים לפי ודאות התשובה.
+
+    Example:
+        solver = EnsembleClueSolver.from_models(
+            api_key, ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"]
+        )
+        results = solver.solve_batch(clues)   # רוב ההגדרות - רק haiku
+    """
+
+    ESCALATE_BELOW_CONFIDENCE = 0.75
+    ESCALATE_BELOW_CERTAINTY = 0.4
+
+    def __init__(
+        self,
+        tiers: List[EnsembleTier],
+        escalate_below_confidence: float = ESCALATE_BELOW_CONFIDENCE,
+        escalate_below_certainty: float = ESCALATE_BELOW_CERTAINTY
+    ):
+        """
+        Args:
+            tiers: הדרגות, מהמהירה לחזקה
+            escalate_below_confidence: ביטחון מועמד מוביל (אחרי מיזוג) שמתחתיו מסלימים
+            escalate_below_certainty: clue_certainty (אחרי מיזוג) שמתחתיו מסלימים
+        """
+        if not tiers:
+            raise ValueError("Ensemble needs at least one tier")
+        super().__init__(api_key=None)
+        self.tiers = tiers
+        self.escalate_below_confidence = escalate_below_confidence
+        self.escalate_below_certainty = escalate_below_certainty
+
+        # סטטיסטיקות
+        self.clues_per_tier = [0] * len(tiers)      # כמה הגדרות נשלחו לכל דרגה
+        self.answered_at_tier = [0] * len(tiers)    # באיזו דרגה הסתיימה כל הגדרה
+
+    @classmethod
+    def from_models(
+        cls,
+        api_key: str,
+        models: List[str],
+        weights: Optional[List[float]] = None,
+        base_url: Optional[str] = None,
+        call_policy: Optional[CallPolicy] = None,
+        **options
+    ) -> 'EnsembleClueSolver':
+        """ensemble של מודלי Claude (מהמהיר לחזק); ברירת המחדל - משקל עולה לפי דרגה"""
+        if weights and len(weights) != len(models):
+            raise ValueError(f"Got {len(weights)} ensemble weights for {len(models)} models")
+        weights = weights or [float(i + 1) for i in range(len(models))]
+        tiers = [
+            EnsembleTier(
+                ClueSolver(api_key=api_key, model=model, base_url=base_url, call_policy=call_policy),
+                weight=weight
+            )
+            for model, weight in zip(models, weights)
+        ]
+        return cls(tiers, **options)
+
+    def merge(self, votes: _ClueVotes) -> SolverResult:
+        """
+        מיזוג התשובות של הדרגות שנשאלו.
+        ביטחון מילה - ממוצע משוקלל על הדרגות שהציעו אותה; clue_certainty - על
+        כל הדרגות שענו. דרגה עם שגיאה לא נספרת; אם כולן נכשלו - השגיאה האחרונה.
+        """
+        answered = [(tier, result) for tier, result in votes.results if not result.error]
+        if not answered:
+            last = votes.results[-1][1]
+            return SolverResult(candidates=[], error=last.error, processing_time=last.processing_time)
+
+        total_weight = sum(tier.weight for tier, _ in answered) or 1.0
+        scores: Dict[str, float] = {}
+        weights: Dict[str, float] = {}
+        certainty = 0.0
+        for tier, result in answered:
+            certainty += tier.weight * result.clue_certainty
+            for word, confidence in result.candidates:
+                scores[word] = scores.get(word, 0.0) + tier.weight * tier.calibrated(confidence)
+                weights[word] = weights.get(word, 0.0) + tier.weight
+
+        candidates = sorted(
+            ((word, round(score / (weights[word] or 1.0), 4)) for word, score in scores.items()),
+            key=lambda x: x[1], reverse=True
+        )
+        return SolverResult(
+            candidates=candidates[:10],
+            clue_certainty=round(certainty / total_weight, 4),
+            processing_time=sum(result.processing_time for _, result in votes.results)
+        )
+
+    def is_confident(self, result: SolverResult) -> bool:
+        """האם לעצור בדרגה הנוכחית"""
+        if result.error or not result.candidates:
+            return False
+        return (result.candidates[0][1] >= self.escalate_below_confidence and
+                result.clue_certainty >= self.escalate_below_certainty)
+
+    def solve_clue(self, clue: ClueEntry, use_cache: bool = True, deadline: Optional[float] = None) -> SolverResult:
+        return self.solve_batch([clue], use_cache=use_cache, deadline=deadline)[clue.id]
+
+    def solve_batch(
+        self,
+        clues: List[ClueEntry],
+        max_per_request: int = 10,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> Dict[str, SolverResult]:
+        """
+        כל ההגדרות לדרגה הראשונה; כל דרגה נוספת מקבלת רק את ההגדרות
+        שהמיזוג עד כה לא בטוח בהן. הפרמטרים עוברים לכל דרגה כמו שהם.
+        """
+        exclude = exclude or {}
+        results: Dict[str, SolverResult] = {}
+
+        pending = []
+        for clue in clues:
+            cache_key = self._get_cache_key(clue, exclude.get(clue.id))
+            if use_cache and cache_key in self._cache:
+                results[clue.id] = self._cache[cache_key]
+            else:
+                pending.append(clue)
+
+        votes = {clue.id: _ClueVotes() for clue in pending}
+        for level, tier in enumerate(self.tiers):
+            if not pending:
+                break
+            if level > 0 and deadline is not None and time.time() >= deadline:
+                break
+
+            self.clues_per_tier[level] += len(pending)
+            tier_results = tier.solver.solve_batch(
+                pending, max_per_request=max_per_request, use_cache=use_cache,
+                deadline=deadline, exclude=exclude
+            )
+
+            escalate = []
+            for clue in pending:
+                votes[clue.id].results.append((
+                    tier, tier_results.get(clue.id) or SolverResult(candidates=[], error="No result")
+                ))
+                merged = self.merge(votes[clue.id])
+                results[clue.id] = merged
+                if self.is_confident(merged) or level == len(self.tiers) - 1:
+                    self.answered_at_tier[level] += 1
+                else:
+                    escalate.append(clue)
+            pending = escalate
+
+        # הגדרות שנעצרו בגלל ה-deadline - נספרות בדרגה האחרונה שענתה עליהן
+        for clue in pending:
+            self.answered_at_tier[len(votes[clue.id].results) - 1] += 1
+
+        if use_cache:
+            for clue in clues:
+                result = results[clue.id]
+                if clue.id in votes and not result.error:
+                    self._cache[self._get_cache_key(clue, exclude.get(clue.id))] = result
+
+        return results
+
+    def get_statistics(self) -> Dict:
+        """כמה הגדרות נשלחו לכל דרגה, ובאיזו דרגה הסתיימו"""
+        return {
+            'tiers': [tier.name for tier in self.tiers],
+            'clues_per_tier': list(self.clues_per_tier),
+            'answered_at_tier': list(self.answered_at_tier),
+            'escalated': sum(self.clues_per_tier[1:]),
+        }
+
+    def get_call_stats(self) -> Dict:
+        """
+        סטטיסטיקות הקריאות של כל הדרגות יחד - באותו מבנה כמו ב-ClueSolver.
+        המונים מסוכמים; p50/p95 הם המקסימום על הדרגות (חסם עליון לאחוזון
+        של כל הקריאות). הפירוט לפי דרגה - get_tier_call_stats().
+        """
+        per_tier = list(self.get_tier_call_stats().values())
+        totals: Dict = {'name': "ensemble"}
+        for key in ('calls', 'attempts', 'retries', 'timeouts', 'failures', 'hedges_sent', 'hedges_won'):
+            totals[key] = sum(stats.get(key, 0) for stats in per_tier)
+        for key in ('p50', 'p95'):
+            values = [stats[key] for stats in per_tier if stats.get(key) is not None]
+            totals[key] = max(values) if values else None
+        return totals
+
+    def get_tier_call_stats(self) -> Dict[str, Dict]:
+        """סטטיסטיקות הקריאות של כל דרגה (שם הדרגה → get_call_stats שלה)"""
+        return {tier.name: tier.solver.get_call_stats() for tier in self.tiers}
+
+
+def create_clue_solver(config) -> ClueSolver:
+    """
+    ClueSolver לפי ClaudeVisionConfig: ensemble אם הוגדרו ensemble_models,
+    אחרת מודל יחיד (config.model).
+    """
+    policy = CallPolicy.from_config(config)
+    if not config.ensemble_models:
+        return ClueSolver(
+            api_key=config.api_key, model=config.model, base_url=config.base_url, call_policy=policy
+        )
+    return EnsembleClueSolver.from_models(
+        config.api_key,
+        config.ensemble_models,
+        weights=config.ensemble_weights or None,
+        base_url=config.base_url,
+        call_policy=policy,
+        escalate_below_confidence=config.ensemble_escalate_confidence,
+        escalate_below_certainty=config.ensemble_escalate_certainty
+    )
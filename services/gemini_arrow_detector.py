@@ -13,6 +13,9 @@ import cv2
 
 from config.cloud_config import GeminiVisionConfig, get_cloud_config
 from models.recognition_result import ArrowResult, ArrowDetectionResult
+from services.call_policy import CallPolicy, ResilientCaller, timeout_ms
+from services.cassette import replay_client, wrap_client
+from services.usage_ledger import UsageMeter
 
 
 class GeminiArrowDetector:
@@ -178,12 +181,22 @@ Your response must be ONLY a JSON object (no other text):
         self.config = config or get_cloud_config().gemini
         self._client = None
         self._initialized = False
+        self._caller = ResilientCaller(
+            CallPolicy.from_config(self.config), name="gemini_arrow", on_error=self._log_api_error
+        )
 
     def _initialize_client(self) -> None:
         """אתחול הלקוח של Google GenAI"""
         if self._initialized:
             return
 
+        # השמעה מ-cassette - בלי SDK ובלי API key
+        replayed = replay_client("gemini_arrow")
+        if replayed is not None:
+            self._client = replayed
+            self._initialized = True
+            return
+
         try:
             from google import genai
 
@@ -192,7 +205,10 @@ Your response must be ONLY a JSON object (no other text):
                     "Gemini Vision requires GOOGLE_API_KEY environment variable or google_vision_api.txt file"
                 )
 
-            self._client = genai.Client(api_key=self.config.api_key)
+            self._client = wrap_client("gemini_arrow", genai.Client(
+                api_key=self.config.api_key,
+                http_options={'base_url': self.config.base_url} if self.config.base_url else None
+            ))
             self._initialized = True
             print("[OK] Gemini 3 Pro Vision client initialized")
 
@@ -260,120 +276,123 @@ Your response must be ONLY a JSON object (no other text):
                 processing_time=time.time() - start_time
             )
 
+    def _log_api_error(self, attempt: int, error: Exception) -> None:
+        """הדפסת ניסיון API שנכשל (ResilientCaller.on_error)"""
+        print(f"    [Gemini] API attempt {attempt + 1} failed: {error}")
+
     def _call_gemini_api(self, image_base64: str) -> str:
         """קריאה ל-Gemini 3 Pro Vision API"""
         from google.genai import types
 
-        for attempt in range(self.config.max_retries):
-            try:
-                # יצירת Part מ-bytes
-                image_bytes = base64.b64decode(image_base64)
-                image_part = types.Part.from_bytes(
-                    data=image_bytes,
-                    mime_type="image/png"
+        meter = UsageMeter("arrow_detection", "google", self.config.model)
+
+        def request(timeout: Optional[float]) -> str:
+            # יצירת Part מ-bytes
+            image_bytes = base64.b64decode(image_base64)
+            image_part = types.Part.from_bytes(
+                data=image_bytes,
+                mime_type="image/png"
+            )
+
+            # הגדרת thinking budget כדי להגביל את כמות הטוקנים לחשיבה
+            thinking_config = None
+            if hasattr(self.config, 'thinking_budget') and self.config.thinking_budget:
+                thinking_config = types.ThinkingConfig(
+                    thinking_budget=self.config.thinking_budget
                 )
 
-                # הגדרת thinking budget כדי להגביל את כמות הטוקנים לחשיבה
-                thinking_config = None
-                if hasattr(self.config, 'thinking_budget') and self.config.thinking_budget:
-                    thinking_config = types.ThinkingConfig(
-                        thinking_budget=self.config.thinking_budget
-                    )
-
-                response = self._client.models.generate_content(
-                    model=self.config.model,
-                    contents=[
-                        image_part,
-                        self.DETECTION_PROMPT
-                    ],
-                    config=types.GenerateContentConfig(
-                        temperature=self.config.temperature,
-                        max_output_tokens=self.config.max_tokens,
-                        thinking_config=thinking_config,
-                    )
+            response = self._client.models.generate_content(
+                model=self.config.model,
+                contents=[
+                    image_part,
+                    self.DETECTION_PROMPT
+                ],
+                config=types.GenerateContentConfig(
+                    temperature=self.config.temperature,
+                    max_output_tokens=self.config.max_tokens,
+                    thinking_config=thinking_config,
+                    http_options=types.HttpOptions(timeout=timeout_ms(timeout)) if timeout is not None else None,
                 )
+            )
 
-                # בדיקה שהתגובה תקינה
-                if response is None:
-                    raise ValueError("Gemini returned None response")
-
-                # חילוץ כל ה-parts מהתשובה
-                thinking_text = None
-                response_text = None
-
-                if hasattr(response, 'candidates') and response.candidates:
-                    candidate = response.candidates[0]
-                    if hasattr(candidate, 'content') and candidate.content:
-                        if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                            parts = candidate.content.parts
-                            print(f"    [Gemini] Found {len(parts)} parts in response")
-
-                            # עבור על כל ה-parts וזהה thinking vs response
-                            for i, part in enumerate(parts):
-                                part_text = getattr(part, 'text', None)
-                                if part_text:
-                                    # בדיקה אם זה part של thinking
-                                    # Gemini 3 Pro מחזיר thinking ב-part נפרד לפני ה-response
-                                    if i == 0 and len(parts) > 1:
-                                        # Part ראשון כשיש יותר מאחד = thinking
+            # בדיקה שהתגובה תקינה
+            if response is None:
+                raise ValueError("Gemini returned None response")
+            meter.observe(response)
+
+            # חילוץ כל ה-parts מהתשובה
+            thinking_text = None
+            response_text = None
+
+            if hasattr(response, 'candidates') and response.candidates:
+                candidate = response.candidates[0]
+                if hasattr(candidate, 'content') and candidate.content:
+                    if hasattr(candidate.content, 'parts') and candidate.content.parts:
+                        parts = candidate.content.parts
+                        print(f"    [Gemini] Found {len(parts)} parts in response")
+
+                        # עבור על כל ה-parts וזהה thinking vs response
+                        for i, part in enumerate(parts):
+                            part_text = getattr(part, 'text', None)
+                            if part_text:
+                                # בדיקה אם זה part של thinking
+                                # Gemini 3 Pro מחזיר thinking ב-part נפרד לפני ה-response
+                                if i == 0 and len(parts) > 1:
+                                    # Part ראשון כשיש יותר מאחד = thinking
+                                    thinking_text = part_text
+                                    print(f"    [Gemini] === THINKING (part {i}) ===")
+                                    print(f"    {thinking_text}")
+                                    print(f"    [Gemini] === END THINKING ===")
+                                elif i == len(parts) - 1:
+                                    # Part אחרון = response (JSON)
+                                    response_text = part_text
+                                else:
+                                    # Parts באמצע - גם הם thinking
+                                    if thinking_text:
+                                        thinking_text += "\n" + part_text
+                                    else:
                                         thinking_text = part_text
-                                        print(f"    [Gemini] === THINKING (part {i}) ===")
+                                    print(f"    [Gemini] === THINKING (part {i}) ===")
+                                    print(f"    {part_text}")
+                                    print(f"    [Gemini] === END THINKING ===")
+
+                        # אם יש רק part אחד, זה גם ה-thinking וגם ה-response
+                        if len(parts) == 1 and parts[0].text:
+                            response_text = parts[0].text
+                            # בדיקה אם יש thinking בתוך הטקסט (לפני ה-JSON)
+                            if '{' in response_text:
+                                json_start = response_text.find('{')
+                                if json_start > 0:
+                                    thinking_text = response_text[:json_start].strip()
+                                    if thinking_text:
+                                        print(f"    [Gemini] === THINKING (embedded) ===")
                                         print(f"    {thinking_text}")
                                         print(f"    [Gemini] === END THINKING ===")
-                                    elif i == len(parts) - 1:
-                                        # Part אחרון = response (JSON)
-                                        response_text = part_text
-                                    else:
-                                        # Parts באמצע - גם הם thinking
-                                        if thinking_text:
-                                            thinking_text += "\n" + part_text
-                                        else:
-                                            thinking_text = part_text
-                                        print(f"    [Gemini] === THINKING (part {i}) ===")
-                                        print(f"    {part_text}")
-                                        print(f"    [Gemini] === END THINKING ===")
 
-                            # אם יש רק part אחד, זה גם ה-thinking וגם ה-response
-                            if len(parts) == 1 and parts[0].text:
-                                response_text = parts[0].text
-                                # בדיקה אם יש thinking בתוך הטקסט (לפני ה-JSON)
-                                if '{' in response_text:
-                                    json_start = response_text.find('{')
-                                    if json_start > 0:
-                                        thinking_text = response_text[:json_start].strip()
-                                        if thinking_text:
-                                            print(f"    [Gemini] === THINKING (embedded) ===")
-                                            print(f"    {thinking_text}")
-                                            print(f"    [Gemini] === END THINKING ===")
-
-                # Fallback ל-response.text אם לא מצאנו parts
-                if not response_text and hasattr(response, 'text') and response.text:
-                    response_text = response.text
-                    # בדיקה אם יש thinking בתוך הטקסט
-                    if '{' in response_text:
-                        json_start = response_text.find('{')
-                        if json_start > 0:
-                            thinking_text = response_text[:json_start].strip()
-                            if thinking_text:
-                                print(f"    [Gemini] === THINKING (from text) ===")
-                                print(f"    {thinking_text}")
-                                print(f"    [Gemini] === END THINKING ===")
-
-                if not response_text:
-                    # הדפסת מידע debug
-                    print(f"    [Gemini] Response object: {response}")
-                    print(f"    [Gemini] Response type: {type(response)}")
-                    if hasattr(response, 'candidates'):
-                        print(f"    [Gemini] Candidates: {response.candidates}")
-                    raise ValueError(f"Gemini returned empty response. Response: {response}")
-
-                return response_text
-
-            except Exception as e:
-                print(f"    [Gemini] API attempt {attempt + 1} failed: {e}")
-                if attempt == self.config.max_retries - 1:
-                    raise e
-                time.sleep(self.config.retry_delay * (attempt + 1))
+            # Fallback ל-response.text אם לא מצאנו parts
+            if not response_text and hasattr(response, 'text') and response.text:
+                response_text = response.text
+                # בדיקה אם יש thinking בתוך הטקסט
+                if '{' in response_text:
+                    json_start = response_text.find('{')
+                    if json_start > 0:
+                        thinking_text = response_text[:json_start].strip()
+                        if thinking_text:
+                            print(f"    [Gemini] === THINKING (from text) ===")
+                            print(f"    {thinking_text}")
+                            print(f"    [Gemini] === END THINKING ===")
+
+            if not response_text:
+                # הדפסת מידע debug
+                print(f"    [Gemini] Response object: {response}")
+                print(f"    [Gemini] Response type: {type(response)}")
+                if hasattr(response, 'candidates'):
+                    print(f"    [Gemini] Candidates: {response.candidates}")
+                raise ValueError(f"Gemini returned empty response. Response: {response}")
+
+            return response_text
+
+        return self._caller.call(request, meter=meter)
 
     # מיפוי פאה לכיוון
     SIDE_TO_DIRECTION = {
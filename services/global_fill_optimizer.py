@@ -0,0 +1,392 @@
+"""
+Global Fill Optimizer - אופטימיזציה גלובלית של המילוי ב-CP-SAT / ILP
+
+בגרידים הקשים החיפוש ב-SolverStrategy נתקע (STUCK), בעוד שפותר גלובלי
+מוצא מהר את ההשמה העקבית הטובה ביותר. המודול מייצא את בעיית המילוי:
+
+- משתנה בוליאני לכל (הגדרה, מועמד), לכל היותר אחד לכל הגדרה
+- עקביות משבצת-אות: במשבצת מצטלבת נבחרת לכל היותר אות אחת, וכל מועמד
+  שנבחר מחייב את האות שלו בכל משבצת מצטלבת
+- משקל לכל מועמד: log(ציון / SKIP_SCORE) - אותה פונקציית מטרה כמו
+  ב-TreeDecompositionSolver (מכפלת הציונים, עם "הגדרה ריקה" בציון נמוך)
+
+ופותר אותה ב-OR-Tools CP-SAT או ב-PuLP (CBC) - מה שמותקן מקומית.
+אם אף אחד לא מותקן (או נכשל) חוזרים ל-TreeDecompositionSolver, ואם גם
+הוא לא מצליח (רוחב או טבלה גדולים מדי, time_limit) מחזירים תוצאה ריקה - והקורא ממשיך בחיפוש הרגיל.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.clue_database import ClueDatabase
+from services.candidate_index import CandidateIndex
+from services.solution_grid import SolutionGrid, PlacementStatus
+from services.tree_decomposition_solver import (
+    TreeDecompositionSolver, REASON_WIDTH, REASON_TABLE_SIZE, REASON_TIMEOUT
+)
+
+try:
+    from ortools.sat.python import cp_model
+    ORTOOLS_AVAILABLE = True
+except ImportError:
+    ORTOOLS_AVAILABLE = False
+
+try:
+    import pulp
+    PULP_AVAILABLE = True
+except ImportError:
+    PULP_AVAILABLE = False
+
+
+BACKEND_CPSAT = "cp-sat"
+BACKEND_PULP = "pulp"
+BACKEND_DP = "dp"
+
+
+@dataclass
+class FillModel:
+    """בעיית המילוי בצורה שמתאימה לכל פותר"""
+    variables: List[Tuple[str, str, float]] = field(default_factory=list)  # (clue_id, מילה, משקל)
+    clue_vars: Dict[str, List[int]] = field(default_factory=dict)         # clue_id → משתנים
+    # משבצת מצטלבת → אות → המשתנים שמציבים אותה שם
+    cell_letters: Dict[Tuple[int, int], Dict[str, List[int]]] = field(default_factory=dict)
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.variables)
+
+    def objective(self, selected: Iterable[int]) -> float:
+        """ערך פונקציית המטרה לבחירה"""
+        return sum(self.variables[i][2] for i in selected)
+
+    def is_consistent(self, selected: Iterable[int]) -> bool:
+        """לכל היותר מילה אחת להגדרה ואות אחת למשבצת"""
+        selected = set(selected)
+        for indices in self.clue_vars.values():
+            if sum(1 for i in indices if i in selected) > 1:
+                return False
+        for letters in self.cell_letters.values():
+            used = [letter for letter, indices in letters.items() if any(i in selected for i in indices)]
+            if len(used) > 1:
+                return False
+        return True
+
+    def assignments(self, selected: Iterable[int]) -> Dict[str, str]:
+        """clue_id → מילה"""
+        return {self.variables[i][0]: self.variables[i][1] for i in selected}
+
+
+@dataclass
+class GlobalFillResult:
+    """תוצאת אופטימיזציה"""
+    assignments: Dict[str, str] = field(default_factory=dict)  # clue_id → מילה
+    unassigned: List[str] = field(default_factory=list)
+    objective: float = 0.0
+    backend: Optional[str] = None       # cp-sat / pulp / dp / None (לא נפתר)
+    status: str = "unavailable"         # optimal / feasible / timeout / infeasible / invalid / unavailable
+    errors: List[str] = field(default_factory=list)  # כשלונות של backends קודמים
+    elapsed: float = 0.0
+
+    @property
+    def is_optimal(self) -> bool:
+        return self.status == "optimal"
+
+    @property
+    def is_complete(self) -> bool:
+        return bool(self.assignments) and not self.unassigned
+
+
+class GlobalFillOptimizer:
+    """
+    פותר את בעיית המילוי גלובלית ב-CP-SAT / ILP, עם נפילה חיננית.
+
+    שימוש:
+        optimizer = GlobalFillOptimizer.from_strategy(strategy, time_limit=10)
+        result = optimizer.solve()
+        strategy.apply_assignments(result.assignments)
+        # או ישירות על SolutionGrid:
+        optimizer.apply(result, solution)
+    """
+
+    WEIGHT_SCALE = 1000  # CP-SAT עובד במשקלים שלמים
+
+    def __init__(
+        self,
+        clue_db: ClueDatabase,
+        candidate_index: CandidateIndex,
+        clue_ids: Optional[Set[str]] = None,
+        backend: str = "auto",
+        time_limit: Optional[float] = 10.0,
+        fallback_to_dp: bool = True
+    ):
+        """
+        Args:
+            clue_db: מאגר ההגדרות (כולל האותיות הידועות)
+            candidate_index: המועמדים לכל הגדרה
+            clue_ids: ההגדרות לפתרון (ברירת מחדל: כל ההגדרות שלא נפתרו)
+            backend: "auto" (CP-SAT ואז PuLP), "cp-sat" או "pulp"
+            time_limit: זמן מקסימלי בשניות לכל פותר, כולל נפילה ל-DP (None = בלי הגבלה)
+            fallback_to_dp: אם אין פותר מתאים - TreeDecompositionSolver
+        """
+        self.clue_db = clue_db
+        self.candidate_index = candidate_index
+        self.clue_ids = clue_ids
+        self.backend = backend
+        self.time_limit = time_limit
+        self.fallback_to_dp = fallback_to_dp
+
+    @classmethod
+    def from_strategy(cls, strategy, **kwargs) -> 'GlobalFillOptimizer':
+        """אופטימיזציה על המצב הנוכחי של SolverStrategy (אחרי prepare)"""
+        unsolved = {
+            clue_id for clue_id, clue_state in strategy.state.clue_states.items()
+            if not clue_state.is_solved
+        }
+        kwargs.setdefault('clue_ids', unsolved)
+        return cls(strategy.clue_db, strategy.state.candidate_index, **kwargs)
+
+    @staticmethod
+    def available_backends() -> List[str]:
+        """הפותרים החיצוניים שמותקנים"""
+        backends = []
+        if ORTOOLS_AVAILABLE:
+            backends.append(BACKEND_CPSAT)
+        if PULP_AVAILABLE:
+            backends.append(BACKEND_PULP)
+        return backends
+
+    def _get_clue_ids(self) -> Set[str]:
+        if self.clue_ids is not None:
+            return set(self.clue_ids)
+        return {
+            clue.id for clue in self.clue_db.clues
+            if clue.answer_length > 0 and not clue.is_solved
+        }
+
+    # === Model ===
+
+    def build_model(self) -> FillModel:
+        """מייצא את בעיית המילוי"""
+        clue_ids = self._get_clue_ids()
+        model = FillModel()
+        cell_letters: Dict[Tuple[int, int], Dict[str, List[int]]] = {}
+        skip = math.log(TreeDecompositionSolver.SKIP_SCORE)
+
+        for clue_id in sorted(clue_ids):
+            clue = self.clue_db.get_clue(clue_id)
+            pattern = clue.get_constraint_string()
+            model.clue_vars[clue_id] = []
+
+            weights: Dict[str, float] = {}
+            for candidate in self.candidate_index.get_valid_candidates_for_clue(clue_id, pattern):
+                word = candidate.word
+                if len(word) != clue.answer_length or not clue.matches_answer(word):
+                    continue
+                score = max(candidate.combined_score, TreeDecompositionSolver.MIN_SCORE)
+                weights[word] = max(weights.get(word, -math.inf), math.log(score) - skip)
+
+            for word, weight in weights.items():
+                index = len(model.variables)
+                model.variables.append((clue_id, word, weight))
+                model.clue_vars[clue_id].append(index)
+                for cell, letter in zip(clue.answer_cells, word):
+                    cell_letters.setdefault(cell, {}).setdefault(letter, []).append(index)
+
+        # רק משבצות שיותר מהגדרה אחת מציבה בהן מילה מגבילות משהו
+        for cell, letters in cell_letters.items():
+            clues_here = {model.variables[i][0] for indices in letters.values() for i in indices}
+            if len(clues_here) > 1:
+                model.cell_letters[cell] = letters
+
+        return model
+
+    # === Solve ===
+
+    def _backend_order(self) -> List[str]:
+        available = self.available_backends()
+        if self.backend == "auto":
+            return available
+        return [self.backend] if self.backend in available else []
+
+    def solve(self) -> GlobalFillResult:
+        """
+        פותר את הבעיה בפותר הראשון שזמין ועובד.
+
+        Returns:
+            GlobalFillResult (backend=None אם לא נפתר)
+        """
+        start = time.time()
+        model = self.build_model()
+        result = GlobalFillResult()
+
+        if self.backend != "auto" and self.backend not in self.available_backends():
+            result.errors.append(f"{self.backend}: not installed")
+
+        for backend in self._backend_order():
+            try:
+                if backend == BACKEND_CPSAT:
+                    selected, status = self._solve_cpsat(model)
+                else:
+                    selected, status = self._solve_pulp(model)
+            except Exception as e:
+                result.errors.append(f"{backend}: {e}")
+                continue
+
+            if selected is None:
+                # בלי פתרון (נגמר הזמן / אין פתרון / מודל לא תקין) - ממשיכים לבא בתור
+                result.status = status
+                result.errors.append(f"{backend}: {status}")
+                continue
+
+            result.backend = backend
+            result.status = status
+            self._fill_result(result, model, selected)
+            break
+
+        if result.backend is None and self.fallback_to_dp:
+            self._solve_dp(model, result)
+
+        result.elapsed = time.time() - start
+        return result
+
+    def _fill_result(self, result: GlobalFillResult, model: FillModel, selected: List[int]) -> None:
+        result.assignments = model.assignments(selected)
+        result.objective = model.objective(selected)
+        result.unassigned = sorted(set(model.clue_vars) - set(result.assignments))
+
+    def _solve_cpsat(self, model: FillModel) -> Tuple[Optional[List[int]], str]:
+        """OR-Tools CP-SAT"""
+        cp = cp_model.CpModel()
+        x = [cp.NewBoolVar(f"x{i}") for i in range(model.num_variables)]
+
+        for indices in model.clue_vars.values():
+            if len(indices) > 1:
+                cp.AddAtMostOne(x[i] for i in indices)
+
+        for (row, col), letters in model.cell_letters.items():
+            y = {letter: cp.NewBoolVar(f"y_{row}_{col}_{letter}") for letter in letters}
+            cp.AddAtMostOne(y.values())
+            for letter, indices in letters.items():
+                for i in indices:
+                    cp.AddImplication(x[i], y[letter])
+
+        cp.Maximize(sum(
+            int(round(weight * self.WEIGHT_SCALE)) * x[i]
+            for i, (_, _, weight) in enumerate(model.variables)
+        ))
+
+        solver = cp_model.CpSolver()
+        if self.time_limit is not None:
+            solver.parameters.max_time_in_seconds = float(self.time_limit)
+
+        label = self._cpsat_label(solver.Solve(cp))
+        if label not in ("optimal", "feasible"):
+            return None, label
+
+        return [i for i in range(model.num_variables) if solver.BooleanValue(x[i])], label
+
+    @staticmethod
+    def _cpsat_label(status) -> str:
+        """סטטוס CP-SAT → optimal / feasible / infeasible / invalid / timeout (UNKNOWN)"""
+        if status == cp_model.OPTIMAL:
+            return "optimal"
+        if status == cp_model.FEASIBLE:
+            return "feasible"
+        if status == cp_model.INFEASIBLE:
+            return "infeasible"
+        if status == cp_model.MODEL_INVALID:
+            return "invalid"
+        return "timeout"
+
+    def _solve_pulp(self, model: FillModel) -> Tuple[Optional[List[int]], str]:
+        """PuLP (CBC)"""
+        problem = pulp.LpProblem("crossword_fill", pulp.LpMaximize)
+        x = [pulp.LpVariable(f"x{i}", cat="Binary") for i in range(model.num_variables)]
+
+        problem += pulp.lpSum(weight * x[i] for i, (_, _, weight) in enumerate(model.variables))
+
+        for clue_id, indices in model.clue_vars.items():
+            if len(indices) > 1:
+                problem += pulp.lpSum(x[i] for i in indices) <= 1
+
+        for (row, col), letters in model.cell_letters.items():
+            y = {
+                letter: pulp.LpVariable(f"y_{row}_{col}_{k}", cat="Binary")
+                for k, letter in enumerate(letters)
+            }
+            problem += pulp.lpSum(y.values()) <= 1
+            for letter, indices in letters.items():
+                for i in indices:
+                    problem += x[i] <= y[letter]
+
+        problem.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=self.time_limit))
+
+        label = self._pulp_label(problem.sol_status)
+        if label not in ("optimal", "feasible"):
+            return None, label
+
+        return [i for i in range(model.num_variables) if (x[i].varValue or 0) > 0.5], label
+
+    @staticmethod
+    def _pulp_label(sol_status) -> str:
+        """sol_status של PuLP → optimal / feasible / infeasible / invalid / timeout (לא נמצא פתרון)"""
+        if sol_status == pulp.LpSolutionOptimal:
+            return "optimal"
+        if sol_status == pulp.LpSolutionIntegerFeasible:
+            return "feasible"
+        if sol_status == pulp.LpSolutionInfeasible:
+            return "infeasible"
+        if sol_status == pulp.LpSolutionUnbounded:
+            # משתנים בינאריים לא יכולים להיות unbounded - המודל שנבנה שגוי
+            return "invalid"
+        return "timeout"
+
+    def _solve_dp(self, model: FillModel, result: GlobalFillResult) -> None:
+        """נפילה ל-TreeDecompositionSolver (בלי פותר חיצוני)"""
+        dp = TreeDecompositionSolver(
+            self.clue_db, self.candidate_index, clue_ids=set(model.clue_vars),
+            time_limit=self.time_limit
+        ).solve()
+
+        if not dp.feasible:
+            if dp.reason == REASON_WIDTH:
+                error = f"width {dp.width} too large"
+            elif dp.reason == REASON_TABLE_SIZE:
+                error = f"table size limit exceeded (width {dp.width})"
+            else:
+                error = "timeout" if dp.reason == REASON_TIMEOUT else "infeasible"
+                result.status = error
+            result.errors.append(f"{BACKEND_DP}: {error}")
+            return
+
+        index = {(clue_id, word): i for i, (clue_id, word, _) in enumerate(model.variables)}
+        selected = [index[(clue_id, word)] for clue_id, word in dp.assignments.items()]
+
+        result.backend = BACKEND_DP
+        result.status = "optimal"
+        self._fill_result(result, model, selected)
+
+    # === Apply ===
+
+    def apply(self, result: GlobalFillResult, solution: SolutionGrid) -> int:
+        """
+        משבץ את התוצאה ב-SolutionGrid ומעדכן את האותיות הידועות.
+        (עם SolverStrategy - עדיף strategy.apply_assignments(result.assignments))
+
+        Returns:
+            מספר המילים ששובצו
+        """
+        placed = 0
+        for clue_id, word in result.assignments.items():
+            clue = self.clue_db.get_clue(clue_id)
+            if clue is None:
+                continue
+
+            placement = solution.place_answer(clue, word)
+            if placement.status == PlacementStatus.SUCCESS:
+                self.clue_db.update_known_letters(clue, word)
+                placed += 1
+
+        return placed
@@ -11,6 +11,29 @@ import cv2
 
 from config.cloud_config import GoogleVisionConfig, get_cloud_config
 from models.recognition_result import OcrResult
+from services.call_policy import CallPolicy, ResilientCaller, timeout_kwargs
+from services.cassette import get_cassette, wrap_client
+from services.usage_ledger import UsageMeter
+
+
+class VisionRestClient:
+    """
+    client מינימלי ל-REST API של Google Vision (כשיש רק API key).
+    ה-key נשמר כאן ולא עובר כארגומנט - כך שאינו נכנס ל-fingerprint של ה-cassette.
+    """
+
+    def __init__(self, config: GoogleVisionConfig):
+        self.config = config
+
+    def annotate(self, request_body: dict, timeout: float = 30.0) -> dict:
+        """שליחת בקשת images:annotate אחת (retries ב-ResilientCaller)"""
+        import requests
+
+        url = f"https://vision.googleapis.com/v1/images:annotate?key={self.config.api_key}"
+
+        response = requests.post(url, json=request_body, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
 
 
 class GoogleVisionOcrService:
@@ -28,12 +51,23 @@ class GoogleVisionOcrService:
         self._client = None
         self._initialized = False
         self._use_rest_api = False
+        self._caller = ResilientCaller(CallPolicy.from_config(self.config), name="google_vision")
 
     def _initialize_client(self) -> None:
         """אתחול הלקוח של Google Cloud Vision"""
         if self._initialized:
             return
 
+        # השמעה מ-cassette - לפי ה-API שהוקלט (client library או REST)
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            self._use_rest_api = cassette.has_recordings("google_vision_rest")
+            self._client = cassette.replay_client(
+                "google_vision_rest" if self._use_rest_api else "google_vision"
+            )
+            self._initialized = True
+            return
+
         try:
             from google.cloud import vision
 
@@ -41,10 +75,10 @@ class GoogleVisionOcrService:
             if self.config.credentials_path:
                 import os
                 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self.config.credentials_path
-                self._client = vision.ImageAnnotatorClient()
+                self._client = wrap_client("google_vision", vision.ImageAnnotatorClient())
             elif self.config.api_key:
                 # שימוש ב-API key (דרך REST)
-                self._client = None  # נשתמש ב-REST API ישירות
+                self._client = wrap_client("google_vision_rest", VisionRestClient(self.config))
                 self._use_rest_api = True
             else:
                 raise ValueError(
@@ -59,6 +93,7 @@ class GoogleVisionOcrService:
         except ImportError:
             # אם אין את הספרייה, ננסה REST API
             if self.config.api_key:
+                self._client = wrap_client("google_vision_rest", VisionRestClient(self.config))
                 self._use_rest_api = True
                 self._initialized = True
                 print("[OK] Google Cloud Vision initialized (REST API mode)")
@@ -113,11 +148,13 @@ class GoogleVisionOcrService:
             language_hints=self.config.language_hints
         )
 
-        # קריאה ל-API
-        response = self._client.text_detection(
+        # קריאה ל-API (מחויב לפי תמונה - יחידה אחת לכל בקשה)
+        meter = UsageMeter("ocr", "google_vision", "text_detection")
+        response = self._caller.call(lambda timeout: meter.observe(self._client.text_detection(
             image=image,
-            image_context=image_context
-        )
+            image_context=image_context,
+            **timeout_kwargs(timeout)
+        ), units=1), meter=meter)
 
         if response.error.message:
             raise Exception(f"Google Vision API error: {response.error.message}")
@@ -157,10 +194,6 @@ class GoogleVisionOcrService:
 
     def _recognize_with_rest_api(self, image_bytes: bytes) -> OcrResult:
         """זיהוי באמצעות REST API (כשמשתמשים ב-API key)"""
-        import requests
-
-        url = f"https://vision.googleapis.com/v1/images:annotate?key={self.config.api_key}"
-
         # בניית הבקשה
         request_body = {
             "requests": [{
@@ -177,17 +210,12 @@ class GoogleVisionOcrService:
             }]
         }
 
-        # שליחת הבקשה עם retries
-        for attempt in range(self.config.max_retries):
-            try:
-                response = requests.post(url, json=request_body, timeout=30)
-                response.raise_for_status()
-                result = response.json()
-                break
-            except requests.RequestException as e:
-                if attempt == self.config.max_retries - 1:
-                    raise e
-                time.sleep(self.config.retry_delay * (attempt + 1))
+        # שליחת הבקשה עם deadline ו-retries
+        meter = UsageMeter("ocr", "google_vision", "text_detection")
+        result = self._caller.call(
+            lambda timeout: meter.observe(self._client.annotate(request_body, **timeout_kwargs(timeout)), units=1),
+            meter=meter
+        )
 
         # עיבוד התוצאות
         annotations = result.get('responses', [{}])[0].get('textAnnotations', [])
@@ -14,6 +14,9 @@ import cv2
 
 from config.cloud_config import GPTVisionConfig, get_cloud_config
 from models.recognition_result import ArrowResult, ArrowDetectionResult
+from services.call_policy import CallPolicy, ResilientCaller, timeout_kwargs
+from services.cassette import replay_client, wrap_client
+from services.usage_ledger import UsageMeter
 
 
 class GPTArrowDetector:
@@ -179,12 +182,20 @@ Your response must be ONLY a JSON object (no other text):
         self.config = config or get_cloud_config().gpt
         self._client = None
         self._initialized = False
+        self._caller = ResilientCaller(CallPolicy.from_config(self.config), name="gpt_arrow")
 
     def _initialize_client(self) -> None:
         """אתחול הלקוח של OpenAI"""
         if self._initialized:
             return
 
+        # השמעה מ-cassette - בלי SDK ובלי API key
+        replayed = replay_client("gpt_arrow")
+        if replayed is not None:
+            self._client = replayed
+            self._initialized = True
+            return
+
         try:
             from openai import OpenAI
 
@@ -193,7 +204,9 @@ Your response must be ONLY a JSON object (no other text):
                     "GPT Vision requires OPENAI_API_KEY environment variable or openai_api.txt file"
                 )
 
-            self._client = OpenAI(api_key=self.config.api_key)
+            self._client = wrap_client("gpt_arrow", OpenAI(
+                api_key=self.config.api_key, base_url=self.config.base_url
+            ))
             self._initialized = True
             print("[OK] GPT-4o Vision client initialized")
 
@@ -263,37 +276,37 @@ Your response must be ONLY a JSON object (no other text):
 
     def _call_gpt_api(self, image_base64: str) -> str:
         """קריאה ל-GPT-5.2 Vision API"""
-        for attempt in range(self.config.max_retries):
-            try:
-                response = self._client.chat.completions.create(
-                    model=self.config.model,
-                    max_completion_tokens=self.config.max_tokens,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{image_base64}",
-                                        "detail": "high"
-                                    }
-                                },
-                                {
-                                    "type": "text",
-                                    "text": self.DETECTION_PROMPT
+        meter = UsageMeter("arrow_detection", "openai", self.config.model)
+
+        def request(timeout: Optional[float]) -> str:
+            response = self._client.chat.completions.create(
+                model=self.config.model,
+                max_completion_tokens=self.config.max_tokens,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:image/png;base64,{image_base64}",
+                                    "detail": "high"
                                 }
-                            ]
-                        }
-                    ]
-                )
+                            },
+                            {
+                                "type": "text",
+                                "text": self.DETECTION_PROMPT
+                            }
+                        ]
+                    }
+                ],
+                **timeout_kwargs(timeout)
+            )
+            meter.observe(response)
 
-                return response.choices[0].message.content
+            return response.choices[0].message.content
 
-            except Exception as e:
-                if attempt == self.config.max_retries - 1:
-                    raise e
-                time.sleep(self.config.retry_delay * (attempt + 1))
+        return self._caller.call(request, meter=meter)
 
     # מיפוי פאה לכיוון
     SIDE_TO_DIRECTION = {
@@ -0,0 +1,225 @@
+"""
+Portfolio Solver - הרצת כמה תצורות סולבר במקביל
+
+PuzzleSolver ו-SolverStrategy (עם ספים, סדר בחירה ומגבלות backtrack שונים)
+טובים בסגנונות תשבץ שונים. ה-Portfolio מריץ כמה תצורות ב-process pool על
+אותה תמונת מצב של מועמדים, לוקח את הפתרון המלא הראשון - או את הפתרון החלקי
+הטוב ביותר עד ה-deadline - ומבטל את השאר.
+
+כל ה-workers חולקים cache תשובות אחד (Manager().dict()), כך שהמקביליות
+לא מכפילה את עלות ה-API.
+"""
+
+import copy
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from services.clue_database import ClueDatabase
+from services.solution_grid import SolutionGrid
+from services.clue_solver import ClueSolver
+from services.puzzle_solver import PuzzleSolver
+from services.solver_strategy import SolverStrategy, SolveStatus
+from services.solver_snapshot import SolveSnapshot, SnapshotResult, SnapshotPoolSolver, collect_result
+
+
+@dataclass
+class PortfolioConfig:
+    """
+    תצורת סולבר אחת בפורטפוליו.
+
+    PuzzleSolver תומך רק ב-max_backtracks - ספים וסדר בחירה שונים
+    מברירת המחדל נדחים (ValueError), כדי ששתי תצורות "puzzle" לא יריצו
+    בשקט את אותו סולבר.
+    """
+    name: str
+    solver: str = "strategy"  # "strategy" (SolverStrategy) / "puzzle" (PuzzleSolver)
+    high_confidence_threshold: float = SolverStrategy.HIGH_CONFIDENCE_THRESHOLD
+    requery_threshold: float = SolverStrategy.REQUERY_THRESHOLD
+    ordering: str = SolverStrategy.ORDERING_SCORE
+    max_backtracks: int = 100
+
+    def __post_init__(self):
+        if self.solver not in ("strategy", "puzzle"):
+            raise ValueError(f"Unknown portfolio solver: {self.solver}")
+
+        if self.solver == "puzzle":
+            unsupported = [
+                name for name, value, default in (
+                    ('high_confidence_threshold', self.high_confidence_threshold,
+                     SolverStrategy.HIGH_CONFIDENCE_THRESHOLD),
+                    ('requery_threshold', self.requery_threshold, SolverStrategy.REQUERY_THRESHOLD),
+                    ('ordering', self.ordering, SolverStrategy.ORDERING_SCORE),
+                )
+                if value != default
+            ]
+            if unsupported:
+                raise ValueError(
+                    f"{self.name}: PuzzleSolver doesn't support {', '.join(unsupported)}"
+                )
+
+
+DEFAULT_PORTFOLIO = [
+    PortfolioConfig(name="strategy-score"),
+    PortfolioConfig(name="strategy-mrv", ordering=SolverStrategy.ORDERING_MRV),
+    PortfolioConfig(
+        name="strategy-cautious",
+        high_confidence_threshold=0.95,
+        requery_threshold=0.2,
+        max_backtracks=200
+    ),
+    PortfolioConfig(name="puzzle-solver", solver="puzzle"),
+]
+
+
+def run_portfolio_member(
+    config: PortfolioConfig,
+    snapshot: SolveSnapshot,
+    clue_solver: ClueSolver,
+    cancel_event=None,
+    deadline: Optional[float] = None
+) -> SnapshotResult:
+    """
+    מריץ תצורה אחת על תמונת מצב (פונקציה ברמת המודול - רצה ב-worker process).
+
+    Args:
+        config: התצורה
+        snapshot: תמונת המצב (לא משתנה - התצורה רצה על עותק)
+        clue_solver: שירות התשובות (עם ה-cache המשותף)
+        cancel_event: Event לביטול (כשתצורה אחרת כבר פתרה)
+        deadline: זמן (time.time()) שאחריו עוצרים ומחזירים פתרון חלקי
+
+    Returns:
+        SnapshotResult עם label=config.name
+    """
+    start = time.time()
+
+    def cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    try:
+        snapshot = copy.deepcopy(snapshot)
+        run = _run_puzzle_solver if config.solver == "puzzle" else _run_strategy
+        return run(config, snapshot, clue_solver, cancelled, deadline, start)
+
+    except Exception as e:
+        return SnapshotResult(
+            status=SolveStatus.FAILED,
+            elapsed=time.time() - start,
+            label=config.name,
+            error=str(e)
+        )
+
+
+def _run_strategy(config, snapshot, clue_solver, cancelled, deadline, start) -> SnapshotResult:
+    """הרצת SolverStrategy עם ספי התצורה"""
+    strategy = snapshot.build_strategy(clue_solver)
+    strategy.max_backtracks = config.max_backtracks
+    strategy.HIGH_CONFIDENCE_THRESHOLD = config.high_confidence_threshold
+    strategy.REQUERY_THRESHOLD = config.requery_threshold
+    strategy.ordering = config.ordering
+
+    # ביטול נבדק אחרי כל שיבוץ / backtrack; ה-deadline נאכף ע"י הסולבר עצמו
+    strategy.callbacks.on_progress = lambda _progress: strategy.pause() if cancelled() else None
+
+    time_limit = max(0.0, deadline - time.time()) if deadline is not None else None
+    progress = strategy.solve(candidate_index=snapshot.candidate_index, time_limit=time_limit)
+    return collect_result(strategy, progress.status, start, config.name)
+
+
+def _run_puzzle_solver(config, snapshot, clue_solver, cancelled, deadline, start) -> SnapshotResult:
+    """הרצת PuzzleSolver - משתמש ב-cache המשותף במקום באינדקס המועמדים"""
+    clue_db = ClueDatabase()
+    for clue in snapshot.clues:
+        clue_db.add_clue(clue)
+
+    solver = PuzzleSolver(clue_db, snapshot.solution, clue_solver, config.max_backtracks)
+
+    # ביטול נבדק לפני כל הגדרה; ה-deadline נאכף ע"י הסולבר ועובר לקריאות ה-LLM
+    solver.callbacks.on_progress = lambda _progress: solver.pause() if cancelled() else None
+
+    time_limit = max(0.0, deadline - time.time()) if deadline is not None else None
+    progress = solver.solve(time_limit=time_limit)
+
+    # ביטחון המילים שנשארו משובצות
+    placed_confidence = {}
+    for step in progress.steps:
+        if step.action == "place":
+            placed_confidence[step.clue_id] = step.confidence
+        elif step.action == "backtrack":
+            placed_confidence.pop(step.clue_id, None)
+
+    return SnapshotResult(
+        assignments={
+            clue.id: clue.chosen_answer
+            for clue in clue_db.clues if clue.is_solved and clue.chosen_answer
+        },
+        status=SolveStatus(progress.status.value),
+        backtracks=progress.backtracks,
+        filled_cells=snapshot.solution.get_statistics()['filled_cells'],
+        confidence=sum(placed_confidence.values()),
+        elapsed=time.time() - start,
+        label=config.name
+    )
+
+
+class PortfolioSolver(SnapshotPoolSolver):
+    """
+    מריץ פורטפוליו של תצורות סולבר ובוחר את התוצאה הטובה ביותר.
+
+    תהליך (SnapshotPoolSolver):
+    1. שאילתא ראשונית אחת (נשמרת ב-cache המשותף ובאינדקס המועמדים)
+    2. כל תצורה רצה ב-worker process על עותק של תמונת המצב
+    3. פתרון מלא ראשון מנצח ומבטל את השאר; אחרת - החלקי הטוב ביותר עד ה-deadline
+    4. התוצאה המנצחת משובצת ב-SolutionGrid המשותף
+    """
+
+    task_function = staticmethod(run_portfolio_member)
+
+    def __init__(
+        self,
+        clue_db: ClueDatabase,
+        solution: SolutionGrid,
+        clue_solver: ClueSolver,
+        configs: Optional[List[PortfolioConfig]] = None,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True
+    ):
+        """
+        Args:
+            clue_db: מאגר ההגדרות
+            solution: מטריצת הפתרון המשותפת
+            clue_solver: שירות התשובות
+            configs: התצורות להרצה (ברירת מחדל: DEFAULT_PORTFOLIO)
+            max_workers: מקסימום תהליכים (None = מספר התצורות)
+            use_processes: False = הרצה בזו אחר זו בתהליך הנוכחי
+        """
+        self.configs = configs or list(DEFAULT_PORTFOLIO)
+        super().__init__(
+            clue_db, solution, clue_solver,
+            max_workers=max_workers or len(self.configs),
+            use_processes=use_processes
+        )
+
+    def tasks(self) -> List[Tuple]:
+        return [(config,) for config in self.configs]
+
+    def get_statistics(self) -> dict:
+        """סטטיסטיקות - תוצאה לכל תצורה"""
+        return {
+            'configs': [c.name for c in self.configs],
+            'results': [
+                {
+                    'name': r.label,
+                    'status': r.status.value,
+                    'filled_cells': r.filled_cells,
+                    'confidence': round(r.confidence, 3),
+                    'backtracks': r.backtracks,
+                    'query_count': r.query_count,
+                    'elapsed': round(r.elapsed, 3),
+                    'error': r.error
+                }
+                for r in self.results
+            ],
+            'cache': self.clue_solver.get_cache_stats()
+        }
@@ -22,6 +22,7 @@ class SolveStatus(Enum):
     SOLVED = "solved"
     STUCK = "stuck"        # לא מצליח להתקדם
     FAILED = "failed"      # נכשל אחרי כל הניסיונות
+    TIMED_OUT = "timed_out"  # עבר ה-deadline
 
 
 @dataclass
@@ -109,6 +110,7 @@ class PuzzleSolver:
         # בקרת ריצה
         self._should_pause = False
         self._is_running = False
+        self._deadline: Optional[float] = None  # time.time() שאחריו עוצרים
 
         # Callbacks
         self.callbacks = SolverCallbacks()
@@ -226,19 +228,23 @@ class PuzzleSolver:
 
     def solve(
         self,
-        progress_callback: Optional[Callable[[SolveProgress], None]] = None
+        progress_callback: Optional[Callable[[SolveProgress], None]] = None,
+        time_limit: Optional[float] = None
     ) -> SolveProgress:
         """
         פותר את התשבץ עם callbacks לכל אות.
 
         Args:
             progress_callback: פונקציה לעדכון התקדמות (legacy)
+            time_limit: זמן מקסימלי בשניות (כולל שאילתות LLM) - אחריו TIMED_OUT
+                        עם מה ששובץ עד אז
 
         Returns:
             SolveProgress עם התוצאות
         """
         self._is_running = True
         self._should_pause = False
+        self._deadline = time.time() + time_limit if time_limit is not None else None
         self.progress.start_time = time.time()
         self.progress.status = SolveStatus.IN_PROGRESS
 
@@ -259,6 +265,10 @@ class PuzzleSolver:
                 self._is_running = False
                 return self.progress
 
+            if self._deadline_passed():
+                self.progress.status = SolveStatus.TIMED_OUT
+                break
+
             # בחירת ההגדרה הבאה
             clue = clues_to_solve[0]
             self.progress.current_clue = clue.id
@@ -276,7 +286,12 @@ class PuzzleSolver:
             self._update_known_letters(clue)
 
             # קבלת תשובות אפשריות
-            result = self.solver.solve_clue(clue)
+            result = self.solver.solve_clue(clue, deadline=self._deadline)
+
+            if (result.error or not result.candidates) and self._deadline_passed():
+                # תשובה חסרה בגלל ה-deadline - לא סיבה ל-backtrack
+                self.progress.status = SolveStatus.TIMED_OUT
+                break
 
             if result.error or not result.candidates:
                 # אין תשובות - צריך backtrack
@@ -324,6 +339,7 @@ class PuzzleSolver:
 
         # סיום
         self._is_running = False
+        self._deadline = None
 
         if self.progress.solved_clues == self.progress.total_clues:
             self.progress.status = SolveStatus.SOLVED
@@ -336,6 +352,10 @@ class PuzzleSolver:
 
         return self.progress
 
+    def _deadline_passed(self) -> bool:
+        """האם עבר ה-deadline"""
+        return self._deadline is not None and time.time() >= self._deadline
+
     def _get_unsolved_clues(self) -> List[ClueEntry]:
         """מחזיר הגדרות שעוד לא נפתרו (לא כולל ידניות)"""
         solved_ids = {c.id for c, _, _ in self._placement_stack}
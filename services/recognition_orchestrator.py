@@ -10,6 +10,7 @@ import numpy as np
 
 from config.cloud_config import CloudServicesConfig, get_cloud_config
 from models.recognition_result import OcrResult, ArrowResult, ArrowDetectionResult, CellRecognitionResult
+from services.circuit_breaker import CircuitBreaker, get_breaker
 
 
 @dataclass
@@ -161,130 +162,142 @@ class RecognitionOrchestrator:
         preprocessed = self.tesseract_ocr.preprocess_image(image)
         return self.tesseract_ocr.recognize_text(preprocessed)
 
+    # ספקי החצים מבוססי המודלים, ושמותיהם להדפסה
+    ARROW_PROVIDERS = {"gemini": "Gemini", "gpt": "GPT", "claude": "Claude"}
+
+    def _arrow_route(self) -> List[str]:
+        """
+        סדר הספקים לזיהוי חצים: הספק הראשי, ואחריו (אם failover מופעל)
+        הספקים הזמינים הבאים לפי failover_order - כולל "template".
+        """
+        primary = self.config.arrow_detector_provider
+        if primary not in self.ARROW_PROVIDERS:
+            return []
+
+        route = [primary]
+        if self.config.enable_failover:
+            for provider in self.config.failover_order:
+                if provider == primary or provider in route:
+                    continue
+                if provider == "template" or (
+                    provider in self.ARROW_PROVIDERS and getattr(self, f"is_{provider}_available")()
+                ):
+                    route.append(provider)
+        return route
+
+    def _breaker(self, provider: str) -> CircuitBreaker:
+        """המפסק המשותף של הספק"""
+        return get_breaker(
+            provider,
+            failure_threshold=self.config.breaker_failure_threshold,
+            slow_call_seconds=self.config.breaker_slow_call_seconds,
+            reset_seconds=self.config.breaker_reset_seconds
+        )
+
+    def _template_arrows(self, image: np.ndarray, bbox, is_split_cell: bool = False) -> Tuple[List[ArrowResult], bool]:
+        """Template Matching - מחזיר תוצאה בודדת, נעטוף ברשימה"""
+        result = self.template_arrow.detect_arrow(image, bbox)
+        if isinstance(result, list):
+            return result, is_split_cell
+        return [result], is_split_cell
+
     def _detect_arrows(
         self,
         image: np.ndarray,
         bbox: Tuple[int, int, int, int] = None
     ) -> Tuple[List[ArrowResult], bool]:
         """
-        זיהוי חצים עם fallback - מחזיר רשימה של עד 2 חצים ו-is_split_cell
+        זיהוי חצים עם fallback - מחזיר רשימה של עד 2 חצים ו-is_split_cell.
+        ספק שהמפסק שלו פתוח מדולג מיד לספק הבא ב-route.
 
         Returns:
             Tuple[List[ArrowResult], bool]: (רשימת חצים, האם זו משבצת חצויה)
         """
-        is_split_cell = False
-
         print(f"  [Orchestrator] Arrow detection - provider: {self.config.arrow_detector_provider}")
         print(f"  [Orchestrator] Fallback enabled: {self.config.enable_fallback}")
 
-        # ניסיון עם Gemini 3 Pro Vision (ברירת מחדל)
-        if self.config.arrow_detector_provider == "gemini":
-            try:
-                detection_result = self.gemini_arrow.detect_arrow(image, bbox)
-
-                # ArrowDetectionResult מכיל arrows ו-is_split_cell
-                results = detection_result.arrows
-                is_split_cell = detection_result.is_split_cell
-
-                # בדיקה אם צריך fallback (אם אין תוצאות או confidence נמוך)
-                if (self.config.enable_fallback and
-                    self.config.fallback_on_low_confidence and
-                    (not results or all(r.confidence < self.config.fallback_confidence_threshold for r in results))):
+        route = self._arrow_route()
+        if not route:
+            # Template Matching כ-primary
+            print(f"  [Orchestrator] Using Template Matching as PRIMARY")
+            return self._template_arrows(image, bbox)
 
-                    print(f"  Gemini Arrow low confidence, trying Template Matching...")
-                    fallback_result = self.template_arrow.detect_arrow(image, bbox)
+        failed: Optional[Tuple[List[ArrowResult], bool]] = None
+        for i, provider in enumerate(route):
+            if provider == "template":
+                print(f"  [Orchestrator] Failing over to Template Matching")
+                return self._template_arrows(image, bbox)
 
-                    # Template matching מחזיר תוצאה בודדת, נחזיר כרשימה
-                    if isinstance(fallback_result, list):
-                        return fallback_result, is_split_cell
-                    return [fallback_result], is_split_cell
+            breaker = self._breaker(provider)
+            if not breaker.allow():
+                print(f"  [Orchestrator] {self.ARROW_PROVIDERS[provider]} circuit open - skipping")
+                continue
 
-                return results, is_split_cell
-
-            except Exception as e:
-                print(f"  Gemini Arrow error: {e}")
-                if self.config.enable_fallback and self.config.fallback_on_error:
-                    print("  Falling back to Template Matching...")
-                    fallback_result = self.template_arrow.detect_arrow(image, bbox)
-                    if isinstance(fallback_result, list):
-                        return fallback_result, False
-                    return [fallback_result], False
-                raise
-
-        # ניסיון עם GPT-4o Vision (אופציונלי - לא בשימוש)
-        if self.config.arrow_detector_provider == "gpt":
+            has_next = i + 1 < len(route)
             try:
-                detection_result = self.gpt_arrow.detect_arrow(image, bbox)
-
-                # ArrowDetectionResult מכיל arrows ו-is_split_cell
-                results = detection_result.arrows
-                is_split_cell = detection_result.is_split_cell
-
-                # בדיקה אם צריך fallback (אם אין תוצאות או confidence נמוך)
-                if (self.config.enable_fallback and
-                    self.config.fallback_on_low_confidence and
-                    (not results or all(r.confidence < self.config.fallback_confidence_threshold for r in results))):
-
-                    print(f"  GPT Arrow low confidence, trying Template Matching...")
-                    fallback_result = self.template_arrow.detect_arrow(image, bbox)
-
-                    # Template matching מחזיר תוצאה בודדת, נחזיר כרשימה
-                    if isinstance(fallback_result, list):
-                        return fallback_result, is_split_cell
-                    return [fallback_result], is_split_cell
-
-                return results, is_split_cell
-
-            except Exception as e:
-                print(f"  GPT Arrow error: {e}")
-                if self.config.enable_fallback and self.config.fallback_on_error:
-                    print("  Falling back to Template Matching...")
-                    fallback_result = self.template_arrow.detect_arrow(image, bbox)
-                    if isinstance(fallback_result, list):
-                        return fallback_result, False
-                    return [fallback_result], False
+                result, ok = self._detect_arrows_with(provider, breaker, image, bbox)
+            except Exception:
+                # המפסק נפתח עכשיו - ממשיכים לספק הבא במקום להיכשל
+                if breaker.is_open and has_next:
+                    continue
                 raise
 
-        # ניסיון עם Claude Vision (אופציונלי - לא בשימוש)
-        if self.config.arrow_detector_provider == "claude":
-            try:
-                detection_result = self.claude_arrow.detect_arrow(image, bbox)
-
-                # ArrowDetectionResult מכיל arrows ו-is_split_cell
-                results = detection_result.arrows
-                is_split_cell = detection_result.is_split_cell
-
-                # בדיקה אם צריך fallback (אם אין תוצאות או confidence נמוך)
-                if (self.config.enable_fallback and
-                    self.config.fallback_on_low_confidence and
-                    (not results or all(r.confidence < self.config.fallback_confidence_threshold for r in results))):
+            if ok or not (breaker.is_open and has_next):
+                return result
+            failed = result
 
-                    print(f"  Claude Arrow low confidence, trying Template Matching...")
-                    fallback_result = self.template_arrow.detect_arrow(image, bbox)
+        if failed is not None:
+            return failed
 
-                    # Template matching מחזיר תוצאה בודדת, נחזיר כרשימה
-                    if isinstance(fallback_result, list):
-                        return fallback_result, is_split_cell
-                    return [fallback_result], is_split_cell
+        # כל הספקים במפסק פתוח ואין ספק נוסף - כשלון מיידי בלי לחכות ל-retries
+        return [ArrowResult(direction="none", confidence=0.0, template_matched="error: circuit open")], False
 
-                return results, is_split_cell
+    def _detect_arrows_with(
+        self,
+        provider: str,
+        breaker: CircuitBreaker,
+        image: np.ndarray,
+        bbox: Tuple[int, int, int, int] = None
+    ) -> Tuple[Tuple[List[ArrowResult], bool], bool]:
+        """
+        זיהוי חצים עם ספק אחד, כולל fallback ל-Template Matching לפי ההגדרות.
 
-            except Exception as e:
-                print(f"  Claude Arrow error: {e}")
-                if self.config.enable_fallback and self.config.fallback_on_error:
-                    print("  Falling back to Template Matching...")
-                    fallback_result = self.template_arrow.detect_arrow(image, bbox)
-                    if isinstance(fallback_result, list):
-                        return fallback_result, False
-                    return [fallback_result], False
-                raise
+        Returns:
+            ((רשימת חצים, is_split_cell), האם הספק הצליח)
+        """
+        label = self.ARROW_PROVIDERS[provider]
+        start_time = time.time()
 
-        # Template Matching כ-primary - מחזיר תוצאה בודדת, נעטוף ברשימה
-        print(f"  [Orchestrator] Using Template Matching as PRIMARY")
-        result = self.template_arrow.detect_arrow(image, bbox)
-        if isinstance(result, list):
-            return result, False
-        return [result], False
+        try:
+            detection_result = getattr(self, f"{provider}_arrow").detect_arrow(image, bbox)
+        except Exception as e:
+            breaker.record_failure()
+            print(f"  {label} Arrow error: {e}")
+            if self.config.enable_fallback and self.config.fallback_on_error:
+                print("  Falling back to Template Matching...")
+                return self._template_arrows(image, bbox), False
+            raise
+
+        # ArrowDetectionResult מכיל arrows ו-is_split_cell
+        results = detection_result.arrows
+        is_split_cell = detection_result.is_split_cell
+
+        # הגלאים מחזירים שגיאות כתוצאה (template_matched="error: ...") ולא כחריגה
+        ok = not any((r.template_matched or "").startswith("error") for r in results)
+        if ok:
+            breaker.record_success(time.time() - start_time)
+        else:
+            breaker.record_failure()
+
+        # בדיקה אם צריך fallback (אם אין תוצאות או confidence נמוך)
+        if (self.config.enable_fallback and
+            self.config.fallback_on_low_confidence and
+            (not results or all(r.confidence < self.config.fallback_confidence_threshold for r in results))):
+
+            print(f"  {label} Arrow low confidence, trying Template Matching...")
+            return self._template_arrows(image, bbox, is_split_cell), ok
+
+        return (results, is_split_cell), ok
 
     def is_google_available(self) -> bool:
         """בדיקה אם Google Vision זמין"""
@@ -324,5 +337,9 @@ class RecognitionOrchestrator:
             "gemini_available": self.is_gemini_available(),
             "gpt_available": self.is_gpt_available(),
             "claude_available": self.is_claude_available(),
-            "fallback_enabled": self.config.enable_fallback
+            "fallback_enabled": self.config.enable_fallback,
+            "failover_enabled": self.config.enable_failover,
+            "circuit_breakers": {
+                provider: self._breaker(provider).state for provider in self.ARROW_PROVIDERS
+            }
         }
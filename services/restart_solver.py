@@ -0,0 +1,249 @@
+"""
+Restart Solver - ריסטארטים אקראיים עם הפרעת ציונים לפי seed
+
+הבחירה ב-_select_best_to_place דטרמיניסטית: כשהמילה עם הביטחון הגבוה
+ביותר שגויה, כל ריצה נופלת לאותה מלכודת. כאן כל ריסטארט מריץ SolverStrategy
+עם הפרעה שונה לציוני המועמדים (perturbation_seed) ותקציב backtracks לפי
+לוח זמנים (Luby או גאומטרי), על אותה תמונת מצב של אינדקס המועמדים.
+
+תמונת המצב נשלחת לכל worker process פעם אחת (initializer) ונשמרת בו
+לקריאה בלבד - כל ריסטארט מעתיק אותה מקומית. הפתרון המלא הראשון מבטל את
+השאר; אחרת מנצחת התוצאה הטובה ביותר. ריסטארט 0 רץ בלי הפרעה, כך שהתוצאה
+לעולם לא גרועה מהריצה הדטרמיניסטית.
+"""
+
+import copy
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from services.clue_database import ClueDatabase
+from services.solution_grid import SolutionGrid
+from services.clue_solver import ClueSolver
+from services.solver_strategy import SolveStatus
+from services.solver_snapshot import SolveSnapshot, SnapshotResult, SnapshotPoolSolver, collect_result
+
+
+SCHEDULE_LUBY = "luby"
+SCHEDULE_GEOMETRIC = "geometric"
+SCHEDULE_FIXED = "fixed"
+
+
+def luby(i: int) -> int:
+    """
+    האיבר ה-i (מ-1) בסדרת Luby: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while True:
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+
+
+@dataclass
+class RestartConfig:
+    """תצורת הריסטארטים"""
+    schedule: str = SCHEDULE_LUBY   # luby / geometric / fixed
+    unit: int = 10                  # backtracks ליחידת תקציב
+    factor: float = 2.0             # יחס ההגדלה ב-geometric
+    max_restarts: int = 16
+    perturbation_strength: float = 0.3  # ציון * (1 ± strength)
+    base_seed: int = 0
+
+    def budget(self, index: int) -> int:
+        """תקציב ה-backtracks של ריסטארט index (מ-0)"""
+        if self.schedule == SCHEDULE_LUBY:
+            return self.unit * luby(index + 1)
+        if self.schedule == SCHEDULE_GEOMETRIC:
+            return max(1, int(round(self.unit * self.factor ** index)))
+        if self.schedule == SCHEDULE_FIXED:
+            return self.unit
+        raise ValueError(f"Unknown restart schedule: {self.schedule}")
+
+    def seed(self, index: int) -> Optional[int]:
+        """seed ההפרעה של ריסטארט index (None = בלי הפרעה)"""
+        return None if index == 0 else self.base_seed + index
+
+
+@dataclass
+class RestartRecord:
+    """טלמטריה לריסטארט אחד"""
+    index: int
+    seed: Optional[int]
+    budget: int
+    status: str = ""
+    filled_cells: int = 0
+    confidence: float = 0.0
+    backtracks: int = 0
+    query_count: int = 0
+    elapsed: float = 0.0
+    worker: int = 0            # pid של התהליך שהריץ
+    error: Optional[str] = None
+
+
+def run_restart(
+    index: int,
+    seed: Optional[int],
+    budget: int,
+    strength: float,
+    snapshot: SolveSnapshot,
+    clue_solver: ClueSolver,
+    cancel_event=None,
+    deadline: Optional[float] = None
+) -> Tuple[SnapshotResult, RestartRecord]:
+    """
+    ריסטארט אחד על עותק פרטי של תמונת המצב.
+
+    Args:
+        index: מספר הריסטארט
+        seed: seed ההפרעה (None = בלי הפרעה)
+        budget: מקסימום backtracks
+        strength: עוצמת ההפרעה
+        snapshot: תמונת המצב (לא משתנה)
+        clue_solver: שירות התשובות
+        cancel_event: Event לביטול (כשריסטארט אחר כבר פתר)
+        deadline: זמן (time.time()) שאחריו עוצרים
+
+    Returns:
+        (SnapshotResult, RestartRecord)
+    """
+    start = time.time()
+    record = RestartRecord(index=index, seed=seed, budget=budget, worker=os.getpid())
+    label = f"restart-{index}"
+
+    try:
+        local = copy.deepcopy(snapshot)
+        strategy = local.build_strategy(clue_solver)
+        strategy.max_backtracks = budget
+        strategy.perturbation_seed = seed
+        strategy.perturbation_strength = strength if seed is not None else 0.0
+
+        if cancel_event is not None:
+            strategy.callbacks.on_progress = (
+                lambda _progress: strategy.pause() if cancel_event.is_set() else None
+            )
+
+        time_limit = max(0.0, deadline - time.time()) if deadline is not None else None
+        progress = strategy.solve(candidate_index=local.candidate_index, time_limit=time_limit)
+        result = collect_result(strategy, progress.status, start, label)
+
+    except Exception as e:
+        result = SnapshotResult(
+            status=SolveStatus.FAILED, elapsed=time.time() - start, label=label, error=str(e)
+        )
+
+    record.status = result.status.value
+    record.filled_cells = result.filled_cells
+    record.confidence = result.confidence
+    record.backtracks = result.backtracks
+    record.query_count = result.query_count
+    record.elapsed = result.elapsed
+    record.error = result.error
+    return result, record
+
+
+class RestartSolver(SnapshotPoolSolver):
+    """
+    פותר בריסטארטים אקראיים ובוחר את התוצאה הטובה ביותר.
+
+    תהליך (SnapshotPoolSolver):
+    1. שאילתא ראשונית אחת (נשמרת ב-cache המשותף ובאינדקס המועמדים)
+    2. תמונת מצב אחת נשלחת לכל worker (לקריאה בלבד)
+    3. הריסטארטים נשלחים לפי סדר לוח הזמנים; כל אחד עם seed ותקציב משלו
+    4. פתרון מלא ראשון מבטל את השאר; התוצאה המנצחת משובצת ב-SolutionGrid
+    """
+
+    task_function = staticmethod(run_restart)
+
+    def __init__(
+        self,
+        clue_db: ClueDatabase,
+        solution: SolutionGrid,
+        clue_solver: ClueSolver,
+        config: Optional[RestartConfig] = None,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True
+    ):
+        """
+        Args:
+            clue_db: מאגר ההגדרות
+            solution: מטריצת הפתרון המשותפת
+            clue_solver: שירות התשובות
+            config: תצורת הריסטארטים (ברירת מחדל: Luby, 16 ריסטארטים)
+            max_workers: מקסימום תהליכים (None = מספר המעבדים)
+            use_processes: False = הרצה בזו אחר זו בתהליך הנוכחי
+        """
+        super().__init__(clue_db, solution, clue_solver, max_workers, use_processes)
+        self.config = config or RestartConfig()
+        self.records: List[RestartRecord] = []
+
+    def plan(self) -> List[Tuple[int, Optional[int], int]]:
+        """לוח הזמנים: [(index, seed, budget)]"""
+        return [
+            (index, self.config.seed(index), self.config.budget(index))
+            for index in range(self.config.max_restarts)
+        ]
+
+    def tasks(self) -> List[Tuple]:
+        return [
+            (index, seed, budget, self.config.perturbation_strength)
+            for index, seed, budget in self.plan()
+        ]
+
+    def solve(self, time_limit: Optional[float] = None) -> Optional[SnapshotResult]:
+        """
+        מריץ את הריסטארטים.
+
+        Args:
+            time_limit: זמן מקסימלי בשניות (None = עד שכל הריסטארטים מסתיימים)
+
+        Returns:
+            התוצאה המנצחת (או None אם אף ריסטארט לא החזיר תוצאה)
+        """
+        self.records = []
+        best = super().solve(time_limit)
+        self.records.sort(key=lambda r: r.index)
+        return best
+
+    def _collect(self, output: Tuple[SnapshotResult, RestartRecord]) -> SnapshotResult:
+        result, record = output
+        self.records.append(record)
+        return result
+
+    def _collect_error(self, error: Exception) -> SnapshotResult:
+        result = super()._collect_error(error)
+        self.records.append(RestartRecord(
+            index=-1, seed=None, budget=0, status=result.status.value, error=str(error)
+        ))
+        return result
+
+    def get_statistics(self) -> dict:
+        """סטטיסטיקות - תצורה וטלמטריה לכל ריסטארט"""
+        return {
+            'schedule': self.config.schedule,
+            'unit': self.config.unit,
+            'perturbation_strength': self.config.perturbation_strength,
+            'restarts': [
+                {
+                    'index': r.index,
+                    'seed': r.seed,
+                    'budget': r.budget,
+                    'status': r.status,
+                    'filled_cells': r.filled_cells,
+                    'confidence': round(r.confidence, 3),
+                    'backtracks': r.backtracks,
+                    'query_count': r.query_count,
+                    'elapsed': round(r.elapsed, 3),
+                    'worker': r.worker,
+                    'error': r.error
+                }
+                for r in self.records
+            ],
+            'cache': self.clue_solver.get_cache_stats()
+        }
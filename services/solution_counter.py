@@ -0,0 +1,228 @@
+"""
+Solution Counter - ספירת פתרונות ובדיקת יחידות
+
+בודק כמה מילויים מלאים ועקביים מאפשרים הגריד המזוהה וקבוצות המועמדים.
+פתרון יחיד = הזיהוי והמועמדים עקביים; אפס פתרונות (או הגדרה בלי אף מועמד
+באורך הנכון) מצביעים על שגיאת זיהוי - למשל answer_length שגוי מחץ שזוהה לא נכון.
+
+האלגוריתם:
+1. פירוק לרכיבים בלתי תלויים (גרף ההצלבות) - הספירה הכוללת היא מכפלה
+2. בכל רכיב: סדר הגדרות שמצמצם את ה"חזית" (משבצות שמשותפות לחלק שהושם
+   ולחלק שעוד לא)
+3. DFS עם memoization על חתימת המצב החלקי = (שלב, האותיות בחזית).
+   שני מצבים חלקיים עם אותה חזית משאירים בדיוק אותה תת-בעיה.
+
+הספירה רוויה ב-limit - מספיק לדעת "יחיד / כמה / לפחות limit".
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.clue_database import ClueDatabase
+from services.candidate_index import CandidateIndex
+
+
+@dataclass
+class CountResult:
+    """תוצאת ספירה"""
+    count: int = 0                  # מספר הפתרונות (רווי ב-limit)
+    capped: bool = False            # האם הגענו ל-limit (יש לפחות count פתרונות)
+    component_counts: List[Tuple[List[str], int]] = field(default_factory=list)  # (הגדרות הרכיב, ספירה)
+    empty_domains: List[str] = field(default_factory=list)  # הגדרות בלי אף מועמד תואם
+    nodes: int = 0                  # מספר צמתי חיפוש
+    memo_hits: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def is_unique(self) -> bool:
+        """בדיוק פתרון אחד"""
+        return self.count == 1 and not self.capped
+
+    @property
+    def unsatisfiable_components(self) -> List[List[str]]:
+        """רכיבים בלי אף מילוי עקבי - מקור אפשרי לשגיאת זיהוי"""
+        return [clue_ids for clue_ids, count in self.component_counts if count == 0]
+
+
+class SolutionCounter:
+    """
+    סופר מילויים מלאים ועקביים של ClueDatabase + CandidateIndex.
+
+    שימוש:
+        counter = SolutionCounter(clue_db, candidate_index, limit=1000)
+        result = counter.count()
+        if result.is_unique: ...
+    """
+
+    def __init__(
+        self,
+        clue_db: ClueDatabase,
+        candidate_index: CandidateIndex,
+        limit: Optional[int] = 1000,
+        clue_ids: Optional[Set[str]] = None
+    ):
+        """
+        Args:
+            clue_db: מאגר ההגדרות (כולל האותיות הידועות)
+            candidate_index: המועמדים לכל הגדרה
+            limit: רוויה - עוצרים לספור מעבר לזה (None = ספירה מדויקת)
+            clue_ids: ההגדרות לספירה (ברירת מחדל: כל ההגדרות עם אורך)
+        """
+        self.clue_db = clue_db
+        self.candidate_index = candidate_index
+        self.limit = limit
+        self.clue_ids = clue_ids
+
+        self._nodes = 0
+        self._memo_hits = 0
+
+    @classmethod
+    def from_strategy(cls, strategy, limit: Optional[int] = 1000) -> 'SolutionCounter':
+        """סופר על המצב הנוכחי של SolverStrategy"""
+        return cls(strategy.clue_db, strategy.state.candidate_index, limit=limit)
+
+    def count(self) -> CountResult:
+        """
+        סופר את הפתרונות.
+
+        Returns:
+            CountResult
+        """
+        start = time.time()
+        self._nodes = 0
+        self._memo_hits = 0
+
+        clue_ids = self.clue_ids
+        if clue_ids is None:
+            clue_ids = {clue.id for clue in self.clue_db.clues if clue.answer_length > 0}
+
+        domains = {clue_id: self._get_domain(clue_id) for clue_id in clue_ids}
+        result = CountResult(
+            empty_domains=sorted(clue_id for clue_id, words in domains.items() if not words)
+        )
+
+        total = 1
+        for component in self.clue_db.get_components(set(clue_ids)):
+            component_count = self._count_component(component, domains)
+            result.component_counts.append((component, component_count))
+            total = self._saturate(total * component_count)
+
+        result.count = total
+        result.capped = self.limit is not None and total >= self.limit
+        result.nodes = self._nodes
+        result.memo_hits = self._memo_hits
+        result.elapsed = time.time() - start
+        return result
+
+    def is_unique(self) -> bool:
+        """האם יש בדיוק פתרון אחד"""
+        return self.count().is_unique
+
+    def _saturate(self, value: int) -> int:
+        """רוויה ב-limit"""
+        if self.limit is not None and value > self.limit:
+            return self.limit
+        return value
+
+    def _get_domain(self, clue_id: str) -> List[str]:
+        """המילים האפשריות להגדרה: תשובה משובצת, או מועמדים שמתאימים לתבנית"""
+        clue = self.clue_db.get_clue(clue_id)
+        pattern = clue.get_constraint_string()
+
+        if clue.is_solved and clue.chosen_answer:
+            words = [clue.chosen_answer]
+        else:
+            words = [c.word for c in self.candidate_index.get_valid_candidates_for_clue(clue_id, pattern)]
+
+        seen: Set[str] = set()
+        domain = []
+        for word in words:
+            if len(word) == clue.answer_length and word not in seen and clue.matches_answer(word):
+                seen.add(word)
+                domain.append(word)
+        return domain
+
+    def _order_component(self, component: List[str], domains: Dict[str, List[str]]) -> List[str]:
+        """
+        סדר השמה: מתחילים מההגדרה עם הכי מעט מילים, ובכל שלב בוחרים את ההגדרה
+        עם הכי הרבה הצלבות לחלק שכבר הושם (ואז הכי מעט מילים) - חזית קטנה.
+        """
+        graph = self.clue_db.get_crossing_graph()
+        remaining = set(component)
+        order: List[str] = []
+
+        while remaining:
+            placed = set(order)
+            best = min(
+                remaining,
+                key=lambda cid: (
+                    -sum(len(pairs) for other, pairs in graph.get(cid, {}).items() if other in placed),
+                    len(domains[cid]),
+                    cid
+                )
+            )
+            order.append(best)
+            remaining.remove(best)
+
+        return order
+
+    def _count_component(self, component: List[str], domains: Dict[str, List[str]]) -> int:
+        """ספירת רכיב אחד - DFS עם memoization על חתימת החזית"""
+        if any(not domains[clue_id] for clue_id in component):
+            return 0
+
+        graph = self.clue_db.get_crossing_graph()
+        order = self._order_component(component, domains)
+        position = {clue_id: k for k, clue_id in enumerate(order)}
+        n = len(order)
+
+        # checks[k] = [(j, אינדקס אצל k, אינדקס אצל j)] - הצלבות עם הגדרות שכבר הושמו
+        checks: List[List[Tuple[int, int, int]]] = [[] for _ in range(n)]
+        # frontier[k] = [(j, אינדקס אצל j)] - אותיות של הגדרות j<k שמשפיעות על k והלאה
+        frontier: List[List[Tuple[int, int]]] = [[] for _ in range(n + 1)]
+
+        for k, clue_id in enumerate(order):
+            for other_id, pairs in graph.get(clue_id, {}).items():
+                j = position.get(other_id)
+                if j is None:
+                    continue
+                if j < k:
+                    for my_idx, other_idx in pairs:
+                        checks[k].append((j, my_idx, other_idx))
+                    # האות של j נשארת בחזית מ-j+1 ועד k (כולל)
+                    for step in range(j + 1, k + 1):
+                        for _my_idx, other_idx in pairs:
+                            frontier[step].append((j, other_idx))
+
+        for k in range(n + 1):
+            frontier[k] = sorted(set(frontier[k]))
+
+        words: List[Optional[str]] = [None] * n
+        memo: List[Dict[Tuple[str, ...], int]] = [{} for _ in range(n + 1)]
+        domain_lists = [domains[clue_id] for clue_id in order]
+
+        def count_from(k: int) -> int:
+            if k == n:
+                return 1
+
+            signature = tuple(words[j][idx] for j, idx in frontier[k])
+            cached = memo[k].get(signature)
+            if cached is not None:
+                self._memo_hits += 1
+                return cached
+
+            total = 0
+            for word in domain_lists[k]:
+                self._nodes += 1
+                if all(word[my_idx] == words[j][other_idx] for j, my_idx, other_idx in checks[k]):
+                    words[k] = word
+                    total = self._saturate(total + count_from(k + 1))
+                    if self.limit is not None and total >= self.limit:
+                        break
+
+            words[k] = None
+            memo[k][signature] = total
+            return total
+
+        return count_from(0)
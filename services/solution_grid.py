@@ -3,8 +3,7 @@ Solution Grid Service
 מטריצת הפתרון - מחזיקה את התשובות שהושבצו
 """
 
-from typing import List, Dict, Optional, Tuple, Set
-from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Set, Sequence
 from enum import Enum
 
 from models.clue_entry import ClueEntry, WritingDirection
@@ -18,22 +17,119 @@ class PlacementStatus(Enum):
     INVALID_LENGTH = "invalid_length"
 
 
-@dataclass
+_EMPTY: Tuple = ()
+
+
 class SolutionCell:
-    """משבצת בודדת במטריצת הפתרון"""
-    letter: str = ""  # האות שהוכנסה
-    confidence: float = 0.0  # ביטחון
-    source_clues: List[str] = field(default_factory=list)  # הגדרות שתרמו לאות זו
-    is_conflict: bool = False  # האם יש סתירה
-    conflicting_letters: List[str] = field(default_factory=list)  # אותיות סותרות
+    """
+    משבצת בודדת במטריצת הפתרון.
+
+    __slots__ ורשימות שמוקצות רק כשצריך: רוב המשבצות ריקות או עם מקור אחד,
+    ומשבצת ריקה לא מחזיקה אף רשימה.
+    """
+
+    __slots__ = (
+        'letter',                # האות שהוכנסה
+        'confidence',            # ביטחון
+        'is_conflict',           # האם יש סתירה
+        '_source_clues',         # הגדרות שתרמו לאות זו (None = אין)
+        '_conflicting_letters',  # אותיות סותרות (None = אין)
+    )
+
+    def __init__(
+        self,
+        letter: str = "",
+        confidence: float = 0.0,
+        source_clues: Optional[List[str]] = None,
+        is_conflict: bool = False,
+        conflicting_letters: Optional[List[str]] = None
+    ):
+        self.letter = letter
+        self.confidence = confidence
+        self.is_conflict = is_conflict
+        self._source_clues = list(source_clues) if source_clues else None
+        self._conflicting_letters = list(conflicting_letters) if conflicting_letters else None
+
+    @property
+    def source_clues(self) -> Sequence[str]:
+        """הגדרות שתרמו לאות (לקריאה בלבד - שינוי דרך add_source / remove_source)"""
+        return self._source_clues or _EMPTY
+
+    @property
+    def conflicting_letters(self) -> Sequence[str]:
+        """אותיות סותרות (לקריאה בלבד - שינוי דרך add_conflict)"""
+        return self._conflicting_letters or _EMPTY
+
+    def add_source(self, clue_id: str) -> None:
+        """הוספת הגדרה שתרמה לאות"""
+        if self._source_clues is None:
+            self._source_clues = [clue_id]
+        elif clue_id not in self._source_clues:
+            self._source_clues.append(clue_id)
+
+    def remove_source(self, clue_id: str) -> None:
+        """הסרת הגדרה מהמקורות"""
+        if self._source_clues and clue_id in self._source_clues:
+            self._source_clues.remove(clue_id)
+            if not self._source_clues:
+                self._source_clues = None
+
+    def add_conflict(self, letter: str) -> None:
+        """רישום אות סותרת"""
+        if self._conflicting_letters is None:
+            self._conflicting_letters = [letter]
+        elif letter not in self._conflicting_letters:
+            self._conflicting_letters.append(letter)
+
+    def reset(self) -> None:
+        """ניקוי המשבצת"""
+        self.letter = ""
+        self.confidence = 0.0
+        self.is_conflict = False
+        self._source_clues = None
+        self._conflicting_letters = None
+
+    def __repr__(self) -> str:
+        return (
+            f"SolutionCell(letter={self.letter!r}, confidence={self.confidence!r}, "
+            f"source_clues={list(self.source_clues)!r}, is_conflict={self.is_conflict!r}, "
+            f"conflicting_letters={list(self.conflicting_letters)!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.letter == other.letter
+            and self.confidence == other.confidence
+            and self.is_conflict == other.is_conflict
+            and list(self.source_clues) == list(other.source_clues)
+            and list(self.conflicting_letters) == list(other.conflicting_letters)
+        )
+
+    __hash__ = None
 
 
-@dataclass
 class PlacementResult:
     """תוצאת ניסיון שיבוץ"""
-    status: PlacementStatus
-    conflicts: List[Tuple[int, int, str, str]] = field(default_factory=list)  # [(row, col, existing, new), ...]
-    message: str = ""
+
+    __slots__ = ('status', 'conflicts', 'message')
+
+    def __init__(
+        self,
+        status: PlacementStatus,
+        conflicts: Optional[List[Tuple[int, int, str, str]]] = None,  # [(row, col, existing, new), ...]
+        message: str = ""
+    ):
+        self.status = status
+        self.conflicts = conflicts if conflicts else _EMPTY
+        self.message = message
+
+    def __repr__(self) -> str:
+        return (
+            f"PlacementResult(status={self.status!r}, conflicts={list(self.conflicts)!r}, "
+            f"message={self.message!r})"
+        )
 
 
 class SolutionGrid:
@@ -150,8 +246,7 @@ class SolutionGrid:
             if cell.letter and cell.letter != new_letter:
                 # יש סתירה
                 cell.is_conflict = True
-                if new_letter not in cell.conflicting_letters:
-                    cell.conflicting_letters.append(new_letter)
+                cell.add_conflict(new_letter)
 
                 if force:
                     cell.letter = new_letter  # דורס
@@ -160,8 +255,7 @@ class SolutionGrid:
 
             cell.confidence = max(cell.confidence, confidence)
 
-            if clue.id not in cell.source_clues:
-                cell.source_clues.append(clue.id)
+            cell.add_source(clue.id)
 
         self._placed_clues.add(clue.id)
         clue.chosen_answer = answer
@@ -184,15 +278,11 @@ class SolutionGrid:
             cell = self.grid[row][col]
 
             # הסרת ה-clue מהמקורות
-            if clue.id in cell.source_clues:
-                cell.source_clues.remove(clue.id)
+            cell.remove_source(clue.id)
 
             # אם אין יותר מקורות - ניקוי המשבצת
             if not cell.source_clues:
-                cell.letter = ""
-                cell.confidence = 0.0
-                cell.is_conflict = False
-                cell.conflicting_letters = []
+                cell.reset()
 
         self._placed_clues.remove(clue.id)
         clue.chosen_answer = None
@@ -200,6 +290,27 @@ class SolutionGrid:
 
         return True
 
+    def get_placed_clues(self) -> Set[str]:
+        """מחזיר את ההגדרות שמשובצות כרגע"""
+        return set(self._placed_clues)
+
+    def restore_cells(
+        self,
+        cells: Dict[Tuple[int, int], SolutionCell],
+        placed_clues: Set[str]
+    ) -> None:
+        """
+        משחזר את תוכן המטריצה (מ-checkpoint) במקום לשבץ מחדש.
+
+        Args:
+            cells: המשבצות המלאות {(row, col): SolutionCell}
+            placed_clues: ההגדרות שמשובצות
+        """
+        self.clear()
+        for (row, col), cell in cells.items():
+            self.grid[row][col] = cell
+        self._placed_clues = set(placed_clues)
+
     def get_known_letters(self, cells: List[Tuple[int, int]]) -> Dict[int, str]:
         """
         מחזיר אותיות ידועות עבור רשימת משבצות.
@@ -226,17 +337,19 @@ class SolutionGrid:
                     conflicts.append((row, col))
         return conflicts
 
+    def get_filled_count(self) -> int:
+        """מחזיר מספר משבצות מלאות"""
+        return sum(1 for row in self.grid for cell in row if cell.letter)
+
     def get_completion_percentage(self) -> float:
         """מחזיר אחוז מילוי"""
-        filled = sum(
-            1 for row in self.grid for cell in row if cell.letter
-        )
+        filled = self.get_filled_count()
         total = self.rows * self.cols
         return (filled / total * 100) if total > 0 else 0
 
     def get_statistics(self) -> Dict:
         """סטטיסטיקות"""
-        filled = sum(1 for row in self.grid for cell in row if cell.letter)
+        filled = self.get_filled_count()
         conflicts = len(self.get_conflicts())
         avg_confidence = sum(
             cell.confidence for row in self.grid for cell in row if cell.letter
@@ -279,7 +392,7 @@ class SolutionGrid:
 
     def clear(self) -> None:
         """ניקוי המטריצה"""
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.grid[row][col] = SolutionCell()
+        for row in self.grid:
+            for cell in row:
+                cell.reset()
         self._placed_clues.clear()
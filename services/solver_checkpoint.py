@@ -0,0 +1,452 @@
+"""
+Solver Checkpoint - שמירה ושחזור של מצב הפתרון
+
+הפעלה מחדש של Streamlit או קריסה באמצע פתרון מאבדים את מחסנית השיבוצים,
+אינדקס המועמדים, המילים שנכשלו ושלב ה-requery - וכל זה נקנה שוב מה-LLM.
+המודול שומר את SolverState ואת SolutionGrid לקובץ בינארי קומפקטי (או לטבלה
+solver_checkpoints במסד הנתונים) ומשחזר אותם כך ש-resume() ממשיך מאותה נקודה.
+
+פורמט (גרסה 3):
+    MAGIC (4 בתים) | VERSION (uint16) | zlib(body)
+
+    body = טבלת מחרוזות + רשומות struct (little-endian).
+    כל מחרוזת (מזהה הגדרה, מילה, תבנית) נשמרת פעם אחת ונרשמת כאינדקס לטבלה.
+"""
+
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from database.db_manager import DatabaseManager
+from services.candidate_index import CandidateIndex, CandidateWord
+from services.solution_grid import SolutionCell
+from services.solver_strategy import SolverStrategy, SolverState, ClueState, SolvePhase
+
+
+CHECKPOINT_MAGIC = b"CWSC"
+CHECKPOINT_VERSION = 3
+
+_HEADER = struct.Struct("<4sH")
+_PHASES = list(SolvePhase)
+
+# רמת דחיסה נמוכה - שמירה אחרי כל שיבוץ צריכה להיות זולה
+COMPRESSION_LEVEL = 1
+
+
+class CheckpointError(Exception):
+    """checkpoint פגום, מגרסה לא נתמכת או שלא מתאים לתשבץ"""
+
+
+class _Writer:
+    """כותב רשומות struct עם טבלת מחרוזות משותפת"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._strings: Dict[str, int] = {}
+
+    def pack(self, fmt: str, *values) -> None:
+        self._parts.append(struct.pack("<" + fmt, *values))
+
+    def string(self, value: Optional[str]) -> None:
+        """כותב אינדקס מחרוזת (0 = None)"""
+        if value is None:
+            self.pack("I", 0)
+            return
+
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings) + 1
+        self.pack("I", index)
+
+    def strings(self, values) -> None:
+        """כותב רשימת מחרוזות"""
+        values = list(values)
+        self.pack("I", len(values))
+        for value in values:
+            self.string(value)
+
+    def getvalue(self) -> bytes:
+        table = [struct.pack("<I", len(self._strings))]
+        for value in self._strings:  # סדר ההכנסה = סדר האינדקסים
+            raw = value.encode("utf-8")
+            table.append(struct.pack("<I", len(raw)))
+            table.append(raw)
+        return b"".join(table + self._parts)
+
+
+class _Reader:
+    """קורא את מה ש-_Writer כתב"""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+        self._strings: List[Optional[str]] = [None]
+        count, = self.unpack("I")
+        for _ in range(count):
+            length, = self.unpack("I")
+            raw = data[self._offset:self._offset + length]
+            if len(raw) != length:
+                raise CheckpointError("Truncated string table")
+            self._strings.append(raw.decode("utf-8"))
+            self._offset += length
+
+    def unpack(self, fmt: str) -> tuple:
+        fmt = "<" + fmt
+        try:
+            values = struct.unpack_from(fmt, self._data, self._offset)
+        except struct.error as e:
+            raise CheckpointError(f"Truncated checkpoint: {e}")
+        self._offset += struct.calcsize(fmt)
+        return values
+
+    def string(self) -> Optional[str]:
+        index, = self.unpack("I")
+        if index >= len(self._strings):
+            raise CheckpointError(f"Invalid string index {index}")
+        return self._strings[index]
+
+    def strings(self) -> List[Optional[str]]:
+        count, = self.unpack("I")
+        return [self.string() for _ in range(count)]
+
+
+def encode_checkpoint(strategy: SolverStrategy) -> bytes:
+    """
+    מקודד את מצב הסולבר והגריד ל-bytes.
+
+    Args:
+        strategy: הסולבר (state + solution)
+
+    Returns:
+        checkpoint בינארי
+    """
+    state = strategy.state
+    solution = strategy.solution
+    w = _Writer()
+
+    # === SolverState ===
+    w.pack(
+        "BBHIIIIIId",
+        _PHASES.index(state.solve_phase),
+        # 0 = אין שלב שנקטע
+        _PHASES.index(state.interrupted_phase) + 1 if state.interrupted_phase is not None else 0,
+        state.current_phase,
+        state.total_solution_cells,
+        state.letters_discovered,
+        state.letters_since_query,
+        state.backtracks,
+        state.forward_check_rejections,
+        state.query_count,
+        time.time() - state.start_time if state.start_time else 0.0
+    )
+    w.pack("Id", *state.best_score)
+
+    w.pack("I", len(state.clue_states))
+    for clue_id, clue_state in state.clue_states.items():
+        w.string(clue_id)
+        w.string(clue_state.placed_word)
+        w.string(clue_state.known_letters_at_query)
+        w.pack(
+            "BHd",
+            int(clue_state.is_solved) | int(clue_state.is_manual) << 1 | int(clue_state.query_expired) << 2,
+            clue_state.last_query_phase,
+            clue_state.placed_confidence
+        )
+
+    w.pack("I", len(state.placement_stack))
+    for clue_id, word, is_manual in state.placement_stack:
+        w.string(clue_id)
+        w.string(word)
+        w.pack("B", int(is_manual))
+
+    w.pack("I", len(state.best_placements))
+    for clue_id, word, confidence in state.best_placements:
+        w.string(clue_id)
+        w.string(word)
+        w.pack("d", confidence)
+
+    # === CandidateIndex ===
+    candidates = list(state.candidate_index.iter_candidates())
+    w.pack("I", len(candidates))
+    for c in candidates:
+        w.string(c.clue_id)
+        w.string(c.word)
+        w.string(c.known_letters_snapshot)
+        w.pack("ddH", c.confidence, c.clue_certainty, c.query_phase)
+
+    failed = state.candidate_index.get_failed_words()
+    w.pack("I", len(failed))
+    for clue_id, words in failed.items():
+        w.string(clue_id)
+        w.strings(sorted(words))
+
+    w.pack("II", *state.candidate_index.get_counters())
+
+    # === SolutionGrid (רק משבצות לא ריקות) ===
+    filled = [
+        (row, col, cell)
+        for row, cells in enumerate(solution.grid)
+        for col, cell in enumerate(cells)
+        if cell.letter or cell.source_clues
+    ]
+    w.pack("HHI", solution.rows, solution.cols, len(filled))
+    for row, col, cell in filled:
+        w.pack("HHdB", row, col, cell.confidence, int(cell.is_conflict))
+        w.string(cell.letter)
+        w.strings(cell.source_clues)
+        w.strings(cell.conflicting_letters)
+
+    w.strings(sorted(solution.get_placed_clues()))
+
+    body = zlib.compress(w.getvalue(), COMPRESSION_LEVEL)
+    return _HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION) + body
+
+
+def restore_checkpoint(strategy: SolverStrategy, data: bytes) -> None:
+    """
+    משחזר checkpoint לתוך הסולבר (אותו תשבץ - אותן הגדרות ואותו גודל גריד).
+    אחרי השחזור resume() ממשיך מהשלב השמור.
+
+    Raises:
+        CheckpointError: אם ה-checkpoint פגום או לא מתאים
+    """
+    if len(data) < _HEADER.size:
+        raise CheckpointError("Checkpoint too short")
+
+    magic, version = _HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC:
+        raise CheckpointError("Not a solver checkpoint")
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError(f"Unsupported checkpoint version {version}")
+
+    try:
+        body = zlib.decompress(data[_HEADER.size:])
+    except zlib.error as e:
+        raise CheckpointError(f"Corrupt checkpoint: {e}")
+
+    r = _Reader(body)
+    clue_db = strategy.clue_db
+    solution = strategy.solution
+
+    def clue_for(clue_id: Optional[str]):
+        clue = clue_db.get_clue(clue_id) if clue_id else None
+        if clue is None:
+            raise CheckpointError(f"Unknown clue {clue_id!r} - checkpoint is for a different puzzle")
+        return clue
+
+    # === SolverState ===
+    state = SolverState()
+    (phase_index, interrupted_index, state.current_phase, state.total_solution_cells,
+     state.letters_discovered, state.letters_since_query, state.backtracks,
+     state.forward_check_rejections, state.query_count, elapsed) = r.unpack("BBHIIIIIId")
+    if phase_index >= len(_PHASES) or interrupted_index > len(_PHASES):
+        raise CheckpointError(f"Invalid phase {phase_index}")
+    state.solve_phase = _PHASES[phase_index]
+    state.interrupted_phase = _PHASES[interrupted_index - 1] if interrupted_index else None
+    state.start_time = time.time() - elapsed
+    state.best_score = r.unpack("Id")
+
+    count, = r.unpack("I")
+    for _ in range(count):
+        clue_id = r.string()
+        placed_word = r.string()
+        known_letters_at_query = r.string() or ""
+        flags, last_query_phase, placed_confidence = r.unpack("BHd")
+        state.clue_states[clue_id] = ClueState(
+            clue=clue_for(clue_id),
+            is_solved=bool(flags & 1),
+            placed_word=placed_word,
+            last_query_phase=last_query_phase,
+            known_letters_at_query=known_letters_at_query,
+            is_manual=bool(flags & 2),
+            placed_confidence=placed_confidence,
+            query_expired=bool(flags & 4)
+        )
+
+    count, = r.unpack("I")
+    for _ in range(count):
+        clue_id, word = r.string(), r.string()
+        is_manual, = r.unpack("B")
+        state.placement_stack.append((clue_id, word, bool(is_manual)))
+
+    count, = r.unpack("I")
+    for _ in range(count):
+        clue_id, word = r.string(), r.string()
+        confidence, = r.unpack("d")
+        state.best_placements.append((clue_id, word, confidence))
+
+    # === CandidateIndex ===
+    candidates: List[CandidateWord] = []
+    count, = r.unpack("I")
+    for _ in range(count):
+        clue_id, word, snapshot = r.string(), r.string(), r.string() or ""
+        confidence, clue_certainty, query_phase = r.unpack("ddH")
+        candidates.append(CandidateWord(
+            word=word,
+            clue_id=clue_id,
+            confidence=confidence,
+            clue_certainty=clue_certainty,
+            query_phase=query_phase,
+            known_letters_snapshot=snapshot
+        ))
+
+    failed: Dict[str, Set[str]] = {}
+    count, = r.unpack("I")
+    for _ in range(count):
+        clue_id = r.string()
+        failed[clue_id] = set(r.strings())
+
+    total_added, total_filtered = r.unpack("II")
+    state.candidate_index = CandidateIndex.restore(candidates, failed, total_added, total_filtered)
+
+    # === SolutionGrid ===
+    rows, cols, count = r.unpack("HHI")
+    if (rows, cols) != (solution.rows, solution.cols):
+        raise CheckpointError(
+            f"Grid size {rows}x{cols} doesn't match {solution.rows}x{solution.cols}"
+        )
+
+    cells: Dict[Tuple[int, int], SolutionCell] = {}
+    for _ in range(count):
+        row, col, confidence, is_conflict = r.unpack("HHdB")
+        if row >= rows or col >= cols:
+            raise CheckpointError(f"Cell ({row}, {col}) is out of bounds")
+        cells[(row, col)] = SolutionCell(
+            letter=r.string() or "",
+            confidence=confidence,
+            source_clues=r.strings(),
+            is_conflict=bool(is_conflict),
+            conflicting_letters=r.strings()
+        )
+
+    placed_clues = set(r.strings())
+    for clue_id in placed_clues:
+        clue_for(clue_id)
+
+    solution.restore_cells(cells, placed_clues)
+    strategy.restore_state(state)
+
+
+class FileCheckpointStore:
+    """שמירת checkpoint לקובץ (כתיבה אטומית - קריסה באמצע לא משאירה קובץ חלקי)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def save(self, data: bytes) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> Optional[bytes]:
+        if not self.path.exists():
+            return None
+        return self.path.read_bytes()
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+class SqliteCheckpointStore:
+    """שמירת checkpoint בטבלה solver_checkpoints (שורה אחת לכל מפתח - למשל שם התשבץ)"""
+
+    def __init__(self, key: str, db_manager: Optional[DatabaseManager] = None):
+        self.key = key
+        self.db = db_manager or DatabaseManager()
+
+    def save(self, data: bytes) -> None:
+        conn = self.db.get_connection()
+        conn.execute('''
+            INSERT OR REPLACE INTO solver_checkpoints (key, format_version, updated_at, data)
+            VALUES (?, ?, CURRENT_TIMESTAMP, ?)
+        ''', (self.key, CHECKPOINT_VERSION, data))
+        conn.commit()
+
+    def load(self) -> Optional[bytes]:
+        conn = self.db.get_connection()
+        row = conn.execute(
+            'SELECT data FROM solver_checkpoints WHERE key = ?', (self.key,)
+        ).fetchone()
+        return bytes(row['data']) if row else None
+
+    def clear(self) -> None:
+        conn = self.db.get_connection()
+        conn.execute('DELETE FROM solver_checkpoints WHERE key = ?', (self.key,))
+        conn.commit()
+
+
+class SolverCheckpointer:
+    """
+    שומר checkpoint של הסולבר כל N צעדים (צעד = שיבוץ / backtrack / שאילתא)
+    ולא יותר מפעם ב-min_interval שניות.
+
+    שימוש:
+        checkpointer = SolverCheckpointer(FileCheckpointStore("solve.ckpt"))
+        strategy.checkpointer = checkpointer
+        if not checkpointer.restore(strategy):
+            strategy.solve()
+        else:
+            strategy.resume()
+    """
+
+    def __init__(self, store, every_steps: int = 1, min_interval: float = 0.0):
+        """
+        Args:
+            store: FileCheckpointStore / SqliteCheckpointStore
+            every_steps: שמירה כל כמה צעדים (1 = אחרי כל שיבוץ)
+            min_interval: מרווח מינימלי בשניות בין שמירות
+        """
+        self.store = store
+        self.every_steps = max(1, every_steps)
+        self.min_interval = min_interval
+
+        self._steps_since_save = 0
+        self._last_save = 0.0
+        self.saves = 0
+        self.last_size = 0
+
+    def maybe_save(self, strategy: SolverStrategy) -> bool:
+        """נקרא אחרי כל צעד - שומר אם הגיע הזמן"""
+        self._steps_since_save += 1
+        if self._steps_since_save < self.every_steps:
+            return False
+        if self.min_interval and time.time() - self._last_save < self.min_interval:
+            return False
+
+        self.save(strategy)
+        return True
+
+    def save(self, strategy: SolverStrategy) -> None:
+        """שמירה מיידית"""
+        data = encode_checkpoint(strategy)
+        self.store.save(data)
+
+        self._steps_since_save = 0
+        self._last_save = time.time()
+        self.saves += 1
+        self.last_size = len(data)
+
+    def restore(self, strategy: SolverStrategy) -> bool:
+        """
+        משחזר את ה-checkpoint השמור (אם יש).
+
+        Returns:
+            True אם שוחזר, False אם אין checkpoint
+        """
+        data = self.store.load()
+        if data is None:
+            return False
+
+        restore_checkpoint(strategy, data)
+        return True
+
+    def clear(self) -> None:
+        """מחיקת ה-checkpoint (למשל אחרי פתרון מלא)"""
+        self.store.clear()
@@ -0,0 +1,335 @@
+"""
+Solver Snapshot - תמונת מצב של בעיית פתרון
+
+תמונת מצב כוללת עותק של ההגדרות, מטריצת הפתרון ואינדקס המועמדים,
+כך שאפשר לשלוח אותה ל-worker process ולהריץ עליה SolverStrategy עצמאי.
+התוצאה חוזרת כמיפוי clue_id → מילה ומשובצת בסולבר הראשי.
+
+SnapshotPoolSolver הוא הבסיס המשותף ל-PortfolioSolver ול-RestartSolver:
+שאילתא ראשונית אחת, process pool עם cache משותף, ביטול אחרי הפתרון המלא
+הראשון ובחירת התוצאה הטובה ביותר. כל סולבר מספק רק את רשימת המשימות
+ואת איסוף התוצאות.
+"""
+
+import copy
+import multiprocessing
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from models.clue_entry import ClueEntry
+from services.clue_database import ClueDatabase
+from services.solution_grid import SolutionGrid
+from services.clue_solver import ClueSolver
+from services.candidate_index import CandidateIndex
+from services.solver_strategy import SolverStrategy, SolvePhase, SolveStatus
+
+
+@dataclass
+class SolveSnapshot:
+    """תמונת מצב של בעיית פתרון (ניתנת ל-pickle)"""
+    clues: List[ClueEntry]
+    solution: SolutionGrid
+    candidate_index: CandidateIndex
+    max_backtracks: int = 100
+
+    @classmethod
+    def capture(
+        cls,
+        strategy: SolverStrategy,
+        clue_ids: Optional[Set[str]] = None
+    ) -> 'SolveSnapshot':
+        """
+        יוצר תמונת מצב מסולבר קיים.
+
+        Args:
+            strategy: הסולבר הראשי (אחרי prepare)
+            clue_ids: ההגדרות שייכללו (ברירת מחדל: כל ההגדרות שלא נפתרו)
+
+        Returns:
+            SolveSnapshot עם עותקים עצמאיים של כל הנתונים
+        """
+        states = [
+            s for s in strategy.state.clue_states.values()
+            if not s.is_solved and (clue_ids is None or s.clue.id in clue_ids)
+        ]
+        ids = {s.clue.id for s in states}
+
+        return cls(
+            clues=[copy.deepcopy(s.clue) for s in states],
+            solution=copy.deepcopy(strategy.solution),
+            candidate_index=strategy.state.candidate_index.subset(ids),
+            max_backtracks=strategy.max_backtracks
+        )
+
+    def build_strategy(self, clue_solver: ClueSolver) -> SolverStrategy:
+        """בונה SolverStrategy עצמאי מעל תמונת המצב"""
+        clue_db = ClueDatabase()
+        for clue in self.clues:
+            clue_db.add_clue(clue)
+
+        return SolverStrategy(clue_db, self.solution, clue_solver, self.max_backtracks)
+
+
+@dataclass
+class SnapshotResult:
+    """תוצאת פתרון של תמונת מצב"""
+    assignments: Dict[str, str] = field(default_factory=dict)  # clue_id → מילה
+    status: SolveStatus = SolveStatus.IN_PROGRESS
+    backtracks: int = 0
+    query_count: int = 0
+    filled_cells: int = 0
+    confidence: float = 0.0  # סכום הביטחון של המילים ששובצו
+    elapsed: float = 0.0
+    label: str = ""  # שם התצורה שהפיקה את התוצאה
+    error: Optional[str] = None
+
+    @property
+    def score(self) -> Tuple[bool, int, float]:
+        """להשוואה בין תוצאות: פתרון מלא, ואז משבצות מלאות, ואז ביטחון"""
+        return (self.status == SolveStatus.SOLVED, self.filled_cells, self.confidence)
+
+
+def collect_result(
+    strategy: SolverStrategy,
+    status: SolveStatus,
+    start_time: float,
+    label: str = ""
+) -> SnapshotResult:
+    """אוסף את השיבוצים מסולבר שסיים לרוץ"""
+    assignments = {}
+    confidence = 0.0
+
+    for clue_id, state in strategy.state.clue_states.items():
+        if not state.is_solved or state.is_manual or not state.placed_word:
+            continue
+
+        assignments[clue_id] = state.placed_word
+        for candidate in strategy.state.candidate_index.get_candidates_for_clue(clue_id):
+            if candidate.word == state.placed_word:
+                confidence += candidate.confidence
+                break
+
+    return SnapshotResult(
+        assignments=assignments,
+        status=status,
+        backtracks=strategy.state.backtracks,
+        query_count=strategy.state.query_count,
+        filled_cells=strategy.solution.get_statistics()['filled_cells'],
+        confidence=confidence,
+        elapsed=time.time() - start_time,
+        label=label
+    )
+
+
+def solve_snapshot(snapshot: SolveSnapshot, clue_solver: ClueSolver) -> SnapshotResult:
+    """
+    פותר תמונת מצב (פונקציה ברמת המודול - ניתנת להרצה ב-ProcessPoolExecutor).
+
+    Args:
+        snapshot: תמונת המצב
+        clue_solver: שירות התשובות (נוצר client חדש בתהליך ה-worker)
+
+    Returns:
+        SnapshotResult
+    """
+    start = time.time()
+    strategy = snapshot.build_strategy(clue_solver)
+    progress = strategy.solve(candidate_index=snapshot.candidate_index)
+
+    return collect_result(strategy, progress.status, start)
+
+
+# מצב ה-worker process (נקבע פעם אחת ב-initializer של ה-pool)
+_worker_state: Dict = {}
+
+
+def _init_pool_worker(snapshot: SolveSnapshot, clue_solver: ClueSolver, cancel_event) -> None:
+    _worker_state['snapshot'] = snapshot
+    _worker_state['clue_solver'] = clue_solver
+    _worker_state['cancel_event'] = cancel_event
+
+
+def _run_pool_task(func: Callable, args: Tuple, deadline: Optional[float]) -> Any:
+    return func(
+        *args, _worker_state['snapshot'], _worker_state['clue_solver'],
+        _worker_state['cancel_event'], deadline
+    )
+
+
+class SnapshotPoolSolver(ABC):
+    """
+    בסיס לסולברים שמריצים כמה משימות על אותה תמונת מצב ובוחרים את הטובה ביותר.
+
+    תהליך:
+    1. שאילתא ראשונית אחת (נשמרת ב-cache המשותף ובאינדקס המועמדים)
+    2. תמונת המצב, ה-cache המשותף וה-cancel_event נשלחים לכל worker פעם אחת
+       (initializer); כל משימה מעתיקה את תמונת המצב מקומית
+    3. פתרון מלא ראשון מבטל את השאר; אחרת - הטוב ביותר עד ה-deadline
+    4. התוצאה המנצחת משובצת ב-SolutionGrid המשותף
+
+    תת-מחלקה מגדירה (חובה - אחרת היא לא ניתנת ליצירה):
+        task_function: staticmethod(func) של func(*args, snapshot, clue_solver,
+            cancel_event, deadline) ברמת המודול (ניתנת ל-pickle)
+        tasks(): רשימת ה-args לכל משימה, לפי סדר ההרצה
+    ואופציונלית:
+        _collect(output): SnapshotResult מתוך מה שהמשימה החזירה
+    """
+
+    DEADLINE_GRACE = 2.0  # שניות להמתנה לתוצאות חלקיות אחרי ה-deadline
+
+    @staticmethod
+    @abstractmethod
+    def task_function(*args) -> Any:
+        """המשימה שרצה ב-worker"""
+
+    def __init__(
+        self,
+        clue_db: ClueDatabase,
+        solution: SolutionGrid,
+        clue_solver: ClueSolver,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True
+    ):
+        """
+        Args:
+            clue_db: מאגר ההגדרות
+            solution: מטריצת הפתרון המשותפת
+            clue_solver: שירות התשובות
+            max_workers: מקסימום תהליכים (None = ברירת המחדל של ProcessPoolExecutor)
+            use_processes: False = הרצה בזו אחר זו בתהליך הנוכחי
+        """
+        self.clue_db = clue_db
+        self.solution = solution
+        self.clue_solver = clue_solver
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+        self.strategy = SolverStrategy(clue_db, solution, clue_solver)
+        self.results: List[SnapshotResult] = []
+
+    @abstractmethod
+    def tasks(self) -> List[Tuple]:
+        """ה-args של כל משימה (לפני snapshot, clue_solver, cancel_event, deadline)"""
+
+    def _collect(self, output: Any) -> SnapshotResult:
+        """SnapshotResult מתוך הפלט של משימה (ברירת מחדל: הפלט עצמו)"""
+        return output
+
+    def _collect_error(self, error: Exception) -> SnapshotResult:
+        """תוצאה למשימה שה-worker שלה נכשל"""
+        return SnapshotResult(status=SolveStatus.FAILED, error=str(error))
+
+    def solve(self, time_limit: Optional[float] = None) -> Optional[SnapshotResult]:
+        """
+        מריץ את המשימות.
+
+        Args:
+            time_limit: זמן מקסימלי בשניות (None = עד שכל המשימות מסתיימות)
+
+        Returns:
+            התוצאה המנצחת (או None אם אף משימה לא החזירה תוצאה)
+        """
+        deadline = time.time() + time_limit if time_limit else None
+        self.results = []
+
+        if self.use_processes:
+            with multiprocessing.Manager() as manager:
+                shared_cache = manager.dict()
+                shared_solver = self.clue_solver.share_cache(shared_cache)
+                cancel_event = manager.Event()
+
+                snapshot = self._prepare(shared_solver)
+                self._run_pool(snapshot, shared_solver, cancel_event, deadline)
+
+                self.clue_solver.merge_cache(shared_cache.copy())
+        else:
+            snapshot = self._prepare(self.clue_solver)
+            self._run_inline(snapshot, deadline)
+
+        self.strategy.solver = self.clue_solver
+
+        valid = [r for r in self.results if not r.error]
+        if not valid:
+            return None
+
+        best = max(valid, key=lambda r: r.score)
+        self.strategy.apply_assignments(best.assignments)
+        if self.strategy.state.solve_phase != SolvePhase.COMPLETED:
+            self.strategy.state.solve_phase = SolvePhase.STUCK
+
+        return best
+
+    def _prepare(self, clue_solver: ClueSolver) -> SolveSnapshot:
+        """שאילתא ראשונית אחת לכל המשימות"""
+        self.strategy.solver = clue_solver
+        self.strategy.prepare()
+        return SolveSnapshot.capture(self.strategy)
+
+    def _add(self, result: SnapshotResult) -> bool:
+        """שמירת תוצאה; True אם זה פתרון מלא"""
+        self.results.append(result)
+        return result.status == SolveStatus.SOLVED
+
+    def _run_inline(self, snapshot: SolveSnapshot, deadline: Optional[float]) -> None:
+        """הרצה בזו אחר זו - עוצרים בפתרון המלא הראשון"""
+        for args in self.tasks():
+            if deadline is not None and time.time() >= deadline:
+                break
+
+            output = self.task_function(*args, snapshot, self.clue_solver, None, deadline)
+            if self._add(self._collect(output)):
+                break
+
+    def _run_pool(self, snapshot, clue_solver, cancel_event, deadline) -> None:
+        """הרצה במקביל - הפתרון המלא הראשון מבטל את השאר"""
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_pool_worker,
+            initargs=(snapshot, clue_solver, cancel_event)
+        )
+        pending = {
+            executor.submit(_run_pool_task, self.task_function, args, deadline)
+            for args in self.tasks()
+        }
+
+        try:
+            while pending:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.time()) + self.DEADLINE_GRACE
+
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break  # עבר ה-deadline וה-workers לא החזירו תוצאה
+
+                solved = False
+                for future in done:
+                    try:
+                        result = self._collect(future.result())
+                    except Exception as e:
+                        result = self._collect_error(e)
+                    solved = self._add(result) or solved
+
+                if solved:
+                    break
+        finally:
+            cancel_event.set()
+            running = [future for future in pending if not future.cancel()]
+            self._stop_workers(executor, running, deadline)
+
+    def _stop_workers(self, executor: ProcessPoolExecutor, running: List, deadline: Optional[float]) -> None:
+        """
+        סוגר את ה-pool לפני שה-Manager נסגר - משימה שרצה צריכה את ה-proxies
+        (cache, cancel_event) חיים. הביטול נבדק אחרי כל צעד וקריאות ה-LLM מוגבלות
+        ב-deadline, כך שבדרך כלל ההמתנה קצרה; worker שעדיין רץ אחרי
+        ה-deadline + DEADLINE_GRACE נעצר בכוח, כדי ש-solve() לא יחרוג מהזמן.
+        """
+        if running and deadline is not None:
+            _, running = wait(running, timeout=max(0.0, deadline + self.DEADLINE_GRACE - time.time()))
+            if running:
+                for process in list((executor._processes or {}).values()):
+                    process.terminate()
+        executor.shutdown(wait=True)
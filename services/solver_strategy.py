@@ -8,15 +8,16 @@ Solver Strategy - אסטרטגיית הפתרון החדשה
 4. Backtracking - חזרה אחורה כשנתקעים
 """
 
+import random
 import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple, Callable
+from typing import Dict, Iterator, List, Optional, Tuple, Callable
 from enum import Enum
 
 from models.clue_entry import ClueEntry
 from services.clue_database import ClueDatabase
 from services.solution_grid import SolutionGrid, PlacementStatus
-from services.clue_solver import ClueSolver, SolverResult
+from services.clue_solver import ClueSolver, SolverResult, DEADLINE_EXCEEDED
 from services.candidate_index import CandidateIndex, CandidateWord
 
 
@@ -28,6 +29,7 @@ class SolvePhase(Enum):
     BACKTRACKING = "backtracking"
     COMPLETED = "completed"
     STUCK = "stuck"
+    TIMED_OUT = "timed_out"  # נגמר הזמן - שוחזר הפתרון החלקי הטוב ביותר
 
 
 class SolveStatus(Enum):
@@ -37,17 +39,48 @@ class SolveStatus(Enum):
     SOLVED = "solved"
     STUCK = "stuck"
     FAILED = "failed"
+    TIMED_OUT = "timed_out"
 
 
-@dataclass
 class ClueState:
-    """מצב הגדרה בתהליך הפתרון"""
-    clue: ClueEntry
-    is_solved: bool = False
-    placed_word: Optional[str] = None
-    last_query_phase: int = 0
-    known_letters_at_query: str = ""  # תבנית בזמן השאילתא האחרונה
-    is_manual: bool = False  # האם הוכנס ידנית
+    """מצב הגדרה בתהליך הפתרון (__slots__ - מופע לכל הגדרה)"""
+
+    __slots__ = (
+        'clue',
+        'is_solved',
+        'placed_word',
+        'last_query_phase',
+        'known_letters_at_query',  # תבנית בזמן השאילתא האחרונה
+        'is_manual',               # האם הוכנס ידנית
+        'placed_confidence',       # ביטחון המועמד ששובץ
+        'query_expired',           # השאילתא האחרונה לא נענתה כי נגמר הזמן
+    )
+
+    def __init__(
+        self,
+        clue: ClueEntry,
+        is_solved: bool = False,
+        placed_word: Optional[str] = None,
+        last_query_phase: int = 0,
+        known_letters_at_query: str = "",
+        is_manual: bool = False,
+        placed_confidence: float = 0.0,
+        query_expired: bool = False
+    ):
+        self.clue = clue
+        self.is_solved = is_solved
+        self.placed_word = placed_word
+        self.last_query_phase = last_query_phase
+        self.known_letters_at_query = known_letters_at_query
+        self.is_manual = is_manual
+        self.placed_confidence = placed_confidence
+        self.query_expired = query_expired
+
+    def __repr__(self) -> str:
+        return (
+            f"ClueState(clue={self.clue.id!r}, is_solved={self.is_solved!r}, "
+            f"placed_word={self.placed_word!r}, is_manual={self.is_manual!r})"
+        )
 
     @property
     def current_pattern(self) -> str:
@@ -59,6 +92,8 @@ class ClueState:
         """האם צריך לשאול שוב"""
         if self.is_solved:
             return False
+        if self.query_expired:
+            return True
         current = self.current_pattern
         last = self.known_letters_at_query
         # צריך re-query אם יש אותיות חדשות
@@ -72,6 +107,7 @@ class SolverState:
     candidate_index: CandidateIndex = field(default_factory=CandidateIndex)
     current_phase: int = 1
     solve_phase: SolvePhase = SolvePhase.INITIAL_QUERY
+    interrupted_phase: Optional[SolvePhase] = None  # השלב שבו נגמר הזמן (ל-resume)
 
     # מעקב אותיות
     total_solution_cells: int = 0
@@ -81,6 +117,11 @@ class SolverState:
     # מעקב שיבוצים
     placement_stack: List[Tuple[str, str, bool]] = field(default_factory=list)  # (clue_id, word, is_manual)
     backtracks: int = 0
+    forward_check_rejections: int = 0  # שיבוצים שנדחו בבדיקה המקדימה
+
+    # הפתרון החלקי הטוב ביותר שנראה (לשחזור כשנגמר הזמן)
+    best_placements: List[Tuple[str, str, float]] = field(default_factory=list)  # (clue_id, word, confidence)
+    best_score: Tuple[int, float] = (0, 0.0)  # (משבצות מלאות, סכום ביטחון)
 
     # זמנים
     start_time: float = 0.0
@@ -129,6 +170,12 @@ class SolverStrategy:
     MAX_BACKTRACKS = 100
     HIGH_CONFIDENCE_THRESHOLD = 0.85  # מעל זה - שבץ מיד
 
+    # סדר בחירת ההגדרה הבאה לשיבוץ
+    ORDERING_SCORE = "score"  # combined_score הגבוה ביותר
+    ORDERING_MRV = "mrv"      # הכי מעט מועמדים תקינים קודם (ואז combined_score)
+
+    FINAL_PHASES = (SolvePhase.COMPLETED, SolvePhase.STUCK, SolvePhase.TIMED_OUT)
+
     def __init__(
         self,
         clue_db: ClueDatabase,
@@ -141,21 +188,51 @@ class SolverStrategy:
         self.solver = clue_solver
         self.max_backtracks = max_backtracks
 
+        self.ordering = self.ORDERING_SCORE
+
+        # בדיקה מקדימה: דוחים שיבוץ שמרוקן הגדרה מצטלבת מכל המועמדים
+        self.forward_check = True
+
+        # הפרעה אקראית לציוני המועמדים (לריסטארטים - services.restart_solver)
+        self.perturbation_seed: Optional[int] = None
+        self.perturbation_strength = 0.0
+        self._perturbation_noise: Dict[Tuple[str, str], float] = {}
+
         self.state = SolverState()
         self.callbacks = SolverCallbacks()
 
         # בקרת ריצה
         self._should_pause = False
         self._is_running = False
+        self._deadline: Optional[float] = None  # time.time() שאחריו עוצרים
+        self._initialized = False
+
+        # שמירת checkpoint אחרי צעדים (SolverCheckpointer מ-services.solver_checkpoint)
+        self.checkpointer = None
+
+        # כיול הביטחון (ConfidenceCalibrator מ-services.confidence_calibration) - None = ביטחון גולמי.
+        # מועמדים נכנסים לאינדקס עם ביטחון מכויל, כך שהסף HIGH_CONFIDENCE_THRESHOLD
+        # ו-combined_score עובדים על הסתברות אמיתית
+        self.calibrator = None
 
     def set_callbacks(self, callbacks: SolverCallbacks) -> None:
         """הגדרת callbacks"""
         self.callbacks = callbacks
 
-    def initialize(self) -> None:
-        """אתחול הסולבר"""
+    def initialize(self, candidate_index: Optional[CandidateIndex] = None) -> None:
+        """
+        אתחול הסולבר.
+
+        Args:
+            candidate_index: אינדקס מועמדים קיים (תמונת מצב) - אופציונלי
+        """
         self.state = SolverState()
         self.state.start_time = time.time()
+        if candidate_index is not None:
+            self.state.candidate_index = candidate_index
+        if self.calibrator is not None:
+            self.state.candidate_index.calibrator = self.calibrator
+        self._initialized = True
 
         # יצירת ClueState לכל הגדרה
         for clue in self.clue_db.clues:
@@ -166,51 +243,134 @@ class SolverStrategy:
             clue.answer_length for clue in self.clue_db.clues
         ) // 2  # בערך - כי יש חפיפות
 
-    def solve(self) -> SolveProgress:
+        self.state.best_score = self._partial_score()
+
+    def prepare(self, candidate_index: Optional[CandidateIndex] = None) -> None:
+        """
+        אתחול ושאילתא ראשונית, בלי להתחיל לשבץ.
+
+        Args:
+            candidate_index: אם ניתן - משתמשים בו במקום השאילתא הראשונית
+        """
+        self.initialize(candidate_index)
+
+        if candidate_index is None:
+            # Phase 1: Initial Query
+            self._phase1_initial_query()
+        else:
+            self.state.solve_phase = SolvePhase.PROPAGATION
+
+    def solve(
+        self,
+        candidate_index: Optional[CandidateIndex] = None,
+        time_limit: Optional[float] = None
+    ) -> SolveProgress:
         """
-        פותר את התשבץ.
+        פותר את התשבץ מההתחלה (מאפס את המצב).
+
+        Args:
+            candidate_index: אינדקס מועמדים קיים - מדלג על השאילתא הראשונית
+            time_limit: זמן מקסימלי בשניות (כולל שאילתות LLM). כשנגמר הזמן
+                        משוחזר הפתרון החלקי הטוב ביותר שנראה (anytime)
 
         Returns:
             SolveProgress עם התוצאות
         """
+        self.initialize(candidate_index)
+        if candidate_index is not None:
+            self.state.solve_phase = SolvePhase.PROPAGATION
+
+        return self._run(time_limit)
+
+    def _run(self, time_limit: Optional[float] = None) -> SolveProgress:
+        """מריץ צעדים עד סיום, עצירה או deadline"""
+        for _ in self.iter_steps(time_limit):
+            pass
+        return self._get_progress()
+
+    def iter_steps(self, time_limit: Optional[float] = None) -> Iterator[SolveProgress]:
+        """
+        מריץ את הפתרון כ-generator - צעד אחד בכל איטרציה.
+
+        ממשיך מהשלב והמצב הנוכחיים (בלי אתחול). נעצר כשהפתרון הסתיים,
+        כשנקרא pause() או כשעבר ה-deadline.
+
+        Args:
+            time_limit: זמן מקסימלי בשניות להרצה הזו
+
+        Yields:
+            SolveProgress אחרי כל צעד
+        """
+        if not self._initialized:
+            self.initialize()
+
         self._is_running = True
         self._should_pause = False
-        self.initialize()
+        self._deadline = time.time() + time_limit if time_limit is not None else None
 
         try:
-            # Phase 1: Initial Query
+            while not self._should_pause and self.state.solve_phase not in self.FINAL_PHASES:
+                self.step()
+                yield self._get_progress()
+        finally:
+            self._is_running = False
+            self._deadline = None
+
+    def step(self) -> bool:
+        """
+        מבצע צעד אחד במכונת המצבים לפי השלב הנוכחי.
+
+        Returns:
+            True אם אפשר להמשיך, False אם הפתרון הסתיים
+        """
+        if self.state.solve_phase in self.FINAL_PHASES:
+            return False
+
+        if self._deadline_passed():
+            self._restore_best()
+            self.state.interrupted_phase = self.state.solve_phase
+            self.state.solve_phase = SolvePhase.TIMED_OUT
+            if self.checkpointer is not None:
+                self.checkpointer.maybe_save(self)
+            return False
+
+        if self.state.solve_phase == SolvePhase.INITIAL_QUERY:
             self._phase1_initial_query()
 
-            # Main loop
-            while not self._should_pause and self.state.solve_phase not in [
-                SolvePhase.COMPLETED, SolvePhase.STUCK
-            ]:
-                if self.state.solve_phase == SolvePhase.PROPAGATION:
-                    if not self._phase2_propagate():
-                        # לא הצלחנו להתקדם
-                        if self._should_requery():
-                            self.state.solve_phase = SolvePhase.REQUERY
-                        else:
-                            self.state.solve_phase = SolvePhase.BACKTRACKING
-
-                elif self.state.solve_phase == SolvePhase.REQUERY:
-                    self._phase3_requery()
-                    self.state.solve_phase = SolvePhase.PROPAGATION
-
-                elif self.state.solve_phase == SolvePhase.BACKTRACKING:
-                    if not self._phase4_backtrack():
-                        self.state.solve_phase = SolvePhase.STUCK
-                    else:
-                        self.state.solve_phase = SolvePhase.PROPAGATION
-
-                # בדיקה אם סיימנו
-                if self._is_solved():
-                    self.state.solve_phase = SolvePhase.COMPLETED
+        elif self.state.solve_phase == SolvePhase.PROPAGATION:
+            if not self._phase2_propagate():
+                # לא הצלחנו להתקדם
+                if self._should_requery():
+                    self.state.solve_phase = SolvePhase.REQUERY
+                else:
+                    self.state.solve_phase = SolvePhase.BACKTRACKING
 
-        finally:
-            self._is_running = False
+        elif self.state.solve_phase == SolvePhase.REQUERY:
+            self._phase3_requery()
+            self.state.solve_phase = SolvePhase.PROPAGATION
 
-        return self._get_progress()
+        elif self.state.solve_phase == SolvePhase.BACKTRACKING:
+            if not self._phase4_backtrack():
+                self.state.solve_phase = SolvePhase.STUCK
+            else:
+                self.state.solve_phase = SolvePhase.PROPAGATION
+
+        # בדיקה אם סיימנו
+        if self._is_solved():
+            self.state.solve_phase = SolvePhase.COMPLETED
+
+        # גם כשנתקעים - הפתרון החלקי הטוב ביותר עדיף על מה שנשאר אחרי backtracking
+        if self.state.solve_phase == SolvePhase.STUCK:
+            self._restore_best()
+
+        if self.checkpointer is not None:
+            self.checkpointer.maybe_save(self)
+
+        return self.state.solve_phase not in self.FINAL_PHASES
+
+    def _deadline_passed(self) -> bool:
+        """האם עבר ה-deadline"""
+        return self._deadline is not None and time.time() >= self._deadline
 
     def _phase1_initial_query(self) -> None:
         """Phase 1: שאילתא ראשונית לכל ההגדרות"""
@@ -228,18 +388,19 @@ class SolverStrategy:
             return
 
         # שאילתא קבוצתית
-        results = self.solver.solve_batch(clues_to_query)
+        results = self.solver.solve_batch(clues_to_query, deadline=self._deadline)
         self.state.query_count += 1
 
         # בניית CandidateIndex
         for clue_id, result in results.items():
-            if result.error or not result.candidates:
-                continue
-
             clue_state = self.state.clue_states.get(clue_id)
             if not clue_state:
                 continue
 
+            clue_state.query_expired = self._query_expired(result)
+            if result.error or not result.candidates:
+                continue
+
             # המרה ל-CandidateWord
             for answer, confidence in result.candidates:
                 candidate = CandidateWord(
@@ -259,12 +420,18 @@ class SolverStrategy:
         self.state.solve_phase = SolvePhase.PROPAGATION
         self._notify_phase_change()
 
+    def _query_expired(self, result: SolverResult) -> bool:
+        """האם התשובה חסרה כי נגמר הזמן (ולא כי למודל אין מה להציע)"""
+        if not result.error:
+            return False
+        return result.error == DEADLINE_EXCEEDED or self._deadline_passed()
+
     def _phase2_propagate(self) -> bool:
         """
         Phase 2: הפצת אילוצים ושיבוץ.
 
         Returns:
-            True אם הצלחנו לשבץ משהו, False אם נתקענו
+            True אם הצלחנו לשבץ משהו (או לפסול מועמד בבדיקה המקדימה), False אם נתקענו
         """
         # מצא את ההגדרה הטובה ביותר לשיבוץ
         best_clue_state, best_candidate = self._select_best_to_place()
@@ -273,9 +440,45 @@ class SolverStrategy:
             return False
 
         # שיבוץ המילה
-        success = self._place_word(best_clue_state, best_candidate.word)
+        rejections = self.state.forward_check_rejections
+        success = self._place_word(
+            best_clue_state, best_candidate.word, best_candidate.confidence
+        )
+
+        # מועמד שנפסל בבדיקה המקדימה הוסר מהאינדקס - ממשיכים לבחירה הבאה
+        return success or self.state.forward_check_rejections > rejections
+
+    def place_confident_words(self) -> int:
+        """
+        משבץ רק מילים ודאיות: מועמד תקין יחיד או ביטחון מעל HIGH_CONFIDENCE_THRESHOLD.
+        חוזר על הסריקה עד שאין עוד מה לשבץ.
+
+        Returns:
+            מספר המילים ששובצו
+        """
+        placed = 0
+        progress = True
 
-        return success
+        while progress:
+            progress = False
+
+            for clue_id, clue_state in self.state.clue_states.items():
+                if clue_state.is_solved:
+                    continue
+
+                candidates = self.state.candidate_index.get_valid_candidates_for_clue(
+                    clue_id, clue_state.current_pattern
+                )
+                if not candidates:
+                    continue
+
+                best = candidates[0]
+                if len(candidates) == 1 or best.confidence >= self.HIGH_CONFIDENCE_THRESHOLD:
+                    if self._place_word(clue_state, best.word, best.confidence):
+                        placed += 1
+                    progress = True
+
+        return placed
 
     def _select_best_to_place(self) -> Tuple[Optional[ClueState], Optional[CandidateWord]]:
         """
@@ -285,10 +488,11 @@ class SolverStrategy:
         1. הגדרה עם מועמד יחיד תקין
         2. הגדרה עם מועמד בביטחון גבוה מאוד (>0.85)
         3. הגדרה עם combined_score הגבוה ביותר
+           (ב-ORDERING_MRV: קודם הגדרה עם הכי מעט מועמדים)
         """
         best_state = None
         best_candidate = None
-        best_score = -1
+        best_score: Optional[Tuple[float, ...]] = None
 
         for clue_id, clue_state in self.state.clue_states.items():
             if clue_state.is_solved:
@@ -306,26 +510,59 @@ class SolverStrategy:
             if len(candidates) == 1:
                 return clue_state, candidates[0]
 
+            if self.perturbation_strength > 0:
+                candidates = sorted(candidates, key=self._perturbed_score, reverse=True)
+
             # עדיפות 2: ביטחון גבוה מאוד
             if candidates[0].confidence >= self.HIGH_CONFIDENCE_THRESHOLD:
-                score = candidates[0].combined_score * 2  # בונוס
+                base_score = self._perturbed_score(candidates[0]) * 2  # בונוס
             else:
-                score = candidates[0].combined_score
+                base_score = self._perturbed_score(candidates[0])
 
-            if score > best_score:
+            if self.ordering == self.ORDERING_MRV:
+                score = (-len(candidates), base_score)
+            else:
+                score = (base_score,)
+
+            if best_score is None or score > best_score:
                 best_score = score
                 best_state = clue_state
                 best_candidate = candidates[0]
 
         return best_state, best_candidate
 
-    def _place_word(self, clue_state: ClueState, word: str) -> bool:
+    def _perturbed_score(self, candidate: CandidateWord) -> float:
+        """
+        combined_score אחרי הפרעה: כפל ב-(1 ± perturbation_strength).
+        ההפרעה קבועה לכל (הגדרה, מילה) לאורך הריצה ונקבעת מ-perturbation_seed.
+        """
+        if self.perturbation_strength <= 0:
+            return candidate.combined_score
+
+        key = (candidate.clue_id, candidate.word)
+        noise = self._perturbation_noise.get(key)
+        if noise is None:
+            rng = random.Random(f"{self.perturbation_seed}|{candidate.clue_id}|{candidate.word}")
+            noise = rng.uniform(-1.0, 1.0)
+            self._perturbation_noise[key] = noise
+
+        return candidate.combined_score * (1.0 + self.perturbation_strength * noise)
+
+    def _place_word(
+        self,
+        clue_state: ClueState,
+        word: str,
+        confidence: Optional[float] = None,
+        forward_check: bool = True
+    ) -> bool:
         """
         משבץ מילה שלמה.
 
         Args:
             clue_state: מצב ההגדרה
             word: המילה לשיבוץ
+            confidence: ביטחון המועמד (None = חיפוש באינדקס)
+            forward_check: בדיקה מקדימה של ההגדרות המצטלבות (אם self.forward_check)
 
         Returns:
             True אם הצליח
@@ -339,12 +576,22 @@ class SolverStrategy:
             self.state.candidate_index.mark_as_failed(clue.id, word)
             return False
 
+        # בדיקה מקדימה - לפני כל שינוי בגריד ובאינדקס
+        if forward_check and self.forward_check and self._forward_check(clue, word):
+            self.state.candidate_index.mark_as_failed(clue.id, word)
+            self.state.forward_check_rejections += 1
+            return False
+
         # שיבוץ בגריד
         self.solution.place_answer(clue, word, confidence=1.0)
 
         # עדכון מצב
         clue_state.is_solved = True
         clue_state.placed_word = word
+        clue_state.placed_confidence = (
+            confidence if confidence is not None
+            else self._candidate_confidence(clue.id, word)
+        )
 
         # הוספה לstack
         self.state.placement_stack.append((clue.id, word, False))
@@ -357,6 +604,8 @@ class SolverStrategy:
         # סינון מועמדים לא תואמים
         self._filter_incompatible_candidates(clue, word)
 
+        self._record_best()
+
         # Callback
         if self.callbacks.on_word_placed:
             self.callbacks.on_word_placed(clue.id, word, clue.answer_cells)
@@ -365,6 +614,95 @@ class SolverStrategy:
 
         return True
 
+    def _forward_check(self, clue: ClueEntry, word: str) -> Optional[str]:
+        """
+        בודק אם שיבוץ המילה ירוקן הגדרה מצטלבת שלא נפתרה מכל המועמדים.
+        הגדרה שכבר אין לה מועמדים (ממתינה ל-re-query) לא נחשבת.
+
+        Returns:
+            clue_id של ההגדרה שהייתה מתרוקנת, או None אם השיבוץ בטוח
+        """
+        index = self.state.candidate_index
+
+        for other_id, pairs in self.clue_db.get_crossing_graph().get(clue.id, {}).items():
+            other_state = self.state.clue_states.get(other_id)
+            if not other_state or other_state.is_solved:
+                continue
+
+            pattern = other_state.current_pattern
+            letters = {
+                other_idx: word[my_idx] for my_idx, other_idx in pairs
+                if pattern[other_idx] == '_'
+            }
+            if not letters:
+                continue
+
+            if not index.has_valid_candidate(other_id, pattern, letters) and \
+                    index.has_valid_candidate(other_id, pattern):
+                return other_id
+
+        return None
+
+    def _candidate_confidence(self, clue_id: str, word: str) -> float:
+        """ביטחון מועמד מהאינדקס (0 אם אינו קיים)"""
+        for candidate in self.state.candidate_index.get_candidates_for_clue(clue_id):
+            if candidate.word == word:
+                return candidate.confidence
+        return 0.0
+
+    # === Anytime ===
+
+    def _partial_score(self) -> Tuple[int, float]:
+        """ציון הפתרון החלקי הנוכחי: (משבצות מלאות, סכום ביטחון)"""
+        confidence = sum(
+            state.placed_confidence for state in self.state.clue_states.values()
+            if state.is_solved
+        )
+        return self.solution.get_filled_count(), confidence
+
+    def _record_best(self) -> None:
+        """שומר את הפתרון הנוכחי אם הוא הטוב ביותר עד כה"""
+        score = self._partial_score()
+        if score > self.state.best_score:
+            self.state.best_score = score
+            self.state.best_placements = [
+                (clue_id, word, self.state.clue_states[clue_id].placed_confidence)
+                for clue_id, word, is_manual in self.state.placement_stack
+                if not is_manual
+            ]
+
+    def _restore_best(self) -> None:
+        """
+        משחזר את הפתרון החלקי הטוב ביותר שנראה, אם הנוכחי גרוע ממנו.
+        תשובות ידניות לא נוגעות.
+        """
+        if self._partial_score() >= self.state.best_score:
+            return
+
+        # הסרת כל השיבוצים האוטומטיים
+        for clue_id, word, is_manual in reversed(self.state.placement_stack):
+            if is_manual:
+                continue
+            clue_state = self.state.clue_states[clue_id]
+            self.solution.remove_answer(clue_state.clue)
+            clue_state.is_solved = False
+            clue_state.placed_word = None
+            clue_state.placed_confidence = 0.0
+
+        self.state.placement_stack = [p for p in self.state.placement_stack if p[2]]
+
+        # שיבוץ מחדש של הפתרון הטוב ביותר
+        for clue_id, word, confidence in self.state.best_placements:
+            clue_state = self.state.clue_states[clue_id]
+            self.solution.place_answer(clue_state.clue, word, confidence=1.0)
+            clue_state.is_solved = True
+            clue_state.placed_word = word
+            clue_state.placed_confidence = confidence
+            self.state.placement_stack.append((clue_id, word, False))
+
+        self._recalculate_known_letters()
+        self._notify_progress()
+
     def _update_intersecting_clues(self, placed_clue: ClueEntry, word: str) -> int:
         """
         מעדכן אותיות ידועות בהגדרות מצטלבות.
@@ -442,26 +780,35 @@ class SolverStrategy:
                 clues_to_requery.append(clue_state.clue)
 
         if not clues_to_requery:
+            # אין מה לשאול - מאפסים את המונה כדי לא לחזור ל-REQUERY בלולאה
+            self.state.letters_since_query = 0
             return
 
         # Callback
         if self.callbacks.on_requery:
             self.callbacks.on_requery(len(clues_to_requery))
 
-        # שאילתא
+        # שאילתא - עם המילים שנכשלו והמועמדים הקיימים כהחרגה, כדי לקבל רק מידע חדש
+        exclude = {
+            clue.id: self.state.candidate_index.get_exclusions(
+                clue.id, self.state.clue_states[clue.id].current_pattern
+            )
+            for clue in clues_to_requery
+        }
         self.state.current_phase += 1
-        results = self.solver.solve_batch(clues_to_requery)
+        results = self.solver.solve_batch(clues_to_requery, deadline=self._deadline, exclude=exclude)
         self.state.query_count += 1
 
         # מיזוג תוצאות
         for clue_id, result in results.items():
-            if result.error or not result.candidates:
-                continue
-
             clue_state = self.state.clue_states.get(clue_id)
             if not clue_state:
                 continue
 
+            clue_state.query_expired = self._query_expired(result)
+            if result.error or not result.candidates:
+                continue
+
             # המרה ל-CandidateWord ומיזוג
             new_candidates = []
             for answer, confidence in result.candidates:
@@ -544,35 +891,14 @@ class SolverStrategy:
         return True
 
     def _recalculate_known_letters(self) -> None:
-        """מחשב מחדש את known_letters לכל ההגדרות"""
-        # איפוס
-        for clue in self.clue_db.clues:
-            clue.known_letters = {}
-
-        # עדכון מהגריד
-        for clue_id, clue_state in self.state.clue_states.items():
-            if not clue_state.is_solved:
-                continue
-
-            clue = clue_state.clue
-            word = clue_state.placed_word
-
-            if not word:
-                continue
-
-            # עדכון הצלבות
-            for i, (row, col) in enumerate(clue.answer_cells):
-                letter = word[i]
-
-                for other_clue in self.clue_db.get_clues_for_cell(row, col):
-                    if other_clue.id == clue.id:
-                        continue
+        """
+        מחשב מחדש את known_letters לכל ההגדרות מתוך הגריד.
 
-                    try:
-                        other_idx = other_clue.answer_cells.index((row, col))
-                        other_clue.known_letters[other_idx] = letter
-                    except ValueError:
-                        pass
+        הגריד כולל גם אותיות שלא שובצו ע"י הסולבר הזה
+        (למשל כשפותרים רכיב בודד מתוך תשבץ גדול).
+        """
+        for clue in self.clue_db.clues:
+            clue.known_letters = self.solution.get_known_letters(clue.answer_cells)
 
     def _is_solved(self) -> bool:
         """בודק אם התשבץ נפתר"""
@@ -592,6 +918,8 @@ class SolverStrategy:
             status = SolveStatus.SOLVED
         elif self.state.solve_phase == SolvePhase.STUCK:
             status = SolveStatus.STUCK
+        elif self.state.solve_phase == SolvePhase.TIMED_OUT:
+            status = SolveStatus.TIMED_OUT
         elif self._should_pause:
             status = SolveStatus.PAUSED
 
@@ -607,6 +935,10 @@ class SolverStrategy:
             query_count=self.state.query_count
         )
 
+    def get_progress(self) -> SolveProgress:
+        """מצב ההתקדמות הנוכחי"""
+        return self._get_progress()
+
     def _notify_progress(self) -> None:
         """מעדכן את ה-callback על התקדמות"""
         if self.callbacks.on_progress:
@@ -630,6 +962,9 @@ class SolverStrategy:
         Returns:
             True אם הצליח
         """
+        if not self._initialized:
+            self.initialize()
+
         clue_state = self.state.clue_states.get(clue_id)
         if not clue_state:
             return False
@@ -656,9 +991,17 @@ class SolverStrategy:
         self.state.placement_stack.append((clue_id, word, True))
 
         # עדכון הצלבות
-        self._update_intersecting_clues(clue, word)
+        new_letters = self._update_intersecting_clues(clue, word)
+        self.state.letters_discovered += new_letters
+        self.state.letters_since_query += new_letters
         self._filter_incompatible_candidates(clue, word)
 
+        # אילוץ חדש - אפשר לנסות שוב גם אחרי שנתקענו
+        if self.state.solve_phase == SolvePhase.STUCK:
+            self.state.solve_phase = SolvePhase.PROPAGATION
+        if self._is_solved():
+            self.state.solve_phase = SolvePhase.COMPLETED
+
         return True
 
     def clear_manual_answer(self, clue_id: str) -> bool:
@@ -688,24 +1031,89 @@ class SolverStrategy:
 
         return True
 
+    def apply_assignments(self, assignments: Dict[str, str]) -> int:
+        """
+        משבץ תשובות שנפתרו מחוץ לסולבר (למשל ב-worker process).
+
+        Args:
+            assignments: מיפוי clue_id → מילה
+
+        Returns:
+            מספר המילים ששובצו בהצלחה
+        """
+        placed = 0
+        for clue_id, word in assignments.items():
+            clue_state = self.state.clue_states.get(clue_id)
+            if not clue_state or clue_state.is_solved:
+                continue
+
+            # השמה שנפתרה גלובלית - הבדיקה המקדימה עלולה לדחות בחירה מכוונת
+            if self._place_word(clue_state, word, forward_check=False):
+                placed += 1
+
+        if self._is_solved():
+            self.state.solve_phase = SolvePhase.COMPLETED
+
+        return placed
+
     # === Control ===
 
     def pause(self) -> None:
         """עצירת הפתרון"""
         self._should_pause = True
 
-    def resume(self) -> SolveProgress:
-        """המשך הפתרון"""
-        self._should_pause = False
-        return self.solve()
+    def resume(self, time_limit: Optional[float] = None) -> SolveProgress:
+        """
+        המשך הפתרון מהשלב ומהמצב שבהם נעצר - בלי אתחול ובלי שאילתא ראשונית חוזרת.
+        תשובות ידניות שהוכנסו בזמן העצירה נשמרות.
+
+        אחרי TIMED_OUT ממשיכים מהשלב שנקטע; הגדרות שהשאילתא שלהן לא נענתה
+        בגלל ה-deadline נשאלות שוב לפני שממשיכים לשבץ.
+
+        Args:
+            time_limit: זמן מקסימלי בשניות להמשך
+        """
+        if self.state.solve_phase == SolvePhase.TIMED_OUT:
+            phase = self.state.interrupted_phase or SolvePhase.PROPAGATION
+            self.state.interrupted_phase = None
+            if phase != SolvePhase.INITIAL_QUERY and any(
+                state.query_expired and not state.is_solved for state in self.state.clue_states.values()
+            ):
+                phase = SolvePhase.REQUERY
+            self.state.solve_phase = phase
+
+        return self._run(time_limit)
 
     def is_running(self) -> bool:
         """האם רץ"""
         return self._is_running
 
+    def restore_state(self, state: SolverState) -> None:
+        """
+        משחזר מצב פתרון שמור (checkpoint) - אחרי שהגריד כבר שוחזר.
+        מסנכרן את ההגדרות ב-clue_db ואת האותיות הידועות מול הגריד.
+        resume() ימשיך מהשלב השמור.
+        """
+        for clue in self.clue_db.clues:
+            if clue.id not in state.clue_states:
+                state.clue_states[clue.id] = ClueState(clue=clue)
+
+        placed = self.solution.get_placed_clues()
+        for clue_id, clue_state in state.clue_states.items():
+            clue = clue_state.clue
+            clue.is_solved = clue_id in placed
+            clue.chosen_answer = clue_state.placed_word if clue.is_solved else None
+
+        self.state = state
+        if self.calibrator is not None:
+            state.candidate_index.calibrator = self.calibrator
+        self._recalculate_known_letters()
+        self._initialized = True
+
     def reset(self) -> None:
         """איפוס מלא"""
         self.state = SolverState()
+        self._initialized = False
         self.solution.clear()
         for clue in self.clue_db.clues:
             clue.known_letters = {}
@@ -728,6 +1136,7 @@ class SolverStrategy:
                 if progress.total_clues > 0 else 0
             ),
             'backtracks': progress.backtracks,
+            'forward_check_rejections': self.state.forward_check_rejections,
             'query_count': progress.query_count,
             'letters_discovered': progress.letters_discovered,
             'elapsed_time': elapsed,
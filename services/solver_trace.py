@@ -0,0 +1,381 @@
+"""
+Solver Trace - הקלטה והרצה חוזרת של פתרון
+
+פתרון שהלך רע (מאות backtracks, הרבה requery) אי אפשר לשחזר בלי לשלם שוב
+על קריאות ה-LLM. ה-trace מקליט:
+- את פריסת התשבץ (הגדרות, משבצות, גודל גריד)
+- כל SolverResult שהתקבל (לפי הגדרה ותבנית)
+- כל החלטה: שיבוץ, backtrack, מעבר שלב, requery - עם זמן יחסי
+
+ReplayClueSolver מחזיר את התשובות המוקלטות בלי API, כך שאפשר להריץ שוב
+את SolverStrategy / PuzzleSolver (גם עם שינויים באלגוריתם) ולהשוות החלטות.
+
+פורמט: JSON דחוס ב-gzip, עם שדה גרסה.
+"""
+
+import gzip
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Deque, Dict, List, Mapping, Optional, Tuple
+
+from models.clue_entry import ClueEntry
+from services.clue_database import ClueDatabase
+from services.solution_grid import SolutionGrid
+from services.clue_solver import ClueSolver, SolverResult
+from services.puzzle_solver import PuzzleSolver
+from services.solver_strategy import SolverStrategy
+
+
+TRACE_VERSION = 1
+
+SOLVER_STRATEGY = "strategy"
+SOLVER_PUZZLE = "puzzle"
+
+
+def _result_key(clue: ClueEntry) -> str:
+    """מפתח תשובה: הגדרה + האותיות הידועות בזמן השאילתא"""
+    return f"{clue.id}|{clue.get_constraint_string()}"
+
+
+@dataclass
+class SolverTrace:
+    """trace של ריצת פתרון אחת"""
+    solver: str = SOLVER_STRATEGY
+    max_backtracks: int = 100
+    rows: int = 0
+    cols: int = 0
+    clues: List[Dict] = field(default_factory=list)      # פריסת ההגדרות
+    results: List[Dict] = field(default_factory=list)    # תשובות ה-LLM לפי סדר קבלתן
+    events: List[List] = field(default_factory=list)     # [סוג, זמן, ...]
+    version: int = TRACE_VERSION
+
+    @classmethod
+    def for_puzzle(
+        cls,
+        clue_db: ClueDatabase,
+        solution: SolutionGrid,
+        solver: str,
+        max_backtracks: int = 100
+    ) -> 'SolverTrace':
+        """trace ריק עם פריסת התשבץ"""
+        return cls(
+            solver=solver,
+            max_backtracks=max_backtracks,
+            rows=solution.rows,
+            cols=solution.cols,
+            clues=[
+                {
+                    'id': clue.id,
+                    'text': clue.text,
+                    'source_cell': list(clue.source_cell),
+                    'answer_cells': [list(cell) for cell in clue.answer_cells],
+                    'answer_length': clue.answer_length,
+                }
+                for clue in clue_db.clues
+            ]
+        )
+
+    def build_puzzle(self) -> Tuple[ClueDatabase, SolutionGrid]:
+        """בונה מחדש את התשבץ המוקלט (גריד ריק)"""
+        clue_db = ClueDatabase()
+        for data in self.clues:
+            clue_db.add_clue(ClueEntry(
+                id=data['id'],
+                source_cell=tuple(data['source_cell']),
+                text=data['text'],
+                answer_cells=[tuple(cell) for cell in data['answer_cells']],
+                answer_length=data['answer_length']
+            ))
+        return clue_db, SolutionGrid(self.rows, self.cols)
+
+    def decisions(self) -> List[Tuple]:
+        """ההחלטות בלבד (בלי זמנים) - להשוואה בין ריצות"""
+        return [
+            (event[0],) + tuple(event[2:4])
+            for event in self.events
+            if event[0] in ("place", "backtrack")
+        ]
+
+    def first_divergence(self, other: 'SolverTrace') -> Optional[int]:
+        """
+        האינדקס של ההחלטה הראשונה ששונה בין שני traces.
+
+        Returns:
+            None אם ההחלטות זהות
+        """
+        mine, theirs = self.decisions(), other.decisions()
+        for i, (a, b) in enumerate(zip(mine, theirs)):
+            if a != b:
+                return i
+        if len(mine) != len(theirs):
+            return min(len(mine), len(theirs))
+        return None
+
+    def summary(self) -> Dict:
+        """סיכום: כמה שיבוצים, backtracks, שאילתות וזמן"""
+        counts: Dict[str, int] = {}
+        for event in self.events:
+            counts[event[0]] = counts.get(event[0], 0) + 1
+        return {
+            'solver': self.solver,
+            'placements': counts.get("place", 0),
+            'backtracks': counts.get("backtrack", 0),
+            'queries': counts.get("query", 0),
+            'results': len(self.results),
+            'duration': self.events[-1][1] if self.events else 0.0,
+        }
+
+    def to_bytes(self) -> bytes:
+        data = {
+            'version': self.version,
+            'solver': self.solver,
+            'max_backtracks': self.max_backtracks,
+            'rows': self.rows,
+            'cols': self.cols,
+            'clues': self.clues,
+            'results': self.results,
+            'events': self.events,
+        }
+        raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return gzip.compress(raw)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SolverTrace':
+        payload = json.loads(gzip.decompress(data).decode('utf-8'))
+        if payload.get('version') != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {payload.get('version')}")
+        return cls(
+            solver=payload['solver'],
+            max_backtracks=payload['max_backtracks'],
+            rows=payload['rows'],
+            cols=payload['cols'],
+            clues=payload['clues'],
+            results=payload['results'],
+            events=payload['events'],
+            version=payload['version']
+        )
+
+    def save(self, path) -> None:
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> 'SolverTrace':
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class TracingClueSolver(ClueSolver):
+    """עוטף ClueSolver אמיתי ומקליט כל SolverResult שחוזר ממנו"""
+
+    def __init__(self, inner: ClueSolver, recorder: 'TraceRecorder'):
+        super().__init__(api_key=None)
+        self.inner = inner
+        self.recorder = recorder
+
+    def solve_clue(self, clue: ClueEntry, use_cache: bool = True, deadline: Optional[float] = None) -> SolverResult:
+        result = self.inner.solve_clue(clue, use_cache=use_cache, deadline=deadline)
+        self.recorder.record_result(clue, result)
+        return result
+
+    def solve_batch(
+        self,
+        clues: List[ClueEntry],
+        max_per_request: int = 10,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> Dict[str, SolverResult]:
+        start = time.time()
+        results = self.inner.solve_batch(
+            clues, max_per_request=max_per_request, use_cache=use_cache, deadline=deadline, exclude=exclude
+        )
+        for clue in clues:
+            if clue.id in results:
+                self.recorder.record_result(clue, results[clue.id])
+        self.recorder.record_event("query", len(clues), round(time.time() - start, 4))
+        return results
+
+    def get_cache_stats(self) -> Dict:
+        return self.inner.get_cache_stats()
+
+
+class ReplayClueSolver(ClueSolver):
+    """
+    מחליף ClueSolver בהרצה חוזרת: מחזיר את התשובות המוקלטות לפי (הגדרה, תבנית),
+    בלי API. שאלה שלא הוקלטה מקבלת תוצאה ריקה ונספרת ב-misses.
+    """
+
+    def __init__(self, trace: SolverTrace):
+        super().__init__(api_key=None)
+        self._recorded: Dict[str, Deque[SolverResult]] = {}
+        self._last: Dict[str, SolverResult] = {}
+        self.misses = 0
+        self.calls = 0
+
+        for data in trace.results:
+            result = SolverResult(
+                candidates=[(word, confidence) for word, confidence in data['c']],
+                clue_certainty=data['u'],
+                processing_time=data['p'],
+                error=data['e']
+            )
+            self._recorded.setdefault(data['k'], deque()).append(result)
+
+    def _replay(self, clue: ClueEntry) -> SolverResult:
+        key = _result_key(clue)
+        queue = self._recorded.get(key)
+        if queue:
+            self._last[key] = queue.popleft()
+            return self._last[key]
+        if key in self._last:
+            return self._last[key]
+
+        self.misses += 1
+        return SolverResult(candidates=[], error="Not in trace")
+
+    def solve_clue(self, clue: ClueEntry, use_cache: bool = True, deadline: Optional[float] = None) -> SolverResult:
+        self.calls += 1
+        return self._replay(clue)
+
+    def solve_batch(
+        self,
+        clues: List[ClueEntry],
+        max_per_request: int = 10,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> Dict[str, SolverResult]:
+        self.calls += 1
+        exclude = exclude or {}
+        return {clue.id: self.without_excluded(self._replay(clue), exclude.get(clue.id)) for clue in clues}
+
+
+class TraceRecorder:
+    """
+    מקליט trace של SolverStrategy או PuzzleSolver.
+
+    שימוש:
+        recorder = TraceRecorder.attach(strategy)
+        strategy.solve()
+        recorder.trace.save("solve.trace.gz")
+
+    ה-callbacks הקיימים (UI) ממשיכים לפעול - ההקלטה נשרשרת לפניהם.
+    """
+
+    def __init__(self, trace: SolverTrace):
+        self.trace = trace
+        self._start = time.time()
+
+    @classmethod
+    def attach(cls, solver) -> 'TraceRecorder':
+        """מחבר הקלטה לסולבר (לפני solve)"""
+        kind = SOLVER_PUZZLE if isinstance(solver, PuzzleSolver) else SOLVER_STRATEGY
+        recorder = cls(SolverTrace.for_puzzle(
+            solver.clue_db, solver.solution, kind, solver.max_backtracks
+        ))
+
+        solver.solver = TracingClueSolver(solver.solver, recorder)
+        if kind == SOLVER_PUZZLE:
+            recorder._hook_puzzle_solver(solver)
+        else:
+            recorder._hook_strategy(solver)
+        return recorder
+
+    def _elapsed(self) -> float:
+        return round(time.time() - self._start, 4)
+
+    def record_event(self, kind: str, *values) -> None:
+        self.trace.events.append([kind, self._elapsed()] + list(values))
+
+    def record_result(self, clue: ClueEntry, result: SolverResult) -> None:
+        self.trace.results.append({
+            'k': _result_key(clue),
+            'c': [[word, confidence] for word, confidence in result.candidates],
+            'u': result.clue_certainty,
+            'p': round(result.processing_time, 4),
+            'e': result.error,
+        })
+
+    def _hook_strategy(self, strategy) -> None:
+        callbacks = strategy.callbacks
+
+        def on_word_placed(clue_id, word, cells, _next=callbacks.on_word_placed):
+            confidence = strategy.state.clue_states[clue_id].placed_confidence
+            self.record_event("place", clue_id, word, round(confidence, 4))
+            if _next:
+                _next(clue_id, word, cells)
+
+        def on_backtrack(clue_id, word, _next=callbacks.on_backtrack):
+            self.record_event("backtrack", clue_id, word)
+            if _next:
+                _next(clue_id, word)
+
+        def on_phase_change(phase, _next=callbacks.on_phase_change):
+            self.record_event("phase", phase.value)
+            if _next:
+                _next(phase)
+
+        def on_requery(count, _next=callbacks.on_requery):
+            self.record_event("requery", count)
+            if _next:
+                _next(count)
+
+        callbacks.on_word_placed = on_word_placed
+        callbacks.on_backtrack = on_backtrack
+        callbacks.on_phase_change = on_phase_change
+        callbacks.on_requery = on_requery
+
+    def _hook_puzzle_solver(self, solver) -> None:
+        callbacks = solver.callbacks
+
+        def on_clue_solved(clue_id, answer, confidence, _next=callbacks.on_clue_solved):
+            self.record_event("place", clue_id, answer, round(confidence, 4))
+            if _next:
+                _next(clue_id, answer, confidence)
+
+        def on_backtrack(clue_id, removed_letters, _next=callbacks.on_backtrack):
+            # המילה שהוסרה - השיבוץ האחרון של ההגדרה
+            word = next(
+                (e[3] for e in reversed(self.trace.events) if e[0] == "place" and e[2] == clue_id),
+                None
+            )
+            self.record_event("backtrack", clue_id, word)
+            if _next:
+                _next(clue_id, removed_letters)
+
+        callbacks.on_clue_solved = on_clue_solved
+        callbacks.on_backtrack = on_backtrack
+
+
+def replay_trace(
+    trace: SolverTrace,
+    configure: Optional[Callable] = None
+) -> Tuple[SolverTrace, object]:
+    """
+    מריץ שוב את הפתרון המוקלט - offline, בלי API.
+
+    Args:
+        trace: ה-trace המקורי
+        configure: פונקציה שמקבלת את הסולבר לפני הריצה (לשינויי אלגוריתם להשוואה)
+
+    Returns:
+        (trace של ההרצה החוזרת, הסולבר) - להשוואה עם first_divergence
+    """
+    clue_db, solution = trace.build_puzzle()
+    clue_solver = ReplayClueSolver(trace)
+
+    if trace.solver == SOLVER_PUZZLE:
+        solver = PuzzleSolver(clue_db, solution, clue_solver, trace.max_backtracks)
+        solver.callbacks.letter_delay_ms = 0
+    else:
+        solver = SolverStrategy(clue_db, solution, clue_solver, trace.max_backtracks)
+
+    if configure:
+        configure(solver)
+
+    recorder = TraceRecorder.attach(solver)
+    solver.solve()
+    return recorder.trace, solver
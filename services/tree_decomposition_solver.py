@@ -0,0 +1,411 @@
+"""
+Tree Decomposition Solver - פתרון מדויק בתכנון דינמי על פירוק עץ
+
+בתשבצי חצים ההצלבות ארוכות ודומות לשרשרת, ולכן ה-treewidth של גרף ההצלבות
+נמוך. במקום חיפוש עם backtracking אפשר למצוא את המילוי העקבי עם הביטחון
+הכולל הגבוה ביותר (מכפלת הציונים) בתכנון דינמי max-product:
+
+1. סדר סילוק (min-fill) על גרף ההצלבות - כל סילוק יוצר "תא" (bag) של
+   ההגדרה והשכנות שלה שטרם סולקו. התאים יוצרים פירוק עץ; הרוחב = גודל
+   התא הגדול פחות 1.
+2. סילוק משתנים (bucket elimination) לפי הסדר: לכל השמה לשכנות נשמר
+   המקסימום על מילות ההגדרה המסולקת וה-argmax שלו.
+3. שחזור לאחור מהמשתנה האחרון - ההשמה האופטימלית.
+
+זמן הריצה O(n · d^(w+1)) - ליניארי במספר ההגדרות כשהרוחב חסום.
+כשהרוחב גדול מ-max_width, או שטבלת ביניים חורגת מ-max_table_size, לא
+פותרים (too_wide, והסיבה ב-reason) והקורא חוזר לחיפוש הרגיל. time_limit נבדק
+בין סילוקים - כל סילוק בודד חסום ב-max_table_size.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.clue_database import ClueDatabase
+from services.candidate_index import CandidateIndex
+
+
+NEG_INF = float('-inf')
+
+# למה לא נמצאה השמה (DPResult.reason)
+REASON_WIDTH = "width"              # הרוחב חרג מ-max_width
+REASON_TABLE_SIZE = "table_size"    # טבלת ביניים חרגה מ-max_table_size
+REASON_TIMEOUT = "timeout"          # עבר time_limit
+REASON_INFEASIBLE = "infeasible"    # אין השמה עקבית (רק בלי allow_partial)
+
+
+@dataclass
+class TreeDecomposition:
+    """פירוק עץ שנגזר מסדר סילוק"""
+    order: List[str]                    # סדר הסילוק
+    bags: Dict[str, List[str]]          # clue_id → התא שלו (ההגדרה + השכנות בזמן הסילוק)
+    parent: Dict[str, Optional[str]]    # clue_id → התא שאליו עוברת ההודעה (None = שורש)
+
+    @property
+    def width(self) -> int:
+        """רוחב הפירוק (גודל התא הגדול פחות 1)"""
+        if not self.bags:
+            return 0
+        return max(len(bag) for bag in self.bags.values()) - 1
+
+
+@dataclass
+class DPResult:
+    """תוצאת פתרון"""
+    assignments: Dict[str, str] = field(default_factory=dict)  # clue_id → מילה
+    unassigned: List[str] = field(default_factory=list)        # הגדרות שנשארו ריקות
+    log_score: float = NEG_INF      # סכום log הציונים של ההשמה
+    width: int = -1
+    feasible: bool = False          # נמצאה השמה עקבית
+    too_wide: bool = False          # הבעיה גדולה מדי (רוחב / גודל טבלה) - לא נפתר
+    reason: str = ""                # REASON_* כשלא נמצאה השמה
+    table_entries: int = 0          # גודל טבלאות ה-DP שנבנו
+    elapsed: float = 0.0
+
+    @property
+    def score(self) -> float:
+        """מכפלת הציונים של ההשמה"""
+        return math.exp(self.log_score) if self.log_score > NEG_INF else 0.0
+
+    @property
+    def is_complete(self) -> bool:
+        """כל ההגדרות קיבלו מילה"""
+        return self.feasible and not self.unassigned
+
+
+class _Factor:
+    """טבלת DP דלילה: השמה ל-scope → ערך (השמה חסרה = -inf)"""
+
+    __slots__ = ('scope', 'table')
+
+    def __init__(self, scope: Tuple[str, ...], table: Dict[Tuple[int, ...], float]):
+        self.scope = scope
+        self.table = table
+
+
+class TreeDecompositionSolver:
+    """
+    פותר מדויק: המילוי העקבי עם מכפלת הציונים (confidence * clue_certainty) הגבוהה ביותר.
+
+    שימוש:
+        solver = TreeDecompositionSolver.from_strategy(strategy)
+        result = solver.solve()
+        if not result.too_wide:
+            strategy.apply_assignments(result.assignments)
+    """
+
+    DEFAULT_MAX_WIDTH = 6
+    DEFAULT_MAX_TABLE_SIZE = 200000
+    SKIP_SCORE = 1e-3      # ציון "השארת הגדרה ריקה" - נמוך מכל מועמד סביר
+    MIN_SCORE = 1e-6
+
+    def __init__(
+        self,
+        clue_db: ClueDatabase,
+        candidate_index: CandidateIndex,
+        clue_ids: Optional[Set[str]] = None,
+        max_width: int = DEFAULT_MAX_WIDTH,
+        max_table_size: int = DEFAULT_MAX_TABLE_SIZE,
+        allow_partial: bool = True,
+        time_limit: Optional[float] = None
+    ):
+        """
+        Args:
+            clue_db: מאגר ההגדרות (כולל האותיות הידועות)
+            candidate_index: המועמדים לכל הגדרה
+            clue_ids: ההגדרות לפתרון (ברירת מחדל: כל ההגדרות שלא נפתרו)
+            max_width: רוחב מקסימלי - מעבר לזה לא פותרים
+            max_table_size: מקסימום השמות לטבלה אחת (הגנה מדומיינים גדולים)
+            allow_partial: מותר להשאיר הגדרה ריקה (בציון SKIP_SCORE) -
+                           כך שגיאת זיהוי בהגדרה אחת לא מבטלת את כל הפתרון
+            time_limit: זמן מקסימלי בשניות (None = בלי הגבלה)
+        """
+        self.clue_db = clue_db
+        self.candidate_index = candidate_index
+        self.clue_ids = clue_ids
+        self.max_width = max_width
+        self.max_table_size = max_table_size
+        self.allow_partial = allow_partial
+        self.time_limit = time_limit
+
+    @classmethod
+    def from_strategy(cls, strategy, **kwargs) -> 'TreeDecompositionSolver':
+        """פותר על המצב הנוכחי של SolverStrategy (אחרי prepare)"""
+        unsolved = {
+            clue_id for clue_id, clue_state in strategy.state.clue_states.items()
+            if not clue_state.is_solved
+        }
+        kwargs.setdefault('clue_ids', unsolved)
+        return cls(strategy.clue_db, strategy.state.candidate_index, **kwargs)
+
+    # === Decomposition ===
+
+    def _get_clue_ids(self) -> Set[str]:
+        if self.clue_ids is not None:
+            return set(self.clue_ids)
+        return {
+            clue.id for clue in self.clue_db.clues
+            if clue.answer_length > 0 and not clue.is_solved
+        }
+
+    def decompose(self, clue_ids: Optional[Set[str]] = None) -> TreeDecomposition:
+        """
+        פירוק עץ בסדר סילוק min-fill (שובר שוויון: דרגה, ואז clue_id).
+
+        Args:
+            clue_ids: ההגדרות (ברירת מחדל: ההגדרות לפתרון)
+        """
+        if clue_ids is None:
+            clue_ids = self._get_clue_ids()
+
+        graph = self.clue_db.get_crossing_graph()
+        adjacency: Dict[str, Set[str]] = {
+            clue_id: {other for other in graph.get(clue_id, {}) if other in clue_ids}
+            for clue_id in clue_ids
+        }
+
+        def fill_in(clue_id: str) -> int:
+            neighbors = list(adjacency[clue_id])
+            return sum(
+                1 for i, a in enumerate(neighbors) for b in neighbors[i + 1:]
+                if b not in adjacency[a]
+            )
+
+        order: List[str] = []
+        bags: Dict[str, List[str]] = {}
+        remaining = set(clue_ids)
+
+        while remaining:
+            best = min(remaining, key=lambda cid: (fill_in(cid), len(adjacency[cid]), cid))
+            neighbors = adjacency[best]
+
+            bags[best] = [best] + sorted(neighbors)
+            order.append(best)
+
+            # השכנות הופכות לקליקה
+            for a in neighbors:
+                adjacency[a].discard(best)
+                adjacency[a].update(n for n in neighbors if n != a)
+
+            del adjacency[best]
+            remaining.remove(best)
+
+        position = {clue_id: k for k, clue_id in enumerate(order)}
+        parent: Dict[str, Optional[str]] = {}
+        for clue_id in order:
+            rest = bags[clue_id][1:]
+            parent[clue_id] = min(rest, key=position.get) if rest else None
+
+        return TreeDecomposition(order=order, bags=bags, parent=parent)
+
+    # === Domains ===
+
+    def _get_domain(self, clue_id: str) -> List[Tuple[str, float]]:
+        """[(מילה, log ציון)] - מועמדים שמתאימים לתבנית, בלי כפילויות"""
+        clue = self.clue_db.get_clue(clue_id)
+        pattern = clue.get_constraint_string()
+
+        domain: Dict[str, float] = {}
+        for candidate in self.candidate_index.get_valid_candidates_for_clue(clue_id, pattern):
+            word = candidate.word
+            if len(word) != clue.answer_length or not clue.matches_answer(word):
+                continue
+            score = math.log(max(candidate.combined_score, self.MIN_SCORE))
+            if score > domain.get(word, NEG_INF):
+                domain[word] = score
+
+        return sorted(domain.items(), key=lambda item: item[1], reverse=True)
+
+    # === Solve ===
+
+    def solve(self) -> DPResult:
+        """
+        מוצא את ההשמה האופטימלית.
+
+        Returns:
+            DPResult (בלי השמות אם לא נפתר - הסיבה ב-reason)
+        """
+        start = time.time()
+        deadline = start + self.time_limit if self.time_limit is not None else None
+        clue_ids = self._get_clue_ids()
+        decomposition = self.decompose(clue_ids)
+        result = DPResult(width=decomposition.width)
+
+        def stop(reason: str) -> DPResult:
+            result.reason = reason
+            result.too_wide = reason in (REASON_WIDTH, REASON_TABLE_SIZE)
+            result.elapsed = time.time() - start
+            return result
+
+        if decomposition.width > self.max_width:
+            return stop(REASON_WIDTH)
+
+        # דומיינים: אינדקס לכל מילה; None = הגדרה ריקה
+        words: Dict[str, List[Optional[str]]] = {}
+        unary: Dict[str, List[float]] = {}
+        for clue_id in clue_ids:
+            domain = self._get_domain(clue_id)
+            words[clue_id] = [word for word, _ in domain]
+            unary[clue_id] = [score for _, score in domain]
+            if self.allow_partial:
+                words[clue_id].append(None)
+                unary[clue_id].append(math.log(self.SKIP_SCORE))
+
+        if any(not words[clue_id] for clue_id in clue_ids):
+            return stop(REASON_INFEASIBLE)
+
+        # buckets: כל factor שייך להגדרה הראשונה בסדר הסילוק מתוך ה-scope שלו
+        position = {clue_id: k for k, clue_id in enumerate(decomposition.order)}
+        buckets: Dict[str, List[_Factor]] = {clue_id: [] for clue_id in clue_ids}
+        for factor in self._crossing_factors(clue_ids, words):
+            buckets[min(factor.scope, key=position.get)].append(factor)
+
+        # סילוק
+        argmax: Dict[str, Tuple[Tuple[str, ...], Dict[Tuple[int, ...], int]]] = {}
+        log_score = 0.0
+
+        for clue_id in decomposition.order:
+            if deadline is not None and time.time() >= deadline:
+                return stop(REASON_TIMEOUT)
+
+            factors = buckets[clue_id]
+            scope = tuple(sorted(
+                {v for f in factors for v in f.scope if v != clue_id},
+                key=position.get
+            ))
+
+            eliminated = self._eliminate(clue_id, scope, factors, unary[clue_id])
+            if eliminated is None:
+                return stop(REASON_TABLE_SIZE)
+
+            message, best_values = eliminated
+            result.table_entries += len(message)
+            argmax[clue_id] = (scope, best_values)
+
+            if not message:
+                # אין השמה עקבית (אפשרי רק בלי allow_partial)
+                return stop(REASON_INFEASIBLE)
+
+            if scope:
+                buckets[min(scope, key=position.get)].append(_Factor(scope, message))
+            else:
+                log_score += message[()]
+
+        # שחזור לאחור
+        values: Dict[str, int] = {}
+        for clue_id in reversed(decomposition.order):
+            scope, best_values = argmax[clue_id]
+            values[clue_id] = best_values[tuple(values[v] for v in scope)]
+
+        for clue_id in decomposition.order:
+            word = words[clue_id][values[clue_id]]
+            if word is None:
+                result.unassigned.append(clue_id)
+            else:
+                result.assignments[clue_id] = word
+
+        result.feasible = True
+        result.log_score = log_score
+        result.elapsed = time.time() - start
+        return result
+
+    def _crossing_factors(
+        self,
+        clue_ids: Set[str],
+        words: Dict[str, List[Optional[str]]]
+    ) -> List[_Factor]:
+        """factor לכל זוג הגדרות מצטלבות: הזוגות העקביים (ערך 0.0)"""
+        graph = self.clue_db.get_crossing_graph()
+        factors = []
+
+        for clue_id in sorted(clue_ids):
+            for other_id, pairs in graph.get(clue_id, {}).items():
+                if other_id not in clue_ids or other_id <= clue_id:
+                    continue
+
+                table: Dict[Tuple[int, ...], float] = {}
+                for i, word in enumerate(words[clue_id]):
+                    for j, other in enumerate(words[other_id]):
+                        if word is None or other is None or all(
+                            word[my_idx] == other[other_idx] for my_idx, other_idx in pairs
+                        ):
+                            table[(i, j)] = 0.0
+
+                factors.append(_Factor((clue_id, other_id), table))
+
+        return factors
+
+    def _eliminate(
+        self,
+        clue_id: str,
+        scope: Tuple[str, ...],
+        factors: List[_Factor],
+        unary: List[float]
+    ) -> Optional[Tuple[Dict[Tuple[int, ...], float], Dict[Tuple[int, ...], int]]]:
+        """
+        מסלק הגדרה: לכל השמה ל-scope - המקסימום על מילות ההגדרה.
+
+        לכל מילה של ההגדרה מחברים (hash join) את שורות ה-factors שמתאימות לה,
+        כך שנבנות רק השמות עקביות ל-scope ולא כל המכפלה של הדומיינים.
+
+        Returns:
+            (message, argmax), או None אם טבלת ביניים חרגה מ-max_table_size
+        """
+        index = {v: k for k, v in enumerate(scope)}
+
+        # לכל factor: מיקומי שאר המשתנים ב-scope, והשורות מקובצות לפי ערך ההגדרה
+        grouped = []
+        for factor in factors:
+            own = factor.scope.index(clue_id)
+            others = [k for k, v in enumerate(factor.scope) if v != clue_id]
+            by_value: Dict[int, List[Tuple[Tuple[int, ...], float]]] = {}
+            for key, value in factor.table.items():
+                by_value.setdefault(key[own], []).append((tuple(key[k] for k in others), value))
+            grouped.append((tuple(index[factor.scope[k]] for k in others), by_value))
+
+        message: Dict[Tuple[int, ...], float] = {}
+        best_values: Dict[Tuple[int, ...], int] = {}
+
+        for value, base in enumerate(unary):
+            partials: Dict[Tuple[int, ...], float] = {(): base}
+            assigned: List[int] = []   # מיקומי scope לפי סדר ההופעה במפתחות partials
+
+            for targets, by_value in grouped:
+                rows = by_value.get(value)
+                if not rows:
+                    partials = {}
+                    break
+
+                shared = [i for i, t in enumerate(targets) if t in assigned]
+                new = [i for i, t in enumerate(targets) if t not in assigned]
+                shared_at = [assigned.index(targets[i]) for i in shared]
+
+                table: Dict[Tuple[int, ...], List[Tuple[Tuple[int, ...], float]]] = {}
+                for sub, row_value in rows:
+                    table.setdefault(tuple(sub[i] for i in shared), []).append(
+                        (tuple(sub[i] for i in new), row_value)
+                    )
+
+                joined: Dict[Tuple[int, ...], float] = {}
+                for key, total in partials.items():
+                    for extension, row_value in table.get(tuple(key[p] for p in shared_at), ()):
+                        joined[key + extension] = total + row_value
+
+                if len(joined) > self.max_table_size:
+                    return None
+
+                assigned.extend(targets[i] for i in new)
+                partials = joined
+                if not partials:
+                    break
+
+            order = [assigned.index(k) for k in range(len(scope))] if partials else []
+            for key, total in partials.items():
+                assignment = tuple(key[p] for p in order)
+                if total > message.get(assignment, NEG_INF):
+                    message[assignment] = total
+                    best_values[assignment] = value
+
+        return message, best_values
@@ -0,0 +1,409 @@
+"""
+Usage Ledger - טוקנים, זמן ועלות לכל קריאה למודל
+
+ClueSolver, גלאי החצים (Gemini / GPT / Claude), SplitCellAnalyzer ו-Google
+Vision קוראים ל-API דרך ResilientCaller. כל קריאה כזו (כולל כל ה-retries
+וה-hedges שלה) נרשמת כשורה אחת בטבלה model_calls:
+- שלב (stage), ספק ומודל
+- טוקנים: קלט, פלט וחשיבה (thinking / reasoning) - סכום על כל הניסיונות
+  שחזרו עד סוף הקריאה (ניסיון שננטש וממשיך ברקע לא נספר);
+  ב-Google Vision נספרות יחידות (תמונות)
+- זמן תגובה, מספר ניסיונות, retries ו-hedges, הצלחה או שגיאה
+- התשבץ, המשבצת וההגדרות שהקריאה שירתה (מ-usage_context)
+- עלות משוערת לפי MODEL_PRICES
+
+ההקשר (תשבץ / משבצת) מוגדר ב-usage_context ועובר ב-contextvars - מי שמריץ
+עבודה ב-thread pool צריך להעביר את ההקשר (contextvars.copy_context).
+
+הפעלה מהקוד (use_ledger) או ממשתנה סביבה - שעובר גם ל-worker processes:
+    CROSSWORD_USAGE_LEDGER=path/to/crosswords.db
+
+המחירים הם הערכה (דולר למיליון טוקנים, לפי תחילית שם המודל) - לא חשבונית.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from database.db_manager import DatabaseManager
+
+
+ENV_PATH = "CROSSWORD_USAGE_LEDGER"
+
+# (קלט, פלט) בדולר למיליון טוקנים; טוקני חשיבה מחויבים כפלט.
+# ההתאמה לפי התחילית הארוכה ביותר של שם המודל
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-opus-4": (15.0, 75.0),
+    "claude-sonnet-4": (3.0, 15.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "claude-haiku-4": (1.0, 5.0),
+    "gpt-5": (1.25, 10.0),
+    "gpt-4o": (2.5, 10.0),
+    "gemini-3-pro": (2.0, 12.0),
+    "gemini-2.5-pro": (1.25, 10.0),
+    "gemini-2.5-flash": (0.3, 2.5),
+}
+
+# דולר לאלף יחידות (תמונה עם TEXT_DETECTION)
+UNIT_PRICES: Dict[str, float] = {
+    "google_vision": 1.5,
+}
+
+GROUP_COLUMNS = ("puzzle", "stage", "provider", "model", "cell")
+
+
+@dataclass
+class UsageRecord:
+    """קריאה אחת למודל (כל הניסיונות שלה)"""
+    stage: str
+    provider: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    units: int = 0
+    latency: float = 0.0
+    attempts: int = 0
+    retries: int = 0
+    hedges: int = 0
+    success: bool = True
+    error: str = ""
+    puzzle: str = ""
+    cell: Optional[Tuple[int, int]] = None
+    clues: List[str] = field(default_factory=list)
+    cost_usd: float = 0.0
+    created_at: float = 0.0
+
+
+def extract_usage(response: Any) -> Tuple[int, int, int]:
+    """
+    (קלט, פלט, חשיבה) מתשובה של SDK.
+
+    Anthropic: usage.input_tokens / output_tokens
+    OpenAI: usage.prompt_tokens / completion_tokens (כולל reasoning - מופרד כאן לחשיבה)
+    Gemini: usage_metadata.prompt_token_count / candidates_token_count / thoughts_token_count
+    תשובה בלי usage (Google Vision, dict של REST) - אפסים.
+    """
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        if getattr(usage, 'input_tokens', None) is not None:
+            return int(usage.input_tokens or 0), int(getattr(usage, 'output_tokens', 0) or 0), 0
+
+        details = getattr(usage, 'completion_tokens_details', None)
+        reasoning = int(getattr(details, 'reasoning_tokens', 0) or 0)
+        completion = int(getattr(usage, 'completion_tokens', 0) or 0)
+        return int(getattr(usage, 'prompt_tokens', 0) or 0), max(0, completion - reasoning), reasoning
+
+    metadata = getattr(response, 'usage_metadata', None)
+    if metadata is not None:
+        return (
+            int(getattr(metadata, 'prompt_token_count', 0) or 0),
+            int(getattr(metadata, 'candidates_token_count', 0) or 0),
+            int(getattr(metadata, 'thoughts_token_count', 0) or 0),
+        )
+
+    return 0, 0, 0
+
+
+def estimate_cost(record: UsageRecord) -> float:
+    """עלות משוערת בדולר (0 למודל שאין לו מחיר)"""
+    if record.units:
+        return record.units * UNIT_PRICES.get(record.provider, 0.0) / 1000
+
+    matches = [prefix for prefix in MODEL_PRICES if record.model.startswith(prefix)]
+    if not matches:
+        return 0.0
+    input_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    return (
+        record.input_tokens * input_price +
+        (record.output_tokens + record.thinking_tokens) * output_price
+    ) / 1_000_000
+
+
+# === הקשר הקריאה (תשבץ / משבצת) ===
+
+_context: contextvars.ContextVar = contextvars.ContextVar('usage_context', default={})
+
+
+def current_usage_context() -> Dict[str, Any]:
+    """ההקשר הנוכחי (puzzle, cell)"""
+    return _context.get()
+
+
+@contextmanager
+def usage_context(**fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    הקשר לקריאות בתוך בלוק - נוסף על ההקשר הקיים.
+
+    Example:
+        with usage_context(puzzle="תשבץ יום שישי"):
+            with usage_context(cell=(3, 4)):
+                detector.detect(image)     # נרשם עם התשבץ והמשבצת
+    """
+    context = {**_context.get(), **fields}
+    token = _context.set(context)
+    try:
+        yield context
+    finally:
+        _context.reset(token)
+
+
+class UsageMeter:
+    """
+    צובר את ה-usage של קריאה אחת לאורך כל הניסיונות שלה.
+    נוצר לפני הקריאה (וכך תופס את ה-usage_context של ה-thread הקורא);
+    ResilientCaller.call סוגר אותו ב-finish.
+
+    Example:
+        meter = UsageMeter("clue_solver", "anthropic", model, clues=[clue.id])
+        response = caller.call(lambda timeout: meter.observe(client.messages.create(...)), meter=meter)
+    """
+
+    def __init__(self, stage: str, provider: str, model: str, clues: Optional[List[str]] = None):
+        self.stage = stage
+        self.provider = provider
+        self.model = model
+        self.clues = list(clues or [])
+        self.context = current_usage_context()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.thinking_tokens = 0
+        self.units = 0
+        self.record: Optional[UsageRecord] = None
+        self._lock = threading.Lock()
+
+    def observe(self, response: Any, units: int = 0) -> Any:
+        """מוסיף את ה-usage של תשובה (מכל ניסיון או hedge) ומחזיר אותה כמו שהיא"""
+        input_tokens, output_tokens, thinking_tokens = extract_usage(response)
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.thinking_tokens += thinking_tokens
+            self.units += units
+        return response
+
+    def finish(
+        self,
+        latency: float,
+        attempts: int,
+        retries: int,
+        hedges: int,
+        error: Optional[Exception] = None
+    ) -> UsageRecord:
+        """סגירת הקריאה ורישום ב-ledger הפעיל (אם יש)"""
+        with self._lock:
+            self.record = UsageRecord(
+                stage=self.stage,
+                provider=self.provider,
+                model=self.model,
+                input_tokens=self.input_tokens,
+                output_tokens=self.output_tokens,
+                thinking_tokens=self.thinking_tokens,
+                units=self.units,
+                latency=latency,
+                attempts=attempts,
+                retries=retries,
+                hedges=hedges,
+                success=error is None,
+                error="" if error is None else f"{type(error).__name__}: {error}"[:500],
+                puzzle=self.context.get('puzzle') or "",
+                cell=self.context.get('cell'),
+                clues=self.clues,
+                created_at=time.time()
+            )
+            self.record.cost_usd = estimate_cost(self.record)
+
+        ledger = get_ledger()
+        if ledger is not None:
+            try:
+                ledger.record(self.record)
+            except Exception as e:
+                # הרישום לא אמור להפיל את הקריאה עצמה
+                print(f"  Usage ledger error: {e}")
+        return self.record
+
+
+class UsageLedger:
+    """קריאות למודלים בטבלה model_calls (בטוח לשימוש מכמה threads)"""
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        self.db = db_manager or DatabaseManager()
+        self._lock = threading.Lock()
+
+    def record(self, record: UsageRecord) -> None:
+        cell = f"{record.cell[0]},{record.cell[1]}" if record.cell is not None else ""
+        with self._lock:
+            conn = self.db.get_connection()
+            conn.execute('''
+                INSERT INTO model_calls (
+                    created_at, stage, provider, model, puzzle, cell, clues,
+                    input_tokens, output_tokens, thinking_tokens, units,
+                    latency, attempts, retries, hedges, success, error, cost_usd
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                record.created_at or time.time(), record.stage, record.provider, record.model,
+                record.puzzle, cell, ",".join(record.clues),
+                record.input_tokens, record.output_tokens, record.thinking_tokens, record.units,
+                record.latency, record.attempts, record.retries, record.hedges,
+                int(record.success), record.error, record.cost_usd
+            ))
+            conn.commit()
+
+    def load(self, puzzle: Optional[str] = None, limit: Optional[int] = None) -> List[UsageRecord]:
+        """הקריאות לפי הסדר (עם limit - האחרונות בלבד)"""
+        query = 'SELECT * FROM model_calls'
+        params: list = []
+        if puzzle is not None:
+            query += ' WHERE puzzle = ?'
+            params.append(puzzle)
+        query += ' ORDER BY id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        with self._lock:
+            rows = self.db.get_connection().execute(query, params).fetchall()
+        return [self._from_row(row) for row in reversed(rows)]
+
+    @staticmethod
+    def _from_row(row) -> UsageRecord:
+        cell = tuple(int(value) for value in row['cell'].split(',')) if row['cell'] else None
+        return UsageRecord(
+            stage=row['stage'],
+            provider=row['provider'],
+            model=row['model'],
+            input_tokens=row['input_tokens'],
+            output_tokens=row['output_tokens'],
+            thinking_tokens=row['thinking_tokens'],
+            units=row['units'],
+            latency=row['latency'],
+            attempts=row['attempts'],
+            retries=row['retries'],
+            hedges=row['hedges'],
+            success=bool(row['success']),
+            error=row['error'],
+            puzzle=row['puzzle'],
+            cell=cell,
+            clues=row['clues'].split(',') if row['clues'] else [],
+            cost_usd=row['cost_usd'],
+            created_at=row['created_at']
+        )
+
+    def rollup(self, group_by: str = "puzzle", puzzle: Optional[str] = None) -> List[Dict]:
+        """
+        סיכום לפי עמודה (puzzle / stage / provider / model / cell), מהיקר לזול.
+
+        Args:
+            group_by: עמודת הקיבוץ
+            puzzle: רק הקריאות של תשבץ אחד
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unknown group_by: {group_by}")
+
+        query = f'''
+            SELECT {group_by} AS key,
+                   COUNT(*) AS calls,
+                   SUM(1 - success) AS failures,
+                   SUM(input_tokens) AS input_tokens,
+                   SUM(output_tokens) AS output_tokens,
+                   SUM(thinking_tokens) AS thinking_tokens,
+                   SUM(units) AS units,
+                   SUM(retries) AS retries,
+                   SUM(hedges) AS hedges,
+                   SUM(latency) AS total_latency,
+                   AVG(latency) AS mean_latency,
+                   MAX(latency) AS max_latency,
+                   SUM(cost_usd) AS cost_usd
+            FROM model_calls
+        '''
+        params: list = []
+        if puzzle is not None:
+            query += ' WHERE puzzle = ?'
+            params.append(puzzle)
+        query += f' GROUP BY {group_by} ORDER BY cost_usd DESC, calls DESC'
+
+        with self._lock:
+            rows = self.db.get_connection().execute(query, params).fetchall()
+        return [
+            {
+                group_by: row['key'],
+                'calls': row['calls'],
+                'failures': row['failures'],
+                'input_tokens': row['input_tokens'],
+                'output_tokens': row['output_tokens'],
+                'thinking_tokens': row['thinking_tokens'],
+                'units': row['units'],
+                'retries': row['retries'],
+                'hedges': row['hedges'],
+                'total_latency': round(row['total_latency'], 3),
+                'mean_latency': round(row['mean_latency'], 3),
+                'max_latency': round(row['max_latency'], 3),
+                'cost_usd': round(row['cost_usd'], 6),
+            }
+            for row in rows
+        ]
+
+    def totals(self, puzzle: Optional[str] = None) -> Dict:
+        """סיכום כולל (של תשבץ אחד או של הכל); calls=0 כשאין קריאות"""
+        rows = self.rollup("puzzle", puzzle)
+        if not rows:
+            return {'calls': 0, 'failures': 0, 'input_tokens': 0, 'output_tokens': 0,
+                    'thinking_tokens': 0, 'units': 0, 'retries': 0, 'hedges': 0,
+                    'total_latency': 0.0, 'cost_usd': 0.0}
+        keys = ('calls', 'failures', 'input_tokens', 'output_tokens', 'thinking_tokens',
+                'units', 'retries', 'hedges', 'total_latency', 'cost_usd')
+        return {key: sum(row[key] for row in rows) for key in keys}
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.get_connection().execute('SELECT COUNT(*) FROM model_calls').fetchone()[0]
+
+    def clear(self, puzzle: Optional[str] = None) -> None:
+        with self._lock:
+            conn = self.db.get_connection()
+            if puzzle is None:
+                conn.execute('DELETE FROM model_calls')
+            else:
+                conn.execute('DELETE FROM model_calls WHERE puzzle = ?', (puzzle,))
+            conn.commit()
+
+
+# === ledger פעיל ===
+
+_active: Optional[UsageLedger] = None
+_from_env: Optional[Tuple[str, UsageLedger]] = None   # (הנתיב, ה-ledger)
+
+
+def get_ledger() -> Optional[UsageLedger]:
+    """ה-ledger הפעיל (מהקוד, או ממשתנה הסביבה)"""
+    global _from_env
+    if _active is not None:
+        return _active
+
+    path = os.environ.get(ENV_PATH)
+    if not path:
+        return None
+    if _from_env is None or _from_env[0] != path:
+        _from_env = (path, UsageLedger(DatabaseManager(path)))
+    return _from_env[1]
+
+
+def set_ledger(ledger: Optional[UsageLedger]) -> None:
+    """הגדרת ה-ledger הפעיל (None = לפי משתנה הסביבה)"""
+    global _active
+    _active = ledger
+
+
+@contextmanager
+def use_ledger(ledger: UsageLedger) -> Iterator[UsageLedger]:
+    """ledger פעיל בתוך בלוק"""
+    previous = _active
+    set_ledger(ledger)
+    try:
+        yield ledger
+    finally:
+        set_ledger(previous)
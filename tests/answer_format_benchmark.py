@@ -0,0 +1,220 @@
+"""
+Answer Format Benchmark - JSON מול הפורמט הקומפקטי של ClueSolver
+
+לכל תשבץ סינתטי (tests.solver_benchmark) בונה, לכל batch של הגדרות, את
+הפרומפט ואת התשובה ש-OracleClueSolver היה נותן בשני הפורמטים, ומודד:
+- טוקני קלט ופלט להגדרה (הערכה מקומית, או ספירה אמיתית עם --count-tokens)
+- זמן הפענוח להגדרה (ClueSolver._parse_batch_response)
+- כמה הגדרות מתפענחות מתשובה שנקטעה באמצע (max_tokens)
+
+בלי API - חוץ מ---count-tokens, שסופר דרך messages.count_tokens של Anthropic.
+
+הרצה:
+    python -m tests.answer_format_benchmark --size 9x9 --size 13x13 --seeds 3 \\
+        --output formats.json
+"""
+
+import argparse
+import json
+import math
+import re
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.clue_entry import ClueEntry
+from services.clue_solver import ClueSolver
+from services.compact_answers import FORMAT_COMPACT, FORMAT_JSON, OUTPUT_FORMATS, format_compact
+from tests.solver_benchmark import OracleClueSolver, SyntheticPuzzle, generate_puzzle, _parse_size
+
+
+_TOKEN_PIECES = re.compile(r"[֐-׿]+|[A-Za-z_]+|\d+|\n\s*|\S")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    הערכת מספר טוקנים בלי tokenizer: כ-2 אותיות עבריות, 4 אותיות לטיניות
+    או 3 ספרות לטוקן; כל סימן פיסוק וכל ירידת שורה (עם ההזחה) - טוקן.
+    מתאים להשוואה בין פורמטים, לא לחיוב.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if '֐' <= piece[0] <= '׿':
+            tokens += math.ceil(len(piece) / 2)
+        elif piece[0].isalpha() or piece[0] == '_':
+            tokens += math.ceil(len(piece) / 4)
+        elif piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        else:
+            tokens += 1
+    return tokens
+
+
+def anthropic_token_counter(model: str = "claude-sonnet-4-20250514") -> Callable[[str], int]:
+    """ספירה אמיתית דרך messages.count_tokens (דורש anthropic ו-ANTHROPIC_API_KEY)"""
+    import anthropic
+
+    client = anthropic.Anthropic()
+
+    def count(text: str) -> int:
+        return client.messages.count_tokens(
+            model=model, messages=[{'role': "user", 'content': text}]
+        ).input_tokens
+
+    baseline = count(".")
+    return lambda text: max(0, count(text) - baseline)
+
+
+def render_response(output_format: str, clues: List[ClueEntry], solutions: Dict[str, Dict]) -> str:
+    """התשובה שמודל היה כותב לפי הדוגמה בפרומפט של הפורמט"""
+    if output_format == FORMAT_COMPACT:
+        return "\n".join(
+            format_compact(number, **solutions[clue.id]) for number, clue in enumerate(clues, 1)
+        )
+    return json.dumps({'solutions': [
+        {
+            'clue_id': clue.id,
+            'clue_certainty': solutions[clue.id]['clue_certainty'],
+            'candidates': [
+                {'answer': word, 'confidence': conf} for word, conf in solutions[clue.id]['candidates']
+            ],
+        }
+        for clue in clues
+    ]}, ensure_ascii=False, indent=2)
+
+
+@dataclass
+class FormatResult:
+    """תוצאה לפורמט אחד על תשבץ אחד (שורה בפלט)"""
+    output_format: str
+    rows: int
+    cols: int
+    seed: int
+    clues: int
+    batches: int
+    input_tokens_per_clue: float = 0.0
+    output_tokens_per_clue: float = 0.0
+    output_chars_per_clue: float = 0.0
+    parse_us_per_clue: float = 0.0
+    parsed_ratio: float = 0.0        # הגדרות שהתפענחו עם מועמדים
+    truncated_ratio: float = 0.0     # כנ"ל, מתשובה שנקטעה ב-truncate_at
+
+
+def run_benchmark(
+    output_format: str,
+    puzzle: SyntheticPuzzle,
+    seed: int = 0,
+    batch_size: int = 10,
+    distractors: int = 3,
+    repeats: int = 20,
+    truncate_at: float = 0.6,
+    count_tokens: Callable[[str], int] = estimate_tokens
+) -> FormatResult:
+    """מודד פורמט אחד על כל ההגדרות של תשבץ אחד, ב-batches כמו solve_batch"""
+    solver = ClueSolver(output_format=output_format)
+    oracle = OracleClueSolver(puzzle.answers, distractors=distractors, seed=seed)
+    clues = puzzle.clue_db.clues
+    batches = [clues[i:i + batch_size] for i in range(0, len(clues), batch_size)]
+
+    input_tokens = output_tokens = output_chars = parsed = truncated = 0
+    parse_time = 0.0
+    for batch in batches:
+        solutions = {}
+        for clue in batch:
+            result = oracle.solve_clue(clue)
+            solutions[clue.id] = {'clue_certainty': result.clue_certainty, 'candidates': result.candidates}
+
+        prompt = solver._build_batch_prompt(batch)
+        response = render_response(output_format, batch, solutions)
+        input_tokens += count_tokens(prompt)
+        output_tokens += count_tokens(response)
+        output_chars += len(response)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            results = solver._parse_batch_response(response, batch)
+        parse_time += (time.perf_counter() - start) / repeats
+
+        parsed += sum(1 for r in results.values() if r.candidates)
+        cut = solver._parse_batch_response(response[:int(len(response) * truncate_at)], batch)
+        truncated += sum(1 for r in cut.values() if r.candidates)
+
+    total = len(clues) or 1
+    return FormatResult(
+        output_format=output_format,
+        rows=puzzle.rows,
+        cols=puzzle.cols,
+        seed=seed,
+        clues=len(clues),
+        batches=len(batches),
+        input_tokens_per_clue=round(input_tokens / total, 1),
+        output_tokens_per_clue=round(output_tokens / total, 1),
+        output_chars_per_clue=round(output_chars / total, 1),
+        parse_us_per_clue=round(parse_time / total * 1e6, 2),
+        parsed_ratio=round(parsed / total, 3),
+        truncated_ratio=round(truncated / total, 3)
+    )
+
+
+def run_suite(
+    sizes: List[Tuple[int, int]],
+    seeds: int = 1,
+    density: float = 0.25,
+    formats: Tuple[str, ...] = OUTPUT_FORMATS,
+    **options
+) -> List[FormatResult]:
+    """כל הצירופים של גודל × seed × פורמט"""
+    results = []
+    for rows, cols in sizes:
+        for seed in range(seeds):
+            puzzle = generate_puzzle(rows, cols, density, seed)
+            for output_format in formats:
+                results.append(run_benchmark(output_format, puzzle, seed, **options))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> List[FormatResult]:
+    parser = argparse.ArgumentParser(description="ClueSolver answer format benchmark")
+    parser.add_argument("--size", action="append", type=_parse_size,
+                        help="Grid size ROWSxCOLS (repeatable, default 13x13)")
+    parser.add_argument("--density", type=float, default=0.25)
+    parser.add_argument("--seeds", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--distractors", type=int, default=3, help="Candidates per clue besides the answer")
+    parser.add_argument("--repeats", type=int, default=20, help="Parse repetitions for timing")
+    parser.add_argument("--truncate-at", type=float, default=0.6,
+                        help="Fraction of the response kept for the truncation test")
+    parser.add_argument("--count-tokens", action="store_true",
+                        help="Count tokens with the Anthropic API instead of estimating")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=args.size or [(13, 13)],
+        seeds=args.seeds,
+        density=args.density,
+        batch_size=args.batch_size,
+        distractors=args.distractors,
+        repeats=args.repeats,
+        truncate_at=args.truncate_at,
+        count_tokens=anthropic_token_counter() if args.count_tokens else estimate_tokens
+    )
+
+    rows = [asdict(r) for r in results]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'created_at': time.time(), 'results': rows}, f, ensure_ascii=False, indent=2)
+
+    for r in results:
+        print(
+            f"{r.output_format:8s} {r.rows}x{r.cols} seed={r.seed} clues={r.clues:3d} "
+            f"in={r.input_tokens_per_clue:6.1f} out={r.output_tokens_per_clue:6.1f} tok/clue "
+            f"parse={r.parse_us_per_clue:7.2f}us/clue parsed={r.parsed_ratio:.2f} "
+            f"truncated@{args.truncate_at:.0%}={r.truncated_ratio:.2f}"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
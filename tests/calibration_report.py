@@ -0,0 +1,211 @@
+"""
+Calibration Report - עקומות אמינות והשפעת הכיול על backtracks
+
+מאמן ConfidenceCalibrator על traces של פתרונות, ומדווח:
+- עקומת אמינות (ביטחון חזוי מול שיעור נכונים) לפני ואחרי הכיול, ו-ECE
+- backtracks בהרצה חוזרת (replay_trace) של כל trace - בלי כיול ועם כיול
+
+בלי --trace: traces סינתטיים מ-tests.solver_benchmark (OracleClueSolver) עם
+התשובות הנכונות - חצי מה-seeds לאימון וחצי להערכה. עם --trace: traces
+מוקלטים (TraceRecorder); התשובות הן השיבוצים הסופיים בכל trace, והאימון
+על כל ה-traces (או על הדגימות ב-calibration_samples עם --from-store).
+
+בהרצה חוזרת עם כיול הסולבר יכול לבחור שיבוצים אחרים ולשאול תבניות שלא
+הוקלטו - אלה נספרות ב-misses (תשובה ריקה) ומוצגות ליד ה-backtracks.
+
+הרצה:
+    python -m tests.calibration_report --size 9x9 --seeds 6 --method platt
+    python -m tests.calibration_report --trace a.trace.gz --trace b.trace.gz --output report.json
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+
+from services.confidence_calibration import (
+    ConfidenceCalibrator, CalibrationSample, CalibrationStore, samples_from_trace, trace_completed,
+    reliability_curve, expected_calibration_error, METHOD_ISOTONIC, METHOD_PLATT
+)
+from services.solver_strategy import SolverStrategy
+from services.solver_trace import SolverTrace, TraceRecorder, replay_trace
+from tests.solver_benchmark import generate_puzzle, OracleClueSolver, _build_solver
+
+
+@dataclass
+class ReplayResult:
+    """backtracks של trace אחד - בלי כיול ועם כיול"""
+    name: str
+    status: str
+    backtracks: int
+    calibrated_status: str
+    calibrated_backtracks: int
+    misses: int               # שאלות שלא הוקלטו בהרצה עם הכיול
+
+
+@dataclass
+class CalibrationReport:
+    """הפלט המלא"""
+    method: str
+    train_samples: int
+    eval_samples: int
+    raw_curve: List[Dict] = field(default_factory=list)
+    calibrated_curve: List[Dict] = field(default_factory=list)
+    raw_ece: float = 0.0
+    calibrated_ece: float = 0.0
+    replays: List[ReplayResult] = field(default_factory=list)
+
+    @property
+    def backtracks(self) -> Tuple[int, int]:
+        """(סך backtracks בלי כיול, עם כיול)"""
+        return (
+            sum(r.backtracks for r in self.replays),
+            sum(r.calibrated_backtracks for r in self.replays)
+        )
+
+
+def synthetic_traces(
+    rows: int,
+    cols: int,
+    density: float,
+    seeds: List[int],
+    oracle_options: Optional[Dict] = None,
+    max_backtracks: int = 100
+) -> List[Tuple[str, SolverTrace, Dict[str, str]]]:
+    """(שם, trace, התשובות הנכונות) לכל seed - פתרון של SolverStrategy עם OracleClueSolver"""
+    traces = []
+    for seed in seeds:
+        puzzle = generate_puzzle(rows, cols, density, seed)
+        oracle = OracleClueSolver(puzzle.answers, seed=seed, **(oracle_options or {}))
+        solver = _build_solver("strategy", puzzle, oracle, max_backtracks)
+        recorder = TraceRecorder.attach(solver)
+        solver.solve()
+        traces.append((f"{rows}x{cols}-seed{seed}", recorder.trace, puzzle.answers))
+    return traces
+
+
+def replay_with_calibrator(name: str, trace: SolverTrace, calibrator: ConfidenceCalibrator) -> ReplayResult:
+    """הרצה חוזרת של trace בלי כיול ועם כיול"""
+    baseline, baseline_solver = replay_trace(trace)
+
+    def configure(solver):
+        if isinstance(solver, SolverStrategy):
+            solver.calibrator = calibrator
+
+    calibrated, calibrated_solver = replay_trace(trace, configure=configure)
+    return ReplayResult(
+        name=name,
+        status=baseline_solver.get_progress().status.value,
+        backtracks=baseline.summary()['backtracks'],
+        calibrated_status=calibrated_solver.get_progress().status.value,
+        calibrated_backtracks=calibrated.summary()['backtracks'],
+        misses=calibrated_solver.solver.inner.misses
+    )
+
+
+def build_report(
+    train: List[CalibrationSample],
+    evaluation: List[CalibrationSample],
+    replays: List[Tuple[str, SolverTrace]],
+    method: str = METHOD_ISOTONIC,
+    bins: int = 10
+) -> Tuple[CalibrationReport, ConfidenceCalibrator]:
+    """מאמן על train, מודד על evaluation ומריץ שוב את ה-traces"""
+    calibrator = ConfidenceCalibrator(method).fit(train)
+    raw_curve = reliability_curve(evaluation, bins=bins)
+    calibrated_curve = reliability_curve(evaluation, calibrator, bins=bins)
+
+    report = CalibrationReport(
+        method=method,
+        train_samples=len(train),
+        eval_samples=len(evaluation),
+        raw_curve=raw_curve,
+        calibrated_curve=calibrated_curve,
+        raw_ece=expected_calibration_error(raw_curve),
+        calibrated_ece=expected_calibration_error(calibrated_curve),
+        replays=[replay_with_calibrator(name, trace, calibrator) for name, trace in replays]
+    )
+    return report, calibrator
+
+
+def _print_curve(title: str, curve: List[Dict], ece: float) -> None:
+    print(f"\n{title} (ECE={ece:.4f})")
+    for point in curve:
+        bar = "#" * int(round(point['observed'] * 20))
+        print(f"  {point['bin']:.1f}  n={point['count']:5d}  predicted={point['predicted']:.3f}  "
+              f"observed={point['observed']:.3f}  {bar}")
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    rows, _, cols = value.lower().partition("x")
+    return int(rows), int(cols or rows)
+
+
+def main(argv: Optional[List[str]] = None) -> CalibrationReport:
+    parser = argparse.ArgumentParser(description="Confidence calibration report")
+    parser.add_argument("--trace", action="append", help="Recorded trace file (repeatable)")
+    parser.add_argument("--from-store", action="store_true",
+                        help="Fit on the samples in calibration_samples instead of the traces")
+    parser.add_argument("--method", choices=(METHOD_ISOTONIC, METHOD_PLATT), default=METHOD_ISOTONIC)
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--size", type=_parse_size, default=(9, 9), help="Synthetic grid size ROWSxCOLS")
+    parser.add_argument("--density", type=float, default=0.25)
+    parser.add_argument("--seeds", type=int, default=6, help="Synthetic puzzles (half train, half eval)")
+    parser.add_argument("--true-confidence", type=float, default=0.75)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--distractors", type=int, default=3)
+    parser.add_argument("--save-calibrator", help="Write the fitted calibrator as JSON to this path")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        loaded = [(path, SolverTrace.load(path)) for path in args.trace]
+        # בלי תשובות נכונות - רק traces שהסתיימו בפתרון מלא (samples_from_trace)
+        unlabeled = [path for path, trace in loaded if not trace_completed(trace)]
+        if unlabeled:
+            print(f"skipping samples from {len(unlabeled)} trace(s) that did not complete: {', '.join(unlabeled)}")
+        evaluation = [s for _, trace in loaded for s in samples_from_trace(trace)]
+        train = CalibrationStore().load() if args.from_store else evaluation
+        replays = loaded
+    else:
+        rows, cols = args.size
+        half = max(1, args.seeds // 2)
+        oracle_options = {
+            'true_confidence': args.true_confidence,
+            'noise': args.noise,
+            'distractors': args.distractors,
+        }
+        train_traces = synthetic_traces(rows, cols, args.density, list(range(half)), oracle_options)
+        eval_traces = synthetic_traces(rows, cols, args.density, list(range(half, args.seeds)), oracle_options)
+        train = [s for _, trace, answers in train_traces for s in samples_from_trace(trace, answers)]
+        evaluation = [s for _, trace, answers in eval_traces for s in samples_from_trace(trace, answers)]
+        replays = [(name, trace) for name, trace, _ in eval_traces]
+
+    report, calibrator = build_report(train, evaluation, replays, args.method, args.bins)
+
+    print(f"method={report.method} train={report.train_samples} eval={report.eval_samples} "
+          f"fitted={calibrator.is_fitted}")
+    _print_curve("Raw confidence", report.raw_curve, report.raw_ece)
+    _print_curve("Calibrated", report.calibrated_curve, report.calibrated_ece)
+
+    print()
+    for r in report.replays:
+        print(f"{r.name:24s} {r.status:8s} bt={r.backtracks:3d}  ->  "
+              f"{r.calibrated_status:8s} bt={r.calibrated_backtracks:3d} misses={r.misses}")
+    before, after = report.backtracks
+    print(f"total backtracks: {before} -> {after}")
+
+    if args.save_calibrator:
+        calibrator.save(args.save_calibrator)
+    if args.output:
+        data = asdict(report)
+        data['created_at'] = time.time()
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Clue Retrieval Benchmark - זמן חיפוש ו-recall של ClueRetrievalIndex
+
+מייצר מאגר סינתטי של הגדרות עבריות (2-5 מילים מאוצר מילים אקראי) עם
+תשובות, ושאילתות שהן גרסאות רועשות של הגדרות מהמאגר: פיסוק, מילה נוספת
+או חסרה, החלפת אותיות (כמו OCR). נמדד:
+- זמן בנייה (הוספה + דחיסה)
+- זמן lookup ממוצע ו-p95 (במילישניות)
+- recall@k - האם התשובה של ההגדרה המקורית חזרה
+
+הרצה:
+    python -m tests.clue_retrieval_benchmark --clues 100000 --queries 1000
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Tuple
+
+from services.clue_retrieval import ClueRetrievalIndex
+from tests.solver_benchmark import HEBREW_LETTERS
+
+
+@dataclass
+class RetrievalResult:
+    """תוצאת ריצה"""
+    clues: int
+    queries: int
+    k: int
+    build_seconds: float
+    mean_ms: float
+    p95_ms: float
+    recall: float
+
+
+def _word(rng: random.Random, min_length: int = 2, max_length: int = 7) -> str:
+    return "".join(rng.choice(HEBREW_LETTERS) for _ in range(rng.randint(min_length, max_length)))
+
+
+def generate_clues(count: int, vocabulary: int = 20000, seed: int = 0) -> List[Tuple[str, str]]:
+    """(טקסט, תשובה) סינתטיים"""
+    rng = random.Random(seed)
+    words = [_word(rng) for _ in range(vocabulary)]
+    return [
+        (" ".join(rng.choice(words) for _ in range(rng.randint(2, 5))), _word(rng, 2, 9))
+        for _ in range(count)
+    ]
+
+
+def perturb(text: str, rng: random.Random) -> str:
+    """גרסה רועשת של הגדרה: פיסוק, מילה נוספת/חסרה, או החלפת אות"""
+    words = text.split()
+    kind = rng.choice(("punctuation", "extra", "missing", "ocr"))
+    if kind == "punctuation":
+        i = rng.randrange(len(words))
+        words[i] = words[i] + rng.choice((",", ".", " -", "?", ":"))
+    elif kind == "extra":
+        words.insert(rng.randrange(len(words) + 1), _word(rng, 2, 4))
+    elif kind == "missing" and len(words) > 2:
+        del words[rng.randrange(len(words))]
+    else:
+        i = rng.randrange(len(words))
+        word = list(words[i])
+        word[rng.randrange(len(word))] = rng.choice(HEBREW_LETTERS)
+        words[i] = "".join(word)
+    return " ".join(words)
+
+
+def run_benchmark(clues: int, queries: int = 200, k: int = 5, seed: int = 0) -> RetrievalResult:
+    """בונה אינדקס על clues הגדרות ומריץ queries שאילתות רועשות (עם אורך התשובה)"""
+    entries = generate_clues(clues, seed=seed)
+    rng = random.Random(seed + 1)
+
+    start = time.perf_counter()
+    index = ClueRetrievalIndex()
+    index.add_many(entries)
+    index.build()
+    build_seconds = time.perf_counter() - start
+
+    timings = []
+    hits = 0
+    for _ in range(queries):
+        text, answer = rng.choice(entries)
+        query = perturb(text, rng)
+
+        start = time.perf_counter()
+        matches = index.lookup(query, k=k, length=len(answer))
+        timings.append((time.perf_counter() - start) * 1000)
+
+        hits += any(match.answer == answer for match in matches)
+
+    timings.sort()
+    return RetrievalResult(
+        clues=len(index),
+        queries=queries,
+        k=k,
+        build_seconds=round(build_seconds, 3),
+        mean_ms=round(sum(timings) / len(timings), 3),
+        p95_ms=round(timings[int(0.95 * (len(timings) - 1))], 3),
+        recall=round(hits / queries, 3)
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> RetrievalResult:
+    parser = argparse.ArgumentParser(description="Clue retrieval benchmark")
+    parser.add_argument("--clues", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.clues, args.queries, args.k, args.seed)
+    for name, value in asdict(result).items():
+        print(f"{name:14s} {value}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
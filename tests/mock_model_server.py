@@ -0,0 +1,527 @@
+"""
+Mock Model Server - שרת HTTP מקומי שמחקה את ה-API של ספקי המודלים
+
+לבדיקות עומס של BatchProcessor ו-ClueSolver בלי לגעת במכסות אמיתיות.
+מדבר את פורמטי ה-wire שה-SDKs משתמשים בהם:
+- Anthropic:  POST /v1/messages
+- OpenAI:     POST /v1/chat/completions
+- Gemini:     POST /v1beta/models/{model}:generateContent
+
+ניתן לכוונן:
+- התפלגות זמן תגובה (fixed / uniform / lognormal), דטרמיניסטית לפי seed
+- הזרקת 429: בהסתברות קבועה ו/או מעל מספר בקשות לשנייה
+- התשובות: טקסט קבוע (CannedResponder) או OracleClueSolver שמפענח את
+  הפרומפט של ClueSolver ועונה בפורמט שביקש - JSON או שורות קומפקטיות
+  (ClueOracleResponder)
+
+השירותים מופנים לשרת דרך base_url בהגדרות (config.cloud_config) או
+ANTHROPIC_BASE_URL / OPENAI_BASE_URL / GEMINI_BASE_URL.
+
+הרצה:
+    python -m tests.mock_model_server --port 8765 --latency lognormal:0.8:0.4 \\
+        --rate-limit 0.05 --size 13x13
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.clue_entry import ClueEntry
+from services.compact_answers import format_compact
+from tests.solver_benchmark import OracleClueSolver, SyntheticPuzzle, generate_puzzle, _parse_size
+
+
+PROVIDER_ANTHROPIC = "anthropic"
+PROVIDER_OPENAI = "openai"
+PROVIDER_GEMINI = "gemini"
+
+_GEMINI_PATH = re.compile(r"^/v1beta/models/([^/:]+):generateContent$")
+
+
+@dataclass
+class MockRequest:
+    """בקשה שהגיעה לשרת, אחרי פענוח לפי ספק"""
+    provider: str
+    model: str
+    prompt: str      # כל חלקי הטקסט של הבקשה, מחוברים
+    body: Dict
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    התפלגות זמן תגובה בשניות.
+
+    kind:
+        fixed - mean קבוע
+        uniform - אחיד ב-[mean - spread, mean + spread]
+        lognormal - חציון mean, spread = סטיית התקן של הלוגריתם (זנב ארוך)
+    """
+    kind: str = "fixed"
+    mean: float = 0.0
+    spread: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.mean
+        if self.kind == "uniform":
+            return max(0.0, rng.uniform(self.mean - self.spread, self.mean + self.spread))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.mean), self.spread) if self.mean > 0 else 0.0
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+    @classmethod
+    def parse(cls, value: str) -> 'LatencyDistribution':
+        """'lognormal:0.8:0.4' → LatencyDistribution('lognormal', 0.8, 0.4)"""
+        parts = value.split(":")
+        return cls(parts[0], *(float(p) for p in parts[1:3]))
+
+
+class CannedResponder:
+    """
+    תשובת טקסט קבועה, או לפי מחרוזת שמופיעה בפרומפט.
+
+    Example:
+        CannedResponder('{"arrows": []}', {"Solve this clue": '{"candidates": []}'})
+    """
+
+    def __init__(self, default: str = "{}", by_substring: Optional[Dict[str, str]] = None):
+        self.default = default
+        self.by_substring = by_substring or {}
+
+    def __call__(self, request: MockRequest) -> str:
+        for substring, text in self.by_substring.items():
+            if substring in request.prompt:
+                return text
+        return self.default
+
+
+class ClueOracleResponder:
+    """
+    מפענח את הפרומפטים של ClueSolver (בודד ו-batch) ועונה דרך OracleClueSolver,
+    בפורמט ש-ClueSolver ביקש (JSON או שורות קומפקטיות). פרומפט אחר - fallback.
+    """
+
+    _BATCH_CLUE = re.compile(r'- ID: (\S+)\n  Clue: "(.*)"\n  Length: (\d+)(?:\n  Pattern: (\S+))?')
+    _COMPACT_BATCH_CLUE = re.compile(
+        r'^(\d+)\. "(.*)" - (\d+) letters(?:, pattern (\S+))?(?:, not: (.*))?$', re.MULTILINE
+    )
+    _COMPACT_MARKER = "<answer> <confidence>"
+    _SINGLE_CLUE = re.compile(r'Clue: "(.*)"\nAnswer length: (\d+) letters\n(?:Known letters pattern: (\S+))?')
+
+    def __init__(
+        self,
+        oracle: OracleClueSolver,
+        clue_ids: Optional[Dict[str, str]] = None,
+        fallback: Optional[Callable[[MockRequest], str]] = None
+    ):
+        """
+        Args:
+            oracle: ה-oracle (answers לפי clue_id)
+            clue_ids: טקסט הגדרה → clue_id (הפרומפט הבודד לא כולל מזהה)
+            fallback: מי שעונה על פרומפטים שאינם של ClueSolver
+        """
+        self.oracle = oracle
+        self.clue_ids = clue_ids or {}
+        self.fallback = fallback or CannedResponder()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_puzzle(cls, puzzle: SyntheticPuzzle, seed: int = 0, **oracle_options) -> 'ClueOracleResponder':
+        """responder שיודע את התשובות של תשבץ סינתטי"""
+        oracle = OracleClueSolver(puzzle.answers, seed=seed, **oracle_options)
+        return cls(oracle, {clue.text: clue.id for clue in puzzle.clue_db.clues})
+
+    def _clue(self, clue_id: str, text: str, length: int, pattern: Optional[str]) -> ClueEntry:
+        clue = ClueEntry(
+            id=clue_id, source_cell=(0, 0), text=text,
+            answer_cells=[(0, i) for i in range(length)], answer_length=length
+        )
+        if pattern:
+            clue.known_letters = {i: ch for i, ch in enumerate(pattern) if ch != '_'}
+        return clue
+
+    def _solve(self, clue: ClueEntry, excluded: str = "") -> Dict:
+        with self._lock:
+            result = self.oracle.solve_clue(clue)
+        result = self.oracle.without_excluded(result, set(excluded.split()))
+        return {'clue_certainty': result.clue_certainty, 'candidates': result.candidates}
+
+    @staticmethod
+    def _as_json(solution: Dict) -> Dict:
+        return {
+            'clue_certainty': solution['clue_certainty'],
+            'candidates': [{'answer': word, 'confidence': conf} for word, conf in solution['candidates']],
+        }
+
+    def __call__(self, request: MockRequest) -> str:
+        compact = self._COMPACT_MARKER in request.prompt
+
+        compact_batch = self._COMPACT_BATCH_CLUE.findall(request.prompt)
+        if compact and compact_batch:
+            lines = []
+            for number, text, length, pattern, excluded in compact_batch:
+                clue_id = self.clue_ids.get(text, text)
+                solution = self._solve(self._clue(clue_id, text, int(length), pattern), excluded)
+                lines.append(format_compact(int(number), **solution))
+            return "\n".join(lines)
+
+        batch = self._BATCH_CLUE.findall(request.prompt)
+        if batch:
+            solutions = []
+            for clue_id, text, length, pattern in batch:
+                solution = self._solve(self._clue(clue_id, text, int(length), pattern))
+                solutions.append(dict(clue_id=clue_id, **self._as_json(solution)))
+            return json.dumps({'solutions': solutions}, ensure_ascii=False)
+
+        single = self._SINGLE_CLUE.search(request.prompt)
+        if single:
+            text, length, pattern = single.groups()
+            clue_id = self.clue_ids.get(text, text)
+            solution = self._solve(self._clue(clue_id, text, int(length), pattern))
+            if compact:
+                return format_compact(1, **solution)
+            return json.dumps(self._as_json(solution), ensure_ascii=False)
+
+        return self.fallback(request)
+
+
+def _text_parts(content) -> List[str]:
+    """טקסט מתוך content של הודעה (מחרוזת או רשימת בלוקים)"""
+    if isinstance(content, str):
+        return [content]
+    parts = []
+    for block in content or []:
+        if isinstance(block, dict) and isinstance(block.get('text'), str):
+            parts.append(block['text'])
+    return parts
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# === פורמטי wire ===
+
+def _anthropic_response(model: str, prompt: str, text: str) -> Dict:
+    return {
+        'id': f"msg_{uuid.uuid4().hex[:24]}",
+        'type': "message",
+        'role': "assistant",
+        'model': model,
+        'content': [{'type': "text", 'text': text}],
+        'stop_reason': "end_turn",
+        'stop_sequence': None,
+        'usage': {'input_tokens': _estimate_tokens(prompt), 'output_tokens': _estimate_tokens(text)},
+    }
+
+
+def _openai_response(model: str, prompt: str, text: str) -> Dict:
+    prompt_tokens, completion_tokens = _estimate_tokens(prompt), _estimate_tokens(text)
+    return {
+        'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        'object': "chat.completion",
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+            'index': 0,
+            'message': {'role': "assistant", 'content': text},
+            'finish_reason': "stop",
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _gemini_response(model: str, prompt: str, text: str) -> Dict:
+    prompt_tokens, completion_tokens = _estimate_tokens(prompt), _estimate_tokens(text)
+    return {
+        'candidates': [{
+            'content': {'parts': [{'text': text}], 'role': "model"},
+            'finishReason': "STOP",
+            'index': 0,
+        }],
+        'usageMetadata': {
+            'promptTokenCount': prompt_tokens,
+            'candidatesTokenCount': completion_tokens,
+            'totalTokenCount': prompt_tokens + completion_tokens,
+        },
+        'modelVersion': model,
+    }
+
+
+def _rate_limit_body(provider: str) -> Dict:
+    message = "Rate limit exceeded (mock server)"
+    if provider == PROVIDER_ANTHROPIC:
+        return {'type': "error", 'error': {'type': "rate_limit_error", 'message': message}}
+    if provider == PROVIDER_OPENAI:
+        return {'error': {'message': message, 'type': "requests", 'param': None, 'code': "rate_limit_exceeded"}}
+    return {'error': {'code': 429, 'message': message, 'status': "RESOURCE_EXHAUSTED"}}
+
+
+def parse_request(path: str, body: Dict) -> Optional[MockRequest]:
+    """מזהה ספק לפי הנתיב ומחלץ מודל וטקסט; None לנתיב לא מוכר"""
+    path = path.split("?")[0]
+
+    if path == "/v1/messages":
+        parts = _text_parts(body.get('system'))
+        for message in body.get('messages', []):
+            parts.extend(_text_parts(message.get('content')))
+        return MockRequest(PROVIDER_ANTHROPIC, body.get('model', ""), "\n".join(parts), body)
+
+    if path == "/v1/chat/completions":
+        parts = []
+        for message in body.get('messages', []):
+            parts.extend(_text_parts(message.get('content')))
+        return MockRequest(PROVIDER_OPENAI, body.get('model', ""), "\n".join(parts), body)
+
+    match = _GEMINI_PATH.match(path)
+    if match:
+        parts = []
+        for content in body.get('contents', []):
+            parts.extend(_text_parts(content.get('parts')))
+        return MockRequest(PROVIDER_GEMINI, match.group(1), "\n".join(parts), body)
+
+    return None
+
+
+_RESPONSE_BUILDERS = {
+    PROVIDER_ANTHROPIC: _anthropic_response,
+    PROVIDER_OPENAI: _openai_response,
+    PROVIDER_GEMINI: _gemini_response,
+}
+
+
+class MockModelServer:
+    """
+    שרת מקומי ב-thread ברקע.
+
+    Example:
+        with MockModelServer(latency=LatencyDistribution("lognormal", 0.5, 0.3)) as server:
+            solver = ClueSolver(api_key="test", base_url=server.anthropic_base_url)
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[MockRequest], str]] = None,
+        latency: Optional[LatencyDistribution] = None,
+        rate_limit_probability: float = 0.0,
+        max_requests_per_second: Optional[int] = None,
+        retry_after: float = 1.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            responder: MockRequest → טקסט התשובה (ברירת מחדל: CannedResponder)
+            latency: התפלגות זמן התגובה (ברירת מחדל: בלי השהיה)
+            rate_limit_probability: הסתברות ל-429 בכל בקשה
+            max_requests_per_second: מעל זה (בחלון של שנייה) - 429
+            retry_after: ערך ה-header retry-after בתשובות 429
+            seed: seed להשהיות ול-429 האקראיים
+            port: 0 = פורט פנוי כלשהו
+        """
+        self.responder = responder or CannedResponder()
+        self.latency = latency or LatencyDistribution()
+        self.rate_limit_probability = rate_limit_probability
+        self.max_requests_per_second = max_requests_per_second
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._window: List[float] = []   # זמני הבקשות בשנייה האחרונה
+
+        # סטטיסטיקות
+        self.requests: Dict[str, int] = {}
+        self.rate_limited = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    # === כתובות ===
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def anthropic_base_url(self) -> str:
+        return self.base_url
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def gemini_base_url(self) -> str:
+        return f"{self.base_url}/"
+
+    # === מחזור חיים ===
+
+    def start(self) -> 'MockModelServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockModelServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # === טיפול בבקשה ===
+
+    def _admit(self, provider: str) -> Tuple[bool, float]:
+        """(האם לענות 429, השהיה) - תחת נעילה, כדי שה-seed יישאר דטרמיניסטי"""
+        with self._lock:
+            self.requests[provider] = self.requests.get(provider, 0) + 1
+
+            now = time.time()
+            self._window = [t for t in self._window if now - t < 1.0]
+            self._window.append(now)
+
+            limited = self._rng.random() < self.rate_limit_probability
+            if self.max_requests_per_second is not None and len(self._window) > self.max_requests_per_second:
+                limited = True
+            if limited:
+                self.rate_limited += 1
+
+            return limited, self.latency.sample(self._rng)
+
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict, Dict[str, str]]:
+        """
+        מטפל בבקשה אחת (בלי HTTP - שימושי גם בבדיקות).
+
+        Returns:
+            (status, JSON body, headers)
+        """
+        request = parse_request(path, body)
+        if request is None:
+            return 404, {'error': {'message': f"Unknown path: {path}"}}, {}
+
+        limited, delay = self._admit(request.provider)
+        if limited:
+            return 429, _rate_limit_body(request.provider), {'retry-after': str(self.retry_after)}
+
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if delay > 0:
+                self._sleep(delay)
+            text = self.responder(request)
+            return 200, _RESPONSE_BUILDERS[request.provider](request.model, request.prompt, text), {}
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            return 500, {'error': {'message': str(e)}}, {}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    body = {}
+
+                status, payload, headers = server.handle(self.path, body)
+
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', "application/json")
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def get_statistics(self) -> Dict:
+        """סטטיסטיקות השרת"""
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'rate_limited': self.rate_limited,
+                'errors': self.errors,
+                'max_in_flight': self.max_in_flight,
+            }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local mock model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=LatencyDistribution.parse, default=LatencyDistribution(),
+                        help="KIND:MEAN[:SPREAD], e.g. lognormal:0.8:0.4")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Probability of a 429 per request")
+    parser.add_argument("--max-rps", type=int, help="Requests per second before 429s")
+    parser.add_argument("--canned", help="Canned response text for non-clue prompts (e.g. arrow JSON)")
+    parser.add_argument("--size", type=_parse_size, help="Answer clues from a synthetic puzzle ROWSxCOLS")
+    parser.add_argument("--density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    responder: Callable[[MockRequest], str] = CannedResponder(args.canned or "{}")
+    if args.size:
+        puzzle = generate_puzzle(args.size[0], args.size[1], args.density, seed=args.seed)
+        oracle = ClueOracleResponder.for_puzzle(puzzle, seed=args.seed)
+        oracle.fallback = responder
+        responder = oracle
+
+    server = MockModelServer(
+        responder, args.latency, args.rate_limit, args.max_rps,
+        seed=args.seed, host=args.host, port=args.port
+    )
+    print(f"Mock model server on {server.base_url}")
+    print(f"  ANTHROPIC_BASE_URL={server.anthropic_base_url}")
+    print(f"  OPENAI_BASE_URL={server.openai_base_url}")
+    print(f"  GEMINI_BASE_URL={server.gemini_base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(json.dumps(server.get_statistics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
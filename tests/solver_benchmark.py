@@ -0,0 +1,415 @@
+"""
+Solver Benchmark - בנצ'מרק סינתטי לשכבת הפתרון
+
+מייצר תשבצים בסגנון עברי (תשובות אופקיות מימין לשמאל ואנכיות מלמעלה למטה)
+בגודל ובצפיפות נתונים עם מילוי ידוע, ומריץ עליהם את SolverStrategy ו-PuzzleSolver
+עם OracleClueSolver - תחליף מקומי ל-ClueSolver שמחזיר את התשובה הנכונה
+ועוד מסיחים רועשים בביטחון שניתן לכוונון. בלי API.
+
+נמדד: זמן ריצה, שיבוצים, backtracks, שאילתות חוזרות, זיכרון שיא ודיוק.
+
+הרצה:
+    python -m tests.solver_benchmark --size 9x9 --size 13x13 --density 0.25 --seeds 3 \\
+        --output benchmark.json
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Collection, Dict, List, Mapping, Optional, Tuple
+
+from models.clue_entry import ClueEntry, WritingDirection
+from services.clue_database import ClueDatabase
+from services.solution_grid import SolutionGrid
+from services.clue_solver import ClueSolver, SolverResult
+from services.puzzle_solver import PuzzleSolver
+from services.solver_strategy import SolverStrategy
+
+
+HEBREW_LETTERS = "אבגדהוזחטיכלמנסעפצקרשת"
+
+SOLVERS = ("strategy", "puzzle")
+
+
+@dataclass
+class SyntheticPuzzle:
+    """תשבץ סינתטי עם מילוי ידוע"""
+    rows: int
+    cols: int
+    clue_db: ClueDatabase
+    answers: Dict[str, str]                    # clue_id → התשובה הנכונה
+    letters: Dict[Tuple[int, int], str]        # המילוי הנכון לכל משבצת תשובה
+
+    def new_solution(self) -> SolutionGrid:
+        return SolutionGrid(self.rows, self.cols)
+
+
+def generate_puzzle(
+    rows: int,
+    cols: int,
+    density: float = 0.25,
+    seed: int = 0,
+    min_length: int = 2
+) -> SyntheticPuzzle:
+    """
+    מייצר תשבץ: משבצות הגדרה אקראיות בצפיפות density, תשובות לאורך כל רצף
+    של לפחות min_length משבצות פתוחות, ומילוי אקראי של אותיות עבריות.
+
+    Args:
+        rows, cols: גודל הגריד
+        density: שיעור משבצות ההגדרה (0.0-1.0)
+        seed: זרע אקראיות (אותו seed = אותו תשבץ)
+        min_length: אורך תשובה מינימלי
+    """
+    rng = random.Random(seed)
+
+    is_clue = [[rng.random() < density for _ in range(cols)] for _ in range(rows)]
+    # משבצת הפינה הימנית העליונה היא תמיד הגדרה - כמו בתשבצי חצים
+    is_clue[0][cols - 1] = True
+
+    letters = {
+        (r, c): rng.choice(HEBREW_LETTERS)
+        for r in range(rows) for c in range(cols) if not is_clue[r][c]
+    }
+
+    clue_db = ClueDatabase()
+    answers: Dict[str, str] = {}
+
+    def add_slot(cells: List[Tuple[int, int]], direction: WritingDirection, suffix: str) -> None:
+        if len(cells) < min_length:
+            return
+        start = cells[0]
+        # משבצת ההגדרה: השכנה לפני תחילת התשובה (אם יש)
+        dr, dc = (0, 1) if direction == WritingDirection.LEFT else (-1, 0)
+        before = (start[0] + dr, start[1] + dc)
+        source = before if 0 <= before[0] < rows and 0 <= before[1] < cols else start
+
+        clue_id = f"clue_{start[0]}_{start[1]}_{suffix}"
+        clue_db.add_clue(ClueEntry(
+            id=clue_id,
+            source_cell=source,
+            text=f"הגדרה {clue_id}",
+            answer_start_cell=start,
+            writing_direction=direction,
+            answer_length=len(cells),
+            answer_cells=list(cells)
+        ))
+        answers[clue_id] = "".join(letters[cell] for cell in cells)
+
+    # אופקי - מימין לשמאל
+    for r in range(rows):
+        run: List[Tuple[int, int]] = []
+        for c in range(cols - 1, -2, -1):
+            if c >= 0 and not is_clue[r][c]:
+                run.append((r, c))
+                continue
+            add_slot(run, WritingDirection.LEFT, "h")
+            run = []
+
+    # אנכי - מלמעלה למטה
+    for c in range(cols):
+        run = []
+        for r in range(rows + 1):
+            if r < rows and not is_clue[r][c]:
+                run.append((r, c))
+                continue
+            add_slot(run, WritingDirection.DOWN, "v")
+            run = []
+
+    # משבצות פתוחות שלא שייכות לאף תשובה (רצף באורך 1 בשני הכיוונים) לא נמדדות
+    covered = {cell for clue in clue_db.clues for cell in clue.answer_cells}
+    letters = {cell: letter for cell, letter in letters.items() if cell in covered}
+
+    return SyntheticPuzzle(rows=rows, cols=cols, clue_db=clue_db, answers=answers, letters=letters)
+
+
+class OracleClueSolver(ClueSolver):
+    """
+    ClueSolver מקומי שיודע את התשובות.
+
+    לכל שאילתא: התשובה הנכונה (אלא אם "פוספסה" לפי miss_rate) בביטחון
+    true_confidence ± noise, ועוד distractors מילים שנוצרו משינוי אותיות
+    בתשובה הנכונה - כולן מתאימות לאותיות הידועות, כמו תשובת LLM.
+    התוצאה דטרמיניסטית לכל (seed, הגדרה, תבנית).
+    """
+
+    def __init__(
+        self,
+        answers: Dict[str, str],
+        distractors: int = 3,
+        true_confidence: float = 0.75,
+        noise: float = 0.1,
+        miss_rate: float = 0.0,
+        clue_certainty: float = 0.8,
+        seed: int = 0
+    ):
+        super().__init__(api_key=None)
+        self.answers = answers
+        self.distractors = distractors
+        self.true_confidence = true_confidence
+        self.noise = noise
+        self.miss_rate = miss_rate
+        self.clue_certainty = clue_certainty
+        self.seed = seed
+
+        self.calls = 0
+        self.query_counts: Dict[str, int] = {}
+
+    @property
+    def requeries(self) -> int:
+        """שאילתות על הגדרות שכבר נשאלו"""
+        return sum(count - 1 for count in self.query_counts.values())
+
+    def _clamp(self, value: float) -> float:
+        return round(min(0.99, max(0.01, value)), 3)
+
+    def _result_for(self, clue: ClueEntry) -> SolverResult:
+        self.query_counts[clue.id] = self.query_counts.get(clue.id, 0) + 1
+
+        pattern = clue.get_constraint_string()
+        rng = random.Random(f"{self.seed}|{clue.id}|{pattern}")
+        true_answer = self.answers.get(clue.id, "")
+
+        candidates: Dict[str, float] = {}
+        if true_answer and rng.random() >= self.miss_rate:
+            candidates[true_answer] = self._clamp(
+                self.true_confidence + rng.uniform(-self.noise, self.noise)
+            )
+
+        free = [i for i in range(len(true_answer)) if i not in clue.known_letters]
+        for _ in range(self.distractors if free else 0):
+            word = list(true_answer)
+            for i in rng.sample(free, rng.randint(1, max(1, len(free) // 2))):
+                word[i] = rng.choice(HEBREW_LETTERS)
+            word = "".join(word)
+            if word not in candidates:
+                candidates[word] = self._clamp(
+                    rng.uniform(0.1, self.true_confidence) + rng.uniform(-self.noise, self.noise)
+                )
+
+        ranked = sorted(
+            ((word, conf) for word, conf in candidates.items() if clue.matches_answer(word)),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return SolverResult(candidates=ranked, clue_certainty=self.clue_certainty)
+
+    def solve_clue(self, clue: ClueEntry, use_cache: bool = True, deadline: Optional[float] = None) -> SolverResult:
+        self.calls += 1
+        return self._result_for(clue)
+
+    def solve_batch(
+        self,
+        clues: List[ClueEntry],
+        max_per_request: int = 10,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> Dict[str, SolverResult]:
+        self.calls += 1
+        exclude = exclude or {}
+        return {clue.id: self.without_excluded(self._result_for(clue), exclude.get(clue.id)) for clue in clues}
+
+
+@dataclass
+class BenchmarkResult:
+    """תוצאת ריצה אחת (שורה בפלט)"""
+    solver: str
+    rows: int
+    cols: int
+    density: float
+    seed: int
+    clues: int
+    status: str = ""
+    wall_time: float = 0.0
+    placements: int = 0
+    backtracks: int = 0
+    requeries: int = 0
+    oracle_calls: int = 0
+    peak_memory_kb: Optional[float] = None
+    filled_ratio: float = 0.0     # משבצות מלאות מתוך משבצות התשובה
+    accuracy: float = 0.0         # משבצות נכונות מתוך משבצות התשובה
+
+
+def _build_solver(kind: str, puzzle: SyntheticPuzzle, oracle: OracleClueSolver, max_backtracks: int):
+    """סולבר חדש על עותק נקי של התשבץ"""
+    clue_db = ClueDatabase()
+    for clue in puzzle.clue_db.clues:
+        clue_db.add_clue(ClueEntry(
+            id=clue.id,
+            source_cell=clue.source_cell,
+            text=clue.text,
+            answer_start_cell=clue.answer_start_cell,
+            writing_direction=clue.writing_direction,
+            answer_length=clue.answer_length,
+            answer_cells=list(clue.answer_cells)
+        ))
+    solution = puzzle.new_solution()
+
+    if kind == "puzzle":
+        solver = PuzzleSolver(clue_db, solution, oracle, max_backtracks)
+        solver.callbacks.letter_delay_ms = 0
+    else:
+        solver = SolverStrategy(clue_db, solution, oracle, max_backtracks)
+    return solver
+
+
+def _solve_once(
+    kind: str,
+    puzzle: SyntheticPuzzle,
+    oracle_options: Dict,
+    max_backtracks: int
+) -> Tuple[object, OracleClueSolver, Dict[str, int], float]:
+    oracle = OracleClueSolver(puzzle.answers, **oracle_options)
+    solver = _build_solver(kind, puzzle, oracle, max_backtracks)
+
+    counts = {'placements': 0, 'backtracks': 0}
+    if kind == "puzzle":
+        solver.callbacks.on_clue_solved = lambda *_: counts.__setitem__('placements', counts['placements'] + 1)
+        solver.callbacks.on_backtrack = lambda *_: counts.__setitem__('backtracks', counts['backtracks'] + 1)
+    else:
+        solver.callbacks.on_word_placed = lambda *_: counts.__setitem__('placements', counts['placements'] + 1)
+        solver.callbacks.on_backtrack = lambda *_: counts.__setitem__('backtracks', counts['backtracks'] + 1)
+
+    start = time.perf_counter()
+    progress = solver.solve()
+    elapsed = time.perf_counter() - start
+
+    counts['status'] = progress.status.value
+    return solver, oracle, counts, elapsed
+
+
+def run_benchmark(
+    kind: str,
+    puzzle: SyntheticPuzzle,
+    density: float = 0.0,
+    seed: int = 0,
+    oracle_options: Optional[Dict] = None,
+    max_backtracks: int = 100,
+    measure_memory: bool = True
+) -> BenchmarkResult:
+    """
+    מריץ סולבר אחד על תשבץ אחד.
+
+    הזמן נמדד בריצה בלי tracemalloc; הזיכרון בריצה נוספת זהה (דטרמיניסטית).
+    """
+    oracle_options = dict(oracle_options or {})
+    oracle_options.setdefault('seed', seed)
+
+    solver, oracle, counts, elapsed = _solve_once(kind, puzzle, oracle_options, max_backtracks)
+
+    peak_kb = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            _solve_once(kind, puzzle, oracle_options, max_backtracks)
+            peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    total = len(puzzle.letters)
+    filled = sum(1 for (r, c) in puzzle.letters if solver.solution.get_letter(r, c))
+    correct = sum(
+        1 for (r, c), letter in puzzle.letters.items()
+        if solver.solution.get_letter(r, c) == letter
+    )
+
+    return BenchmarkResult(
+        solver=kind,
+        rows=puzzle.rows,
+        cols=puzzle.cols,
+        density=density,
+        seed=seed,
+        clues=len(puzzle.answers),
+        status=counts['status'],
+        wall_time=round(elapsed, 4),
+        placements=counts['placements'],
+        backtracks=counts['backtracks'],
+        requeries=oracle.requeries,
+        oracle_calls=oracle.calls,
+        peak_memory_kb=peak_kb,
+        filled_ratio=round(filled / total, 3) if total else 0.0,
+        accuracy=round(correct / total, 3) if total else 0.0
+    )
+
+
+def run_suite(
+    sizes: List[Tuple[int, int]],
+    densities: List[float],
+    seeds: int = 1,
+    solvers: Tuple[str, ...] = SOLVERS,
+    oracle_options: Optional[Dict] = None,
+    max_backtracks: int = 100,
+    measure_memory: bool = True
+) -> List[BenchmarkResult]:
+    """מריץ את כל הצירופים של גודל × צפיפות × seed × סולבר"""
+    results = []
+    for rows, cols in sizes:
+        for density in densities:
+            for seed in range(seeds):
+                puzzle = generate_puzzle(rows, cols, density, seed)
+                for kind in solvers:
+                    results.append(run_benchmark(
+                        kind, puzzle, density, seed, oracle_options, max_backtracks, measure_memory
+                    ))
+    return results
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    rows, _, cols = value.lower().partition("x")
+    return int(rows), int(cols or rows)
+
+
+def main(argv: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    parser = argparse.ArgumentParser(description="Synthetic solver benchmark")
+    parser.add_argument("--size", action="append", type=_parse_size,
+                        help="Grid size ROWSxCOLS (repeatable, default 9x9)")
+    parser.add_argument("--density", action="append", type=float,
+                        help="Clue cell density (repeatable, default 0.25)")
+    parser.add_argument("--seeds", type=int, default=1, help="Puzzles per size/density")
+    parser.add_argument("--solver", action="append", choices=SOLVERS, help="Solvers to run (default: all)")
+    parser.add_argument("--distractors", type=int, default=3)
+    parser.add_argument("--true-confidence", type=float, default=0.75)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--miss-rate", type=float, default=0.0)
+    parser.add_argument("--max-backtracks", type=int, default=100)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=args.size or [(9, 9)],
+        densities=args.density or [0.25],
+        seeds=args.seeds,
+        solvers=tuple(args.solver or SOLVERS),
+        oracle_options={
+            'distractors': args.distractors,
+            'true_confidence': args.true_confidence,
+            'noise': args.noise,
+            'miss_rate': args.miss_rate,
+        },
+        max_backtracks=args.max_backtracks,
+        measure_memory=not args.no_memory
+    )
+
+    rows = [asdict(r) for r in results]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'created_at': time.time(), 'results': rows}, f, ensure_ascii=False, indent=2)
+
+    for r in results:
+        print(
+            f"{r.solver:9s} {r.rows}x{r.cols} d={r.density:.2f} seed={r.seed} "
+            f"clues={r.clues:3d} {r.status:8s} time={r.wall_time:.3f}s "
+            f"placed={r.placements} bt={r.backtracks} rq={r.requeries} "
+            f"mem={r.peak_memory_kb}KB acc={r.accuracy:.2f}"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Solver Fixtures
+תשבצים קטנים ו-ClueSolver מקומי לבדיקות שכבת הפתרון (בלי API)
+"""
+
+import json
+import re
+from types import SimpleNamespace
+from typing import Collection, Dict, List, Mapping, Optional, Tuple
+
+from models.clue_entry import ClueEntry
+from services.clue_database import ClueDatabase
+from services.solution_grid import SolutionGrid
+from services.clue_solver import ClueSolver, SolverResult
+from services.compact_answers import format_compact
+
+
+# שני אזורים שאינם חולקים משבצת:
+# אזור א' - שתי הגדרות שמצטלבות ב-(0, 0)
+# אזור ב' - שתי הגדרות שמצטלבות ב-(0, 6)
+TWO_REGIONS = {
+    'clue_a1': ([(0, 0), (0, 1), (0, 2)], "אבג"),
+    'clue_a2': ([(0, 0), (1, 0), (2, 0)], "אדה"),
+    'clue_b1': ([(0, 5), (0, 6)], "וז"),
+    'clue_b2': ([(0, 6), (1, 6), (2, 6)], "זחט"),
+}
+
+# שרשרת: כל הגדרה חוצה רק את הבאה אחריה (גריד 5x5)
+CHAIN = {
+    'clue_1': ([(0, 0), (0, 1), (0, 2)], "אבג"),
+    'clue_2': ([(0, 2), (1, 2), (2, 2)], "גדה"),
+    'clue_3': ([(2, 2), (2, 3), (2, 4)], "הוז"),
+    'clue_4': ([(2, 4), (3, 4), (4, 4)], "זחט"),
+}
+
+# מלכודת בעומק שני צעדים על CHAIN: המועמד המוביל של clue_1 (אבכ) משאיר
+# ל-clue_2 מועמד (כדמ), אבל זה כבר לא מתיישב עם clue_3.
+# forward checking רואה רק שכנים ישירים - ולכן לא מזהה אותה מראש.
+DEEP_TRAP = {
+    'clue_1': [("אבכ", 0.8), ("אבג", 0.6)],
+    'clue_2': [("כדמ", 0.7), ("גדה", 0.5)],
+    'clue_3': [("הוז", 0.7), ("הול", 0.4)],
+    'clue_4': [("זחט", 0.7), ("לחט", 0.4)],
+}
+
+
+def build_puzzle(
+    layout: Dict[str, Tuple[List[Tuple[int, int]], str]],
+    rows: int = 3,
+    cols: int = 7
+) -> Tuple[ClueDatabase, SolutionGrid]:
+    """
+    בונה ClueDatabase ו-SolutionGrid מפריסה.
+
+    Args:
+        layout: clue_id → (משבצות התשובה, התשובה הנכונה)
+        rows, cols: גודל הגריד
+
+    Returns:
+        (clue_db, solution)
+    """
+    clue_db = ClueDatabase()
+    for clue_id, (cells, answer) in layout.items():
+        clue_db.add_clue(ClueEntry(
+            id=clue_id,
+            source_cell=cells[0],
+            text=f"הגדרה {clue_id}",
+            answer_cells=list(cells),
+            answer_length=len(cells)
+        ))
+
+    return clue_db, SolutionGrid(rows, cols)
+
+
+class FakeClueSolver(ClueSolver):
+    """
+    ClueSolver מקומי: מחזיר רשימת מועמדים קבועה לכל הגדרה,
+    מסוננת לפי האותיות הידועות.
+    """
+
+    def __init__(self, answers: Dict[str, List[Tuple[str, float]]], clue_certainty: float = 0.8):
+        super().__init__(api_key=None)
+        self.answers = answers  # clue_id → [(תשובה, ביטחון), ...]
+        self.clue_certainty = clue_certainty
+        self.calls = 0
+
+    def _result_for(self, clue: ClueEntry) -> SolverResult:
+        candidates = [
+            (word, conf) for word, conf in self.answers.get(clue.id, [])
+            if clue.matches_answer(word)
+        ]
+        return SolverResult(candidates=candidates, clue_certainty=self.clue_certainty)
+
+    def solve_clue(self, clue: ClueEntry, use_cache: bool = True, deadline: Optional[float] = None) -> SolverResult:
+        self.calls += 1
+        return self._result_for(clue)
+
+    def solve_batch(
+        self,
+        clues: List[ClueEntry],
+        max_per_request: int = 10,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Mapping[str, Collection[str]]] = None
+    ) -> Dict[str, SolverResult]:
+        self.calls += 1
+        exclude = exclude or {}
+        return {clue.id: self.without_excluded(self._result_for(clue), exclude.get(clue.id)) for clue in clues}
+
+
+def answers_from_layout(
+    layout: Dict[str, Tuple[List[Tuple[int, int]], str]],
+    confidence: float = 0.7
+) -> Dict[str, List[Tuple[str, float]]]:
+    """מועמד נכון יחיד לכל הגדרה"""
+    return {clue_id: [(answer, confidence)] for clue_id, (_, answer) in layout.items()}
+
+
+class StubAnthropicClient:
+    """
+    מחליף את anthropic.Anthropic: מחזיר תשובה קבועה לכל ההגדרות שמופיעות
+    בפרומפט - JSON ל-BATCH_SOLVE_PROMPT, שורות ל-COMPACT_BATCH_SOLVE_PROMPT
+    (לפי הטקסט של build_puzzle) - וסופר קריאות.
+    """
+
+    _COMPACT_CLUE = re.compile(r'^(\d+)\. "הגדרה (\S+)" - ', re.MULTILINE)
+
+    def __init__(self, answers: Dict[str, List[Tuple[str, float]]], clue_certainty: float = 0.8):
+        self.answers = answers
+        self.clue_certainty = clue_certainty
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        prompt = kwargs['messages'][0]['content']
+        compact = self._COMPACT_CLUE.findall(prompt)
+        if compact:
+            text = "\n".join(
+                format_compact(int(number), self.clue_certainty, self.answers[clue_id])
+                for number, clue_id in compact if clue_id in self.answers
+            )
+            return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+        solutions = [
+            {
+                'clue_id': clue_id,
+                'clue_certainty': self.clue_certainty,
+                'candidates': [{'answer': w, 'confidence': c} for w, c in candidates]
+            }
+            for clue_id, candidates in self.answers.items()
+            if f"ID: {clue_id}\n" in prompt
+        ]
+        text = json.dumps({'solutions': solutions}, ensure_ascii=False)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
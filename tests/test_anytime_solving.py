@@ -0,0 +1,143 @@
+"""
+Tests for deadline-driven (anytime) solving
+"""
+
+import time
+
+import pytest
+
+from services.clue_solver import ClueSolver, SolverResult, DEADLINE_EXCEEDED
+from services.solver_checkpoint import encode_checkpoint, restore_checkpoint
+from services.solver_strategy import SolverStrategy, SolveStatus, SolvePhase
+from tests.solver_fixtures import (
+    TWO_REGIONS,
+    build_puzzle,
+    answers_from_layout,
+    FakeClueSolver,
+    StubAnthropicClient,
+)
+
+
+class TestAnytimeSolving:
+    """בדיקות לפתרון עם מגבלת זמן"""
+
+    def test_solves_within_time_limit(self):
+        """זמן מספיק - פתרון מלא כרגיל"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers_from_layout(TWO_REGIONS)))
+
+        progress = strategy.solve(time_limit=30)
+
+        assert progress.status == SolveStatus.SOLVED
+
+    def test_expired_deadline_times_out(self):
+        """deadline שעבר - עוצרים מיד עם TIMED_OUT"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers_from_layout(TWO_REGIONS)))
+
+        progress = strategy.solve(time_limit=0)
+
+        assert progress.status == SolveStatus.TIMED_OUT
+        assert progress.solved_clues == 0
+
+    def test_best_partial_restored_when_stuck(self):
+        """אחרי backtracking שרוקן את הגריד - חוזרים לפתרון החלקי הטוב ביותר"""
+        answers = {'clue_a1': [("אבג", 0.9)]}  # לשאר ההגדרות אין מועמדים
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers))
+
+        progress = strategy.solve()
+
+        assert progress.status == SolveStatus.STUCK
+        assert progress.backtracks >= 1
+        assert solution.get_answer_for_clue(clue_db.get_clue('clue_a1')) == "אבג"
+        assert strategy.state.clue_states['clue_a1'].placed_confidence == 0.9
+        assert clue_db.get_clue('clue_a2').get_constraint_string() == "א__"
+
+
+class ExpiringClueSolver(FakeClueSolver):
+    """השאילתא הראשונה מחכה עד ה-deadline ולא עונה על ההגדרות ב-expiring"""
+
+    def __init__(self, answers, expiring):
+        super().__init__(answers)
+        self.expiring = set(expiring)
+
+    def solve_batch(self, clues, max_per_request=10, use_cache=True, deadline=None, exclude=None):
+        results = super().solve_batch(clues, max_per_request, use_cache, deadline, exclude)
+        if self.calls == 1 and deadline is not None:
+            time.sleep(max(0.0, deadline - time.time()))
+            for clue_id in self.expiring & set(results):
+                results[clue_id] = SolverResult(candidates=[], error=DEADLINE_EXCEEDED)
+        return results
+
+
+class TestResumeAfterTimeout:
+    """בדיקות להמשך הפתרון אחרי TIMED_OUT"""
+
+    def test_resume_after_timeout_in_initial_query(self):
+        """הזמן נגמר לפני השאילתא הראשונית - resume מריץ אותה"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers_from_layout(TWO_REGIONS)))
+
+        assert strategy.solve(time_limit=0).status == SolveStatus.TIMED_OUT
+        assert strategy.state.interrupted_phase == SolvePhase.INITIAL_QUERY
+
+        progress = strategy.resume()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert strategy.solver.calls == 1
+        assert strategy.state.interrupted_phase is None
+
+    def test_expired_clues_are_requeried(self):
+        """הגדרות שהשאילתא שלהן פגה נשאלות שוב - גם אחרי שחזור checkpoint"""
+        answers = answers_from_layout(TWO_REGIONS)
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, ExpiringClueSolver(answers, ['clue_b1', 'clue_b2']))
+
+        assert strategy.solve(time_limit=0.2).status == SolveStatus.TIMED_OUT
+        assert strategy.state.clue_states['clue_b1'].needs_requery
+
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        restored = SolverStrategy(clue_db, solution, FakeClueSolver(answers))
+        restore_checkpoint(restored, encode_checkpoint(strategy))
+        progress = restored.resume()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert restored.solver.calls == 1
+
+
+class TestQueryDeadline:
+    """בדיקות ל-deadline בשאילתות LLM"""
+
+    def test_no_calls_after_deadline(self):
+        """deadline שעבר - לא שולחים קריאות"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        solver = ClueSolver(api_key=None)
+        solver.client = StubAnthropicClient(answers_from_layout(TWO_REGIONS))
+
+        results = solver.solve_batch(clue_db.clues, deadline=time.time() - 1)
+
+        assert solver.client.calls == 0
+        assert all(r.error == "Deadline exceeded" for r in results.values())
+
+    def test_remaining_time_is_call_timeout(self):
+        """הזמן שנותר עובר כ-timeout לקריאה"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        solver = ClueSolver(api_key=None)
+        solver.client = StubAnthropicClient(answers_from_layout(TWO_REGIONS))
+
+        received = {}
+        create = solver.client.create
+
+        def recording_create(**kwargs):
+            received.update(kwargs)
+            return create(**kwargs)
+
+        solver.client.create = recording_create
+        solver.solve_batch(clue_db.clues, deadline=time.time() + 20)
+
+        assert 0 < received['timeout'] <= 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
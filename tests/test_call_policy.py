@@ -0,0 +1,218 @@
+"""
+Tests for per-call deadlines, jittered backoff and hedged requests
+"""
+
+import pickle
+import random
+import threading
+import time
+
+import pytest
+
+from services.call_policy import CallPolicy, CallTimeout, ResilientCaller, LatencyTracker, timeout_ms
+from services.cassette import fingerprint
+from services.clue_solver import ClueSolver, ANTHROPIC_AVAILABLE
+from tests.mock_model_server import MockModelServer, LatencyDistribution
+from tests.solver_benchmark import generate_puzzle
+
+
+class Flaky:
+    """נכשל failures פעמים ואז מצליח"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, timeout):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"failure {self.calls}")
+        return "ok"
+
+
+class TestBackoff:
+    """בדיקות ל-backoff"""
+
+    def test_full_jitter_is_bounded_and_capped(self):
+        policy = CallPolicy(backoff_base=1.0, backoff_max=5.0)
+        rng = random.Random(0)
+
+        for attempt in range(6):
+            delays = [policy.backoff(attempt, rng) for _ in range(50)]
+            assert all(0 <= d <= min(5.0, 2 ** attempt) for d in delays)
+
+    def test_retries_until_success(self):
+        """retries עם השהיות jitter, דטרמיניסטיות לפי seed"""
+        def run(seed):
+            slept = []
+            caller = ResilientCaller(CallPolicy(max_attempts=3), seed=seed, sleep=slept.append)
+            return caller.call(Flaky(2)), slept, caller
+
+        result, slept, caller = run(5)
+
+        assert result == "ok"
+        assert len(slept) == 2
+        assert slept == run(5)[1]
+        assert (caller.attempts, caller.retries, caller.failures) == (3, 2, 0)
+
+    def test_last_error_is_raised(self):
+        errors = []
+        caller = ResilientCaller(
+            CallPolicy(max_attempts=2), sleep=lambda d: None,
+            on_error=lambda attempt, e: errors.append(attempt)
+        )
+
+        with pytest.raises(ConnectionError, match="failure 2"):
+            caller.call(Flaky(5))
+        assert errors == [0, 1]
+        assert caller.failures == 1
+
+
+class TestDeadlines:
+    """בדיקות ל-deadlines"""
+
+    def test_attempt_timeout(self):
+        """קריאה תקועה - CallTimeout אחרי ה-timeout, לא אחרי הקריאה"""
+        release = threading.Event()
+        caller = ResilientCaller(CallPolicy(timeout=0.1, max_attempts=2), sleep=lambda d: None)
+        start = time.time()
+
+        with pytest.raises(CallTimeout):
+            caller.call(lambda timeout: release.wait(5))
+        release.set()
+
+        assert time.time() - start < 1.0
+        assert caller.timeouts == 2
+
+    def test_timeout_passed_to_func(self):
+        """הפונקציה מקבלת את הזמן שנותר (להעברה ל-SDK)"""
+        seen = []
+        ResilientCaller(CallPolicy(timeout=5.0)).call(lambda timeout: seen.append(timeout))
+
+        assert 4.0 < seen[0] <= 5.0
+
+    def test_total_deadline_stops_retries(self):
+        """deadline כולל - לא מתחילים ניסיון אחרי שעבר"""
+        caller = ResilientCaller(CallPolicy(max_attempts=10, backoff_base=0.05), seed=1)
+        flaky = Flaky(100)
+
+        with pytest.raises(Exception):
+            caller.call(flaky, deadline=time.time() + 0.2)
+
+        assert flaky.calls < 10
+
+    def test_no_request_after_deadline(self):
+        """hedge מאוחר - לא נשלחת בקשה עם timeout של 0 (שה-SDK היה מתעלם ממנו)"""
+        release = threading.Event()
+        seen = []
+
+        def request(timeout):
+            seen.append(timeout)
+            release.wait(5)
+
+        caller = ResilientCaller(CallPolicy(timeout=0.1, max_attempts=1, hedge=True, hedge_after=0.1))
+        for _ in range(5):
+            with pytest.raises(CallTimeout):
+                caller.call(request)
+        release.set()
+
+        assert all(timeout > 0 for timeout in seen)
+
+    def test_timeout_ms(self):
+        """timeout ל-HttpOptions - לפחות מילישנייה אחת"""
+        assert timeout_ms(None) is None
+        assert timeout_ms(2.5) == 2500
+        assert timeout_ms(0.0001) == 1
+
+
+class TestHedging:
+    """בדיקות ל-hedging"""
+
+    def test_hedge_wins_over_slow_call(self):
+        """הבקשה הראשונה איטית - הכפולה חוזרת קודם"""
+        release = threading.Event()
+        calls = []
+
+        def request(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        caller = ResilientCaller(CallPolicy(hedge=True, hedge_after=0.05))
+        start = time.time()
+        result = caller.call(request)
+        release.set()
+
+        assert result == "fast"
+        assert time.time() - start < 1.0
+        assert (caller.hedges_sent, caller.hedges_won) == (1, 1)
+
+    def test_no_hedge_when_fast(self):
+        caller = ResilientCaller(CallPolicy(hedge=True, hedge_after=1.0))
+
+        assert caller.call(lambda timeout: "ok") == "ok"
+        assert caller.hedges_sent == 0
+
+    def test_auto_delay_from_percentile(self):
+        """בלי hedge_after - p95 של הזמנים, רק אחרי מספיק דגימות"""
+        caller = ResilientCaller(CallPolicy(hedge=True, hedge_min_samples=20))
+        assert caller.hedge_delay() is None
+
+        for i in range(1, 101):
+            caller.latencies.record(i / 100)
+
+        assert caller.hedge_delay() == pytest.approx(0.96)
+        assert ResilientCaller(CallPolicy(hedge=False)).hedge_delay() is None
+
+    def test_picklable(self):
+        """ClueSolver עם ה-caller עובר ל-worker processes"""
+        caller = ResilientCaller(CallPolicy(hedge=True), on_error=print)
+        caller.latencies.record(0.5)
+
+        restored = pickle.loads(pickle.dumps(caller))
+
+        assert restored.latencies.percentile(0.5) == 0.5
+        assert restored.on_error is None
+        assert restored.call(lambda timeout: "ok") == "ok"
+
+    def test_latency_tracker_window(self):
+        tracker = LatencyTracker(window=3)
+        for value in [10.0, 1.0, 2.0, 3.0]:
+            tracker.record(value)
+
+        assert len(tracker) == 3
+        assert tracker.percentile(0.99) == 3.0
+
+
+class TestIntegration:
+    """בדיקות חיבור"""
+
+    def test_cassette_fingerprint_ignores_timeout(self):
+        """ה-timeout שנותר משתנה בין קריאות - לא חלק מהזיהוי"""
+        assert fingerprint("ns", "create", (), {'model': "m", 'timeout': 59.9}) == \
+            fingerprint("ns", "create", (), {'model': "m", 'timeout': 12.3})
+
+    @pytest.mark.skipif(not ANTHROPIC_AVAILABLE, reason="anthropic not installed")
+    def test_clue_solver_deadline_against_slow_server(self):
+        """שרת איטי - ClueSolver חוזר עם שגיאה בתוך ה-deadline"""
+        puzzle = generate_puzzle(7, 7, seed=1)
+        clue = puzzle.clue_db.clues[0]
+
+        with MockModelServer(latency=LatencyDistribution("fixed", 2.0)) as server:
+            solver = ClueSolver(
+                api_key="test", base_url=server.anthropic_base_url,
+                call_policy=CallPolicy(timeout=0.2, max_attempts=1)
+            )
+            start = time.time()
+            result = solver.solve_clue(clue, use_cache=False)
+            elapsed = time.time() - start
+
+        assert result.error
+        assert elapsed < 1.5
+        assert solver.get_call_stats()['calls'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
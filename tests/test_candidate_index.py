@@ -0,0 +1,141 @@
+"""
+Tests for CandidateIndex storage and secondary indexes
+"""
+
+import pytest
+
+from services.candidate_index import CandidateIndex, CandidateWord
+
+
+def _candidate(clue_id, word, confidence=0.6, phase=1):
+    return CandidateWord(
+        word=word, clue_id=clue_id, confidence=confidence, clue_certainty=0.8, query_phase=phase
+    )
+
+
+class TestKeyedStorage:
+    """בדיקות לאחסון לפי (clue_id, word)"""
+
+    def test_duplicate_is_merged(self):
+        """מועמד כפול מתמזג ולא נוסף שוב"""
+        index = CandidateIndex()
+        index.add_candidate(_candidate('c1', "אבג", 0.4))
+        index.add_candidate(_candidate('c1', "אבג", 0.8, phase=2))
+
+        candidates = index.get_candidates_for_clue('c1')
+
+        assert len(candidates) == 1
+        assert candidates[0].confidence == pytest.approx(0.6)
+        assert candidates[0].query_phase == 2
+
+    def test_merge_new_candidates_weights_requery(self):
+        """re-query מקבל משקל כפול"""
+        index = CandidateIndex()
+        index.add_candidate(_candidate('c1', "אבג", 0.3))
+
+        updated = index.merge_new_candidates(
+            [_candidate('c1', "אבג", 0.9), _candidate('c1', "אבד", 0.5)], current_phase=2
+        )
+
+        assert updated == 2
+        by_word = {c.word: c for c in index.get_candidates_for_clue('c1')}
+        assert by_word["אבג"].confidence == pytest.approx(0.7)
+        assert by_word["אבד"].query_phase == 2
+
+    def test_failed_word_not_readded(self):
+        """מילה שנכשלה לא נוספת שוב"""
+        index = CandidateIndex()
+        index.add_candidate(_candidate('c1', "אבג"))
+        index.mark_as_failed('c1', "אבג")
+        index.add_candidate(_candidate('c1', "אבג"))
+
+        assert index.get_candidate_count('c1') == 0
+        assert index.get_failed_words() == {'c1': {"אבג"}}
+
+
+class TestSecondaryIndexes:
+    """בדיקות לעקביות האינדקסים המשניים"""
+
+    def test_shared_word_survives_single_removal(self):
+        """מילה של שתי הגדרות נשארת באינדקס עד שהוסרה משתיהן"""
+        index = CandidateIndex()
+        index.add_candidate(_candidate('c1', "אבג"))
+        index.add_candidate(_candidate('c2', "אבג"))
+
+        index.remove_candidate('c1', "אבג")
+        assert index.get_words_with_letter(3, 1, "ב") == {"אבג"}
+
+        index.mark_as_failed('c2', "אבג")
+        assert index.get_words_with_letter(3, 1, "ב") == set()
+        assert index.get_words_by_length(3) == set()
+
+    def test_filters_update_indexes(self):
+        """filter_by_letter ו-filter_by_pattern מסירים גם מהאינדקסים המשניים"""
+        index = CandidateIndex()
+        index.add_candidates([
+            _candidate('c1', "אבג"), _candidate('c1', "אדג"), _candidate('c1', "הבג"),
+        ])
+
+        assert index.filter_by_letter('c1', 1, "ב", 3) == 1
+        assert index.filter_by_pattern('c1', "א__") == 1
+
+        assert [c.word for c in index.get_candidates_for_clue('c1')] == ["אבג"]
+        assert index.get_words_by_length(3) == {"אבג"}
+        assert index.get_words_with_letter(3, 0, "ה") == set()
+
+    def test_memory_steady_across_phases(self):
+        """סבבי הוספה וסינון חוזרים לא מגדילים את האינדקסים"""
+        index = CandidateIndex()
+
+        for phase in range(1, 20):
+            index.add_candidates([
+                _candidate('c1', "אב" + letter, phase=phase) for letter in "גדהוזחט"
+            ])
+            index.filter_by_pattern('c1', "אבג")
+            index.clear_clue('c1')
+
+        assert index.get_statistics()['total_candidates'] == 0
+        assert index._by_length == {}
+        assert index._position_index == {}
+
+    def test_subset_copies_candidates(self):
+        """subset מעתיק מועמדים - שינוי בעותק לא משפיע על המקור"""
+        index = CandidateIndex()
+        index.add_candidates([_candidate('c1', "אבג"), _candidate('c2', "דהו")])
+
+        sub = index.subset({'c1'})
+        sub.remove_candidate('c1', "אבג")
+
+        assert sub.get_all_clue_ids() == []
+        assert index.get_candidate_count('c1') == 1
+        assert index.get_words_by_length(3) == {"אבג", "דהו"}
+
+
+class TestHasValidCandidate:
+    """בדיקות לבדיקה המקדימה של מועמדים"""
+
+    def test_pattern_and_extra_letters(self):
+        """תבנית ואותיות נוספות מצמצמות יחד"""
+        index = CandidateIndex()
+        index.add_candidate(_candidate('c1', "אבג"))
+        index.add_candidate(_candidate('c1', "דבה"))
+
+        assert index.has_valid_candidate('c1', "_ב_")
+        assert index.has_valid_candidate('c1', "_ב_", {0: "ד"})
+        assert index.has_valid_candidate('c1', "_ב_", {0: "א", 2: "ג"})
+        assert not index.has_valid_candidate('c1', "_ב_", {0: "א", 2: "ה"})
+        assert not index.has_valid_candidate('c1', "__ג", {0: "ד"})
+
+    def test_ignores_other_clues_and_does_not_mutate(self):
+        """מילה של הגדרה אחרת לא נספרת; האינדקס לא משתנה"""
+        index = CandidateIndex()
+        index.add_candidate(_candidate('c1', "אבג"))
+        index.add_candidate(_candidate('c2', "תבג"))
+
+        assert not index.has_valid_candidate('c1', "___", {0: "ת"})
+        assert not index.has_valid_candidate('missing', "___")
+        assert index.get_candidate_count('c1') == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
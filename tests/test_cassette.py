@@ -0,0 +1,216 @@
+"""
+Tests for the record/replay cassette layer
+"""
+
+import gzip
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from models.clue_entry import ClueEntry
+from services.cassette import (
+    Cassette, CassetteMiss, LatencyProfile, MODE_RECORD, MODE_REPLAY, MODE_AUTO,
+    fingerprint, use_cassette, wrap_client, get_cassette, ENV_PATH, ENV_MODE
+)
+from services.clue_solver import ClueSolver
+
+
+class FakeMessages:
+    """messages.create של SDK מדומה - תשובה שונה בכל קריאה"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(text=f"reply {self.calls}")])
+
+
+class FakeClient:
+    def __init__(self):
+        self.messages = FakeMessages()
+
+
+def _text(response):
+    return response.content[0].text
+
+
+class TestRecordReplay:
+    """בדיקות להקלטה ולהשמעה"""
+
+    def test_replay_without_live_client(self, tmp_path):
+        """מה שהוקלט חוזר מהקובץ - בלי client חי"""
+        live = FakeClient()
+        recorder = Cassette(str(tmp_path), mode=MODE_RECORD).wrap("clue_solver", live)
+        assert _text(recorder.messages.create(model="m", messages=["שלום"])) == "reply 1"
+
+        player = Cassette(str(tmp_path), mode=MODE_REPLAY).replay_client("clue_solver")
+
+        assert _text(player.messages.create(model="m", messages=["שלום"])) == "reply 1"
+        assert live.messages.calls == 1
+
+    def test_miss_raises(self, tmp_path):
+        """בקשה שלא הוקלטה - CassetteMiss"""
+        cassette = Cassette(str(tmp_path), mode=MODE_REPLAY)
+
+        with pytest.raises(CassetteMiss):
+            cassette.replay_client("clue_solver").messages.create(model="m")
+        assert cassette.misses == 1
+
+    def test_repeated_request_replays_in_order(self, tmp_path):
+        """אותה בקשה שהוקלטה פעמיים חוזרת לפי הסדר, ואחר כך האחרונה"""
+        recorder = Cassette(str(tmp_path), mode=MODE_RECORD).wrap("ns", FakeClient())
+        recorder.messages.create(model="m")
+        recorder.messages.create(model="m")
+
+        player = Cassette(str(tmp_path), mode=MODE_REPLAY).replay_client("ns")
+
+        assert [_text(player.messages.create(model="m")) for _ in range(3)] == [
+            "reply 1", "reply 2", "reply 2"
+        ]
+
+    def test_auto_records_only_misses(self, tmp_path):
+        """auto - משמיע מה שקיים, קורא ל-API רק לבקשות חדשות"""
+        Cassette(str(tmp_path), mode=MODE_RECORD).wrap("ns", FakeClient()).messages.create(model="a")
+        live = FakeClient()
+        cassette = Cassette(str(tmp_path), mode=MODE_AUTO)
+        client = cassette.wrap("ns", live)
+
+        client.messages.create(model="a")
+        client.messages.create(model="b")
+
+        assert live.messages.calls == 1
+        assert (cassette.hits, cassette.misses, cassette.recorded) == (1, 1, 1)
+
+    def test_record_overwrites(self, tmp_path):
+        """record מקליט מחדש - התשובה הישנה מוחלפת"""
+        Cassette(str(tmp_path), mode=MODE_RECORD).wrap("ns", FakeClient()).messages.create(model="m")
+        live = FakeClient()
+        live.messages.calls = 10
+        Cassette(str(tmp_path), mode=MODE_RECORD).wrap("ns", live).messages.create(model="m")
+
+        player = Cassette(str(tmp_path), mode=MODE_REPLAY).replay_client("ns")
+
+        assert _text(player.messages.create(model="m")) == "reply 11"
+
+    def test_record_appends_to_file(self, tmp_path):
+        """כל הקלטה נוספת לסוף הקובץ; frame שנקטע בסוף לא מפיל את הטעינה"""
+        cassette = Cassette(str(tmp_path), mode=MODE_RECORD)
+        recorder = cassette.wrap("ns", FakeClient())
+        path = tmp_path / "ns.cassette"
+
+        recorder.messages.create(model="a")
+        first = path.read_bytes()
+        recorder.messages.create(model="b")
+        assert path.read_bytes().startswith(first)
+
+        with open(path, 'ab') as f:
+            f.write(gzip.compress(b"truncated")[:10])
+        player = Cassette(str(tmp_path), mode=MODE_REPLAY).replay_client("ns")
+
+        assert _text(player.messages.create(model="b")) == "reply 2"
+
+    def test_compact(self, tmp_path):
+        """compact משאיר רק את ההקלטות בתוקף"""
+        for calls in (0, 10):
+            live = FakeClient()
+            live.messages.calls = calls
+            cassette = Cassette(str(tmp_path), mode=MODE_RECORD)
+            cassette.wrap("ns", live).messages.create(model="m")
+        path = tmp_path / "ns.cassette"
+        size = path.stat().st_size
+
+        cassette.compact()
+        player = Cassette(str(tmp_path), mode=MODE_REPLAY).replay_client("ns")
+
+        assert path.stat().st_size < size
+        assert [_text(player.messages.create(model="m")) for _ in range(2)] == ["reply 11", "reply 11"]
+
+
+class TestFingerprint:
+    """בדיקות ל-fingerprint"""
+
+    def test_images_hashed_by_content(self):
+        """bytes ו-numpy לפי תוכן; סדר מפתחות לא משנה"""
+        image = np.zeros((4, 4, 3), dtype=np.uint8)
+        same = fingerprint("ns", "detect", (image.copy(),), {'a': 1, 'b': b"xy"})
+
+        assert fingerprint("ns", "detect", (image,), {'b': b"xy", 'a': 1}) == same
+        assert fingerprint("ns", "detect", (image + 1,), {'a': 1, 'b': b"xy"}) != same
+        assert fingerprint("other", "detect", (image,), {'a': 1, 'b': b"xy"}) != same
+
+
+class TestLatency:
+    """בדיקות לפרופילי ההשהיה"""
+
+    def _replay(self, tmp_path, latency, seed=0):
+        Cassette(str(tmp_path), mode=MODE_RECORD).wrap("ns", FakeClient()).messages.create(model="m")
+        slept = []
+        cassette = Cassette(str(tmp_path), mode=MODE_REPLAY, latency=latency, seed=seed, sleep=slept.append)
+        client = cassette.replay_client("ns")
+        for _ in range(3):
+            client.messages.create(model="m")
+        return slept, cassette
+
+    def test_instant(self, tmp_path):
+        slept, cassette = self._replay(tmp_path, "instant")
+        assert slept == []
+        assert cassette.get_statistics()['hits'] == 3
+
+    def test_fixed_with_jitter_is_deterministic(self, tmp_path):
+        """jitter לפי seed - אותו seed, אותן השהיות"""
+        profile = LatencyProfile("test", kind="fixed", seconds=1.0, jitter=0.5)
+        first, cassette = self._replay(tmp_path, profile, seed=3)
+        second, _ = self._replay(tmp_path, profile, seed=3)
+
+        assert first == second
+        assert all(0.5 <= delay <= 1.5 for delay in first)
+        assert cassette.simulated_latency == pytest.approx(sum(first))
+
+
+class TestServices:
+    """בדיקות לחיבור לשירותים"""
+
+    def test_clue_solver_offline(self, tmp_path):
+        """ClueSolver מוקלט ומושמע בלי API key"""
+        clue = ClueEntry(id="c1", source_cell=(0, 0), text="בירת צרפת", answer_cells=[(0, 1)] * 4, answer_length=4)
+        reply = json.dumps({'clue_certainty': 0.9, 'candidates': [{'answer': "פריז", 'confidence': 0.95}]})
+
+        live = SimpleNamespace(messages=SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(content=[SimpleNamespace(text=reply)])
+        ))
+        with use_cassette(Cassette(str(tmp_path), mode=MODE_RECORD)):
+            recording = ClueSolver()
+            recording.client = wrap_client("clue_solver", live)
+            recorded = recording.solve_clue(clue)
+
+        with use_cassette(Cassette(str(tmp_path), mode=MODE_REPLAY)) as cassette:
+            replayed = ClueSolver().solve_clue(clue)
+
+        assert recorded.candidates == [("פריז", 0.95)]
+        assert replayed.candidates == recorded.candidates
+        assert cassette.hits == 1
+
+    def test_no_cassette_is_passthrough(self, monkeypatch):
+        """בלי cassette פעיל - ה-client חוזר כמו שהוא"""
+        monkeypatch.delenv(ENV_PATH, raising=False)
+        client = FakeClient()
+
+        assert get_cassette() is None
+        assert wrap_client("ns", client) is client
+
+    def test_environment_config(self, tmp_path, monkeypatch):
+        """cassette ממשתני סביבה (עובר גם ל-worker processes)"""
+        monkeypatch.setenv(ENV_PATH, str(tmp_path))
+        monkeypatch.setenv(ENV_MODE, MODE_REPLAY)
+
+        cassette = get_cassette()
+
+        assert cassette.mode == MODE_REPLAY
+        assert ClueSolver().client is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,167 @@
+"""
+Tests for the provider circuit breaker and arrow-detection failover
+"""
+
+import numpy as np
+import pytest
+
+from config.cloud_config import CloudServicesConfig
+from models.recognition_result import ArrowResult, ArrowDetectionResult
+from services.circuit_breaker import (
+    CircuitBreaker, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN, get_breaker, reset_breakers
+)
+from services.recognition_orchestrator import RecognitionOrchestrator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDetector:
+    """גלאי מדומה - מחזיר תוצאה קבועה, תוצאת שגיאה או חריגה"""
+
+    def __init__(self, direction="straight-down", error=None, raises=False):
+        self.direction = direction
+        self.error = error
+        self.raises = raises
+        self.calls = 0
+
+    def detect_arrow(self, image, bbox=None):
+        self.calls += 1
+        if self.raises:
+            raise RuntimeError("service unavailable")
+        if self.error:
+            return ArrowDetectionResult(arrows=[
+                ArrowResult(direction="none", confidence=0.0, template_matched=f"error: {self.error}")
+            ])
+        return ArrowDetectionResult(arrows=[ArrowResult(direction=self.direction, confidence=0.9)])
+
+
+class FakeTemplate:
+    def __init__(self):
+        self.calls = 0
+
+    def detect_arrow(self, image, bbox=None):
+        self.calls += 1
+        return ArrowResult(direction="template", confidence=0.5)
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+class TestCircuitBreaker:
+    """בדיקות למכונת המצבים"""
+
+    def test_opens_after_threshold(self):
+        """כשלונות רצופים פותחים; הצלחה באמצע מאפסת את הספירה"""
+        breaker = CircuitBreaker("gemini", failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == STATE_CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == STATE_OPEN
+        assert not breaker.allow()
+        assert breaker.get_statistics()['rejected'] == 1
+
+    def test_half_open_probe(self):
+        """אחרי reset_seconds - probe אחד; הצלחה סוגרת, כשלון פותח מחדש"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("gpt", failure_threshold=1, reset_seconds=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.state == STATE_HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == STATE_CLOSED
+        assert breaker.times_opened == 2
+
+    def test_slow_call_counts_as_failure(self):
+        breaker = CircuitBreaker("claude", failure_threshold=1, slow_call_seconds=5, clock=FakeClock())
+        breaker.record_success(latency=1)
+        assert breaker.state == STATE_CLOSED
+
+        breaker.record_success(latency=6)
+
+        assert breaker.state == STATE_OPEN
+
+    def test_registry_is_shared(self):
+        assert get_breaker("gemini", failure_threshold=7) is get_breaker("gemini")
+        assert get_breaker("gemini").failure_threshold == 7
+
+
+class TestFailover:
+    """בדיקות לניתוב בין ספקים ב-RecognitionOrchestrator"""
+
+    IMAGE = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def _orchestrator(self, gemini, gpt=None, **options):
+        config = CloudServicesConfig(breaker_failure_threshold=2, **options)
+        config.gpt.api_key = "key" if gpt is not None else ""
+        config.claude.api_key = ""
+        orchestrator = RecognitionOrchestrator(config)
+        orchestrator._gemini_arrow = gemini
+        orchestrator._gpt_arrow = gpt
+        orchestrator._template_arrow = FakeTemplate()
+        return orchestrator
+
+    def test_open_breaker_fails_over(self):
+        """אחרי שהמפסק נפתח - הספק הבא, בלי לקרוא שוב לספק שנפל"""
+        gemini, gpt = FakeDetector(error="503"), FakeDetector(direction="gpt")
+        orchestrator = self._orchestrator(gemini, gpt)
+
+        first, _ = orchestrator._detect_arrows(self.IMAGE)
+        second, _ = orchestrator._detect_arrows(self.IMAGE)
+        third, _ = orchestrator._detect_arrows(self.IMAGE)
+
+        assert first[0].template_matched == "error: 503"
+        assert second[0].direction == "gpt"
+        assert third[0].direction == "gpt"
+        assert (gemini.calls, gpt.calls) == (2, 2)
+        assert orchestrator.get_active_providers()['circuit_breakers']['gemini'] == STATE_OPEN
+
+    def test_exceptions_fail_over_to_template(self):
+        """חריגות פותחות את המפסק; בלי ספק זמין נוסף - Template Matching"""
+        gemini = FakeDetector(raises=True)
+        orchestrator = self._orchestrator(gemini)
+
+        with pytest.raises(RuntimeError):
+            orchestrator._detect_arrows(self.IMAGE)
+        result, _ = orchestrator._detect_arrows(self.IMAGE)
+        again, _ = orchestrator._detect_arrows(self.IMAGE)
+
+        assert result[0].direction == again[0].direction == "template"
+        assert gemini.calls == 2
+
+    def test_without_failover_circuit_open_is_instant(self):
+        """failover כבוי - מפסק פתוח מחזיר שגיאה מיד"""
+        gemini = FakeDetector(error="timeout")
+        orchestrator = self._orchestrator(gemini, enable_failover=False)
+
+        for _ in range(3):
+            result, _ = orchestrator._detect_arrows(self.IMAGE)
+
+        assert result[0].template_matched == "error: circuit open"
+        assert gemini.calls == 2
+        assert orchestrator.template_arrow.calls == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
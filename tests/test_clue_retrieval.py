@@ -0,0 +1,112 @@
+"""
+Tests for the solved-clue similarity index
+"""
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from models.clue_entry import ClueEntry
+from services.clue_retrieval import ClueRetrievalIndex, SolvedClueStore, normalize_clue_text, char_ngrams
+from tests.clue_retrieval_benchmark import run_benchmark
+
+
+SOLVED = [
+    ("חטיף בוטנים פופולרי", "במבה"),
+    ("בירת צרפת", "פריז"),
+    ("עיר הבירה של איטליה", "רומא"),
+    ("מטבע ישראלי", "שקל"),
+    ("כלי נגינה בעל מיתרים", "גיטרה"),
+    ("כלי נגינה בעל מיתרים", "נבל"),
+]
+
+
+def _index():
+    index = ClueRetrievalIndex()
+    index.add_many(SOLVED)
+    return index
+
+
+def _clue(text, length, known=None):
+    clue = ClueEntry(
+        id="c1", source_cell=(0, 0), text=text,
+        answer_cells=[(0, i) for i in range(length)], answer_length=length
+    )
+    for position, letter in (known or {}).items():
+        clue.known_letters[position] = letter
+    return clue
+
+
+class TestNormalization:
+    """בדיקות לנרמול הטקסט"""
+
+    def test_normalize(self):
+        assert normalize_clue_text('  צה"ל: חַיִל-אוויר, (קיצור) ') == "צהל חיל אוויר קיצור"
+        assert normalize_clue_text("מסך אדום") == normalize_clue_text("מסכ אדומ")
+
+    def test_ngrams_pad_words(self):
+        assert char_ngrams("אב גד") == {" אב": 1, "אב ": 1, "ב ג": 1, " גד": 1, "גד ": 1}
+
+
+class TestLookup:
+    """בדיקות לחיפוש"""
+
+    def test_near_duplicates_found(self):
+        """פיסוק, מילה נוספת ושגיאת OCR - עדיין התשובה הנכונה ראשונה"""
+        index = _index()
+
+        for query in ("חטיף-בוטנים, פופולארי!", "חטיף בוטנים פופולרי מאוד", "חטיף בוטגים פופולרי"):
+            assert index.lookup(query)[0].answer == "במבה"
+        assert index.lookup("בירת צרפת")[0].similarity == pytest.approx(1.0)
+
+    def test_length_and_pattern_filter(self):
+        """אותו טקסט עם שתי תשובות - האורך והתבנית בוחרים"""
+        index = _index()
+
+        both = index.lookup("כלי נגינה עם מיתרים")
+        by_length = index.lookup("כלי נגינה עם מיתרים", length=3)
+        by_pattern = index.lookup_clue(_clue("כלי נגינה עם מיתרים", 5, known={0: "ג"}))
+
+        assert [m.answer for m in both] == ["גיטרה", "נבל"]
+        assert [m.answer for m in by_length] == ["נבל"]
+        assert [m.answer for m in by_pattern] == ["גיטרה"]
+        assert index.lookup_clue(_clue("כלי נגינה עם מיתרים", 5, known={0: "ב"})) == []
+
+    def test_threshold_k_and_duplicates(self):
+        index = _index()
+
+        assert not index.add("בירת  צרפת!", "פריז")
+        assert index.add("בירת צרפת", "פאריז")
+        assert len(index) == len(SOLVED) + 1
+        assert index.lookup("מזג אוויר חם") == []
+        assert len(index.lookup("בירת צרפת", k=1)) == 1
+        assert ClueRetrievalIndex().lookup("בירת צרפת") == []
+
+    def test_benchmark_is_fast_and_accurate(self):
+        result = run_benchmark(clues=5000, queries=50)
+
+        assert result.recall >= 0.95
+        assert result.mean_ms < 20
+
+
+class TestStore:
+    """בדיקות לשמירה ב-solved_clues"""
+
+    def test_store_and_rebuild(self, tmp_path):
+        store = SolvedClueStore(DatabaseManager(tmp_path / "test.db"))
+        solved = _clue("בירת צרפת", 4)
+        solved.chosen_answer, solved.is_solved = "פריז", True
+        unsolved = _clue("מטבע ישראלי", 3)
+
+        assert store.add(SOLVED[:2]) == 2
+        assert store.add(SOLVED[:2]) == 0
+        assert store.add_solved([solved, unsolved], source="puzzle") == 0
+        store.add([("מטבע ישראלי", "שקל")])
+
+        index = ClueRetrievalIndex.from_store(store)
+
+        assert store.count() == 3
+        assert index.lookup("מטבע בישראל")[0].answer == "שקל"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
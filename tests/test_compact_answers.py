@@ -0,0 +1,133 @@
+"""
+Tests for the compact clue-answer format
+"""
+
+import json
+
+import pytest
+
+from models.clue_entry import ClueEntry
+from services.clue_solver import ClueSolver
+from services.compact_answers import (
+    CompactAnswerParser, parse_compact, parse_line, format_compact, extract_json, FORMAT_JSON
+)
+from tests.answer_format_benchmark import run_suite, estimate_tokens
+
+
+def _clue(clue_id, length, known=None):
+    clue = ClueEntry(
+        id=clue_id, source_cell=(0, 0), text=f"הגדרה {clue_id}",
+        answer_cells=[(0, i) for i in range(length)], answer_length=length
+    )
+    clue.known_letters = known or {}
+    return clue
+
+
+class TestParser:
+    """בדיקות לפענוח השורות"""
+
+    def test_round_trip(self):
+        line = format_compact(3, 0.85, [("תשובה", 0.95), ("אחרת", 0.8)])
+
+        parsed = parse_line(line)
+
+        assert line == "3|85|תשובה 95|אחרת 80"
+        assert (parsed.index, parsed.clue_certainty) == (3, 0.85)
+        assert parsed.candidates == [("תשובה", 0.95), ("אחרת", 0.8)]
+
+    def test_tolerant_variants(self):
+        """תבליטים, מספר עם נקודה, שבר/אחוזים, ':' , בלי certainty ובלי ביטחון"""
+        answers = parse_compact(
+            "```\n"
+            "Here are the answers:\n"
+            "- 1.| 0.9 | תשובה 0.95 | אחרת:80%\n"
+            "2|לב טוב 70|שלום\n"
+            "```"
+        )
+
+        assert answers[1].clue_certainty == 0.9
+        assert answers[1].candidates == [("תשובה", 0.95), ("אחרת", 0.8)]
+        assert answers[2].clue_certainty == 0.5
+        assert answers[2].candidates == [("לבטוב", 0.7), ("שלום", 0.5)]
+
+    def test_streaming_chunks(self):
+        """שורה מפוענחת ברגע שהושלמה, גם כשהיא מגיעה בכמה חלקים"""
+        parser = CompactAnswerParser()
+
+        assert parser.feed("1|80|תש") == []
+        assert [a.index for a in parser.feed("ובה 90\n2|50|מי")] == [1]
+        assert parser.feed("לה 60") == []
+        assert [a.index for a in parser.close()] == [2]
+        assert parser.answers[2].candidates == [("מילה", 0.6)]
+
+    def test_extract_json_ignores_trailing_braces(self):
+        """טקסט עם סוגריים אחרי ה-JSON - כאן find/rfind נכשל"""
+        data = extract_json('Answer: {"candidates": []} (note: {not json})')
+
+        assert data == {'candidates': []}
+        with pytest.raises(json.JSONDecodeError):
+            extract_json("{broken")
+
+
+class TestClueSolver:
+    """בדיקות לפענוח ב-ClueSolver"""
+
+    def test_single_filters_candidates(self):
+        """אורך ואותיות ידועות מסוננים, המיון לפי ביטחון"""
+        clue = _clue("c1", 4, known={0: "פ"})
+
+        result = ClueSolver()._parse_response("1|90|פרוס 40|פריז 95|לונדון 99|ברלן 70", clue)
+
+        assert result.candidates == [("פריז", 0.95), ("פרוס", 0.4)]
+        assert result.clue_certainty == 0.9
+
+    def test_truncated_batch_keeps_complete_lines(self):
+        """תשובה שנקטעה - השורות השלמות נשמרות, השאר מקבלות שגיאה"""
+        clues = [_clue("a", 3), _clue("b", 3), _clue("c", 3)]
+
+        results = ClueSolver()._parse_batch_response("1|80|אבג 90\n3|70|דהו 60\n2|50|זח", clues)
+
+        assert results["a"].candidates == [("אבג", 0.9)]
+        assert results["c"].candidates == [("דהו", 0.6)]
+        assert results["b"].candidates == []
+
+    def test_json_response_still_parsed(self):
+        """תשובת JSON (cassette ישן, מודל שהתעלם מההוראות) מתפענחת גם במצב קומפקטי"""
+        clues = [_clue("a", 3)]
+        response = '```json\n{"solutions": [{"clue_id": "a", "clue_certainty": 0.7, ' \
+                   '"candidates": [{"answer": "אבג", "confidence": 0.9}]}]}\n```'
+
+        for solver in (ClueSolver(), ClueSolver(output_format=FORMAT_JSON)):
+            assert solver._parse_batch_response(response, clues)["a"].candidates == [("אבג", 0.9)]
+
+    def test_prompts(self):
+        """בפורמט הקומפקטי ההגדרות ממוספרות, בלי ה-clue_id"""
+        clues = [_clue("clue_0_0_full", 3, known={1: "ב"})]
+
+        compact = ClueSolver()._build_batch_prompt(clues)
+        legacy = ClueSolver(output_format=FORMAT_JSON)._build_batch_prompt(clues)
+
+        assert '1. "הגדרה clue_0_0_full" - 3 letters, pattern _ב_' in compact
+        assert "- ID: clue_0_0_full" not in compact
+        assert "- ID: clue_0_0_full" in legacy
+        with pytest.raises(ValueError):
+            ClueSolver(output_format="xml")
+
+
+class TestBenchmark:
+    """בדיקות ל-answer_format_benchmark"""
+
+    def test_compact_is_smaller_and_survives_truncation(self):
+        results = {r.output_format: r for r in run_suite([(7, 7)], repeats=1)}
+
+        assert results["compact"].output_tokens_per_clue < results["json"].output_tokens_per_clue / 2
+        assert results["compact"].parsed_ratio == results["json"].parsed_ratio == 1.0
+        assert results["compact"].truncated_ratio > results["json"].truncated_ratio
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("שלום") == 2
+        assert estimate_tokens('{"a": 95}') == 7
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
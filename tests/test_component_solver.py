@@ -0,0 +1,88 @@
+"""
+Tests for Component Decomposition and Parallel Sub-Solving
+"""
+
+import pytest
+
+from services.solver_strategy import SolverStrategy, SolveStatus
+from services.component_solver import ComponentSolver
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, FakeClueSolver
+
+
+# מועמדים בביטחון בינוני - אף מילה לא "ודאית", כך שהרכיבים נפתרים ב-workers
+AMBIGUOUS_ANSWERS = {
+    'clue_a1': [("אבג", 0.6), ("אבד", 0.5)],
+    'clue_a2': [("אדה", 0.6), ("אדו", 0.5)],
+    'clue_b1': [("וז", 0.6), ("וי", 0.5)],
+    'clue_b2': [("זחט", 0.6), ("זחכ", 0.5)],
+}
+
+
+class TestComponents:
+    """בדיקות לפירוק גרף ההצלבות"""
+
+    def test_crossing_graph(self):
+        """בדיקת גרף ההצלבות"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        graph = clue_db.get_crossing_graph()
+
+        assert graph['clue_a1'] == {'clue_a2': [(0, 0)]}
+        assert graph['clue_b2'] == {'clue_b1': [(0, 1)]}
+
+    def test_independent_regions(self):
+        """שני אזורים נפרדים = שני רכיבים"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        components = clue_db.get_components()
+
+        assert sorted(sorted(c) for c in components) == [
+            ['clue_a1', 'clue_a2'],
+            ['clue_b1', 'clue_b2'],
+        ]
+
+    def test_filled_cell_splits_component(self):
+        """משבצת עם אות ידועה לא מקשרת בין הגדרות"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        components = clue_db.get_components(
+            is_open_cell=lambda row, col: (row, col) != (0, 0)
+        )
+
+        assert len(components) == 3
+        assert ['clue_b1', 'clue_b2'] in components
+
+
+class TestComponentSolver:
+    """בדיקות לפתרון רכיבים במקביל"""
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_solves_all_components(self, use_processes):
+        """כל הרכיבים נפתרים וממוזגים לגריד המשותף"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(AMBIGUOUS_ANSWERS))
+        solver = ComponentSolver(strategy, max_workers=2, use_processes=use_processes)
+
+        progress = solver.solve()
+
+        assert progress.status == SolveStatus.SOLVED
+        for cells, answer in TWO_REGIONS.values():
+            assert "".join(solution.get_letter(r, c) for r, c in cells) == answer
+
+        assert solver.round_stats[0]['components'] == 2
+
+    def test_confident_words_placed_before_split(self):
+        """מילה ודאית משובצת בתהליך הראשי לפני הפירוק"""
+        answers = dict(AMBIGUOUS_ANSWERS)
+        answers['clue_a2'] = [("אדה", 0.95)]
+
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers))
+        solver = ComponentSolver(strategy, use_processes=False)
+
+        progress = solver.solve()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert solver.round_stats[0]['confident_placements'] >= 1
+        assert solution.get_letter(0, 1) == "ב"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
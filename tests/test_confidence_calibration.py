@@ -0,0 +1,191 @@
+"""
+Tests for confidence calibration
+"""
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from services.candidate_index import CandidateIndex, CandidateWord
+from services.confidence_calibration import (
+    ConfidenceCalibrator, CalibrationSample, CalibrationStore, IsotonicCalibrator,
+    samples_from_trace, final_answers, trace_completed, pattern_fill, reliability_curve, expected_calibration_error
+)
+from services.solver_strategy import SolverStrategy
+from services.solver_trace import SolverTrace
+from tests.calibration_report import build_report, synthetic_traces
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, FakeClueSolver
+
+
+def _fitted(thresholds, values):
+    """calibrator איזוטוני עם נקודות קבועות"""
+    calibrator = ConfidenceCalibrator(min_samples=0)
+    calibrator.model = IsotonicCalibrator(thresholds, values)
+    return calibrator
+
+
+def _samples(pairs, certainty=0.8, fill=0.0, repeat=1):
+    return [
+        CalibrationSample(confidence, certainty, fill, correct)
+        for _ in range(repeat) for confidence, correct in pairs
+    ]
+
+
+class TestCalibrators:
+    """בדיקות להתאמה"""
+
+    def test_isotonic_is_monotone(self):
+        """ביטחון מנופח יורד, והמיפוי לא יורד בשום מקום"""
+        samples = _samples([(0.9, True), (0.9, False), (0.8, False), (0.7, True), (0.3, False)], repeat=20)
+
+        calibrator = ConfidenceCalibrator("isotonic").fit(samples)
+
+        values = [calibrator.calibrate(c / 10, 0.8) for c in range(11)]
+        assert values == sorted(values)
+        assert calibrator.calibrate(0.3, 0.8) == 0.001
+        assert calibrator.calibrate(0.9, 0.8) == pytest.approx(0.5, abs=0.01)
+
+    def test_platt_uses_pattern_fill(self):
+        """אותה תשובה עם יותר אותיות ידועות - סיכוי גבוה יותר"""
+        samples = (
+            _samples([(0.8, True), (0.8, False), (0.8, False)], fill=0.0, repeat=20) +
+            _samples([(0.8, True), (0.8, True), (0.8, False)], fill=0.5, repeat=20)
+        )
+
+        calibrator = ConfidenceCalibrator("platt").fit(samples)
+
+        assert calibrator.calibrate(0.8, 0.8, 0.0) == pytest.approx(1 / 3, abs=0.05)
+        assert calibrator.calibrate(0.8, 0.8, 0.5) == pytest.approx(2 / 3, abs=0.05)
+
+    def test_too_few_samples_and_round_trip(self, tmp_path):
+        few = ConfidenceCalibrator(min_samples=10).fit(_samples([(0.9, True), (0.1, False)]))
+        assert not few.is_fitted
+        with pytest.raises(ValueError):
+            few.calibrate(0.5, 0.5)
+        with pytest.raises(ValueError):
+            ConfidenceCalibrator("histogram")
+
+        calibrator = ConfidenceCalibrator("platt", min_samples=2).fit(
+            _samples([(0.9, True), (0.2, False), (0.6, True), (0.5, False)], repeat=5)
+        )
+        path = tmp_path / "calibrator.json"
+        calibrator.save(path)
+        loaded = ConfidenceCalibrator.load(path)
+
+        assert loaded.to_dict() == calibrator.to_dict()
+        assert loaded.calibrate(0.7, 0.6, 0.2) == calibrator.calibrate(0.7, 0.6, 0.2)
+
+
+class TestSamples:
+    """בדיקות לאיסוף הדגימות ולשמירתן"""
+
+    def test_samples_from_trace(self):
+        trace = SolverTrace(
+            clues=[{'id': "c1"}, {'id': "c2"}],
+            results=[
+                {'k': "c1|___", 'c': [["אבג", 0.9], ["אבד", 0.4]], 'u': 0.7, 'p': 0.0, 'e': None},
+                {'k': "c2|_ב_", 'c': [["גבה", 0.6]], 'u': 0.5, 'p': 0.0, 'e': None},
+                {'k': "c3|___", 'c': [], 'u': 0.0, 'p': 0.0, 'e': "timeout"},
+            ],
+            events=[
+                ["place", 0.1, "c1", "אבד", 0.4],
+                ["backtrack", 0.2, "c1", "אבד"],
+                ["place", 0.3, "c1", "אבג", 0.9],
+                ["place", 0.4, "c2", "גבה", 0.6],
+            ]
+        )
+
+        assert final_answers(trace) == {"c1": "אבג", "c2": "גבה"}
+        assert samples_from_trace(trace) == [
+            CalibrationSample(0.9, 0.7, 0.0, True),
+            CalibrationSample(0.4, 0.7, 0.0, False),
+            CalibrationSample(0.6, 0.5, pattern_fill("_ב_"), True),
+        ]
+        assert len(samples_from_trace(trace, {"c2": "אחר"})) == 1
+
+    def test_unfinished_trace_needs_answers(self):
+        """פתרון תקוע - השיבוצים שלו אינם אמת, ובלי תשובות אין דגימות"""
+        trace = SolverTrace(
+            clues=[{'id': "c1"}, {'id': "c2"}],
+            results=[{'k': "c1|___", 'c': [["אבד", 0.9], ["אבג", 0.4]], 'u': 0.7, 'p': 0.0, 'e': None}],
+            events=[["place", 0.1, "c1", "אבד", 0.9], ["phase", 0.2, "stuck"]]
+        )
+
+        assert not trace_completed(trace)
+        assert samples_from_trace(trace) == []
+        assert samples_from_trace(trace, {"c1": "אבג"}) == [
+            CalibrationSample(0.9, 0.7, 0.0, False),
+            CalibrationSample(0.4, 0.7, 0.0, True),
+        ]
+
+    def test_store_round_trip(self, tmp_path):
+        store = CalibrationStore(DatabaseManager(tmp_path / "test.db"))
+        samples = _samples([(0.9, True), (0.4, False), (0.7, True)])
+
+        store.add(samples, source="test")
+
+        assert store.count() == 3
+        assert store.load() == samples
+        assert store.load(limit=2) == samples[1:]
+        store.clear()
+        assert store.load() == []
+
+    def test_reliability_curve(self):
+        samples = _samples([(0.95, True), (0.95, False), (0.15, False)])
+
+        curve = reliability_curve(samples, bins=10)
+
+        assert curve == [
+            {'bin': 0.1, 'count': 1, 'predicted': 0.15, 'observed': 0.0},
+            {'bin': 0.9, 'count': 2, 'predicted': 0.95, 'observed': 0.5},
+        ]
+        assert expected_calibration_error(curve) == round((0.15 + 2 * 0.45) / 3, 4)
+
+
+class TestIntegration:
+    """בדיקות לחיבור לאינדקס ולסולבר"""
+
+    def test_index_calibrates_new_candidates_only(self):
+        """מועמד חדש מכויל בכניסה; מיזוג ממצע עם ערך מכויל; subset שומר את ה-calibrator"""
+        index = CandidateIndex()
+        index.add_candidate(CandidateWord("אבג", "c1", 0.9, 0.8))
+        index.calibrator = _fitted([0.0, 1.0], [0.0, 0.5])
+
+        index.add_candidate(CandidateWord("אבד", "c1", 0.8, 0.8))
+        index.merge_new_candidates([CandidateWord("אבג", "c1", 0.6, 0.8)], current_phase=2)
+
+        confidences = {c.word: c.confidence for c in index.get_candidates_for_clue("c1")}
+        assert confidences == {"אבג": pytest.approx((0.9 + 2 * 0.3) / 3), "אבד": 0.4}
+        assert index.subset({"c1"}).calibrator is index.calibrator
+
+    def test_strategy_places_by_calibrated_confidence(self):
+        """ביטחון גולמי 0.6 שמתברר כ-0.9 - משובץ מיד"""
+        answers = {
+            'clue_a1': [("אבג", 0.6), ("אבד", 0.2)],
+            'clue_a2': [("אדה", 0.6), ("אדו", 0.2)],
+            'clue_b1': [("וז", 0.6), ("וי", 0.2)],
+            'clue_b2': [("זחט", 0.6), ("זחכ", 0.2)],
+        }
+
+        def placed(calibrator):
+            clue_db, solution = build_puzzle(TWO_REGIONS)
+            strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers))
+            strategy.calibrator = calibrator
+            strategy.prepare()
+            return strategy.place_confident_words()
+
+        assert placed(None) == 0
+        assert placed(_fitted([0.2, 0.6], [0.1, 0.9])) == 4
+
+    def test_report_replays_traces(self):
+        traces = synthetic_traces(7, 7, 0.25, [0, 1])
+        samples = [s for _, trace, answers in traces for s in samples_from_trace(trace, answers)]
+
+        report, calibrator = build_report(samples, samples, [(name, trace) for name, trace, _ in traces])
+
+        assert calibrator.is_fitted
+        assert report.calibrated_ece <= report.raw_ece
+        assert [r.name for r in report.replays] == ["7x7-seed0", "7x7-seed1"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
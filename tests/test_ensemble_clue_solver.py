@@ -0,0 +1,159 @@
+"""
+Tests for the multi-model ensemble clue solver
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from models.clue_entry import ClueEntry
+from services.clue_solver import ClueSolver, SolverResult
+from services.ensemble_clue_solver import EnsembleClueSolver, EnsembleTier, create_clue_solver
+from services.solver_strategy import SolverStrategy, SolveStatus
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, answers_from_layout, FakeClueSolver
+
+
+def _clue(clue_id, length=3):
+    return ClueEntry(
+        id=clue_id, source_cell=(0, 0), text=f"הגדרה {clue_id}",
+        answer_cells=[(0, i) for i in range(length)], answer_length=length
+    )
+
+
+class RecordingSolver(FakeClueSolver):
+    """FakeClueSolver ששומר אילו הגדרות נשאלו"""
+
+    def __init__(self, answers, clue_certainty=0.8):
+        super().__init__(answers, clue_certainty)
+        self.asked = []
+
+    def solve_batch(self, clues, max_per_request=10, use_cache=True, deadline=None, exclude=None):
+        self.asked.extend(clue.id for clue in clues)
+        return super().solve_batch(clues, max_per_request, use_cache, deadline, exclude)
+
+
+class TestEscalation:
+    """בדיקות להסלמה בין הדרגות"""
+
+    def _ensemble(self, fast_answers, strong_answers, **options):
+        fast, strong = RecordingSolver(fast_answers), RecordingSolver(strong_answers)
+        ensemble = EnsembleClueSolver(
+            [EnsembleTier(fast, weight=1.0, name="fast"), EnsembleTier(strong, weight=2.0, name="strong")],
+            **options
+        )
+        return ensemble, fast, strong
+
+    def test_only_weak_clues_escalate(self):
+        """הגדרה בטוחה נעצרת בדרגה הראשונה; חלשה או ריקה מוסלמת"""
+        ensemble, fast, strong = self._ensemble(
+            {'a': [("אבג", 0.9)], 'b': [("דהו", 0.4)]},
+            {'b': [("זחט", 0.9)], 'c': [("יכל", 0.8)]}
+        )
+
+        results = ensemble.solve_batch([_clue('a'), _clue('b'), _clue('c')])
+
+        assert strong.asked == ['b', 'c']
+        assert results['a'].candidates == [("אבג", 0.9)]
+        assert results['b'].candidates == [("זחט", 0.9), ("דהו", 0.4)]
+        assert results['c'].candidates == [("יכל", 0.8)]
+        assert ensemble.get_statistics() == {
+            'tiers': ["fast", "strong"],
+            'clues_per_tier': [3, 2],
+            'answered_at_tier': [1, 2],
+            'escalated': 2,
+        }
+
+    def test_agreement_and_calibration(self):
+        """מילה ששתי הדרגות מציעות מצטברת; calibrate חל לפני השקלול"""
+        ensemble, _, _ = self._ensemble({'a': [("אבג", 0.5)]}, {'a': [("אבג", 0.8)]})
+        ensemble.tiers[0].calibrate = lambda confidence: confidence / 2
+
+        results = ensemble.solve_batch([_clue('a')])
+
+        assert results['a'].candidates == [("אבג", round((0.25 + 2 * 0.8) / 3, 4))]
+
+    def test_escalated_answer_keeps_its_confidence(self):
+        """תשובה בטוחה של הדרגה החזקה למילה שהמהירה פספסה - לא יורדת מתחת לספים"""
+        ensemble, _, _ = self._ensemble({'a': [("אבג", 0.3)]}, {'a': [("דהו", 0.95)]})
+
+        merged = ensemble.solve_batch([_clue('a')])['a']
+
+        assert merged.candidates[0] == ("דהו", 0.95)
+        assert merged.candidates[0][1] >= SolverStrategy.HIGH_CONFIDENCE_THRESHOLD
+        assert ensemble.is_confident(merged)
+
+    def test_low_certainty_escalates(self):
+        ensemble, fast, strong = self._ensemble({'a': [("אבג", 0.95)]}, {'a': [("אבג", 0.95)]})
+        fast.clue_certainty = 0.2
+
+        ensemble.solve_batch([_clue('a')])
+
+        assert strong.asked == ['a']
+
+    def test_cache_and_deadline(self):
+        """תוצאה ממוזגת נשמרת ב-cache; אחרי ה-deadline לא מסלימים"""
+        ensemble, fast, strong = self._ensemble({'a': [("אבג", 0.4)]}, {'a': [("אבג", 0.9)]})
+
+        ensemble.solve_batch([_clue('a')], deadline=time.time() - 1)
+        assert strong.asked == []
+
+        ensemble.solve_batch([_clue('b')])
+        ensemble.solve_batch([_clue('b')])
+        assert fast.asked == ['a', 'b']
+
+
+class TestIntegration:
+    """בדיקות לחיבור לסולבר ולהגדרות"""
+
+    def test_strategy_solves_with_ensemble(self):
+        answers = answers_from_layout(TWO_REGIONS, confidence=0.9)
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        ensemble = EnsembleClueSolver([
+            EnsembleTier(FakeClueSolver(answers)), EnsembleTier(FakeClueSolver(answers), weight=2.0)
+        ])
+
+        progress = SolverStrategy(clue_db, solution, ensemble).solve()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert ensemble.get_statistics()['escalated'] == 0
+
+    def test_create_from_config(self):
+        config = SimpleNamespace(
+            api_key=None, model="big", base_url=None, request_timeout=30.0, max_retries=2, retry_delay=1.0,
+            ensemble_models=[], ensemble_weights=[],
+            ensemble_escalate_confidence=0.6, ensemble_escalate_certainty=0.3
+        )
+        single = create_clue_solver(config)
+
+        config.ensemble_models = ["small", "big"]
+        ensemble = create_clue_solver(config)
+
+        assert type(single) is ClueSolver and single.model == "big"
+        assert [tier.name for tier in ensemble.tiers] == ["small", "big"]
+        assert [tier.weight for tier in ensemble.tiers] == [1.0, 2.0]
+        assert ensemble.escalate_below_confidence == 0.6
+        with pytest.raises(ValueError):
+            EnsembleClueSolver([])
+
+        config.ensemble_weights = [1.0]
+        with pytest.raises(ValueError, match="1 ensemble weights for 2 models"):
+            create_clue_solver(config)
+
+    def test_call_stats_match_clue_solver(self):
+        """get_call_stats במבנה של ClueSolver; הפירוט לפי דרגה בנפרד"""
+        fast, strong = FakeClueSolver({}), FakeClueSolver({})
+        fast._caller.calls, strong._caller.calls = 3, 1
+        fast._caller.latencies.record(0.5)
+        strong._caller.latencies.record(2.0)
+        ensemble = EnsembleClueSolver([EnsembleTier(fast, name="fast"), EnsembleTier(strong, name="strong")])
+
+        stats = ensemble.get_call_stats()
+
+        assert set(stats) == set(ClueSolver(api_key=None).get_call_stats())
+        assert (stats['calls'], stats['p50']) == (4, 2.0)
+        assert set(ensemble.get_tier_call_stats()) == {"fast", "strong"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,88 @@
+"""
+Tests for forward-checking before word placement
+"""
+
+import pytest
+
+from services.solver_strategy import SolverStrategy, SolveStatus, SolvePhase
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, FakeClueSolver
+
+
+# המועמד המוביל של clue_a1 (תבג) משאיר את clue_a2 בלי מועמדים תקינים
+ONE_STEP_TRAP = {
+    'clue_a1': [("תבג", 0.9), ("אבג", 0.6)],
+    'clue_a2': [("אדה", 0.7), ("אדו", 0.3)],
+    'clue_b1': [("וז", 0.9)],
+    'clue_b2': [("זחט", 0.9)],
+}
+
+
+def _strategy(answers=ONE_STEP_TRAP, **kwargs):
+    clue_db, solution = build_puzzle(TWO_REGIONS)
+    strategy = SolverStrategy(clue_db, solution, FakeClueSolver(answers), **kwargs)
+    return strategy
+
+
+class TestForwardCheck:
+    """בדיקות לדחיית שיבוץ שמרוקן הגדרה מצטלבת"""
+
+    def test_rejection_leaves_grid_untouched(self):
+        """שיבוץ שנדחה - בלי שינוי בגריד ובמועמדי השכן, והמילה נפסלת"""
+        strategy = _strategy()
+        strategy.prepare()
+        before = strategy.solution.to_string_grid()
+        clue_state = strategy.state.clue_states['clue_a1']
+
+        assert not strategy._place_word(clue_state, "תבג")
+
+        assert strategy.solution.to_string_grid() == before
+        assert strategy.state.candidate_index.get_candidate_count('clue_a2') == 2
+        assert strategy.state.candidate_index.get_candidate_count('clue_a1') == 1
+        assert strategy.state.forward_check_rejections == 1
+        assert strategy.state.backtracks == 0
+
+    def test_trap_solved_without_backtracks(self):
+        """המלכודת נמנעת מראש - פתרון בלי backtracks"""
+        strategy = _strategy()
+
+        progress = strategy.solve()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert progress.backtracks == 0
+        assert strategy.get_statistics()['forward_check_rejections'] == 1
+        assert strategy.solution.get_answer_for_clue(strategy.clue_db.get_clue('clue_a1')) == "אבג"
+
+    def test_disabled_falls_back_to_backtracking(self):
+        """forward_check כבוי - ההתנהגות הקודמת: שיבוץ, backtracks, ונתקעים"""
+        strategy = _strategy()
+        strategy.forward_check = False
+
+        progress = strategy.solve()
+
+        assert progress.status == SolveStatus.STUCK
+        assert progress.backtracks >= 1
+        assert strategy.state.forward_check_rejections == 0
+
+    def test_neighbour_without_candidates_does_not_block(self):
+        """שכן שכבר אין לו מועמדים (ממתין ל-re-query) לא חוסם שיבוץ"""
+        answers = dict(ONE_STEP_TRAP, clue_a2=[])
+        strategy = _strategy(answers)
+        strategy.prepare()
+
+        assert strategy._place_word(strategy.state.clue_states['clue_a1'], "תבג")
+        assert strategy.state.forward_check_rejections == 0
+
+    def test_apply_assignments_bypasses_check(self):
+        """השמה גלובלית מפורשת לא נדחית"""
+        strategy = _strategy()
+        strategy.prepare()
+
+        placed = strategy.apply_assignments({'clue_a1': "תבג"})
+
+        assert placed == 1
+        assert strategy.state.forward_check_rejections == 0
+        assert strategy.state.solve_phase != SolvePhase.COMPLETED
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
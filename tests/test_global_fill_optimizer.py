@@ -0,0 +1,197 @@
+"""
+Tests for the global CP-SAT / ILP fill optimizer
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services import global_fill_optimizer
+from services.candidate_index import CandidateIndex, CandidateWord
+from services.global_fill_optimizer import GlobalFillOptimizer, BACKEND_CPSAT, BACKEND_PULP, BACKEND_DP
+from services.solver_strategy import SolverStrategy, SolvePhase
+from services.tree_decomposition_solver import (
+    DPResult, TreeDecompositionSolver, REASON_WIDTH, REASON_TABLE_SIZE, REASON_TIMEOUT, REASON_INFEASIBLE
+)
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, FakeClueSolver
+
+
+# הבחירה החמדנית (אבג) כופה על clue_a2 מועמד חלש; האופטימום הגלובלי שונה
+GREEDY_TRAP = {
+    'clue_a1': [("אבג", 0.9), ("דבג", 0.8)],
+    'clue_a2': [("אדה", 0.1), ("דדה", 0.9)],
+    'clue_b1': [("וז", 0.9)],
+    'clue_b2': [("זחט", 0.9)],
+}
+
+OPTIMUM = {'clue_a1': "דבג", 'clue_a2': "דדה", 'clue_b1': "וז", 'clue_b2': "זחט"}
+
+
+def _index(answers) -> CandidateIndex:
+    index = CandidateIndex()
+    for clue_id, candidates in answers.items():
+        for word, confidence in candidates:
+            index.add_candidate(CandidateWord(word, clue_id, confidence, 0.8))
+    return index
+
+
+@pytest.fixture
+def no_backends(monkeypatch):
+    """סביבה בלי OR-Tools ובלי PuLP"""
+    monkeypatch.setattr(global_fill_optimizer, "ORTOOLS_AVAILABLE", False)
+    monkeypatch.setattr(global_fill_optimizer, "PULP_AVAILABLE", False)
+
+
+class TestFillModel:
+    """בדיקות לייצוא הבעיה"""
+
+    def test_one_variable_per_candidate(self):
+        """משתנה לכל (הגדרה, מועמד); משקל גבוה יותר לביטחון גבוה יותר"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        model = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP)).build_model()
+
+        assert model.num_variables == 6
+        assert {clue_id for clue_id, _, _ in model.variables} == set(GREEDY_TRAP)
+        weights = {word: weight for _, word, weight in model.variables}
+        assert weights["אבג"] > weights["דבג"] > 0
+
+    def test_cell_letter_groups_only_for_crossings(self):
+        """קבוצות משבצת-אות רק למשבצות מצטלבות"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        model = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP)).build_model()
+
+        assert set(model.cell_letters) == {(0, 0), (0, 6)}
+        assert set(model.cell_letters[(0, 0)]) == {"א", "ד"}
+
+    def test_consistency_check(self):
+        """בחירה עם שתי אותיות שונות באותה משבצת - לא עקבית"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        model = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP)).build_model()
+        index = {(clue_id, word): i for i, (clue_id, word, _) in enumerate(model.variables)}
+
+        assert model.is_consistent([index[("clue_a1", "דבג")], index[("clue_a2", "דדה")]])
+        assert not model.is_consistent([index[("clue_a1", "אבג")], index[("clue_a2", "דדה")]])
+
+
+class TestFallback:
+    """בדיקות לנפילה החיננית"""
+
+    def test_falls_back_to_dp(self, no_backends):
+        """בלי פותר חיצוני - TreeDecompositionSolver"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP)).solve()
+
+        assert result.backend == BACKEND_DP
+        assert result.is_optimal
+        assert result.assignments == OPTIMUM
+
+    def test_requested_backend_missing(self, no_backends):
+        """backend מפורש שלא מותקן - נרשם ב-errors וממשיכים ל-DP"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP), backend=BACKEND_CPSAT).solve()
+
+        assert result.errors == ["cp-sat: not installed"]
+        assert result.backend == BACKEND_DP
+
+    def test_backend_failure_and_timeout(self, monkeypatch):
+        """חריגה בפותר אחד וזמן שנגמר בשני - ממשיכים הלאה"""
+        monkeypatch.setattr(global_fill_optimizer, "ORTOOLS_AVAILABLE", True)
+        monkeypatch.setattr(global_fill_optimizer, "PULP_AVAILABLE", True)
+
+        def broken(self, model):
+            raise RuntimeError("solver crashed")
+
+        monkeypatch.setattr(GlobalFillOptimizer, "_solve_cpsat", broken)
+        monkeypatch.setattr(GlobalFillOptimizer, "_solve_pulp", lambda self, model: (None, "timeout"))
+
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP), time_limit=0.1).solve()
+
+        assert result.errors == ["cp-sat: solver crashed", "pulp: timeout"]
+        assert result.backend == BACKEND_DP
+        assert result.assignments == OPTIMUM
+
+    def test_solver_status_labels(self, monkeypatch):
+        """אין פתרון / מודל לא תקין מדווחים בנפרד מזמן שנגמר"""
+        monkeypatch.setattr(global_fill_optimizer, "cp_model", SimpleNamespace(
+            OPTIMAL=4, FEASIBLE=2, INFEASIBLE=3, MODEL_INVALID=1, UNKNOWN=0
+        ), raising=False)
+        monkeypatch.setattr(global_fill_optimizer, "pulp", SimpleNamespace(
+            LpSolutionOptimal=1, LpSolutionIntegerFeasible=2, LpSolutionInfeasible=-1,
+            LpSolutionUnbounded=-2, LpSolutionNoSolutionFound=0
+        ), raising=False)
+
+        assert [GlobalFillOptimizer._cpsat_label(status) for status in (4, 2, 3, 1, 0)] == \
+            ["optimal", "feasible", "infeasible", "invalid", "timeout"]
+        assert [GlobalFillOptimizer._pulp_label(status) for status in (1, 2, -1, -2, 0)] == \
+            ["optimal", "feasible", "infeasible", "invalid", "timeout"]
+
+    @pytest.mark.parametrize("dp_result, error", [
+        (DPResult(width=9, too_wide=True, reason=REASON_WIDTH), "dp: width 9 too large"),
+        (DPResult(width=3, too_wide=True, reason=REASON_TABLE_SIZE), "dp: table size limit exceeded (width 3)"),
+        (DPResult(width=1, reason=REASON_TIMEOUT), "dp: timeout"),
+        (DPResult(width=1, reason=REASON_INFEASIBLE), "dp: infeasible"),
+    ])
+    def test_dp_failure_reasons(self, no_backends, monkeypatch, dp_result, error):
+        """כל סיבה שה-DP לא פתר מדווחת בנפרד"""
+        monkeypatch.setattr(TreeDecompositionSolver, "solve", lambda self: dp_result)
+
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP)).solve()
+
+        assert result.errors == [error]
+        assert result.backend is None
+        assert result.assignments == {}
+
+    def test_no_fallback_returns_empty(self, no_backends):
+        """בלי פותר ובלי DP - תוצאה ריקה, לא חריגה"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP), fallback_to_dp=False).solve()
+
+        assert result.backend is None
+        assert result.status == "unavailable"
+        assert result.assignments == {}
+
+
+class TestApply:
+    """בדיקות להחזרת התוצאה לגריד"""
+
+    def test_apply_to_solution_grid(self, no_backends):
+        """השיבוץ מעדכן את SolutionGrid ואת האותיות הידועות"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        optimizer = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP))
+
+        placed = optimizer.apply(optimizer.solve(), solution)
+
+        assert placed == 4
+        assert solution.get_answer_for_clue(clue_db.get_clue('clue_a2')) == "דדה"
+        assert clue_db.get_clue('clue_a2').is_solved
+
+    def test_apply_to_strategy(self, no_backends):
+        """from_strategy + apply_assignments משלים את הפתרון"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(GREEDY_TRAP))
+        strategy.prepare()
+
+        result = GlobalFillOptimizer.from_strategy(strategy).solve()
+
+        assert strategy.apply_assignments(result.assignments) == 4
+        assert strategy.state.solve_phase == SolvePhase.COMPLETED
+
+
+class TestExternalBackends:
+    """פותרים חיצוניים - רק כשמותקנים"""
+
+    @pytest.mark.parametrize("backend, module", [(BACKEND_CPSAT, "ortools"), (BACKEND_PULP, "pulp")])
+    def test_matches_dp_optimum(self, backend, module):
+        pytest.importorskip(module)
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+
+        result = GlobalFillOptimizer(clue_db, _index(GREEDY_TRAP), backend=backend, time_limit=10).solve()
+
+        assert result.backend == backend
+        assert result.assignments == OPTIMUM
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
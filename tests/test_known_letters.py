@@ -0,0 +1,118 @@
+"""
+Tests for the cached constraint pattern on ClueEntry
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from models.clue_entry import ClueEntry, KnownLetters
+
+
+def _clue(length=4, **kwargs):
+    return ClueEntry(id="c1", source_cell=(0, 0), answer_length=length, **kwargs)
+
+
+class TestKnownLetters:
+    """בדיקות ל-buffer האותיות הידועות"""
+
+    def test_behaves_like_dict(self):
+        """התנהגות של {מיקום: אות}"""
+        known = KnownLetters({2: "ב", 0: "כ"}, size=4)
+
+        assert known == {0: "כ", 2: "ב"}
+        assert list(known.items()) == [(0, "כ"), (2, "ב")]
+        assert 2 in known and 1 not in known
+        assert known.get(1) is None
+
+        del known[0]
+        assert len(known) == 1
+        with pytest.raises(KeyError):
+            del known[0]
+
+    def test_mask(self):
+        """מסכת הביטים מתעדכנת עם האותיות"""
+        known = KnownLetters(size=5)
+        known[0] = "א"
+        known[3] = "ד"
+        assert known.mask == 0b1001
+
+        del known[0]
+        assert known.mask == 0b1000
+
+    def test_copy_and_pickle(self):
+        """עותק ו-pickle עצמאיים"""
+        clue = _clue(known_letters={1: "ב"})
+
+        copied = copy.deepcopy(clue)
+        copied.known_letters[0] = "א"
+        restored = pickle.loads(pickle.dumps(clue))
+
+        assert clue.get_constraint_string() == "_ב__"
+        assert copied.get_constraint_string() == "אב__"
+        assert restored.known_letters == {1: "ב"}
+
+    def test_default_is_per_instance(self):
+        """בלי known_letters כל הגדרה מקבלת buffer ריק משלה"""
+        first, second = _clue(), _clue()
+        first.known_letters[0] = "א"
+
+        assert isinstance(second.known_letters, KnownLetters)
+        assert second.known_letters == {}
+        assert first == _clue(known_letters={0: "א"})
+        assert "_known_letters" not in repr(first)
+
+
+class TestConstraintPatternCache:
+    """בדיקות ל-cache התבנית"""
+
+    def test_pattern_cached_until_change(self):
+        """אותה מחרוזת מוחזרת עד שאות משתנה"""
+        clue = _clue()
+        clue.known_letters[1] = "ב"
+
+        first = clue.get_constraint_string()
+        assert first == "_ב__"
+        assert clue.get_constraint_string() is first
+
+        clue.known_letters[1] = "ב"  # אותה אות - בלי ביטול
+        assert clue.get_constraint_string() is first
+
+        clue.known_letters[3] = "ד"
+        assert clue.get_constraint_string() == "_ב_ד"
+
+    def test_assignment_updates_in_place(self):
+        """השמת dict מעדכנת את ה-buffer ושומרת את ה-cache כשאין שינוי"""
+        clue = _clue(known_letters={0: "א"})
+        buffer = clue.known_letters
+        pattern = clue.get_constraint_string()
+
+        clue.known_letters = {0: "א"}
+        assert clue.known_letters is buffer
+        assert clue.get_constraint_string() is pattern
+
+        clue.known_letters = {}
+        assert clue.get_constraint_string() == "____"
+        assert clue.get_known_mask() == 0
+
+    def test_length_change(self):
+        """שינוי answer_length אחרי יצירה"""
+        clue = _clue(length=0)
+        assert clue.get_constraint_string() == ""
+
+        clue.answer_length = 3
+        clue.known_letters[2] = "ג"
+        assert clue.get_constraint_string() == "__ג"
+
+    def test_to_dict_is_plain(self):
+        """to_dict מחזיר dict רגיל (לשמירה/JSON)"""
+        clue = _clue(known_letters={0: "א"})
+        data = clue.to_dict()
+
+        assert type(data['known_letters']) is dict
+        assert data['constraint'] == "א___"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+"""
+Memory benchmark for the slotted solver objects
+
+משווה מול ה-dataclasses הקודמים (מוגדרים כאן כהשוואה) - מספר הקצאות ובתים
+עבור אלפי מועמדים ומשבצות, כפי שמחזיק פתרון של תשבץ גדול.
+"""
+
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List
+
+import pytest
+
+from models.clue_entry import ClueEntry
+from services.candidate_index import CandidateWord
+from services.solution_grid import SolutionCell, SolutionGrid
+from services.solver_strategy import ClueState
+
+
+N = 5000
+
+
+@dataclass
+class LegacyCandidateWord:
+    word: str
+    clue_id: str
+    confidence: float
+    clue_certainty: float
+    query_phase: int = 1
+    known_letters_snapshot: str = ""
+
+
+@dataclass
+class LegacySolutionCell:
+    letter: str = ""
+    confidence: float = 0.0
+    source_clues: List[str] = field(default_factory=list)
+    is_conflict: bool = False
+    conflicting_letters: List[str] = field(default_factory=list)
+
+
+def _measure(factory):
+    """(מספר הקצאות, בתים) לבניית N מופעים"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        objects = [factory(i) for i in range(N)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    count = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    assert len(objects) == N
+    return count, size
+
+
+def _report(name, legacy, slotted):
+    print(f"\n{name}: allocations {legacy[0]} -> {slotted[0]}, bytes {legacy[1]} -> {slotted[1]}")
+
+
+class TestSlottedObjects:
+    """בדיקות ל-__slots__"""
+
+    def test_no_instance_dict(self):
+        """אין __dict__ לכל מופע"""
+        clue = ClueEntry(id="c1", source_cell=(0, 0))
+        objects = [
+            CandidateWord("אבג", "c1", 0.5, 0.5),
+            SolutionCell(),
+            ClueState(clue=clue),
+        ]
+        for obj in objects:
+            assert not hasattr(obj, '__dict__')
+
+    def test_cell_lists_allocated_lazily(self):
+        """משבצת ריקה לא מחזיקה רשימות; הן נוצרות רק בשימוש"""
+        cell = SolutionCell()
+        assert cell._source_clues is None and cell._conflicting_letters is None
+
+        cell.add_source("c1")
+        cell.add_source("c1")
+        assert list(cell.source_clues) == ["c1"]
+
+        cell.remove_source("c1")
+        assert cell._source_clues is None
+
+    def test_grid_behaviour_unchanged(self):
+        """שיבוץ, סתירה והסרה עובדים כמו קודם"""
+        grid = SolutionGrid(1, 3)
+        first = ClueEntry(id="c1", source_cell=(0, 0), answer_cells=[(0, 0), (0, 1)])
+        second = ClueEntry(id="c2", source_cell=(0, 0), answer_cells=[(0, 1), (0, 2)])
+
+        grid.place_answer(first, "אב")
+        result = grid.place_answer(second, "גד", force=True)
+
+        assert result.conflicts == [(0, 1, "ב", "ג")]
+        assert list(grid.get_cell(0, 1).source_clues) == ["c1", "c2"]
+        assert list(grid.get_cell(0, 1).conflicting_letters) == ["ג"]
+
+        grid.remove_answer(second)
+        assert grid.get_cell(0, 2) == SolutionCell()
+
+
+class TestMemoryBenchmark:
+    """השוואת הקצאות - לפני ואחרי"""
+
+    def test_candidate_words(self):
+        """מועמדים: פחות בתים"""
+        legacy = _measure(lambda i: LegacyCandidateWord("אבג", "c1", 0.5, 0.5))
+        slotted = _measure(lambda i: CandidateWord("אבג", "c1", 0.5, 0.5))
+        _report("CandidateWord", legacy, slotted)
+
+        assert slotted[0] < legacy[0]
+        assert slotted[1] < legacy[1] * 0.7
+
+    def test_solution_cells(self):
+        """משבצות ריקות: בלי רשימות ובלי __dict__"""
+        legacy = _measure(lambda i: LegacySolutionCell())
+        slotted = _measure(lambda i: SolutionCell())
+        _report("SolutionCell", legacy, slotted)
+
+        assert slotted[0] < legacy[0] / 2
+        assert slotted[1] < legacy[1] / 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,158 @@
+"""
+Tests for the local mock model server
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from services.clue_solver import ClueSolver, ANTHROPIC_AVAILABLE
+from tests.mock_model_server import (
+    MockModelServer, LatencyDistribution, CannedResponder, ClueOracleResponder, parse_request,
+    PROVIDER_ANTHROPIC, PROVIDER_OPENAI, PROVIDER_GEMINI
+)
+from tests.solver_benchmark import generate_puzzle
+
+
+def _post(url, body):
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode('utf-8'), headers={'Content-Type': "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read()), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read()), dict(e.headers)
+
+
+class TestWireFormats:
+    """בדיקות לפורמטים של הספקים"""
+
+    def test_parse_requests(self):
+        """ספק, מודל וטקסט מכל אחד מהנתיבים"""
+        anthropic_request = parse_request("/v1/messages", {
+            'model': "claude", 'messages': [{'role': "user", 'content': "שלום"}]
+        })
+        openai_request = parse_request("/v1/chat/completions", {
+            'model': "gpt", 'messages': [{'role': "user", 'content': [
+                {'type': "image_url", 'image_url': {'url': "data:"}}, {'type': "text", 'text': "חצים"}
+            ]}]
+        })
+        gemini_request = parse_request("/v1beta/models/gemini-pro:generateContent?key=x", {
+            'contents': [{'parts': [{'inline_data': {}}, {'text': "משבצת"}]}]
+        })
+
+        assert (anthropic_request.provider, anthropic_request.prompt) == (PROVIDER_ANTHROPIC, "שלום")
+        assert (openai_request.provider, openai_request.prompt) == (PROVIDER_OPENAI, "חצים")
+        assert (gemini_request.provider, gemini_request.model, gemini_request.prompt) == (
+            PROVIDER_GEMINI, "gemini-pro", "משבצת"
+        )
+        assert parse_request("/v2/other", {}) is None
+
+    def test_http_responses(self):
+        """תשובות HTTP בפורמט של כל ספק"""
+        with MockModelServer(CannedResponder('{"arrows": []}')) as server:
+            _, anthropic_body, _ = _post(server.anthropic_base_url + "/v1/messages", {'model': "m", 'messages': []})
+            _, openai_body, _ = _post(server.openai_base_url + "/chat/completions", {'model': "m", 'messages': []})
+            _, gemini_body, _ = _post(server.gemini_base_url + "v1beta/models/m:generateContent", {'contents': []})
+
+        assert anthropic_body['content'][0]['text'] == '{"arrows": []}'
+        assert openai_body['choices'][0]['message']['content'] == '{"arrows": []}'
+        assert gemini_body['candidates'][0]['content']['parts'][0]['text'] == '{"arrows": []}'
+
+
+class TestOracle:
+    """בדיקות ל-ClueOracleResponder"""
+
+    @pytest.mark.skipif(not ANTHROPIC_AVAILABLE, reason="anthropic not installed")
+    def test_clue_solver_against_server(self):
+        """ClueSolver אמיתי (SDK + HTTP) מקבל את התשובה הנכונה, בודד וב-batch"""
+        puzzle = generate_puzzle(7, 7, seed=1)
+        clues = puzzle.clue_db.clues[:3]
+
+        with MockModelServer(ClueOracleResponder.for_puzzle(puzzle, distractors=2)) as server:
+            solver = ClueSolver(api_key="test", base_url=server.anthropic_base_url)
+            single = solver.solve_clue(clues[0], use_cache=False)
+            batch = solver.solve_batch(clues, use_cache=False)
+            stats = server.get_statistics()
+
+        assert single.error is None
+        assert puzzle.answers[clues[0].id] in [word for word, _ in single.candidates]
+        for clue in clues:
+            assert puzzle.answers[clue.id] in [w for w, _ in batch[clue.id].candidates]
+        assert stats['requests'] == {PROVIDER_ANTHROPIC: 2}
+
+    def test_pattern_is_respected(self):
+        """Pattern בפרומפט → known_letters, והמסיחים מתאימים לו"""
+        puzzle = generate_puzzle(7, 7, seed=2)
+        clue = puzzle.clue_db.clues[0]
+        answer = puzzle.answers[clue.id]
+        clue.known_letters = {0: answer[0]}
+        prompt = ClueSolver.BATCH_SOLVE_PROMPT.format(
+            clues_list=f"- ID: {clue.id}\n  Clue: \"{clue.text}\"\n  Length: {clue.answer_length}"
+                       f"\n  Pattern: {clue.get_constraint_string()}"
+        )
+
+        responder = ClueOracleResponder.for_puzzle(puzzle, distractors=3)
+        reply = json.loads(responder(parse_request("/v1/messages", {
+            'model': "m", 'messages': [{'role': "user", 'content': prompt}]
+        })))
+
+        words = [c['answer'] for c in reply['solutions'][0]['candidates']]
+        assert answer in words
+        assert all(word[0] == answer[0] for word in words)
+
+
+class TestLoadShaping:
+    """בדיקות ל-429 ולהשהיות"""
+
+    def test_rate_limit_injection(self):
+        """429 עם retry-after וגוף שגיאה בפורמט הספק"""
+        with MockModelServer(rate_limit_probability=1.0, retry_after=2) as server:
+            status, body, headers = _post(server.anthropic_base_url + "/v1/messages", {'messages': []})
+
+        assert status == 429
+        assert body['error']['type'] == "rate_limit_error"
+        assert headers['retry-after'] == "2"
+        assert server.get_statistics()['rate_limited'] == 1
+
+    def test_requests_per_second_limit(self):
+        """מעל max_requests_per_second בחלון של שנייה - 429"""
+        server = MockModelServer(max_requests_per_second=2)
+        statuses = [server.handle("/v1/messages", {'messages': []})[0] for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+
+    def test_latency_is_seeded(self):
+        """אותו seed - אותן השהיות"""
+        def delays(seed):
+            slept = []
+            server = MockModelServer(
+                latency=LatencyDistribution("lognormal", 0.5, 0.4), seed=seed, sleep=slept.append
+            )
+            for _ in range(5):
+                server.handle("/v1/chat/completions", {'messages': []})
+            return slept
+
+        assert delays(1) == delays(1)
+        assert delays(1) != delays(2)
+        assert LatencyDistribution.parse("uniform:1:0.5") == LatencyDistribution("uniform", 1.0, 0.5)
+
+    def test_concurrency_is_measured(self):
+        """בקשות במקביל נספרות ב-max_in_flight"""
+        with MockModelServer(latency=LatencyDistribution("fixed", 0.2)) as server:
+            url = server.anthropic_base_url + "/v1/messages"
+            threads = [threading.Thread(target=_post, args=(url, {'messages': []})) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert server.get_statistics()['max_in_flight'] >= 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,198 @@
+"""
+Tests for the Portfolio Solver and the shared answer cache
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from services.candidate_index import CandidateIndex
+from services.clue_solver import ClueSolver
+from services.solver_snapshot import SolveSnapshot, SnapshotPoolSolver, SnapshotResult
+from services.solver_strategy import SolveStatus
+from services.portfolio_solver import PortfolioSolver, PortfolioConfig, run_portfolio_member
+from tests.solver_fixtures import (
+    TWO_REGIONS,
+    build_puzzle,
+    answers_from_layout,
+    FakeClueSolver,
+    StubAnthropicClient,
+)
+
+
+CONFIGS = [
+    PortfolioConfig(name="strategy-score"),
+    PortfolioConfig(name="strategy-mrv", ordering="mrv"),
+    PortfolioConfig(name="puzzle-solver", solver="puzzle"),
+]
+
+
+def _stub_solver(answers) -> ClueSolver:
+    solver = ClueSolver(api_key=None)
+    solver.client = StubAnthropicClient(answers)
+    return solver
+
+
+class SlowAnthropicClient(StubAnthropicClient):
+    """client שלא מכבד timeout ועונה רק אחרי delay שניות"""
+
+    def __init__(self, answers, delay: float):
+        super().__init__(answers)
+        self.delay = delay
+
+    def create(self, **kwargs):
+        time.sleep(self.delay)
+        return super().create(**kwargs)
+
+
+def _hang(seconds, snapshot, clue_solver, cancel_event, deadline):
+    """משימת pool שלא בודקת לא ביטול ולא deadline"""
+    time.sleep(seconds)
+    return SnapshotResult(status=SolveStatus.STUCK)
+
+
+class HangingPoolSolver(SnapshotPoolSolver):
+    task_function = staticmethod(_hang)
+
+    def tasks(self):
+        return [(60,)]
+
+
+class TestSharedCache:
+    """בדיקות ל-cache התשובות של ClueSolver"""
+
+    def test_batch_uses_cache(self):
+        """שאילתא חוזרת עם אותן תבניות לא פונה ל-API"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        solver = _stub_solver(answers_from_layout(TWO_REGIONS))
+
+        first = solver.solve_batch(clue_db.clues)
+        second = solver.solve_batch(clue_db.clues)
+
+        assert solver.client.calls == 1
+        assert first['clue_a1'].candidates == second['clue_a1'].candidates == [("אבג", 0.7)]
+
+    def test_share_cache_between_solvers(self):
+        """שני solvers עם cache משותף - התשובות נקנות פעם אחת בלבד"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        shared = {}
+
+        first = _stub_solver(answers_from_layout(TWO_REGIONS)).share_cache(shared)
+        first.solve_batch(clue_db.clues)
+
+        second = _stub_solver(answers_from_layout(TWO_REGIONS)).share_cache(shared)
+        results = second.solve_batch(clue_db.clues)
+
+        assert second.client.calls == 0
+        assert results['clue_b2'].candidates == [("זחט", 0.7)]
+
+
+class TestPortfolioSolver:
+    """בדיקות להרצת הפורטפוליו"""
+
+    def test_first_complete_fill_wins(self):
+        """הפתרון המלא הראשון עוצר את שאר התצורות"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        portfolio = PortfolioSolver(
+            clue_db, solution, FakeClueSolver(answers_from_layout(TWO_REGIONS)),
+            configs=CONFIGS, use_processes=False
+        )
+
+        best = portfolio.solve()
+
+        assert best.status == SolveStatus.SOLVED
+        assert best.label == "strategy-score"
+        assert len(portfolio.results) == 1
+        assert solution.get_letter(2, 6) == "ט"
+
+    def test_best_partial_fill(self):
+        """בלי פתרון מלא - נבחרת התוצאה החלקית הטובה ביותר"""
+        answers = answers_from_layout(TWO_REGIONS)
+        del answers['clue_b2']
+
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        portfolio = PortfolioSolver(
+            clue_db, solution, FakeClueSolver(answers),
+            configs=CONFIGS, use_processes=False
+        )
+
+        best = portfolio.solve(time_limit=10)
+
+        assert best.status != SolveStatus.SOLVED
+        assert len(portfolio.results) == len(CONFIGS)
+        assert best.filled_cells == max(r.filled_cells for r in portfolio.results)
+        assert solution.get_statistics()['placed_clues'] == len(best.assignments)
+
+    def test_puzzle_config_rejects_strategy_fields(self):
+        """ל-PuzzleSolver אין ספים וסדר בחירה - תצורה שמגדירה אותם נדחית"""
+        with pytest.raises(ValueError, match="ordering"):
+            PortfolioConfig(name="puzzle-mrv", solver="puzzle", ordering="mrv")
+        with pytest.raises(ValueError):
+            PortfolioConfig(name="other", solver="sat")
+
+        assert PortfolioConfig(name="puzzle-deep", solver="puzzle", max_backtracks=500).max_backtracks == 500
+
+    def test_puzzle_member_respects_deadline(self):
+        """ה-deadline עובר לקריאות ה-LLM של PuzzleSolver - גם כשה-SDK לא מכבד timeout"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        solver = ClueSolver(api_key=None)
+        solver.client = SlowAnthropicClient(answers_from_layout(TWO_REGIONS), delay=2.0)
+        snapshot = SolveSnapshot(clues=list(clue_db.clues), solution=solution, candidate_index=CandidateIndex())
+
+        start = time.time()
+        result = run_portfolio_member(
+            PortfolioConfig(name="puzzle-solver", solver="puzzle"), snapshot, solver, deadline=time.time() + 0.3
+        )
+
+        assert time.time() - start < 1.5
+        assert result.status == SolveStatus.TIMED_OUT
+        assert result.error is None
+
+    def test_process_pool(self, capfd):
+        """הרצה ב-process pool עם cache משותף; אף worker לא קורס אחרי הביטול"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        portfolio = PortfolioSolver(
+            clue_db, solution, FakeClueSolver(answers_from_layout(TWO_REGIONS)),
+            configs=CONFIGS, max_workers=2
+        )
+
+        best = portfolio.solve(time_limit=30)
+
+        assert best.status == SolveStatus.SOLVED
+        assert solution.get_letter(0, 2) == "ג"
+        # ה-workers הסתיימו לפני שה-Manager נסגר - ולא קרסו מול proxies מתים
+        assert multiprocessing.active_children() == []
+        assert "Traceback" not in capfd.readouterr().err
+
+    def test_pool_hooks_are_required(self):
+        """תת-מחלקה בלי tasks / task_function נכשלת ביצירה, לא בתוך ה-pool"""
+        class NoTasks(SnapshotPoolSolver):
+            task_function = staticmethod(_hang)
+
+        class NoFunction(SnapshotPoolSolver):
+            def tasks(self):
+                return []
+
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        for cls in (NoTasks, NoFunction):
+            with pytest.raises(TypeError):
+                cls(clue_db, solution, FakeClueSolver({}))
+
+    def test_pool_returns_at_deadline(self):
+        """worker תקוע לא מעכב את solve() אחרי ה-deadline"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        pool = HangingPoolSolver(
+            clue_db, solution, FakeClueSolver(answers_from_layout(TWO_REGIONS)), max_workers=1
+        )
+        pool.DEADLINE_GRACE = 0.5
+
+        start = time.time()
+        assert pool.solve(time_limit=0.5) is None
+
+        assert time.time() - start < 10
+        assert multiprocessing.active_children() == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
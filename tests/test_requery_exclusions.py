@@ -0,0 +1,126 @@
+"""
+Tests for exclusion lists in requery prompts
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from models.clue_entry import ClueEntry
+from services.candidate_index import CandidateIndex, CandidateWord
+from services.clue_solver import ClueSolver
+from services.compact_answers import FORMAT_JSON
+from services.solver_strategy import SolverStrategy
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, FakeClueSolver
+
+
+class RecordingClient:
+    """client מדומה - שומר את הפרומפטים ומחזיר תשובה קבועה"""
+
+    def __init__(self, text):
+        self.text = text
+        self.prompts = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.prompts.append(kwargs['messages'][0]['content'])
+        return SimpleNamespace(content=[SimpleNamespace(text=self.text)])
+
+
+class RecordingFakeSolver(FakeClueSolver):
+    """FakeClueSolver ששומר את ה-exclude של כל קריאה"""
+
+    def __init__(self, answers):
+        super().__init__(answers)
+        self.excludes = []
+
+    def solve_batch(self, clues, max_per_request=10, use_cache=True, deadline=None, exclude=None):
+        self.excludes.append(dict(exclude or {}))
+        return super().solve_batch(clues, max_per_request, use_cache, deadline, exclude)
+
+
+def _clue(clue_id="c1", length=3):
+    return ClueEntry(
+        id=clue_id, source_cell=(0, 0), text=f"הגדרה {clue_id}",
+        answer_cells=[(0, i) for i in range(length)], answer_length=length
+    )
+
+
+class TestExclusions:
+    """בדיקות ל-CandidateIndex.get_exclusions"""
+
+    def test_failed_then_known_matching_pattern(self):
+        index = CandidateIndex()
+        for word, confidence in (("אבג", 0.4), ("אדה", 0.9), ("תבג", 0.8)):
+            index.add_candidate(CandidateWord(word, "c1", confidence, clue_certainty=0.8))
+        index.mark_as_failed("c1", "אזז")
+        index.mark_as_failed("c1", "שזז")
+
+        assert index.get_exclusions("c1") == ["אזז", "שזז", "אדה", "תבג", "אבג"]
+        assert index.get_exclusions("c1", "א__") == ["אזז", "אדה", "אבג"]
+        assert index.get_exclusions("other") == []
+
+
+class TestClueSolver:
+    """בדיקות להחרגות ב-ClueSolver"""
+
+    def test_prompt_lists_exclusions_and_parse_drops_them(self):
+        """המילים בפרומפט; מה שחוזר בכל זאת מסונן"""
+        solver = ClueSolver()
+        solver.client = RecordingClient("1|70|אבג 90|אדה 60")
+
+        results = solver.solve_batch([_clue()], exclude={"c1": ["אבג"]})
+
+        assert ', not: אבג' in solver.client.prompts[0]
+        assert ClueSolver.EXCLUSION_HINT in solver.client.prompts[0]
+        assert results["c1"].candidates == [("אדה", 0.6)]
+
+    def test_json_prompt_and_prompt_cap(self):
+        solver = ClueSolver(output_format=FORMAT_JSON)
+        words = [f"מ{i:02d}" for i in range(30)]
+
+        prompt = solver._build_batch_prompt([_clue()], {"c1": words})
+
+        assert "  Exclude: מ00, מ01" in prompt
+        assert "מ19" in prompt and "מ20" not in prompt
+
+    def test_cache_is_keyed_by_exclusions(self):
+        """תשובה מסוננת לא מוחזרת לשאילתא בלי החרגות"""
+        solver = ClueSolver()
+        solver.client = RecordingClient("1|70|אבג 90|אדה 60")
+
+        solver.solve_batch([_clue()], exclude={"c1": ["אבג"]})
+        plain = solver.solve_batch([_clue()])
+        solver.solve_batch([_clue()], exclude={"c1": ["אבג"]})
+
+        assert plain["c1"].candidates == [("אבג", 0.9), ("אדה", 0.6)]
+        assert len(solver.client.prompts) == 2
+        assert "not:" not in solver.client.prompts[1]
+
+
+class TestStrategy:
+    """בדיקות ל-_phase3_requery"""
+
+    def test_requery_sends_failed_and_known_words(self):
+        """ה-re-query שולח את המילים הידועות ואת אלה שנכשלו, והן לא חוזרות לאינדקס"""
+        solver = RecordingFakeSolver({
+            'clue_a1': [("אבג", 0.9)],
+            'clue_a2': [("אדה", 0.7), ("אדו", 0.3), ("אלף", 0.5)],
+            'clue_b1': [("וז", 0.9)],
+            'clue_b2': [("זחט", 0.9)],
+        })
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, solver)
+        strategy.prepare()
+        index = strategy.state.candidate_index
+        index.mark_as_failed('clue_a2', "אלף")
+        strategy._place_word(strategy.state.clue_states['clue_a1'], "אבג")
+
+        strategy._phase3_requery()
+
+        assert solver.excludes[-1]['clue_a2'] == ["אלף", "אדה", "אדו"]
+        assert [c.word for c in index.get_candidates_for_clue('clue_a2')] == ["אדה", "אדו"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
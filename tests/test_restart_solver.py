@@ -0,0 +1,135 @@
+"""
+Tests for random-restart solving
+"""
+
+import multiprocessing
+
+import pytest
+
+from services.solver_strategy import SolverStrategy, SolveStatus, SolvePhase
+from services.restart_solver import RestartSolver, RestartConfig, luby, run_restart
+from services.solver_snapshot import SolveSnapshot
+from tests.solver_fixtures import CHAIN, DEEP_TRAP, build_puzzle, FakeClueSolver
+
+
+# בלי backtracks הריצה הדטרמיניסטית נופלת ב-DEEP_TRAP; הפרעה שבוחרת אחרת - פותרת.
+TRAP = DEEP_TRAP
+
+
+def _puzzle():
+    return build_puzzle(CHAIN, rows=5, cols=5)
+
+NO_BACKTRACKS = RestartConfig(schedule="fixed", unit=0, max_restarts=8, perturbation_strength=0.5)
+
+
+class TestSchedule:
+    """בדיקות ללוח הזמנים"""
+
+    def test_luby_sequence(self):
+        assert [luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+    def test_budgets(self):
+        """Luby ו-geometric בכפולות של unit"""
+        assert [RestartConfig(unit=10).budget(i) for i in range(7)] == [10, 10, 20, 10, 10, 20, 40]
+        geometric = RestartConfig(schedule="geometric", unit=4, factor=2.0)
+        assert [geometric.budget(i) for i in range(4)] == [4, 8, 16, 32]
+
+    def test_unknown_schedule(self):
+        with pytest.raises(ValueError):
+            RestartConfig(schedule="random").budget(0)
+
+    def test_first_restart_is_unperturbed(self):
+        """ריסטארט 0 בלי הפרעה, השאר עם seeds שונים"""
+        seeds = [RestartConfig(base_seed=100).seed(i) for i in range(4)]
+        assert seeds == [None, 101, 102, 103]
+
+
+class TestPerturbation:
+    """בדיקות להפרעת הציונים ב-SolverStrategy"""
+
+    def _run(self, seed, strength):
+        clue_db, solution = _puzzle()
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(TRAP), max_backtracks=0)
+        strategy.perturbation_seed = seed
+        strategy.perturbation_strength = strength
+        progress = strategy.solve()
+        return progress.status, solution.to_string_grid()
+
+    def test_deterministic_trap(self):
+        """בלי הפרעה - תמיד אותה מלכודת"""
+        assert self._run(None, 0.0)[0] == SolveStatus.STUCK
+        assert self._run(7, 0.0) == self._run(None, 0.0)
+
+    def test_same_seed_same_run(self):
+        """אותו seed - אותה ריצה"""
+        assert self._run(3, 0.5) == self._run(3, 0.5)
+
+    def test_some_seed_escapes_trap(self):
+        """לפחות seed אחד בוחר אחרת ופותר"""
+        assert any(self._run(seed, 0.5)[0] == SolveStatus.SOLVED for seed in range(1, 9))
+
+
+class TestRestartSolver:
+    """בדיקות לריסטארטים"""
+
+    def test_restarts_escape_trap(self):
+        """ריסטארט 0 נתקע, ריסטארט מאוחר יותר פותר ועוצר את השאר"""
+        clue_db, solution = _puzzle()
+        solver = RestartSolver(clue_db, solution, FakeClueSolver(TRAP), NO_BACKTRACKS, use_processes=False)
+
+        best = solver.solve()
+
+        assert best.status == SolveStatus.SOLVED
+        assert solver.records[0].status == "stuck"
+        assert solver.records[-1].status == "solved"
+        assert len(solver.records) < NO_BACKTRACKS.max_restarts
+        assert solver.strategy.state.solve_phase == SolvePhase.COMPLETED
+        assert solution.get_answer_for_clue(clue_db.get_clue('clue_1')) == "אבג"
+
+    def test_telemetry(self):
+        """רשומה לכל ריסטארט עם seed, תקציב וסטטוס"""
+        clue_db, solution = _puzzle()
+        config = RestartConfig(unit=0, max_restarts=3, perturbation_strength=0.0)
+        solver = RestartSolver(clue_db, solution, FakeClueSolver(TRAP), config, use_processes=False)
+
+        solver.solve()
+        stats = solver.get_statistics()
+
+        assert stats['schedule'] == "luby"
+        assert [r['index'] for r in stats['restarts']] == [0, 1, 2]
+        assert [r['seed'] for r in stats['restarts']] == [None, 1, 2]
+        assert all(r['status'] == "stuck" and r['budget'] == 0 for r in stats['restarts'])
+
+    def test_snapshot_not_mutated(self):
+        """כל ריסטארט עובד על עותק - תמונת המצב המשותפת לא משתנה"""
+        clue_db, solution = _puzzle()
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(TRAP))
+        strategy.prepare()
+        snapshot = SolveSnapshot.capture(strategy)
+        before = snapshot.solution.to_string_grid()
+
+        result, record = run_restart(1, 5, 10, 0.5, snapshot, strategy.solver)
+
+        assert result.assignments
+        assert record.worker > 0
+        assert snapshot.solution.to_string_grid() == before
+        assert snapshot.candidate_index.get_candidate_count('clue_1') == 2
+
+    def test_process_pool(self, capfd):
+        """ריסטארטים ב-worker processes; אף worker לא קורס אחרי הביטול"""
+        clue_db, solution = _puzzle()
+        solver = RestartSolver(
+            clue_db, solution, FakeClueSolver(TRAP), NO_BACKTRACKS, max_workers=2
+        )
+
+        best = solver.solve(time_limit=60)
+
+        assert best is not None
+        assert best.status == SolveStatus.SOLVED
+        assert all(r.worker > 0 for r in solver.records)
+        assert multiprocessing.active_children() == []
+        assert "Traceback" not in capfd.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+"""
+Tests for resumable (step-based) solving
+"""
+
+import pytest
+
+from services.solver_strategy import SolverStrategy, SolvePhase, SolveStatus
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, answers_from_layout, FakeClueSolver
+
+
+def _strategy(answers=None):
+    clue_db, solution = build_puzzle(TWO_REGIONS)
+    solver = FakeClueSolver(answers if answers is not None else answers_from_layout(TWO_REGIONS))
+    return SolverStrategy(clue_db, solution, solver), solver
+
+
+class TestStepExecution:
+    """בדיקות להרצה צעד אחר צעד"""
+
+    def test_iter_steps_reaches_completion(self):
+        """ה-generator מתקדם עד פתרון מלא"""
+        strategy, _ = _strategy()
+
+        phases = [progress.phase for progress in strategy.iter_steps()]
+
+        assert phases[0] == SolvePhase.PROPAGATION  # אחרי השאילתא הראשונית
+        assert phases[-1] == SolvePhase.COMPLETED
+        assert strategy.step() is False
+
+    def test_pause_and_resume_keeps_state(self):
+        """עצירה והמשך - בלי אתחול ובלי שאילתא ראשונית נוספת"""
+        strategy, solver = _strategy()
+
+        steps = strategy.iter_steps()
+        next(steps)
+        strategy.pause()
+        for _ in steps:
+            pass
+
+        assert strategy.state.solve_phase == SolvePhase.PROPAGATION
+        assert solver.calls == 1
+
+        progress = strategy.resume()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert solver.calls == 1
+        assert strategy.state.query_count == 1
+
+
+class TestManualAnswersWhilePaused:
+    """בדיקות לתשובות ידניות בזמן עצירה"""
+
+    def test_manual_answer_survives_resume(self):
+        """תשובה ידנית שהוכנסה בעצירה נשמרת ומשמשת בהמשך"""
+        answers = answers_from_layout(TWO_REGIONS)
+        del answers['clue_b2']
+        strategy, _ = _strategy(answers)
+
+        for _ in strategy.iter_steps():
+            if strategy.state.solve_phase == SolvePhase.PROPAGATION:
+                strategy.pause()
+
+        assert strategy.set_manual_answer('clue_b2', "זחט")
+
+        progress = strategy.resume()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert strategy.state.clue_states['clue_b2'].is_manual
+        assert strategy.solution.get_letter(2, 6) == "ט"
+
+    def test_manual_answer_unsticks_solver(self):
+        """אחרי STUCK - תשובה ידנית מאפשרת להמשיך"""
+        answers = answers_from_layout(TWO_REGIONS)
+        del answers['clue_a2']
+        strategy, _ = _strategy(answers)
+
+        assert strategy.solve().status == SolveStatus.STUCK
+        assert strategy.set_manual_answer('clue_a2', "אדה")
+
+        assert strategy.resume().status == SolveStatus.SOLVED
+
+    def test_manual_answer_before_start(self):
+        """תשובה ידנית לפני תחילת הפתרון - לא נשאלת ולא נמחקת"""
+        strategy, solver = _strategy()
+
+        assert strategy.set_manual_answer('clue_a1', "אבג")
+        progress = strategy.resume()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert strategy.state.clue_states['clue_a1'].is_manual
+        assert solver.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Tests for solution counting / uniqueness verification
+"""
+
+import time
+
+import pytest
+
+from services.candidate_index import CandidateIndex, CandidateWord
+from services.solution_counter import SolutionCounter
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, answers_from_layout
+
+
+AMBIGUOUS_ANSWERS = {
+    'clue_a1': [("אבג", 0.6), ("אבד", 0.5)],
+    'clue_a2': [("אדה", 0.6), ("אדו", 0.5)],
+    'clue_b1': [("וז", 0.6), ("וי", 0.5)],
+    'clue_b2': [("זחט", 0.6), ("זחכ", 0.5)],
+}
+
+
+def _index(answers) -> CandidateIndex:
+    index = CandidateIndex()
+    for clue_id, candidates in answers.items():
+        for word, confidence in candidates:
+            index.add_candidate(CandidateWord(word, clue_id, confidence, 0.8))
+    return index
+
+
+class TestSolutionCounter:
+    """בדיקות לספירת פתרונות"""
+
+    def test_unique_fill(self):
+        """מועמד אחד לכל הגדרה - פתרון יחיד"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        counter = SolutionCounter(clue_db, _index(answers_from_layout(TWO_REGIONS)))
+
+        result = counter.count()
+
+        assert result.count == 1
+        assert result.is_unique
+
+    def test_counts_across_components(self):
+        """הספירה היא מכפלת הרכיבים; הצלבות מסננות צירופים"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = SolutionCounter(clue_db, _index(AMBIGUOUS_ANSWERS)).count()
+
+        # אזור א': 2x2 (שתיהן מתחילות ב-א), אזור ב': רק "וז" מתאים ל-ז
+        assert result.count == 8
+        assert sorted(count for _, count in result.component_counts) == [2, 4]
+
+    def test_wrong_length_reported(self):
+        """מועמדים באורך שגוי (answer_length שגוי) - אפס פתרונות והגדרה בלי מועמדים"""
+        answers = answers_from_layout(TWO_REGIONS)
+        answers['clue_b2'] = [("זחטי", 0.9)]
+
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = SolutionCounter(clue_db, _index(answers)).count()
+
+        assert result.count == 0
+        assert result.empty_domains == ['clue_b2']
+        assert sorted(result.unsatisfiable_components[0]) == ['clue_b1', 'clue_b2']
+
+    def test_limit_saturates(self):
+        """עוצרים ב-limit"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = SolutionCounter(clue_db, _index(AMBIGUOUS_ANSWERS), limit=3).count()
+
+        assert result.count == 3
+        assert result.capped
+        assert not result.is_unique
+
+    def test_memoization_on_long_chain(self):
+        """שרשרת ארוכה - ספירה נאיבית מתפוצצת, memoization מסיים מיד"""
+        length = 40
+        letters = "אבג"
+        layout = {
+            f"clue_{i}": ([(0, i), (0, i + 1)], "אא") for i in range(length)
+        }
+        clue_db, _ = build_puzzle(layout, rows=1, cols=length + 1)
+        answers = {
+            clue_id: [(a + b, 0.5) for a in letters for b in letters] for clue_id in layout
+        }
+
+        start = time.time()
+        result = SolutionCounter(clue_db, _index(answers), limit=None).count()
+
+        assert result.count == 3 ** (length + 1)
+        assert result.memo_hits > 0
+        assert time.time() - start < 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
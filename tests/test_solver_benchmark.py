@@ -0,0 +1,118 @@
+"""
+Tests for the synthetic solver benchmark
+"""
+
+import json
+
+import pytest
+
+from models.clue_entry import ClueEntry
+from tests.solver_benchmark import (
+    generate_puzzle,
+    OracleClueSolver,
+    run_benchmark,
+    main,
+    SOLVERS,
+)
+
+
+class TestSyntheticPuzzle:
+    """בדיקות למחולל התשבצים"""
+
+    def test_known_fill_is_consistent(self):
+        """כל תשובה תואמת את המילוי, כך שהמילוי הידוע הוא פתרון תקין"""
+        puzzle = generate_puzzle(9, 9, density=0.25, seed=3)
+
+        assert puzzle.answers
+        for clue in puzzle.clue_db.clues:
+            expected = "".join(puzzle.letters[cell] for cell in clue.answer_cells)
+            assert puzzle.answers[clue.id] == expected
+            assert len(expected) == clue.answer_length >= 2
+
+    def test_same_seed_same_puzzle(self):
+        """אותו seed - אותו תשבץ"""
+        assert generate_puzzle(7, 7, seed=5).answers == generate_puzzle(7, 7, seed=5).answers
+        assert generate_puzzle(7, 7, seed=5).answers != generate_puzzle(7, 7, seed=6).answers
+
+
+class TestOracleClueSolver:
+    """בדיקות ל-ClueSolver המקומי"""
+
+    def test_includes_true_answer_and_distractors(self):
+        """התשובה הנכונה + מסיחים, כולם תואמים לאותיות הידועות"""
+        puzzle = generate_puzzle(9, 9, seed=1)
+        clue = max(puzzle.clue_db.clues, key=lambda c: c.answer_length)
+        oracle = OracleClueSolver(puzzle.answers, distractors=3)
+
+        words = [word for word, _ in oracle.solve_clue(clue).candidates]
+
+        assert puzzle.answers[clue.id] in words
+        assert len(words) > 1
+
+    def test_respects_known_letters(self):
+        """מסיחים לא סותרים אותיות שכבר במשבצות"""
+        clue = ClueEntry(id="c", source_cell=(0, 0), answer_length=4,
+                         answer_cells=[(0, 0), (0, 1), (0, 2), (0, 3)])
+        clue.known_letters = {0: "א", 3: "ד"}
+        oracle = OracleClueSolver({"c": "אבגד"}, distractors=10, seed=2)
+
+        result = oracle.solve_clue(clue)
+
+        assert result.candidates
+        assert all(word[0] == "א" and word[3] == "ד" for word, _ in result.candidates)
+
+    def test_counts_requeries(self):
+        """שאילתא שנייה על אותה הגדרה נספרת כ-requery"""
+        puzzle = generate_puzzle(7, 7, seed=0)
+        oracle = OracleClueSolver(puzzle.answers)
+        clue = puzzle.clue_db.clues[0]
+
+        oracle.solve_clue(clue)
+        oracle.solve_batch([clue])
+
+        assert oracle.calls == 2
+        assert oracle.requeries == 1
+
+
+class TestRunBenchmark:
+    """בדיקות להרצת הבנצ'מרק"""
+
+    @pytest.mark.parametrize("kind", SOLVERS)
+    def test_noiseless_oracle_solves(self, kind):
+        """בלי רעש ובלי מסיחים - שני הסולברים פותרים את התשבץ נכון"""
+        puzzle = generate_puzzle(7, 7, seed=0)
+
+        result = run_benchmark(kind, puzzle, oracle_options={'distractors': 0, 'noise': 0.0})
+
+        assert result.status == "solved"
+        assert result.accuracy == 1.0
+        assert result.placements == result.clues
+        assert result.backtracks == 0
+        assert result.peak_memory_kb > 0
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_noisy_runs_terminate(self, seed):
+        """עם מסיחים - הריצה מסתיימת (גם אם נתקעת) ומחזירה מדדים"""
+        puzzle = generate_puzzle(7, 7, seed=seed)
+
+        result = run_benchmark("strategy", puzzle, seed=seed, max_backtracks=20, measure_memory=False)
+
+        assert result.status in ("solved", "stuck")
+        assert result.peak_memory_kb is None
+        assert 0.0 <= result.accuracy <= 1.0
+
+    def test_json_output(self, tmp_path):
+        """פלט JSON לכל צירוף"""
+        output = tmp_path / "bench.json"
+
+        main(["--size", "6x7", "--density", "0.3", "--seeds", "2", "--no-memory", "--output", str(output)])
+
+        rows = json.loads(output.read_text(encoding="utf-8"))["results"]
+        assert len(rows) == 2 * len(SOLVERS)
+        assert {row["solver"] for row in rows} == set(SOLVERS)
+        assert all(row["rows"] == 6 and row["cols"] == 7 for row in rows)
+        assert {"wall_time", "placements", "backtracks", "requeries", "peak_memory_kb"} <= set(rows[0])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,144 @@
+"""
+Tests for solver checkpoint/restore
+"""
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from services.solver_strategy import SolverStrategy, SolvePhase, SolveStatus
+from services.solver_checkpoint import (
+    encode_checkpoint,
+    restore_checkpoint,
+    CheckpointError,
+    FileCheckpointStore,
+    SqliteCheckpointStore,
+    SolverCheckpointer,
+)
+from tests.solver_fixtures import TWO_REGIONS, build_puzzle, answers_from_layout, FakeClueSolver
+
+
+AMBIGUOUS_ANSWERS = {
+    'clue_a1': [("אבג", 0.6), ("אבד", 0.5)],
+    'clue_a2': [("אדה", 0.6), ("אדו", 0.5)],
+    'clue_b1': [("וז", 0.6), ("וי", 0.5)],
+    'clue_b2': [("זחט", 0.6), ("זחכ", 0.5)],
+}
+
+
+def _strategy(answers):
+    clue_db, solution = build_puzzle(TWO_REGIONS)
+    return SolverStrategy(clue_db, solution, FakeClueSolver(answers))
+
+
+def _run_steps(strategy, count):
+    """מריץ מספר צעדים ועוצר"""
+    for i, _ in enumerate(strategy.iter_steps(), start=1):
+        if i >= count:
+            strategy.pause()
+
+
+class TestCheckpointRoundTrip:
+    """בדיקות לשמירה ושחזור"""
+
+    def test_restore_continues_without_requery(self):
+        """אחרי שחזור ממשיכים מאותה נקודה - בלי קריאות LLM חדשות"""
+        original = _strategy(AMBIGUOUS_ANSWERS)
+        _run_steps(original, 3)
+        original.state.forward_check_rejections = 7
+        data = encode_checkpoint(original)
+
+        restored = _strategy(AMBIGUOUS_ANSWERS)
+        restore_checkpoint(restored, data)
+
+        assert restored.state.solve_phase == original.state.solve_phase
+        assert restored.state.placement_stack == original.state.placement_stack
+        assert restored.state.forward_check_rejections == 7
+        assert restored.solution.to_matrix() == original.solution.to_matrix()
+        assert restored.state.candidate_index.get_statistics() == \
+            original.state.candidate_index.get_statistics()
+
+        progress = restored.resume()
+
+        assert progress.status == SolveStatus.SOLVED
+        assert restored.solver.calls == 0
+
+    def test_failed_words_and_known_letters_restored(self):
+        """מילים שנכשלו ואותיות ידועות משוחזרות"""
+        original = _strategy(AMBIGUOUS_ANSWERS)
+        original.initialize()
+        original.state.solve_phase = SolvePhase.PROPAGATION
+        original.set_manual_answer('clue_a1', "אבג")
+        original.state.candidate_index.mark_as_failed('clue_b1', "וי")
+
+        restored = _strategy(AMBIGUOUS_ANSWERS)
+        restore_checkpoint(restored, encode_checkpoint(original))
+
+        assert restored.state.clue_states['clue_a1'].is_manual
+        assert restored.clue_db.get_clue('clue_a1').chosen_answer == "אבג"
+        assert restored.clue_db.get_clue('clue_a2').get_constraint_string() == "א__"
+        assert restored.state.candidate_index.get_failed_words() == {'clue_b1': {"וי"}}
+
+    def test_rejects_corrupt_data(self):
+        """נתונים פגומים - CheckpointError"""
+        data = encode_checkpoint(_strategy(AMBIGUOUS_ANSWERS))
+
+        with pytest.raises(CheckpointError):
+            restore_checkpoint(_strategy(AMBIGUOUS_ANSWERS), b"XXXX" + data[4:])
+        with pytest.raises(CheckpointError):
+            restore_checkpoint(_strategy(AMBIGUOUS_ANSWERS), data[:-5])
+
+    def test_rejects_other_puzzle(self):
+        """checkpoint של תשבץ אחר - CheckpointError"""
+        original = _strategy(AMBIGUOUS_ANSWERS)
+        original.initialize()
+        data = encode_checkpoint(original)
+
+        clue_db, solution = build_puzzle(TWO_REGIONS, rows=4, cols=7)
+        other = SolverStrategy(clue_db, solution, FakeClueSolver(AMBIGUOUS_ANSWERS))
+
+        with pytest.raises(CheckpointError):
+            restore_checkpoint(other, data)
+
+
+class TestCheckpointer:
+    """בדיקות לשמירה תקופתית"""
+
+    def test_saves_after_every_step(self, tmp_path):
+        """שמירה אחרי כל צעד לקובץ, ושחזור מהקובץ"""
+        checkpointer = SolverCheckpointer(FileCheckpointStore(tmp_path / "solve.ckpt"))
+        strategy = _strategy(answers_from_layout(TWO_REGIONS))
+        strategy.checkpointer = checkpointer
+
+        strategy.solve()
+
+        assert checkpointer.saves >= len(TWO_REGIONS)
+
+        restored = _strategy(answers_from_layout(TWO_REGIONS))
+        assert checkpointer.restore(restored)
+        assert restored.state.solve_phase == SolvePhase.COMPLETED
+
+    def test_every_steps_interval(self, tmp_path):
+        """every_steps - שמירה רק כל N צעדים"""
+        checkpointer = SolverCheckpointer(FileCheckpointStore(tmp_path / "solve.ckpt"), every_steps=100)
+        strategy = _strategy(answers_from_layout(TWO_REGIONS))
+        strategy.checkpointer = checkpointer
+
+        strategy.solve()
+
+        assert checkpointer.saves == 0
+        assert not checkpointer.restore(_strategy(answers_from_layout(TWO_REGIONS)))
+
+    def test_sqlite_store(self, tmp_path):
+        """שמירה וטעינה מטבלת solver_checkpoints"""
+        store = SqliteCheckpointStore("puzzle-1", DatabaseManager(tmp_path / "test.db"))
+
+        store.save(b"first")
+        store.save(b"second")
+        assert store.load() == b"second"
+
+        store.clear()
+        assert store.load() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,93 @@
+"""
+Tests for solver trace recording and offline replay
+"""
+
+import pytest
+
+from services.puzzle_solver import PuzzleSolver
+from services.solver_strategy import SolverStrategy
+from services.solver_trace import SolverTrace, TraceRecorder, replay_trace
+from tests.solver_fixtures import CHAIN, DEEP_TRAP, build_puzzle, FakeClueSolver
+
+
+# המועמד הבטוח ביותר ל-clue_1 נכשל רק שני צעדים בהמשך - מאלץ backtracks
+MISLEADING_ANSWERS = DEEP_TRAP
+
+
+def _record(solver_class):
+    clue_db, solution = build_puzzle(CHAIN, rows=5, cols=5)
+    solver = solver_class(clue_db, solution, FakeClueSolver(MISLEADING_ANSWERS))
+    if solver_class is PuzzleSolver:
+        solver.callbacks.letter_delay_ms = 0
+
+    recorder = TraceRecorder.attach(solver)
+    solver.solve()
+    return recorder.trace, solver
+
+
+class TestTraceRecording:
+    """בדיקות להקלטה"""
+
+    def test_records_results_and_decisions(self):
+        """תשובות, שיבוצים, backtracks ושלבים מוקלטים"""
+        trace, _ = _record(SolverStrategy)
+        summary = trace.summary()
+
+        assert summary['results'] >= len(CHAIN)
+        assert summary['placements'] >= len(CHAIN)
+        assert summary['backtracks'] >= 1
+        assert any(event[0] == "phase" for event in trace.events)
+
+    def test_existing_callbacks_still_called(self):
+        """callbacks של ה-UI ממשיכים לפעול"""
+        clue_db, solution = build_puzzle(CHAIN, rows=5, cols=5)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(MISLEADING_ANSWERS))
+        placed = []
+        strategy.callbacks.on_word_placed = lambda clue_id, word, cells: placed.append(word)
+
+        TraceRecorder.attach(strategy)
+        strategy.solve()
+
+        assert "אבכ" in placed
+
+    def test_bytes_roundtrip(self, tmp_path):
+        """שמירה וטעינה"""
+        trace, _ = _record(SolverStrategy)
+        path = tmp_path / "solve.trace.gz"
+        trace.save(path)
+
+        loaded = SolverTrace.load(path)
+
+        assert loaded.decisions() == trace.decisions()
+        assert loaded.results == trace.results
+
+
+class TestTraceReplay:
+    """בדיקות להרצה חוזרת"""
+
+    @pytest.mark.parametrize("solver_class", [SolverStrategy, PuzzleSolver])
+    def test_replay_is_deterministic(self, solver_class):
+        """הרצה חוזרת offline - אותן החלטות ואותו פתרון"""
+        trace, original = _record(solver_class)
+
+        replayed, solver = replay_trace(SolverTrace.from_bytes(trace.to_bytes()))
+
+        assert trace.first_divergence(replayed) is None
+        assert solver.solver.inner.misses == 0
+        assert solver.solution.to_matrix() == original.solution.to_matrix()
+
+    def test_replay_with_algorithm_change(self):
+        """שינוי אלגוריתם - רץ על התשובות המוקלטות ומשווים החלטות"""
+        trace, _ = _record(SolverStrategy)
+
+        def limit_backtracks(strategy):
+            strategy.max_backtracks = 2
+
+        replayed, solver = replay_trace(trace, configure=limit_backtracks)
+
+        assert solver.solver.inner.misses == 0
+        assert replayed.summary()['backtracks'] == 2
+        assert trace.first_divergence(replayed) is not None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
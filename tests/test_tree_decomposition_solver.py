@@ -0,0 +1,190 @@
+"""
+Tests for the tree-decomposition DP solver
+"""
+
+import math
+
+import pytest
+
+from services.candidate_index import CandidateIndex, CandidateWord
+from services.solver_strategy import SolverStrategy, SolvePhase
+from services.tree_decomposition_solver import (
+    TreeDecompositionSolver, REASON_WIDTH, REASON_TABLE_SIZE, REASON_TIMEOUT, REASON_INFEASIBLE
+)
+from tests.solver_fixtures import TWO_REGIONS, CHAIN, build_puzzle, answers_from_layout, FakeClueSolver
+from tests.solver_benchmark import generate_puzzle, OracleClueSolver
+
+
+# הבחירה החמדנית (אבג) כופה על clue_a2 מועמד חלש; האופטימום הגלובלי שונה
+GREEDY_TRAP = {
+    'clue_a1': [("אבג", 0.9), ("דבג", 0.8)],
+    'clue_a2': [("אדה", 0.1), ("דדה", 0.9)],
+    'clue_b1': [("וז", 0.9)],
+    'clue_b2': [("זחט", 0.9)],
+}
+
+
+def _index(answers) -> CandidateIndex:
+    index = CandidateIndex()
+    for clue_id, candidates in answers.items():
+        for word, confidence in candidates:
+            index.add_candidate(CandidateWord(word, clue_id, confidence, 0.8))
+    return index
+
+
+def _brute_force(clue_db, index):
+    """הציון המקסימלי על כל המילויים המלאים העקביים (DFS פשוט)"""
+    clues = [clue for clue in clue_db.clues if clue.answer_length > 0]
+    cells = {}
+    best = [-math.inf]
+
+    def visit(k, total):
+        if k == len(clues):
+            best[0] = max(best[0], total)
+            return
+        clue = clues[k]
+        for candidate in index.get_candidates_for_clue(clue.id):
+            word = candidate.word
+            if any(cells.get(cell, letter) != letter for cell, letter in zip(clue.answer_cells, word)):
+                continue
+            added = [cell for cell in clue.answer_cells if cell not in cells]
+            for cell, letter in zip(clue.answer_cells, word):
+                cells.setdefault(cell, letter)
+            visit(k + 1, total + math.log(candidate.combined_score))
+            for cell in added:
+                del cells[cell]
+
+    visit(0, 0.0)
+    return best[0]
+
+
+class TestTreeDecomposition:
+    """בדיקות לפירוק העץ"""
+
+    def test_chain_has_width_one(self):
+        """שרשרת הצלבות - רוחב 1, וכל תא מצביע לתא שסולק אחריו"""
+        clue_db, _ = build_puzzle(CHAIN, rows=5, cols=5)
+        solver = TreeDecompositionSolver(clue_db, _index(answers_from_layout(CHAIN)))
+
+        decomposition = solver.decompose()
+
+        assert decomposition.width == 1
+        assert sorted(decomposition.order) == sorted(CHAIN)
+        roots = [cid for cid, parent in decomposition.parent.items() if parent is None]
+        assert len(roots) == 1
+
+    def test_independent_regions_have_one_root_each(self):
+        """שני אזורים בלתי תלויים - יער עם שני שורשים"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        decomposition = TreeDecompositionSolver(clue_db, CandidateIndex()).decompose()
+
+        assert decomposition.width == 1
+        assert sum(1 for parent in decomposition.parent.values() if parent is None) == 2
+
+
+class TestTreeDecompositionSolver:
+    """בדיקות ל-DP"""
+
+    def test_finds_global_optimum(self):
+        """המילוי עם מכפלת הציונים הגבוהה ביותר - לא החמדני"""
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+        result = TreeDecompositionSolver(clue_db, _index(GREEDY_TRAP)).solve()
+
+        assert result.is_complete
+        assert result.assignments == {
+            'clue_a1': "דבג", 'clue_a2': "דדה", 'clue_b1': "וז", 'clue_b2': "זחט"
+        }
+        assert result.score == pytest.approx((0.8 * 0.9 * 0.9 * 0.9) * 0.8 ** 4)
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_brute_force(self, seed):
+        """על תשבץ קטן עם מסיחים - אותו ציון כמו חיפוש ממצה"""
+        puzzle = generate_puzzle(4, 5, density=0.2, seed=seed)
+        oracle = OracleClueSolver(puzzle.answers, distractors=3, noise=0.3, seed=seed)
+        index = CandidateIndex()
+        for clue in puzzle.clue_db.clues:
+            for word, confidence in oracle.solve_clue(clue).candidates:
+                index.add_candidate(CandidateWord(word, clue.id, confidence, 0.8))
+
+        result = TreeDecompositionSolver(
+            puzzle.clue_db, index, max_width=10, allow_partial=False
+        ).solve()
+
+        assert result.feasible
+        assert result.log_score == pytest.approx(_brute_force(puzzle.clue_db, index))
+
+    def test_missing_candidates_left_unassigned(self):
+        """הגדרה בלי מועמדים - נשארת ריקה, השאר נפתרות"""
+        answers = answers_from_layout(TWO_REGIONS)
+        del answers['clue_b2']
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+
+        result = TreeDecompositionSolver(clue_db, _index(answers)).solve()
+
+        assert result.feasible
+        assert result.unassigned == ['clue_b2']
+        assert result.assignments['clue_b1'] == "וז"
+
+    def test_missing_candidates_without_partial_is_infeasible(self):
+        """בלי allow_partial - הגדרה בלי מועמדים = אין פתרון"""
+        answers = answers_from_layout(TWO_REGIONS)
+        del answers['clue_b2']
+        clue_db, _ = build_puzzle(TWO_REGIONS)
+
+        result = TreeDecompositionSolver(clue_db, _index(answers), allow_partial=False).solve()
+
+        assert not result.feasible
+        assert result.reason == REASON_INFEASIBLE
+        assert result.assignments == {}
+
+    def test_too_wide_is_not_solved(self):
+        """רוחב מעל max_width - לא פותרים, הקורא חוזר לחיפוש"""
+        clue_db, _ = build_puzzle(CHAIN, rows=5, cols=5)
+        result = TreeDecompositionSolver(
+            clue_db, _index(answers_from_layout(CHAIN)), max_width=0
+        ).solve()
+
+        assert result.too_wide
+        assert result.width == 1
+        assert not result.feasible
+        assert result.reason == REASON_WIDTH
+
+    def test_table_size_and_time_limits(self):
+        """טבלה גדולה מדי או זמן שנגמר - סיבה משלהם, לא רוחב"""
+        clue_db, _ = build_puzzle(CHAIN, rows=5, cols=5)
+        index = _index(answers_from_layout(CHAIN))
+
+        table = TreeDecompositionSolver(clue_db, index, max_table_size=0).solve()
+        timeout = TreeDecompositionSolver(clue_db, index, time_limit=0).solve()
+
+        assert (table.reason, table.too_wide, table.width) == (REASON_TABLE_SIZE, True, 1)
+        assert (timeout.reason, timeout.too_wide, timeout.feasible) == (REASON_TIMEOUT, False, False)
+
+    def test_apply_to_strategy(self):
+        """תוצאה מ-from_strategy משובצת ב-SolverStrategy ומשלימה את הפתרון"""
+        clue_db, solution = build_puzzle(TWO_REGIONS)
+        strategy = SolverStrategy(clue_db, solution, FakeClueSolver(GREEDY_TRAP))
+        strategy.prepare()
+
+        result = TreeDecompositionSolver.from_strategy(strategy).solve()
+        placed = strategy.apply_assignments(result.assignments)
+
+        assert placed == 4
+        assert strategy.state.solve_phase == SolvePhase.COMPLETED
+        assert solution.get_answer_for_clue(clue_db.get_clue('clue_a2')) == "דדה"
+
+    def test_recovers_synthetic_fill(self):
+        """מסיחים עם ביטחון נמוך מהתשובה הנכונה - ה-DP משחזר את המילוי הידוע"""
+        puzzle = generate_puzzle(9, 9, density=0.25, seed=1)
+        oracle = OracleClueSolver(puzzle.answers, distractors=3, noise=0.0, seed=1)
+        strategy = SolverStrategy(puzzle.clue_db, puzzle.new_solution(), oracle)
+        strategy.prepare()
+
+        result = TreeDecompositionSolver.from_strategy(strategy, max_width=8).solve()
+
+        assert not result.too_wide
+        assert result.assignments == puzzle.answers
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
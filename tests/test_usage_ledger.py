@@ -0,0 +1,216 @@
+"""
+Tests for the per-call token, latency and cost ledger
+"""
+
+import contextvars
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from services.call_policy import CallPolicy, ResilientCaller
+from services.clue_solver import ClueSolver, ANTHROPIC_AVAILABLE
+from services.usage_ledger import (
+    UsageLedger, UsageMeter, UsageRecord, ENV_PATH,
+    extract_usage, estimate_cost, get_ledger, use_ledger, usage_context, current_usage_context
+)
+from tests.mock_model_server import MockModelServer, ClueOracleResponder
+from tests.solver_benchmark import generate_puzzle
+from tests.usage_report import main as report_main
+
+
+def anthropic_response(input_tokens, output_tokens):
+    return SimpleNamespace(usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+
+
+def _ledger(tmp_path):
+    return UsageLedger(DatabaseManager(tmp_path / "test.db"))
+
+
+class TestExtraction:
+    """בדיקות לחילוץ הטוקנים ולתמחור"""
+
+    def test_provider_formats(self):
+        openai = SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=100, completion_tokens=80,
+            completion_tokens_details=SimpleNamespace(reasoning_tokens=30)
+        ))
+        gemini = SimpleNamespace(usage_metadata=SimpleNamespace(
+            prompt_token_count=200, candidates_token_count=20, thoughts_token_count=500
+        ))
+
+        assert extract_usage(anthropic_response(10, 5)) == (10, 5, 0)
+        assert extract_usage(openai) == (100, 50, 30)
+        assert extract_usage(gemini) == (200, 20, 500)
+        assert extract_usage({'responses': []}) == (0, 0, 0)
+
+    def test_cost(self):
+        """תחילית ארוכה קודמת; חשיבה מחויבת כפלט; Vision לפי יחידות"""
+        sonnet = UsageRecord("s", "anthropic", "claude-sonnet-4-20250514", input_tokens=1_000_000)
+        gemini = UsageRecord("s", "google", "gemini-2.5-flash-lite", output_tokens=500_000, thinking_tokens=500_000)
+        vision = UsageRecord("ocr", "google_vision", "text_detection", units=2000)
+
+        assert estimate_cost(sonnet) == pytest.approx(3.0)
+        assert estimate_cost(gemini) == pytest.approx(2.5)
+        assert estimate_cost(vision) == pytest.approx(3.0)
+        assert estimate_cost(UsageRecord("s", "x", "unknown-model", input_tokens=10)) == 0.0
+
+
+class TestMeter:
+    """בדיקות ל-UsageMeter דרך ResilientCaller"""
+
+    def test_retries_and_tokens_across_attempts(self, tmp_path):
+        """שני ניסיונות שנכשלו ושלישי שהצליח - שורה אחת עם כל הספירות"""
+        calls = []
+
+        def request(timeout):
+            calls.append(timeout)
+            response = meter.observe(anthropic_response(100, 10))
+            if len(calls) < 3:
+                raise ConnectionError("flaky")
+            return response
+
+        ledger = _ledger(tmp_path)
+        caller = ResilientCaller(CallPolicy(max_attempts=3), sleep=lambda _: None)
+        with use_ledger(ledger), usage_context(puzzle="p1", cell=(2, 3)):
+            meter = UsageMeter("clue_solver", "anthropic", "claude-sonnet-4", clues=["c1", "c2"])
+            caller.call(request, meter=meter)
+
+        [record] = ledger.load()
+        assert (record.attempts, record.retries, record.hedges, record.success) == (3, 2, 0, True)
+        assert (record.input_tokens, record.output_tokens) == (300, 30)
+        assert (record.puzzle, record.cell, record.clues) == ("p1", (2, 3), ["c1", "c2"])
+        assert record.cost_usd == pytest.approx((300 * 3.0 + 30 * 15.0) / 1_000_000)
+        assert record == meter.record
+
+    def test_failure_is_recorded(self, tmp_path):
+        def request(timeout):
+            raise ValueError("bad request")
+
+        ledger = _ledger(tmp_path)
+        caller = ResilientCaller(CallPolicy(max_attempts=2), sleep=lambda _: None)
+        meter = UsageMeter("arrow_detection", "openai", "gpt-5.2")
+        with use_ledger(ledger), pytest.raises(ValueError):
+            caller.call(request, meter=meter)
+
+        [record] = ledger.load()
+        assert not record.success
+        assert record.error == "ValueError: bad request"
+        assert (record.attempts, record.retries, record.puzzle, record.cell) == (2, 1, "", None)
+
+    def test_no_ledger_no_write(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(ENV_PATH, raising=False)
+        meter = UsageMeter("ocr", "google_vision", "text_detection")
+
+        ResilientCaller().call(lambda timeout: meter.observe({}, units=1), meter=meter)
+
+        assert get_ledger() is None
+        assert meter.record.units == 1
+
+    def test_context_nesting_and_threads(self):
+        """הקשר מקונן; thread חדש לא יורש אותו בלי copy_context"""
+        seen = {}
+
+        with usage_context(puzzle="p1"):
+            with usage_context(cell=(1, 1)):
+                assert current_usage_context() == {'puzzle': "p1", 'cell': (1, 1)}
+            plain = threading.Thread(target=lambda: seen.update(plain=current_usage_context()))
+            copied = threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(lambda: seen.update(copied=current_usage_context()),)
+            )
+            for thread in (plain, copied):
+                thread.start()
+                thread.join()
+
+        assert current_usage_context() == {}
+        assert seen == {'plain': {}, 'copied': {'puzzle': "p1"}}
+
+
+class TestLedger:
+    """בדיקות לטבלה model_calls, ל-rollups ולדוח"""
+
+    def _fill(self, ledger):
+        records = [
+            UsageRecord("ocr", "google_vision", "text_detection", units=1, latency=0.2, puzzle="p1", cell=(0, 0)),
+            UsageRecord("arrow_detection", "google", "gemini-3-pro-preview", input_tokens=1000,
+                        output_tokens=100, thinking_tokens=2000, latency=8.0, retries=1, puzzle="p1", cell=(0, 0)),
+            UsageRecord("clue_solver", "anthropic", "claude-sonnet-4-20250514", input_tokens=500,
+                        output_tokens=200, latency=2.0, puzzle="p1", clues=["c1", "c2"]),
+            UsageRecord("clue_solver", "anthropic", "claude-sonnet-4-20250514", input_tokens=500,
+                        output_tokens=200, latency=4.0, success=False, error="timeout", puzzle="p2"),
+        ]
+        for record in records:
+            record.cost_usd = estimate_cost(record)
+            ledger.record(record)
+        return records
+
+    def test_round_trip(self, tmp_path):
+        ledger = _ledger(tmp_path)
+        records = self._fill(ledger)
+
+        loaded = ledger.load()
+
+        assert [(r.stage, r.cell, r.clues, r.success) for r in loaded] == \
+            [(r.stage, r.cell, r.clues, r.success) for r in records]
+        assert ledger.load(puzzle="p2", limit=5)[0].error == "timeout"
+        assert len(ledger.load(limit=2)) == 2
+
+    def test_rollups(self, tmp_path):
+        ledger = _ledger(tmp_path)
+        self._fill(ledger)
+
+        by_stage = {row['stage']: row for row in ledger.rollup("stage", puzzle="p1")}
+        by_puzzle = [row['puzzle'] for row in ledger.rollup("puzzle")]
+
+        assert by_stage['arrow_detection']['thinking_tokens'] == 2000
+        assert by_stage['arrow_detection']['retries'] == 1
+        assert by_stage['ocr']['units'] == 1
+        assert by_stage['clue_solver']['calls'] == 1
+        assert by_puzzle == ["p1", "p2"]   # מהיקר לזול
+        assert ledger.totals("p2")['failures'] == 1
+        assert ledger.totals("missing")['calls'] == 0
+        with pytest.raises(ValueError):
+            ledger.rollup("error")
+
+        ledger.clear("p2")
+        assert ledger.count() == 3
+
+    def test_env_ledger_and_report(self, tmp_path, monkeypatch, capsys):
+        path = str(tmp_path / "env.db")
+        monkeypatch.setenv(ENV_PATH, path)
+        self._fill(get_ledger())
+
+        rows = report_main(["--db", path, "--puzzle", "p1", "--by", "stage"])
+        output = capsys.readouterr().out
+
+        assert get_ledger() is get_ledger()
+        assert [row['stage'] for row in rows][0] == "arrow_detection"
+        assert "TOTAL" in output and "clue_solver" in output
+
+
+class TestIntegration:
+    """ClueSolver אמיתי מול שרת מדומה"""
+
+    @pytest.mark.skipif(not ANTHROPIC_AVAILABLE, reason="anthropic not installed")
+    def test_clue_solver_calls_are_recorded(self, tmp_path):
+        puzzle = generate_puzzle(7, 7, seed=1)
+        clues = puzzle.clue_db.clues[:3]
+        ledger = _ledger(tmp_path)
+
+        with MockModelServer(ClueOracleResponder.for_puzzle(puzzle)) as server:
+            solver = ClueSolver(api_key="test", base_url=server.anthropic_base_url)
+            with use_ledger(ledger), usage_context(puzzle="synthetic"):
+                solver.solve_clue(clues[0], use_cache=False)
+                solver.solve_batch(clues, use_cache=False)
+
+        single, batch = ledger.load()
+        assert single.clues == [clues[0].id]
+        assert batch.clues == [clue.id for clue in clues]
+        assert all(r.puzzle == "synthetic" and r.input_tokens > 0 and r.cost_usd > 0 for r in (single, batch))
+        assert ledger.totals("synthetic")['calls'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
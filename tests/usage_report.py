@@ -0,0 +1,82 @@
+"""
+Usage Report - טוקנים, זמן ועלות של הקריאות למודלים (מה-usage ledger)
+
+מסכם את הטבלה model_calls לפי תשבץ, שלב, ספק, מודל או משבצת:
+קריאות, כשלונות, טוקנים (קלט / פלט / חשיבה), יחידות Vision, retries,
+hedges, זמן ממוצע ומקסימלי ועלות משוערת - מהיקר לזול.
+
+הרצה:
+    python -m tests.usage_report                              # לפי תשבץ
+    python -m tests.usage_report --puzzle "תשבץ יום שישי" --by stage
+    python -m tests.usage_report --db data/crosswords.db --by model --json
+"""
+
+import argparse
+import json
+from typing import Dict, List, Optional
+
+from database.db_manager import DatabaseManager
+from services.usage_ledger import GROUP_COLUMNS, UsageLedger
+
+
+COLUMNS = (
+    ('calls', 'calls'),
+    ('failures', 'fail'),
+    ('input_tokens', 'input'),
+    ('output_tokens', 'output'),
+    ('thinking_tokens', 'thinking'),
+    ('units', 'units'),
+    ('retries', 'retries'),
+    ('hedges', 'hedges'),
+    ('mean_latency', 'mean_s'),
+    ('max_latency', 'max_s'),
+    ('cost_usd', 'cost_usd'),
+)
+
+
+def format_rollup(rows: List[Dict], group_by: str) -> str:
+    """טבלת טקסט של rollup, עם שורת סה"כ"""
+    if not rows:
+        return "No model calls recorded"
+
+    header = [group_by] + [title for _, title in COLUMNS]
+    table = [[str(row[group_by] or '-')] + [str(row[key]) for key, _ in COLUMNS] for row in rows]
+
+    total = ['TOTAL']
+    for key, _ in COLUMNS:
+        if key == 'mean_latency':
+            value = round(sum(row['total_latency'] for row in rows) / sum(row['calls'] for row in rows), 3)
+        elif key == 'max_latency':
+            value = max(row[key] for row in rows)
+        else:
+            value = sum(row[key] for row in rows)
+            value = round(value, 6) if isinstance(value, float) else value
+        total.append(str(value))
+    table.append(total)
+
+    widths = [max(len(line[i]) for line in [header] + table) for i in range(len(header))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in [header] + table]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="Model usage report")
+    parser.add_argument("--db", default=None, help="קובץ ה-DB (ברירת מחדל: data/crosswords.db)")
+    parser.add_argument("--puzzle", default=None, help="רק הקריאות של תשבץ אחד")
+    parser.add_argument("--by", default="puzzle", choices=GROUP_COLUMNS)
+    parser.add_argument("--json", action="store_true", help="פלט JSON במקום טבלה")
+    args = parser.parse_args(argv)
+
+    ledger = UsageLedger(DatabaseManager(args.db))
+    rows = ledger.rollup(args.by, args.puzzle)
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print(format_rollup(rows, args.by))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ from ui.control_bar import ControlBar, render_control_bar
 from ui.crossword_grid import CrosswordGridDisplay, render_crossword_grid
 from ui.clues_table import CluesTableDisplay, render_clues_table
 from ui.manual_edit_panel import ManualEditPanel, render_manual_edit_panel
-from ui.stats_panel import StatsPanel, render_stats_panel, render_completion_summary
+from ui.stats_panel import StatsPanel, UsagePanel, render_stats_panel, render_usage_panel, render_completion_summary
 from ui.solver_view import SolverView, SolverViewConfig, render_solver_view
 
 __all__ = [
@@ -34,6 +34,7 @@ __all__ = [
     'CluesTableDisplay',
     'ManualEditPanel',
     'StatsPanel',
+    'UsagePanel',
     # Main View
     'SolverView',
     'SolverViewConfig',
@@ -43,6 +44,7 @@ __all__ = [
     'render_clues_table',
     'render_manual_edit_panel',
     'render_stats_panel',
+    'render_usage_panel',
     'render_completion_summary',
     'render_solver_view',
 ]
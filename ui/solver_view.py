@@ -16,7 +16,8 @@ from ui.control_bar import render_control_bar
 from ui.crossword_grid import render_crossword_grid
 from ui.clues_table import render_clues_table
 from ui.manual_edit_panel import render_manual_edit_panel
-from ui.stats_panel import render_stats_panel, render_completion_summary
+from ui.stats_panel import render_stats_panel, render_usage_panel, render_completion_summary
+from services.usage_ledger import usage_context
 
 
 @dataclass
@@ -26,6 +27,7 @@ class SolverViewConfig:
     letter_delay_ms: int = 150
     show_stats: bool = True
     show_manual_edit: bool = True
+    puzzle_name: Optional[str] = None  # לרישום ולסיכום הקריאות למודלים (services.usage_ledger)
 
 
 class SolverView:
@@ -93,7 +95,8 @@ class SolverView:
         # === Step-by-step solving ===
         # אם אנחנו במצב RUNNING, נבצע צעד אחד ונעדכן את ה-UI
         if self.state.mode == SolverMode.RUNNING and st.session_state.get('is_solving', False):
-            self._execute_solving_step()
+            with usage_context(puzzle=self.config.puzzle_name):
+                self._execute_solving_step()
 
         # Main layout - two columns
         left_col, right_col = st.columns([1, 1])
@@ -131,6 +134,7 @@ class SolverView:
             if self.config.show_stats:
                 st.divider()
                 render_stats_panel(self.state)
+                render_usage_panel(self.config.puzzle_name)
 
         # Completion summary (when done)
         if self.state.mode == SolverMode.COMPLETED:
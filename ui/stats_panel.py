@@ -7,6 +7,7 @@ import streamlit as st
 import time
 from typing import Optional
 from ui.solver_state import SolverUIState, SolverMode
+from services.usage_ledger import UsageLedger, get_ledger
 
 
 class StatsPanel:
@@ -97,6 +98,58 @@ class StatsPanel:
         st.caption(stats_text)
 
 
+class UsagePanel:
+    """
+    עלות הקריאות למודלים של התשבץ (מה-usage ledger).
+
+    מציג:
+    - קריאות, טוקנים (קלט / פלט / חשיבה) ועלות משוערת
+    - פירוט לפי שלב: OCR, חצים, משבצות חצויות, פתרון הגדרות
+    """
+
+    def __init__(self, puzzle: str, ledger: Optional[UsageLedger] = None):
+        self.puzzle = puzzle
+        self.ledger = ledger or get_ledger()
+
+    def render(self) -> None:
+        """רינדור פאנל העלויות (כלום אם אין ledger או קריאות)"""
+        if self.ledger is None:
+            return
+
+        totals = self.ledger.totals(self.puzzle)
+        if not totals['calls']:
+            return
+
+        with st.expander("עלות קריאות למודלים", expanded=False):
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.metric("קריאות", str(totals['calls']))
+
+            with col2:
+                tokens = totals['input_tokens'] + totals['output_tokens'] + totals['thinking_tokens']
+                st.metric("טוקנים", f"{tokens:,}")
+
+            with col3:
+                st.metric("עלות משוערת", f"${totals['cost_usd']:.3f}")
+
+            rows = [
+                {
+                    'שלב': row['stage'],
+                    'קריאות': row['calls'],
+                    'כשלונות': row['failures'],
+                    'קלט': row['input_tokens'],
+                    'פלט': row['output_tokens'],
+                    'חשיבה': row['thinking_tokens'],
+                    'retries': row['retries'],
+                    'זמן ממוצע (שניות)': row['mean_latency'],
+                    'עלות ($)': round(row['cost_usd'], 4),
+                }
+                for row in self.ledger.rollup("stage", self.puzzle)
+            ]
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
 class CompletionSummary:
     """
     סיכום בסיום הפתרון
@@ -161,6 +214,12 @@ def render_stats_panel(state: SolverUIState, compact: bool = False) -> None:
         panel.render()
 
 
+def render_usage_panel(puzzle: Optional[str]) -> None:
+    """פונקציית עזר לרינדור עלות הקריאות של תשבץ"""
+    if puzzle:
+        UsagePanel(puzzle).render()
+
+
 def render_completion_summary(state: SolverUIState) -> None:
     """פונקציית עזר לרינדור סיכום"""
     summary = CompletionSummary(state)